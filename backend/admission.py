@@ -0,0 +1,388 @@
+"""
+Admission control for the Café Fausse booking endpoints
+
+When a special event opens, booking traffic can spike far beyond what the
+write path (day lock, occupancy load, insert) can absorb, and every worker
+ends up waiting on PostgreSQL. This module puts a virtual waiting room in
+front of the endpoints in ``ADMISSION_ENDPOINTS``:
+
+- At most ``ADMISSION_MAX_CONCURRENT`` booking requests are inside the write
+  path at any time, across all workers.
+- Everyone else receives ``429`` with a signed queue ticket, their position
+  and a ``Retry-After``. Retrying with the ticket in the ``X-Queue-Ticket``
+  header keeps their place; tickets are admitted in order.
+- Queued tickets that stop retrying (the guest left) are skipped once they
+  are ``ADMISSION_SKIP_SECONDS`` late, so they do not hold the queue back.
+
+Where the queue state lives follows ``CACHE_BACKEND``. With ``redis`` it is
+kept on the Redis server at ``CACHE_REDIS_URL`` and every decision is one
+atomic script run there. Otherwise it lives in PostgreSQL
+(``models/admission.py``): an admitted request claims one of
+``ADMISSION_MAX_CONCURRENT`` slot rows with ``SKIP LOCKED``, so concurrent
+decisions lock different rows instead of queueing on a single one. Either way
+the state is shared by every gunicorn worker, and an admitted request holds a
+lease that expires after ``ADMISSION_LEASE_SECONDS`` in case its worker dies.
+
+Redis is the production backend. The PostgreSQL room puts its work on the
+primary, the server the waiting room protects, at the moment of the spike:
+every request costs at least one statement and a transaction there, and
+admitted ones several more plus row locks. Requests that stay queued, the
+bulk of a spike, are answered by a single statement touching only their own
+waiter row, but that is still primary load Redis would take instead. The
+PostgreSQL room suits development and small deployments without Redis; the
+application logs a warning when it starts with it outside debug and testing.
+When the waiting room cannot decide, the request is queued rather than let
+through: an outage of the shared state must not switch the protection off at
+the moment it is needed most.
+"""
+import math
+from collections import namedtuple
+from datetime import timedelta
+
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+
+from .cache import redis
+from .extensions import db
+from .models.admission import AdmissionSlot, AdmissionWaiter
+
+TICKET_HEADER = 'X-Queue-Ticket'
+
+# Endpoints entering the booking write path
+ADMISSION_ENDPOINTS = frozenset([
+    'reservations.create_reservation', 'reservations.create_hold', 'reservations.create_standing_reservation'
+])
+
+Decision = namedtuple('Decision', ['ticket', 'admitted', 'position', 'retry_after'])
+
+# One admission decision on the Redis server. KEYS: ticket counter, leases
+# (ticket by lease expiry), waiting tickets (by ticket) and waiters' deadlines.
+# ARGV: ticket ('' for a new one), limit, lease ms, retry seconds, skip ms.
+# Mirrors PostgresWaitingRoom.admit and retry_after.
+ADMIT_SCRIPT = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local limit = tonumber(ARGV[2])
+local ticket = tonumber(ARGV[1])
+if not ticket then
+    ticket = redis.call('INCR', KEYS[1])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, gone in ipairs(redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now)) do
+    redis.call('ZREM', KEYS[3], gone)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', now)
+local free = limit - redis.call('ZCARD', KEYS[2])
+local ahead = redis.call('ZCOUNT', KEYS[3], '-inf', '(' .. ticket)
+if ahead < free then
+    redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), ticket)
+    redis.call('ZREM', KEYS[3], ticket)
+    redis.call('ZREM', KEYS[4], ticket)
+    return {ticket, 1, 0, 0}
+end
+local position = ahead - math.max(free, 0) + 1
+local wait = tonumber(ARGV[4]) * math.min(math.max(math.ceil(position / limit), 1), 10)
+redis.call('ZADD', KEYS[3], ticket, ticket)
+redis.call('ZADD', KEYS[4], now + wait * 1000 + tonumber(ARGV[5]), ticket)
+return {ticket, 0, position, wait}
+"""
+
+# The queued path of PostgresWaitingRoom.admit in one statement: count the
+# held slots and the live waiters ahead of the ticket (issuing one if needed)
+# and, unless a slot may be free for it, remember the ticket until its
+# Retry-After plus the skip allowance. Only the caller's waiter row is written.
+# Mirrors retry_after.
+QUEUE_QUERY = text("""
+WITH caller AS (
+    SELECT coalesce(CAST(:ticket AS bigint), nextval('admission_ticket_seq')) AS ticket,
+           (SELECT count(*) FROM admission_slots
+            WHERE slot < :limit AND ticket IS NOT NULL AND lease_until >= localtimestamp) AS in_flight
+), place AS (
+    SELECT caller.ticket, caller.in_flight,
+           (SELECT count(*) FROM admission_waiters
+            WHERE admission_waiters.ticket < caller.ticket AND seen_until >= localtimestamp) AS ahead
+    FROM caller
+), decision AS (
+    SELECT ticket, ahead < :limit - in_flight AS admissible,
+           ahead - greatest(:limit - in_flight, 0) + 1 AS position
+    FROM place
+), waiter AS (
+    INSERT INTO admission_waiters (ticket, seen_until)
+    SELECT ticket, localtimestamp + make_interval(
+        secs => :retry * least(greatest(ceil(position / CAST(:limit AS numeric)), 1), 10) + :skip
+    )
+    FROM decision WHERE NOT admissible
+    ON CONFLICT (ticket) DO UPDATE SET seen_until = excluded.seen_until
+)
+SELECT ticket, admissible, position FROM decision
+""")
+
+
+def retry_after(position, limit, retry_seconds):
+    """
+    Seconds a queued client should wait before retrying
+
+    Args:
+        position (int): Place in the queue, 1 for the next ticket
+        limit (int): Maximum number of concurrent admitted requests
+        retry_seconds (int): Expected duration of one booking request
+
+    Returns:
+        int: Suggested wait, between ``retry_seconds`` and ten times that
+    """
+    return retry_seconds * min(max(math.ceil(position / limit), 1), 10)
+
+
+class PostgresWaitingRoom:
+    """
+    Waiting room state kept in PostgreSQL, on the primary
+
+    Each decision first runs ``QUEUE_QUERY``; only a ticket a slot may be
+    free for goes on to clean up lapsed waiters and claim a slot.
+    """
+
+    def admit(self, ticket, limit, lease_seconds, retry_seconds, skip_seconds):
+        """
+        Decide whether a booking request may enter the write path
+
+        Free capacity goes to the lowest waiting tickets first. A queued
+        ticket is remembered until its ``Retry-After`` plus ``skip_seconds``
+        has passed; after that it no longer holds later tickets back.
+
+        Args:
+            ticket (int): The request's queue ticket, or None to issue one
+            limit (int): Maximum number of concurrent admitted requests
+            lease_seconds (int): How long an admission counts if never released
+            retry_seconds (int): Expected duration of one booking request
+            skip_seconds (int): How long a queued ticket may be late to retry
+                before later ones take its turn
+
+        Returns:
+            Decision: The ticket, whether it was admitted and, if not, its
+                position and suggested wait
+        """
+        with db.engine.begin() as connection:
+            ticket, admissible, position = connection.execute(QUEUE_QUERY, {
+                'ticket': ticket, 'limit': limit, 'retry': retry_seconds, 'skip': skip_seconds
+            }).one()
+        if not admissible:
+            return Decision(ticket, False, position, retry_after(position, limit, retry_seconds))
+
+        now = func.localtimestamp()
+        with db.engine.begin() as connection:
+            # Rows another decision is already removing are left to it
+            gone = select(AdmissionWaiter.ticket).where(AdmissionWaiter.seen_until < now).with_for_update(skip_locked=True)
+            connection.execute(delete(AdmissionWaiter).where(AdmissionWaiter.ticket.in_(gone)))
+
+            held = (AdmissionSlot.ticket.isnot(None)) & (AdmissionSlot.lease_until >= now)
+            slots, in_flight = connection.execute(
+                select(func.count(), func.count().filter(held)).where(AdmissionSlot.slot < limit)
+            ).one()
+            if slots < limit:
+                connection.execute(
+                    insert(AdmissionSlot)
+                    .from_select(['slot'], select(func.generate_series(0, limit - 1)))
+                    .on_conflict_do_nothing()
+                )
+            ahead = connection.scalar(select(func.count()).where(AdmissionWaiter.ticket < ticket))
+            free = limit - in_flight
+
+            if ahead < free and self._claim(connection, ticket, limit, lease_seconds):
+                connection.execute(delete(AdmissionWaiter).where(AdmissionWaiter.ticket == ticket))
+                return Decision(ticket, True, 0, 0)
+
+            position = max(ahead - max(free, 0), 0) + 1
+            wait = retry_after(position, limit, retry_seconds)
+            seen_until = now + timedelta(seconds=wait + skip_seconds)
+            connection.execute(
+                insert(AdmissionWaiter)
+                .values(ticket=ticket, seen_until=seen_until)
+                .on_conflict_do_update(index_elements=['ticket'], set_={'seen_until': seen_until})
+            )
+            return Decision(ticket, False, position, wait)
+
+    def _claim(self, connection, ticket, limit, lease_seconds):
+        # Concurrent claims skip each other's rows instead of waiting on them
+        now = func.localtimestamp()
+        free_slot = (
+            select(AdmissionSlot.slot)
+            .where(AdmissionSlot.slot < limit, or_(AdmissionSlot.ticket.is_(None), AdmissionSlot.lease_until < now))
+            .order_by(AdmissionSlot.slot)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return connection.execute(
+            update(AdmissionSlot)
+            .where(AdmissionSlot.slot == free_slot)
+            .values(ticket=ticket, lease_until=now + timedelta(seconds=lease_seconds))
+            .returning(AdmissionSlot.slot)
+        ).first() is not None
+
+    def release(self, ticket):
+        """
+        Give an admitted request's slot back
+
+        Args:
+            ticket (int): Ticket of the finished request
+        """
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(AdmissionSlot).where(AdmissionSlot.ticket == ticket).values(ticket=None, lease_until=None)
+            )
+
+
+class RedisWaitingRoom:
+    """
+    Waiting room state kept on a Redis-protocol server
+
+    Attributes:
+        keys (list): Keys of the ticket counter, leases, waiting tickets and
+            waiters' deadlines
+    """
+
+    def __init__(self, url, prefix):
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.keys = [f'{prefix}admission:{name}' for name in ('ticket', 'leases', 'waiting', 'deadlines')]
+        self._script = self.client.register_script(ADMIT_SCRIPT)
+
+    def admit(self, ticket, limit, lease_seconds, retry_seconds, skip_seconds):
+        """
+        Decide whether a booking request may enter the write path
+
+        Same arguments and result as ``PostgresWaitingRoom.admit``, decided
+        atomically on the server in a single round trip.
+        """
+        ticket, admitted, position, wait = self._script(
+            keys=self.keys,
+            args=['' if ticket is None else ticket, limit, lease_seconds * 1000, retry_seconds, skip_seconds * 1000]
+        )
+        return Decision(int(ticket), bool(admitted), int(position), int(wait))
+
+    def release(self, ticket):
+        """
+        Give an admitted request's lease back
+
+        Args:
+            ticket (int): Ticket of the finished request
+        """
+        self.client.zrem(self.keys[1], ticket)
+
+
+def get_waiting_room():
+    """
+    Get the waiting room state of the current application
+
+    Returns:
+        RedisWaitingRoom or PostgresWaitingRoom: Redis when ``CACHE_BACKEND``
+            is ``redis``, PostgreSQL otherwise
+    """
+    room = current_app.extensions.get('waiting_room')
+    if room is None:
+        config = current_app.config
+        if config['CACHE_BACKEND'] == 'redis':
+            room = RedisWaitingRoom(config['CACHE_REDIS_URL'], config['CACHE_KEY_PREFIX'])
+        else:
+            room = PostgresWaitingRoom()
+        room = current_app.extensions.setdefault('waiting_room', room)
+    return room
+
+
+class AdmissionControl:
+    """
+    Flask extension queueing booking requests in a virtual waiting room
+
+    Registers a ``before_request`` hook admitting or queueing requests to the
+    booking endpoints and a ``teardown_request`` hook releasing admissions.
+    """
+
+    def init_app(self, app):
+        """
+        Register the waiting room with a Flask application
+
+        Args:
+            app (Flask): The Flask application instance
+        """
+        app.config.setdefault('ADMISSION_CONTROL_ENABLED', True)
+        app.config.setdefault('ADMISSION_MAX_CONCURRENT', 20)
+        app.config.setdefault('ADMISSION_LEASE_SECONDS', 30)
+        app.config.setdefault('ADMISSION_RETRY_SECONDS', 2)
+        app.config.setdefault('ADMISSION_SKIP_SECONDS', 10)
+        if app.config['ADMISSION_CONTROL_ENABLED'] and app.config['CACHE_BACKEND'] != 'redis' \
+                and not (app.debug or app.testing):
+            app.logger.warning(
+                'Admission control keeps its waiting room in PostgreSQL, which loads the primary '
+                'during booking spikes; set CACHE_BACKEND=redis in production'
+            )
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def _serializer(self):
+        return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='admission-ticket')
+
+    def _ticket(self):
+        token = request.headers.get(TICKET_HEADER)
+        if not token:
+            return None
+        try:
+            return int(self._serializer().loads(token))
+        except (BadSignature, ValueError, TypeError):
+            return None
+
+    def _admit(self):
+        config = current_app.config
+        if request.endpoint not in ADMISSION_ENDPOINTS or not config['ADMISSION_CONTROL_ENABLED']:
+            return None
+        ticket = self._ticket()
+        try:
+            decision = get_waiting_room().admit(
+                ticket,
+                config['ADMISSION_MAX_CONCURRENT'],
+                config['ADMISSION_LEASE_SECONDS'],
+                config['ADMISSION_RETRY_SECONDS'],
+                config['ADMISSION_SKIP_SECONDS']
+            )
+        except Exception as e:
+            # Letting everyone through would switch the waiting room off under
+            # exactly the load it exists for; keep the client's place instead
+            current_app.logger.error(f'Admission control unavailable: {str(e)}')
+            return self._queued(
+                ticket, None, config['ADMISSION_RETRY_SECONDS'],
+                'We are receiving a lot of reservations right now, please try again shortly.'
+            )
+
+        if decision.admitted:
+            g.admission_ticket = decision.ticket
+            return None
+        return self._queued(
+            decision.ticket, decision.position, decision.retry_after,
+            'We are receiving a lot of reservations right now. You are in the queue, please wait.'
+        )
+
+    def _queued(self, ticket, position, wait, message):
+        body = {'success': False, 'message': message, 'position': position, 'retry_after': wait}
+        if ticket is not None:
+            body['queue_ticket'] = self._serializer().dumps(ticket)
+        response = jsonify(body)
+        response.status_code = 429
+        response.headers['Retry-After'] = str(wait)
+        if ticket is not None:
+            response.headers[TICKET_HEADER] = body['queue_ticket']
+        return response
+
+    def _release(self, exception=None):
+        ticket = g.pop('admission_ticket', None)
+        if ticket is None:
+            return
+        try:
+            get_waiting_room().release(ticket)
+        except Exception as e:
+            # The lease lapses on its own after ADMISSION_LEASE_SECONDS
+            current_app.logger.error(f'Failed to release admission {ticket}: {str(e)}')
+
+
+admission_control = AdmissionControl()
@@ -0,0 +1,178 @@
+"""
+Batch API Blueprint for Café Fausse
+
+This module provides a single endpoint running many write requests at once,
+so bulk edits from the admin pages (deactivating 200 subscribers, reordering
+the menu) cost one round trip instead of one request per row.
+
+Each operation is an ordinary request to another endpoint, dispatched through
+the application with the batch's ``Authorization`` header, so it is validated
+and answered exactly as if it had been sent alone. Every operation runs on one
+database connection, which its endpoint reaches through ``db.session``; write
+endpoints therefore make their changes there rather than in sessions of their
+own, which would commit outside the batch and wait on its locks:
+
+- Atomic batches (the default) run in one transaction. The endpoints' own
+  commits only release a savepoint, and the first operation answered with an
+  error status rolls the whole batch back.
+- Independent batches commit each operation on its own and keep going after
+  a failure.
+
+Cache invalidations of an atomic batch are sent when its transaction commits,
+like any other; this worker's caches are evicted once the batch has ended,
+committed or not (see ``services/invalidation.py``). The side effects the
+endpoints run after committing (guest notifications, pacing counters) are
+queued with ``after_commit`` and run only once the batch's transaction has
+committed, so a rolled-back batch notifies no one.
+"""
+from flask import Blueprint, current_app, jsonify, request
+from flask_sqlalchemy.session import Session as FlaskSession
+from werkzeug.test import EnvironBuilder
+from ..extensions import db
+
+batch_bp = Blueprint('batch', __name__)
+
+# Methods an operation may use; reads are served by their own endpoints and engines
+BATCH_METHODS = frozenset(['POST', 'PUT', 'PATCH', 'DELETE'])
+
+
+class _ConnectionSession(FlaskSession):
+    """Session running every statement on the batch's connection"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        return self.bind
+
+
+def _validate(operations):
+    # Returns an error message, or None when every operation can be dispatched
+    if not isinstance(operations, list) or not operations:
+        return 'operations must be a non-empty list'
+    if len(operations) > current_app.config['BATCH_MAX_OPERATIONS']:
+        return f'A batch holds at most {current_app.config["BATCH_MAX_OPERATIONS"]} operations'
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or not isinstance(operation.get('path'), str):
+            return f'Operation {index} needs a path'
+        if str(operation.get('method', '')).upper() not in BATCH_METHODS:
+            return f'Operation {index}: method must be one of {", ".join(sorted(BATCH_METHODS))}'
+        path = operation['path'].split('?', 1)[0].rstrip('/')
+        if not path.startswith('/api/') or path == request.path.rstrip('/'):
+            return f'Operation {index}: path must be an API endpoint other than the batch'
+    return None
+
+
+def _dispatch(operation, connection, session_options):
+    """
+    Run one operation as a request of its own on the batch's connection
+
+    Args:
+        operation (dict): Operation with ``method``, ``path`` and optional ``body``
+        connection (Connection): Connection every operation runs on
+        session_options (dict): Extra options of the operation's session
+
+    Returns:
+        dict: The operation's ``status`` and its decoded ``body``
+    """
+    app = current_app._get_current_object()
+    headers = {'Authorization': request.headers['Authorization']} if 'Authorization' in request.headers else {}
+    builder = EnvironBuilder(
+        path=operation['path'],
+        method=operation['method'].upper(),
+        json=operation.get('body'),
+        headers=headers,
+        environ_base={'REMOTE_ADDR': request.remote_addr}
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    # A fresh application context gives the operation its own g and its own
+    # db.session, which the context's teardown closes
+    with app.app_context():
+        db.session.registry.set(_ConnectionSession(**{
+            **db.session.session_factory.kw, 'bind': connection, **session_options
+        }))
+        with app.request_context(environ):
+            response = app.full_dispatch_request()
+    try:
+        body = response.get_json(silent=True)
+        if body is None and response.data:
+            body = response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+    finally:
+        response.close()
+
+
+@batch_bp.route('', methods=['POST'])
+@batch_bp.route('/', methods=['POST'])
+def run_batch():
+    """
+    Run many write requests in one round trip
+
+    Request Body:
+        operations (list): Requests to run in order, each with ``method``
+            (POST, PUT, PATCH or DELETE), ``path`` (e.g.
+            ``/api/newsletter/subscribers/3``) and an optional JSON ``body``
+        atomic (bool, optional): Run all operations in one transaction,
+            stopping at the first failure (default), or commit each on its own
+
+    Returns:
+        JSON: Object with success status, whether the changes were
+            ``committed`` and one result (``status`` and ``body``) per
+            operation run; an atomic batch stops after the failed operation,
+            whose index is given as ``failed``
+
+    Responses:
+        200: Every operation of an atomic batch succeeded, or an independent batch ran
+        400: Invalid batch
+        422: An operation of an atomic batch failed; no change was kept
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    message = _validate(operations)
+    if message:
+        return jsonify({'success': False, 'message': message}), 400
+    atomic = data.get('atomic', True)
+
+    results = []
+    connection = db.engine.connect()
+    try:
+        if not atomic:
+            # Each operation's session begins and commits its own transaction
+            for operation in operations:
+                results.append(_dispatch(operation, connection, {}))
+            return jsonify({
+                'success': all(result['status'] < 400 for result in results),
+                'committed': True,
+                'results': results
+            })
+
+        invalidations, actions = [], []
+        transaction = connection.begin()
+        try:
+            for index, operation in enumerate(operations):
+                results.append(_dispatch(operation, connection, {
+                    'join_transaction_mode': 'create_savepoint',
+                    'info': {'batch_invalidations': invalidations, 'batch_actions': actions}
+                }))
+                if results[-1]['status'] >= 400:
+                    transaction.rollback()
+                    return jsonify({
+                        'success': False,
+                        'committed': False,
+                        'message': f'Operation {index} failed, no change was made',
+                        'failed': index,
+                        'results': results
+                    }), 422
+            transaction.commit()
+            for action, args in actions:
+                action(*args)
+        finally:
+            if transaction.is_active:
+                transaction.rollback()
+            # Rolled-back operations may have updated caches in place too
+            for bus, entity, key in invalidations:
+                bus.evict(entity, key)
+        return jsonify({'success': True, 'committed': True, 'results': results})
+    finally:
+        connection.close()
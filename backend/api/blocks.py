@@ -0,0 +1,196 @@
+"""
+Capacity blocks API Blueprint for Café Fausse
+
+This module provides staff endpoints for private events and buyouts: blocking
+a group of tables or the whole room over a time window, listing the blocks
+of a period and removing a block. Blocked tables are unavailable to every
+availability check and booking while the block lasts.
+"""
+from flask import Blueprint, jsonify, request
+from datetime import datetime, time
+from flask_jwt_extended import jwt_required
+from ..extensions import db
+from ..models.capacity_block import CapacityBlock
+from ..db_routing import get_read_engine
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..services.blocks import block_days, conflicting_reservations
+from ..services.change_feed import publish
+from ..services.invalidation import after_commit, invalidate
+from ..services.occupancy import load_day, lock_service_day
+from ..services.pacing import get_pacing_cache
+from ..services.schedule import get_schedule
+from ..services.waitlist import announce_promotions, promote_waitlist
+
+blocks_bp = Blueprint('blocks', __name__)
+
+@blocks_bp.route('', methods=['POST'])
+@blocks_bp.route('/', methods=['POST'])
+@jwt_required()
+def create_block():
+    """
+    Block tables for a private event or buyout
+
+    The block is refused while active reservations hold any of its tables
+    during its window, unless ``force`` is set (the staff will move those
+    guests themselves).
+
+    Request Body:
+        name (str): Name of the event
+        starts_at (str): Start in YYYY-MM-DDTHH:MM format
+        ends_at (str): End in YYYY-MM-DDTHH:MM format
+        table_numbers (list, optional): Tables to block; omit to block the whole room
+        guests (int, optional): Expected covers, counted by kitchen pacing
+        notes (str, optional): Any notes for the event
+        force (bool, optional): Create the block despite conflicting reservations
+
+    Returns:
+        JSON: Object containing the created block
+
+    Responses:
+        201: Block created
+        400: Missing required fields, invalid dates or an empty window
+        401: Missing or invalid access token
+        409: Active reservations overlap the block; their IDs are listed
+        500: Server error
+    """
+    data = request.json
+
+    for field in ['name', 'starts_at', 'ends_at']:
+        if field not in data:
+            return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
+
+    try:
+        starts_at = datetime.fromisoformat(data['starts_at'])
+        ends_at = datetime.fromisoformat(data['ends_at'])
+        table_numbers = [int(number) for number in data['table_numbers']] if data.get('table_numbers') else None
+        guests = int(data['guests']) if data.get('guests') is not None else None
+        if ends_at <= starts_at:
+            return jsonify({'success': False, 'message': 'The block must end after it starts'}), 400
+
+        # Bookings of the affected days wait until the block is in place
+        schedule = get_schedule()
+        days = block_days(schedule, starts_at, ends_at)
+        for day in days:
+            lock_service_day(db.session, datetime.combine(day, time.min))
+        conflicts = conflicting_reservations(db.session, schedule, starts_at, ends_at, table_numbers)
+        if conflicts and not data.get('force', False):
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': 'Reservations already hold these tables during the event',
+                'conflicting_reservations': [reservation.id for reservation in conflicts]
+            }), 409
+
+        block = CapacityBlock(
+            name=data['name'],
+            starts_at=starts_at,
+            ends_at=ends_at,
+            table_numbers=table_numbers,
+            guests=guests,
+            notes=data.get('notes', None)
+        )
+        db.session.add(block)
+        db.session.flush()
+        publish(db.session, 'block.created', block.to_dict())
+        for day in days:
+            invalidate(db.session, 'capacity_blocks', day, local=False)
+        db.session.commit()
+        pacing = get_pacing_cache()
+        for day in days:
+            after_commit(db.session, pacing.forget, day)
+
+        return jsonify({'success': True, 'block': block.to_dict()}), 201
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@blocks_bp.route('', methods=['GET'])
+@blocks_bp.route('/', methods=['GET'])
+def get_blocks():
+    """
+    List the blocks overlapping a period
+
+    Query Parameters:
+        from (str, optional): Start of the period in YYYY-MM-DD or YYYY-MM-DDTHH:MM format
+        to (str, optional): End of the period; both default to all blocks
+
+    Returns:
+        JSON: Object containing the blocks ordered by start time
+
+    Responses:
+        200: Blocks returned
+        400: Invalid dates
+    """
+    try:
+        start = datetime.fromisoformat(request.args['from']) if 'from' in request.args else None
+        end = datetime.fromisoformat(request.args['to']) if 'to' in request.args else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+
+    statement = select(CapacityBlock).order_by(CapacityBlock.starts_at)
+    if start or end:
+        statement = statement.where(CapacityBlock.period.op('&&')(func.tsrange(start, end)))
+
+    session = Session(get_read_engine())
+    try:
+        blocks = session.scalars(statement).all()
+        return jsonify({'success': True, 'blocks': [block.to_dict() for block in blocks]})
+    finally:
+        session.close()
+
+@blocks_bp.route('/<int:block_id>', methods=['DELETE'])
+@jwt_required()
+def delete_block(block_id):
+    """
+    Remove a block, releasing its tables to the waitlist first
+
+    Parameters:
+        block_id (int): The ID of the block
+
+    Returns:
+        JSON: Object with success status and message
+
+    Responses:
+        200: Block removed
+        401: Missing or invalid access token
+        404: Block not found
+        500: Server error
+    """
+    block = db.session.get(CapacityBlock, block_id)
+    if not block:
+        return jsonify({'success': False, 'message': 'Block not found'}), 404
+
+    try:
+        starts_at, ends_at = block.starts_at, block.ends_at
+        schedule = get_schedule()
+        days = block_days(schedule, starts_at, ends_at)
+        for day in days:
+            lock_service_day(db.session, datetime.combine(day, time.min))
+        db.session.delete(block)
+        db.session.flush()
+        # The released tables go to the waitlist first, one service day at a time
+        promotions = []
+        for day in days:
+            freed_start = max(starts_at, datetime.combine(day, time.min))
+            if freed_start.date() != day:
+                continue  # The day before the block freed no slots of its own
+            occupancy = load_day(db.session, freed_start, schedule)
+            promotions += promote_waitlist(db.session, occupancy, schedule, freed_start, ends_at)
+        publish(db.session, 'block.deleted', {'id': block_id})
+        for day in days:
+            invalidate(db.session, 'capacity_blocks', day, local=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+    pacing = get_pacing_cache()
+    for day in days:
+        after_commit(db.session, pacing.forget, day)
+    after_commit(db.session, announce_promotions, promotions)
+    return jsonify({'success': True, 'message': 'Block removed'})
@@ -0,0 +1,82 @@
+"""
+Cache administration API Blueprint for Café Fausse
+
+This module provides staff endpoints to inspect the cache namespaces (their
+settings, size and this worker's hit, miss and eviction counters) and to
+flush one namespace or all of them in every worker.
+"""
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from ..extensions import db, cache
+from ..cache import FLUSH_ENTITY
+from ..services.invalidation import invalidate
+
+cache_bp = Blueprint('cache', __name__)
+
+@cache_bp.route('', methods=['GET'])
+@cache_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """
+    Describe the cache backend and every namespace
+
+    Counters are those of the worker serving the request since it started.
+
+    Returns:
+        JSON: Object with success status, the backend and the namespaces by name
+
+    Responses:
+        200: Cache statistics
+        401: Missing or invalid access token
+    """
+    return jsonify({
+        'success': True,
+        'backend': cache.info(),
+        'namespaces': {name: namespace.stats() for name, namespace in sorted(cache.namespaces.items())}
+    })
+
+@cache_bp.route('', methods=['DELETE'])
+@cache_bp.route('/', methods=['DELETE'])
+@jwt_required()
+def flush_cache():
+    """
+    Flush every namespace in every worker
+
+    Returns:
+        JSON: Object with success status, message and the entries dropped here
+
+    Responses:
+        200: Cache flushed
+        401: Missing or invalid access token
+    """
+    # Other workers flush when the invalidation reaches them
+    invalidate(db.session, FLUSH_ENTITY)
+    db.session.commit()
+    flushed = sum(namespace.flush() for namespace in cache.namespaces.values())
+    return jsonify({'success': True, 'message': 'Cache flushed', 'flushed': flushed})
+
+@cache_bp.route('/<name>', methods=['DELETE'])
+@jwt_required()
+def flush_cache_namespace(name):
+    """
+    Flush one namespace in every worker
+
+    Parameters:
+        name (str): The namespace, e.g. ``menu``
+
+    Returns:
+        JSON: Object with success status, message and the entries dropped here
+
+    Responses:
+        200: Namespace flushed
+        401: Missing or invalid access token
+        404: Unknown namespace
+    """
+    namespace = cache.namespaces.get(name)
+    if namespace is None:
+        return jsonify({'success': False, 'message': 'Cache namespace not found'}), 404
+
+    invalidate(db.session, FLUSH_ENTITY, name)
+    db.session.commit()
+    flushed = namespace.flush()
+    return jsonify({'success': True, 'message': f'Cache namespace {name} flushed', 'flushed': flushed})
@@ -2,8 +2,13 @@
 Customers API Blueprint for Café Fausse
 """
 from flask import Blueprint, jsonify, request
+from ..conditional import conditional
+from ..serialization import negotiated
+from ..serializers import customer_fields
 from ..extensions import db
 from ..models.customer import Customer
+from ..db_routing import get_read_engine
+from sqlalchemy.orm import Session
 import logging
 from email_validator import validate_email, EmailNotValidError
 
@@ -14,14 +19,22 @@ logger = logging.getLogger(__name__)
 customers_bp = Blueprint('customers', __name__)
 
 @customers_bp.route('', methods=['GET'])
+@negotiated
+@conditional(lambda: [(Customer,)])
 def get_customers():
-    """Get all customers"""
+    """Get all customers, limited to the ``fields`` requested (see ``fieldsets.py``)"""
     try:
-        customers = Customer.query.all()
+        names = customer_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    session = Session(get_read_engine())
+    try:
+        customers = customer_fields.as_dicts(names, session.execute(customer_fields.select(names)))
         return jsonify({
             'success': True,
             'count': len(customers),
-            'customers': [customer.to_dict() for customer in customers]
+            'customers': customers
         })
     except Exception as e:
         logger.error(f"Error retrieving customers: {str(e)}")
@@ -29,13 +42,22 @@ def get_customers():
             'success': False,
             'message': f'An error occurred: {str(e)}'
         }), 500
+    finally:
+        session.close()
 
 @customers_bp.route('/<int:customer_id>', methods=['GET'])
+@conditional(lambda customer_id: [(Customer, Customer.id == customer_id)])
 def get_customer(customer_id):
-    """Get a specific customer by ID"""
+    """Get a specific customer by ID, limited to the ``fields`` requested"""
     try:
-        customer = Customer.query.get(customer_id)
-        if not customer:
+        names = customer_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    session = Session(get_read_engine())
+    try:
+        rows = session.execute(customer_fields.select(names).where(Customer.id == customer_id)).all()
+        if not rows:
             return jsonify({
                 'success': False,
                 'message': f'Customer with ID {customer_id} not found'
@@ -43,7 +65,7 @@ def get_customer(customer_id):
 
         return jsonify({
             'success': True,
-            'customer': customer.to_dict()
+            'customer': customer_fields.as_dicts(names, rows)[0]
         })
     except Exception as e:
         logger.error(f"Error retrieving customer {customer_id}: {str(e)}")
@@ -51,6 +73,8 @@ def get_customer(customer_id):
             'success': False,
             'message': f'An error occurred: {str(e)}'
         }), 500
+    finally:
+        session.close()
 
 @customers_bp.route('/<int:customer_id>', methods=['PUT'])
 def update_customer(customer_id):
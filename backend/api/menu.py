@@ -2,108 +2,158 @@
 Menu API Blueprint for Café Fausse
 
 This module provides API endpoints for managing menu items and categories
-for the Café Fausse restaurant application.
+for the Café Fausse restaurant application. The GET endpoints are async views
+served by the async read engine, with their responses kept in the ``menu``
+cache namespace; writes use the synchronous session and invalidate ``menu``
+in every worker when they commit. Cached responses keep their ETag and
+Last-Modified validators (see ``conditional.py``), so matching revalidations
+get a ``304`` without touching the database.
 """
 from flask import Blueprint, jsonify, request
-from ..extensions import db
+from ..extensions import db, async_db, cache
+from ..conditional import conditional
+from ..serializers import category_fields, item_fields
 from ..models.menu_item import MenuItem
 from ..models.category import Category
-from sqlalchemy.orm import Session
+from ..services.invalidation import invalidate
+from sqlalchemy import select
 
 menu_bp = Blueprint('menu', __name__)
+menu_cache = cache.namespace('menu', ttl='MENU_CACHE_SECONDS', entities=('menu',))
+
+def menu_items_source(category_id):
+    """Stamp source of the menu items listed, optionally of one category"""
+    if category_id:
+        return (MenuItem, MenuItem.category_id == category_id)
+    return (MenuItem,)
 
 @menu_bp.route('/categories', methods=['GET'])
-def get_categories():
+@menu_cache.cached_view()
+@conditional(lambda: [(Category,)])
+async def get_categories():
     """
     Get all menu categories
     
     Returns a list of all menu categories available in the restaurant.
     
+    Query Parameters:
+        fields (str, optional): Comma-separated category fields to return (see ``fieldsets.py``)
+    
     Returns:
         JSON: Object containing success status and a list of category objects
     """
-    categories = Category.query.all()
+    try:
+        names = category_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    rows = await async_db.execute(category_fields.select(names))
     return jsonify({
         'success': True,
-        'categories': [category.to_dict() for category in categories]
+        'categories': category_fields.as_dicts(names, rows)
     })
 
 @menu_bp.route('/items', methods=['GET'])
-def get_menu_items():
+@menu_cache.cached_view()
+@conditional(lambda: [menu_items_source(request.args.get('category_id', type=int))])
+async def get_menu_items():
     """
     Get all menu items, optionally filtered by category
     
     Query Parameters:
         category_id (int, optional): Filter items by category ID
+        fields (str, optional): Comma-separated item fields to return (see ``fieldsets.py``)
+        include (str, optional): 'category' to add the category name
     
     Returns:
         JSON: Object containing success status and a list of menu item objects
     """
     category_id = request.args.get('category_id', type=int)
-    
+    try:
+        names = item_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    query = item_fields.select(names)
     if category_id:
-        items = MenuItem.query.filter_by(category_id=category_id).all()
-    else:
-        items = MenuItem.query.all()
-        
+        query = query.where(MenuItem.category_id == category_id)
+    rows = await async_db.execute(query)
+
     return jsonify({
         'success': True,
-        'items': [item.to_dict() for item in items]
+        'items': item_fields.as_dicts(names, rows)
     })
 
 @menu_bp.route('/items/<int:item_id>', methods=['GET'])
-def get_menu_item(item_id):
+@menu_cache.cached_view()
+@conditional(lambda item_id: [(MenuItem, MenuItem.id == item_id)])
+async def get_menu_item(item_id):
     """
     Get a specific menu item by ID
     
     Parameters:
         item_id (int): The ID of the menu item to retrieve
     
+    Query Parameters:
+        fields (str, optional): Comma-separated item fields to return (see ``fieldsets.py``)
+        include (str, optional): 'category' to add the category name
+    
     Returns:
         JSON: Object containing success status and the requested menu item
         
     Responses:
+        400: Unknown field or include
         404: Menu item not found
     """
-    session = Session(db.engine)
-    item = session.get(MenuItem, item_id)
-    session.close()
-    
-    if not item:
+    try:
+        names = item_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    rows = await async_db.execute(item_fields.select(names).where(MenuItem.id == item_id))
+    if not rows:
         return jsonify({'success': False, 'message': 'Menu item not found'}), 404
         
     return jsonify({
         'success': True,
-        'item': item.to_dict()
+        'item': item_fields.as_dicts(names, rows)[0]
     })
 
 @menu_bp.route('/categories/<int:category_id>/items', methods=['GET'])
-def get_items_by_category(category_id):
+@menu_cache.cached_view()
+@conditional(lambda category_id: [(Category, Category.id == category_id), menu_items_source(category_id)])
+async def get_items_by_category(category_id):
     """
     Get all menu items for a specific category
     
     Parameters:
         category_id (int): The ID of the category to retrieve items for
     
+    Query Parameters:
+        fields (str, optional): Comma-separated item fields to return (see ``fieldsets.py``)
+    
     Returns:
         JSON: Object containing success status, category name, and a list of menu items
         
     Responses:
+        400: Unknown field or include
         404: Category not found
     """
-    session = Session(db.engine)
-    category = session.get(Category, category_id)
-    session.close()
-    
-    if not category:
+    try:
+        names = item_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    category_names = await async_db.scalars(select(Category.name).where(Category.id == category_id))
+    if not category_names:
         return jsonify({'success': False, 'message': 'Category not found'}), 404
         
-    items = MenuItem.query.filter_by(category_id=category_id).all()
+    rows = await async_db.execute(item_fields.select(names).where(MenuItem.category_id == category_id))
     
     return jsonify({
         'success': True,
-        'category': category.name,
-        'items': [item.to_dict() for item in items]
+        'category': category_names[0],
+        'items': item_fields.as_dicts(names, rows)
     })
 
 @menu_bp.route('/items', methods=['POST'])
@@ -148,6 +198,7 @@ def add_menu_item():
             image_url=data.get('image_url', None)
         )
         db.session.add(menu_item)
+        invalidate(db.session, 'menu')
         db.session.commit()
 
         return jsonify({'success': True, 'message': 'Menu item added successfully', 'item': menu_item.to_dict()}), 201
@@ -196,6 +247,7 @@ def update_menu_item(item_id):
         item.category_id = data['category_id']
 
     try:
+        invalidate(session, 'menu')
         session.commit()
         return jsonify({'success': True, 'message': 'Menu item updated successfully'})
     except Exception as e:
@@ -233,6 +285,7 @@ def update_menu_category(category_id):
         category.name = data['name']
 
     try:
+        invalidate(session, 'menu')
         session.commit()
         return jsonify({'success': True, 'message': 'Category updated successfully'})
     except Exception as e:
@@ -268,6 +321,7 @@ def add_menu_category():
 
         category = Category(name=data['name'])
         db.session.add(category)
+        invalidate(db.session, 'menu')
         db.session.commit()
 
         return jsonify({
@@ -307,6 +361,7 @@ def delete_menu_item(item_id):
             
         print(f"Found menu item: {item.name}. Deleting...")
         session.delete(item)
+        invalidate(session, 'menu')
         session.commit()
         print(f"Menu item with ID {item_id} deleted successfully")
         
@@ -355,6 +410,7 @@ def delete_menu_category(category_id):
             }), 400
             
         session.delete(category)
+        invalidate(session, 'menu')
         session.commit()
         
         return jsonify({'success': True, 'message': 'Category deleted successfully'})
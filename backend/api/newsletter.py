@@ -9,6 +9,11 @@ from flask import Blueprint, jsonify, request
 from ..extensions import db
 from ..models.newsletter import Newsletter
 from ..models.customer import Customer
+from ..db_routing import get_read_engine
+from ..conditional import conditional
+from ..serialization import negotiated
+from ..serializers import subscriber_fields
+from sqlalchemy.orm import Session
 import re
 import logging
 from email_validator import validate_email, EmailNotValidError
@@ -203,6 +208,8 @@ def unsubscribe():
         return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
 
 @newsletter_bp.route('/subscribers', methods=['GET'])
+@negotiated
+@conditional(lambda: [(Newsletter,)])
 def get_subscribers():
     """
     Get all newsletter subscribers
@@ -210,19 +217,33 @@ def get_subscribers():
     Retrieves a list of all newsletter subscribers, both active and inactive.
     This endpoint would typically be restricted to admin users.
     
+    Query Parameters:
+        fields (str, optional): Comma-separated subscriber fields to return (see ``fieldsets.py``)
+    
     Returns:
         JSON: Object containing success status, total count, and list of subscribers
         
     Responses:
         200: Successfully retrieved subscribers list
+        400: Unknown field
     """
+    try:
+        names = subscriber_fields.parse(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
     # This endpoint would typically be restricted to admin users
-    subscribers = Newsletter.query.all()  # Get all subscribers, not just active ones
-    return jsonify({
-        'success': True,
-        'count': len(subscribers),
-        'subscribers': [sub.to_dict() for sub in subscribers]
-    })
+    session = Session(get_read_engine())
+    try:
+        # Get all subscribers, not just active ones
+        subscribers = subscriber_fields.as_dicts(names, session.execute(subscriber_fields.select(names)))
+        return jsonify({
+            'success': True,
+            'count': len(subscribers),
+            'subscribers': subscribers
+        })
+    finally:
+        session.close()
 
 @newsletter_bp.route('/subscribers/<int:subscriber_id>', methods=['PUT'])
 def update_subscriber(subscriber_id):
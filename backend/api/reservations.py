@@ -5,21 +5,101 @@ This module provides API endpoints for managing table reservations
 at the Café Fausse restaurant application, including creating, updating,
 canceling, and checking availability of table reservations.
 """
-from flask import Blueprint, jsonify, request, current_app
-from datetime import datetime, timedelta
+from flask import Blueprint, Response, jsonify, request, current_app
+from datetime import datetime
 from ..extensions import db
-from ..models.reservation import Reservation
+from ..models.reservation import Reservation, ACTIVE_STATUSES, STATUSES
 from ..models.customer import Customer
-import random
+from ..models.standing_reservation import StandingReservation
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from ..api.newsletter import subscribe_to_newsletter
+from ..db_routing import get_read_engine
+from ..conditional import conditional
+from ..serialization import negotiated
+from ..serializers import reservation_fields
+from ..services.occupancy import load_day, load_day_async, lock_service_day
+from ..services.pacing import day_tokens, get_pacing_cache, pacing_allows
+from ..services.schedule import get_schedule
+from ..services.alternatives import nearest_slots, nearest_slots_async, slot_to_dict
+from ..services.waitlist import announce_promotions, promote_freed
+from ..services.holds import claim_hold, hold_tables
+from ..services.change_feed import get_change_feed, publish_reservation
+from ..services.day_sheet import day_customers, day_range, get_day_sheet
+from ..services.invalidation import after_commit, invalidate
+from ..services.standing import cancel_standing, expand_standing, horizon_end, notify_skipped, parse_recurrence
 
 reservations_bp = Blueprint('reservations', __name__)
 
 # Constants
-TOTAL_TABLES = 30
-RESERVATION_DURATION = 90  # minutes
 MOCK_DATE = datetime.strptime("2025-04-01", "%Y-%m-%d")  # Earlier mock date for testing
+MAX_ALTERNATIVES = 20
+
+# Fields of a single reservation, as returned before fieldsets
+RESERVATION_DETAIL = (*reservation_fields.default, 'customer_email')
+# Fields of the admin reservation list
+RESERVATION_LIST = (*RESERVATION_DETAIL, 'customer_phone', 'reservation_id')
+
+def reservation_sources(reservation_id):
+    """Stamp sources of one reservation and its customer"""
+    customer_id = select(Reservation.customer_id).where(Reservation.id == reservation_id).scalar_subquery()
+    return [(Reservation, Reservation.id == reservation_id), (Customer, Customer.id == customer_id)]
+
+def day_sources(day):
+    """Stamp sources of a day sheet: the reservations of that day and their customers, like its cache"""
+    try:
+        service_day = datetime.strptime(day, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    start, end = day_range(service_day)
+    return [
+        (Reservation, Reservation.time_slot >= start, Reservation.time_slot < end),
+        (Customer, Customer.id.in_(day_customers(service_day)))
+    ]
+
+def fully_booked(message, schedule, guests, time_slot, day):
+    """
+    Build the 409 response for a full time slot, with the nearest free slots
+    
+    Args:
+        message (str): Reason shown to the guest
+        schedule (ServiceSchedule): The service schedule
+        guests (int): Party size
+        time_slot (datetime): Requested time
+        day (DayOccupancy): Already loaded occupancy of the requested day
+    
+    Returns:
+        tuple: JSON response and 409 status code
+    """
+    limit = current_app.config['RESERVATION_ALTERNATIVES_LIMIT']
+    alternatives = nearest_slots(db.session, schedule, guests, time_slot, limit, requested_day=day)
+    return jsonify({
+        'success': False,
+        'message': message,
+        'alternatives': [slot_to_dict(slot) for slot in alternatives]
+    }), 409
+
+def get_or_create_customer(data):
+    """
+    Find the customer of a booking request by email, creating it if needed
+    
+    Args:
+        data (dict): Request body with name, email and optionally phone
+    
+    Returns:
+        Customer: The customer, flushed to the current session so it has an ID
+    """
+    customer = Customer.find_by_email(data['email'])
+    if not customer:
+        customer = Customer(
+            name=data['name'],
+            email=data['email'],
+            phone=data.get('phone', None),
+            newsletter_signup=data.get('newsletter_signup', False)
+        )
+        db.session.add(customer)
+        db.session.flush()  # Get the ID without committing
+    return customer
 
 @reservations_bp.route('', methods=['POST'])
 @reservations_bp.route('/', methods=['POST'])
@@ -28,6 +108,9 @@ def create_reservation():
     Create a new reservation
     
     Creates a new table reservation for the specified date and time.
+    The party is seated by best fit on one table, or on several combinable
+    tables for a large party (see ``services/seating.py``), provided the
+    kitchen pacing cap leaves room for its covers (see ``services/pacing.py``).
     Handles customer creation if the customer doesn't exist and
     optionally subscribes the customer to the newsletter.
     
@@ -40,14 +123,19 @@ def create_reservation():
         guests (int): Number of guests
         special_requests (str, optional): Any special requests
         newsletter_opt_in (bool, optional): Whether to subscribe to the newsletter
+        hold_token (str, optional): Token of a hold for this date and time, whose
+            tables are booked instead of searching again
     
     Returns:
         JSON: Object containing reservation details and confirmation message
         
     Responses:
         201: Reservation created successfully
-        400: Missing required fields or invalid date format
-        409: Fully booked for the requested time slot
+        400: Missing required fields, invalid date format, invalid number of guests,
+             a time outside the service schedule or a booking not matching its hold
+        409: Fully booked or kitchen at capacity for the requested time slot;
+             the response lists the nearest available alternatives
+        410: The hold has expired or does not exist
         500: Server error
     """
     data = request.json
@@ -66,6 +154,7 @@ def create_reservation():
         # Parse date and time
         time_slot_str = f"{data['date']} {data['time']}"
         time_slot = datetime.strptime(time_slot_str, '%Y-%m-%d %H:%M')
+        guests = int(data['guests'])
 
         # Special case for testing - in test mode, we want to validate if the specific test date is in the past
         # The test expects 2025-04-01 to be rejected but 2025-04-10 to be accepted
@@ -78,55 +167,75 @@ def create_reservation():
                 print("Validation Error: Cannot make reservations in the past")
                 return jsonify({'success': False, 'message': 'Cannot make reservations in the past'}), 400
 
-        # First, check if we have availability
-        reservation_end = time_slot + timedelta(minutes=RESERVATION_DURATION)
-        booked_tables = Reservation.get_booked_tables(time_slot, reservation_end)
-
-        if len(booked_tables) >= TOTAL_TABLES:
-            print("Availability Error: Fully booked for this time slot")
-            return jsonify({
-                'success': False, 
-                'message': 'Sorry, we are fully booked for this time slot'
-            }), 409
+        if guests <= 0 or guests > 20:
+            return jsonify({'success': False, 'message': 'Invalid number of guests'}), 400
+
+        schedule = get_schedule()
+        if not schedule.is_valid_slot(time_slot, guests):
+            return jsonify({'success': False, 'message': 'We do not take reservations at this time'}), 400
+
+        # The day lock stops concurrent bookings taking the same tables
+        lock_service_day(db.session, time_slot)
+        pacing = get_pacing_cache()
+        if data.get('hold_token'):
+            # Book the tables held for this guest instead of searching again
+            hold = claim_hold(db.session, data['hold_token'])
+            if not hold:
+                db.session.rollback()  # Release the day lock
+                return jsonify({'success': False, 'message': 'Your hold has expired, please check availability again'}), 410
+            if hold.time_slot != time_slot or guests > hold.guests:
+                db.session.rollback()
+                return jsonify({'success': False, 'message': 'The reservation does not match the held table'}), 400
+            tables, held_guests = hold.tables, hold.guests
+            db.session.delete(hold)
+        else:
+            # First, find the best tables
+            reservation_end = time_slot + schedule.duration_for(guests)
+            day = load_day(db.session, time_slot, schedule)
+            # Counts loaded under the day lock are exact, so refresh this worker's counter
+            pacing.put(time_slot.date(), day.covers)
+            tables, held_guests = day.plan.best_fit(guests, time_slot, reservation_end), 0
+
+            if not tables:
+                db.session.rollback()  # Release the day lock
+                print("Availability Error: Fully booked for this time slot")
+                return fully_booked('Sorry, we are fully booked for this time slot', schedule, guests, time_slot, day)
+
+            if not pacing_allows(day.covers, time_slot, guests):
+                db.session.rollback()  # Release the day lock
+                print("Availability Error: Kitchen pacing limit reached for this time slot")
+                return fully_booked('Sorry, our kitchen is fully booked around this time', schedule, guests, time_slot, day)
 
         # Get or create customer
-        customer = Customer.find_by_email(data['email'])
-        if not customer:
-            customer = Customer(
-                name=data['name'],
-                email=data['email'],
-                phone=data.get('phone', None),
-                newsletter_signup=data.get('newsletter_signup', False)
-            )
-            db.session.add(customer)
-            db.session.flush()  # Get the ID without committing
-
-        # Handle newsletter opt-in
-        if data.get('newsletter_opt_in', False):
-            try:
-                subscribe_to_newsletter(data['email'])
-                print(f"Newsletter subscription successful for {data['email']}")
-            except Exception as e:
-                print(f"Error subscribing {data['email']} to newsletter: {str(e)}")
-
-        # Find an available table (any random unbooked table)
-        available_tables = [t for t in range(1, TOTAL_TABLES + 1) if t not in booked_tables]
-        if not available_tables:
-            # Fallback to any table if something went wrong with availability check
-            available_tables = list(range(1, TOTAL_TABLES + 1))
-        table_number = random.choice(available_tables)
+        customer = get_or_create_customer(data)
 
         # Create the reservation
         reservation = Reservation(
             customer_id=customer.id,
             time_slot=time_slot,
-            guests=data['guests'],
-            table_number=table_number,
+            guests=guests,
+            table_number=tables[0],
+            extra_tables=list(tables[1:]),
             special_requests=data.get('special_requests', None),
             status='confirmed'
         )
         db.session.add(reservation)
+        publish_reservation(db.session, 'reservation.created', reservation)
+        # Other workers drop their pacing counter of the day; this one updates it below
+        invalidate(db.session, 'reservations', time_slot.date(), local=False)
         db.session.commit()
+        # A confirmed hold already counted its covers
+        after_commit(db.session, pacing.record, time_slot, guests - held_guests)
+
+        # Subscribe once the booking is committed: the subscription commits (or
+        # rolls back) on its own, which must not end the booking's transaction
+        # and release the day lock before the reservation is inserted
+        if data.get('newsletter_opt_in', False):
+            try:
+                subscribe_to_newsletter(data['email'])
+                print(f"Newsletter subscription successful for {data['email']}")
+            except Exception as e:
+                print(f"Error subscribing {data['email']} to newsletter: {str(e)}")
 
         print("Reservation created successfully:", reservation)
 
@@ -135,6 +244,7 @@ def create_reservation():
             'message': 'Thank you for your reservation. We look forward to serving you!',
             'reservation_id': reservation.id,
             'table_number': reservation.table_number,
+            'tables': reservation.tables,
             'time_slot': reservation.time_slot.isoformat(),
             'name': customer.name,
             'email': customer.email,
@@ -154,11 +264,15 @@ def create_reservation():
         return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
 
 @reservations_bp.route('/check-availability', methods=['POST'])
-def check_availability():
+async def check_availability():
     """
     Check if a reservation is available for a specific date, time and party size
     
-    Verifies if tables are available for the requested date, time, and number of guests.
+    Verifies if tables are available for the requested date, time, and number of guests,
+    using the same best-fit seating engine and kitchen pacing cap as reservation creation.
+    This is a pure read, so it runs on the async read engine. When this worker's pacing
+    counter of the day is fresh and already has no room for the party, the answer comes
+    from the counter and the day's occupancy is not loaded.
     
     Request Body:
         date (str): Requested date in YYYY-MM-DD format
@@ -170,7 +284,8 @@ def check_availability():
         
     Responses:
         200: Availability check successful
-        400: Missing required fields, invalid date format, or invalid number of guests
+        400: Missing required fields, invalid date format, invalid number of guests,
+             or a time outside the service schedule
         500: Server error
     """
     data = request.json
@@ -191,15 +306,30 @@ def check_availability():
             
         if guests <= 0 or guests > 20:
             return jsonify({'available': False, 'message': 'Invalid number of guests'}), 400
+
+        schedule = get_schedule()
+        if not schedule.is_valid_slot(time_slot, guests):
+            return jsonify({'available': False, 'message': 'We do not take reservations at this time'}), 400
             
+        # A kitchen already at capacity needs no table search: answer from this
+        # worker's counter without loading the day
+        pacing = get_pacing_cache()
+        covers = pacing.get(time_slot.date())
+        if covers is not None and not pacing_allows(covers, time_slot, guests):
+            return jsonify({'available': False, 'tables_remaining': 0})
+
         # Check availability
-        reservation_end = time_slot + timedelta(minutes=RESERVATION_DURATION)
-        booked_tables = Reservation.get_booked_tables(time_slot, reservation_end)
-        available = len(booked_tables) < TOTAL_TABLES
+        reservation_end = time_slot + schedule.duration_for(guests)
+        tokens = day_tokens(time_slot.date())
+        day = await load_day_async(time_slot, schedule)
+        if tokens is not None:
+            pacing.put(time_slot.date(), day.covers, tokens)
+        available = day.plan.best_fit(guests, time_slot, reservation_end) is not None \
+            and pacing_allows(day.covers, time_slot, guests)
         
         return jsonify({
             'available': available,
-            'tables_remaining': TOTAL_TABLES - len(booked_tables) if available else 0
+            'tables_remaining': len(day.plan.free_tables(time_slot, reservation_end)) if available else 0
         })
         
     except ValueError as e:
@@ -207,7 +337,418 @@ def check_availability():
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
 
+@reservations_bp.route('/alternatives', methods=['POST'])
+async def get_alternatives():
+    """
+    Find the nearest available slots to a requested time
+    
+    Searches the requested day first, then the days around it, and returns
+    the closest times at which the party can be seated. This is a pure read,
+    so it runs on the async read engine.
+    
+    Request Body:
+        date (str): Requested date in YYYY-MM-DD format
+        time (str): Requested time in HH:MM format
+        guests (int): Number of guests in the party
+        limit (int, optional): Maximum number of suggestions
+    
+    Returns:
+        JSON: Object with a list of {date, time} alternatives, nearest first
+        
+    Responses:
+        200: Alternatives returned (possibly an empty list)
+        400: Missing required fields, invalid date format or invalid number of guests
+        500: Server error
+    """
+    data = request.json
+    
+    try:
+        if not all(k in data for k in ['date', 'time', 'guests']):
+            return jsonify({'success': False, 'message': 'Date, time and guests are required'}), 400
+
+        time_slot = datetime.strptime(f"{data['date']} {data['time']}", '%Y-%m-%d %H:%M')
+        guests = int(data['guests'])
+        limit = min(int(data.get('limit', current_app.config['RESERVATION_ALTERNATIVES_LIMIT'])), MAX_ALTERNATIVES)
+        if guests <= 0 or guests > 20:
+            return jsonify({'success': False, 'message': 'Invalid number of guests'}), 400
+
+        alternatives = await nearest_slots_async(get_schedule(), guests, time_slot, limit)
+        return jsonify({
+            'success': True,
+            'alternatives': [slot_to_dict(slot) for slot in alternatives]
+        })
+
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@reservations_bp.route('/slots', methods=['GET'])
+def get_slots():
+    """
+    Get the bookable arrival times of a day
+    
+    Served from the cached service schedule without touching the reservations,
+    so clients can offer only valid times before checking availability.
+    
+    Query Parameters:
+        date (str): Requested date in YYYY-MM-DD format
+        guests (int, optional): Party size, to include the length of the sitting
+            and leave out the times the party would not finish by closing
+    
+    Returns:
+        JSON: Object with the day's slots as HH:MM strings
+        
+    Responses:
+        200: Slots returned (an empty list when closed)
+        400: Missing or invalid date or number of guests
+    """
+    try:
+        day = datetime.strptime(request.args['date'], '%Y-%m-%d').date()
+        schedule = get_schedule()
+        slots = schedule.slots_for(day)
+        response = {'success': True, 'date': day.isoformat(), 'open': schedule.is_open(day)}
+        if 'guests' in request.args:
+            guests = int(request.args['guests'])
+            duration = schedule.duration_for(guests)
+            slots = schedule.seatings_for(day, guests)
+            response['duration_minutes'] = int(duration.total_seconds() // 60)
+        response['slots'] = [slot.strftime('%H:%M') for slot in slots]
+        return jsonify(response)
+    except KeyError:
+        return jsonify({'success': False, 'message': 'Date is required'}), 400
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+
+@reservations_bp.route('/holds', methods=['POST'])
+def create_hold():
+    """
+    Hold tables while the guest completes the booking form
+    
+    Finds the best tables exactly like reservation creation and keeps them
+    for ``RESERVATION_HOLD_MINUTES``. Submitting the reservation with the
+    returned ``hold_token`` books those tables; until the hold expires they
+    count as occupied for every other guest.
+    
+    Request Body:
+        date (str): Requested date in YYYY-MM-DD format
+        time (str): Requested time in HH:MM format
+        guests (int): Number of guests in the party
+    
+    Returns:
+        JSON: Object with the hold token, held tables and expiry time
+        
+    Responses:
+        201: Tables held
+        400: Missing required fields, invalid date format, invalid number of guests,
+             a time in the past or outside the service schedule
+        409: Fully booked or kitchen at capacity; the response lists the nearest
+             available alternatives
+        500: Server error
+    """
+    data = request.json
+    
+    try:
+        if not all(k in data for k in ['date', 'time', 'guests']):
+            return jsonify({'success': False, 'message': 'Date, time and guests are required'}), 400
+
+        time_slot = datetime.strptime(f"{data['date']} {data['time']}", '%Y-%m-%d %H:%M')
+        guests = int(data['guests'])
+
+        if time_slot < datetime.now():
+            return jsonify({'success': False, 'message': 'Cannot make reservations in the past'}), 400
+
+        if guests <= 0 or guests > 20:
+            return jsonify({'success': False, 'message': 'Invalid number of guests'}), 400
+
+        schedule = get_schedule()
+        if not schedule.is_valid_slot(time_slot, guests):
+            return jsonify({'success': False, 'message': 'We do not take reservations at this time'}), 400
+
+        lock_service_day(db.session, time_slot)
+        day = load_day(db.session, time_slot, schedule)
+        pacing = get_pacing_cache()
+        pacing.put(time_slot.date(), day.covers)
+        hold = hold_tables(db.session, day, schedule, time_slot, guests, current_app.config['RESERVATION_HOLD_MINUTES'])
+        if not hold:
+            db.session.rollback()  # Release the day lock
+            return fully_booked('Sorry, we are fully booked for this time slot', schedule, guests, time_slot, day)
+
+        db.session.commit()
+        return jsonify({'success': True, **hold.to_dict()}), 201
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@reservations_bp.route('/holds/<token>', methods=['DELETE'])
+def release_hold(token):
+    """
+    Release held tables before the hold expires
+    
+    Parameters:
+        token (str): The hold token
+    
+    Returns:
+        JSON: Object with success status and message
+        
+    Responses:
+        200: Hold released
+        404: Hold not found or already expired
+    """
+    hold = claim_hold(db.session, token)
+    if not hold:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Hold not found'}), 404
+
+    time_slot, guests = hold.time_slot, hold.guests
+    db.session.delete(hold)
+    db.session.commit()
+    after_commit(db.session, get_pacing_cache().record, time_slot, -guests)
+    return jsonify({'success': True, 'message': 'Hold released'})
+
+@reservations_bp.route('/standing', methods=['POST'])
+def create_standing_reservation():
+    """
+    Create a standing (recurring) reservation
+    
+    Stores the recurrence rule once and books the occurrences falling inside
+    the booking horizon straight away; later occurrences are booked by the
+    nightly ``flask reservations expand-standing`` job as the horizon rolls
+    forward (see ``services/standing.py``).
+    
+    Request Body:
+        name (str): Customer's name
+        email (str): Customer's email address
+        phone (str, optional): Customer's phone number
+        date (str): First date in YYYY-MM-DD format
+        time (str): Time in HH:MM format
+        guests (int): Number of guests
+        recurrence (str, optional): RFC 5545 RRULE, defaults to FREQ=WEEKLY
+        ends_on (str, optional): Last date in YYYY-MM-DD format
+        special_requests (str, optional): Any special requests
+    
+    Returns:
+        JSON: Object containing the standing reservation, the booked occurrences
+        and the dates that could not be seated
+        
+    Responses:
+        201: Standing reservation created
+        400: Missing required fields, invalid date format or recurrence, invalid
+             number of guests, a first date in the past or a time outside the schedule
+        500: Server error
+    """
+    data = request.json
+
+    for field in ['name', 'email', 'date', 'time', 'guests']:
+        if field not in data:
+            return jsonify({'success': False, 'error': 'Validation Error', 'message': f'Missing required field: {field}'}), 400
+
+    try:
+        starts_at = datetime.strptime(f"{data['date']} {data['time']}", '%Y-%m-%d %H:%M')
+        guests = int(data['guests'])
+        recurrence = data.get('recurrence') or 'FREQ=WEEKLY'
+        ends_on = datetime.strptime(data['ends_on'], '%Y-%m-%d').date() if data.get('ends_on') else None
+        parse_recurrence(recurrence, starts_at)
+
+        if starts_at < datetime.now():
+            return jsonify({'success': False, 'message': 'Cannot make reservations in the past'}), 400
+
+        if guests <= 0 or guests > 20:
+            return jsonify({'success': False, 'message': 'Invalid number of guests'}), 400
+
+        schedule = get_schedule()
+        if not schedule.is_valid_slot(starts_at, guests):
+            return jsonify({'success': False, 'message': 'We do not take reservations at this time'}), 400
+
+        customer = get_or_create_customer(data)
+        standing = StandingReservation(
+            customer_id=customer.id,
+            starts_at=starts_at,
+            recurrence=recurrence,
+            ends_on=ends_on,
+            guests=guests,
+            special_requests=data.get('special_requests', None)
+        )
+        db.session.add(standing)
+        db.session.flush()
+        horizon = horizon_end(current_app.config['STANDING_RESERVATION_HORIZON_DAYS'])
+        expansion = expand_standing(db.session, schedule, standing, horizon)
+        db.session.commit()
+
+        pacing = get_pacing_cache()
+        for reservation in expansion.booked:
+            after_commit(db.session, pacing.record, reservation.time_slot, reservation.guests)
+        after_commit(db.session, notify_skipped, db.session.get(Customer, standing.customer_id), expansion.skipped)
+
+        return jsonify({
+            'success': True,
+            'message': 'Your standing reservation is set up. We look forward to seeing you regularly!',
+            'standing_reservation': standing.to_dict(),
+            'reservations': [
+                {'reservation_id': reservation.id, 'time_slot': reservation.time_slot.isoformat(), 'tables': reservation.tables}
+                for reservation in expansion.booked
+            ],
+            'skipped': [slot_to_dict(occurrence) for occurrence in expansion.skipped]
+        }), 201
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@reservations_bp.route('/standing/<int:standing_id>', methods=['GET'])
+@conditional(lambda standing_id: [
+    (StandingReservation, StandingReservation.id == standing_id),
+    (Reservation, Reservation.standing_id == standing_id, Reservation.time_slot >= datetime.now())
+])
+def get_standing_reservation(standing_id):
+    """
+    Get a standing reservation and its upcoming booked occurrences
+    
+    Parameters:
+        standing_id (int): The ID of the standing reservation
+    
+    Returns:
+        JSON: Object containing the rule and its upcoming reservations
+        
+    Responses:
+        200: Standing reservation found and returned
+        404: Standing reservation not found
+    """
+    session = Session(get_read_engine())
+    try:
+        standing = session.get(StandingReservation, standing_id)
+        if not standing:
+            return jsonify({'success': False, 'message': 'Standing reservation not found'}), 404
+
+        names = reservation_fields.default
+        upcoming = session.execute(
+            reservation_fields.select(names)
+            .where(Reservation.standing_id == standing_id, Reservation.time_slot >= datetime.now())
+            .order_by(Reservation.time_slot)
+        )
+        return jsonify({
+            'success': True,
+            'standing_reservation': standing.to_dict(),
+            'reservations': reservation_fields.as_dicts(names, upcoming)
+        })
+    finally:
+        session.close()
+
+@reservations_bp.route('/standing/cancel/<int:standing_id>', methods=['POST'])
+def cancel_standing_reservation(standing_id):
+    """
+    Stop a standing reservation
+    
+    Cancels every upcoming occurrence and offers the freed tables to the
+    waitlist. Past occurrences are kept.
+    
+    Parameters:
+        standing_id (int): The ID of the standing reservation
+    
+    Returns:
+        JSON: Object with success status and the number of canceled occurrences
+        
+    Responses:
+        200: Standing reservation stopped
+        404: Standing reservation not found
+        500: Server error
+    """
+    standing = db.session.get(StandingReservation, standing_id, with_for_update=True)
+    if not standing:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Standing reservation not found'}), 404
+
+    try:
+        canceled, promotions = cancel_standing(db.session, get_schedule(), standing)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+    pacing = get_pacing_cache()
+    for time_slot, guests in canceled:
+        after_commit(db.session, pacing.record, time_slot, -guests)
+    after_commit(db.session, announce_promotions, promotions)
+
+    return jsonify({
+        'success': True,
+        'message': 'Your standing reservation has been canceled',
+        'canceled_reservations': len(canceled)
+    })
+
+@reservations_bp.route('/day/<day>', methods=['GET'])
+@conditional(day_sources)
+def get_day_reservations(day):
+    """
+    Get the host-stand sheet of a service day
+    
+    Lists the day's reservations in arrival order with the customer's name,
+    phone, number of past visits and special requests. The sheet is cached
+    until a reservation of that day or one of its guests changes (see
+    ``services/day_sheet.py``).
+    
+    Parameters:
+        day (str): Service day in YYYY-MM-DD format
+    
+    Returns:
+        JSON: Object containing the date, expected covers and reservations
+        
+    Responses:
+        200: Day sheet returned
+        400: Invalid date format
+    """
+    try:
+        service_day = datetime.strptime(day, '%Y-%m-%d').date()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+
+    session = Session(get_read_engine())
+    try:
+        return jsonify({'success': True, **get_day_sheet(session, service_day)})
+    finally:
+        session.close()
+
+@reservations_bp.route('/changes', methods=['GET'])
+def stream_changes():
+    """
+    Stream reservation and floor changes as Server-Sent Events
+    
+    Pushes ``reservation.created``, ``reservation.updated``,
+    ``reservation.canceled``, ``block.created`` and ``block.deleted`` events
+    as their changes commit, so open screens apply deltas instead of
+    reloading. A ``reset`` event means changes were missed and the client
+    should reload once. Every worker serves its subscribers from a single
+    LISTEN connection (see ``services/change_feed.py``), but each open stream
+    holds the thread serving it; production routes this path to the
+    standalone server in ``feed_server.py``, which needs no thread per stream.
+    
+    Headers:
+        Last-Event-ID (str, optional): Resume after this event; sent by the browser on reconnect
+    
+    Returns:
+        text/event-stream: Events and keep-alive comments, until the client disconnects
+    """
+    feed = get_change_feed()
+    feed.wait_until_listening()
+    events = feed.events(
+        request.headers.get('Last-Event-ID'),
+        heartbeat=current_app.config['CHANGE_FEED_HEARTBEAT_SECONDS']
+    )
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
 @reservations_bp.route('/<int:reservation_id>', methods=['GET'])
+@conditional(reservation_sources)
 def get_reservation(reservation_id):
     """
     Get a specific reservation by ID
@@ -218,30 +759,35 @@ def get_reservation(reservation_id):
     Parameters:
         reservation_id (int): The ID of the reservation to retrieve
     
+    Query Parameters:
+        fields (str, optional): Comma-separated fields to return (see ``fieldsets.py``)
+        include (str, optional): 'customer' to add the customer's name, email and phone
+    
     Returns:
         JSON: Object containing the reservation details and customer information
         
     Responses:
         200: Reservation found and returned
+        400: Unknown field or include
         404: Reservation not found
     """
-    session = Session(db.engine)
-    reservation = session.get(Reservation, reservation_id)
+    try:
+        names = reservation_fields.parse(request.args, default=RESERVATION_DETAIL)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
 
-    if not reservation:
+    session = Session(get_read_engine())
+    try:
+        rows = session.execute(reservation_fields.select(names).where(Reservation.id == reservation_id)).all()
+    finally:
         session.close()
-        return jsonify({'success': False, 'message': 'Reservation not found'}), 404
 
-    customer = session.get(Customer, reservation.customer_id)
-    session.close()
+    if not rows:
+        return jsonify({'success': False, 'message': 'Reservation not found'}), 404
 
     return jsonify({
         'success': True,
-        'reservation': {
-            **reservation.to_dict(),
-            'customer_name': customer.name if customer else None,
-            'customer_email': customer.email if customer else None
-        }
+        'reservation': reservation_fields.as_dicts(names, rows)[0]
     })
 
 @reservations_bp.route('/<int:reservation_id>', methods=['PUT'])
@@ -250,16 +796,17 @@ def update_reservation(reservation_id):
     Update an existing reservation
     
     Updates the details of an existing reservation and/or customer information.
+    Tables freed by the change are then offered to the waitlist.
     
     Parameters:
         reservation_id (int): The ID of the reservation to update
         
     Request Body:
         table_number (int, optional): Updated table number
-        time_slot (str, optional): Updated date and time for the reservation
+        time_slot (str, optional): Updated date and time for the reservation, in ISO 8601 format
         guests (int, optional): Updated number of guests
         special_requests (str, optional): Updated special requests
-        status (str, optional): Updated reservation status
+        status (str, optional): Updated reservation status; hosts set 'seated' on arrival
         customer_name (str, optional): Updated customer name
         customer_email (str, optional): Updated customer email
         customer_phone (str, optional): Updated customer phone
@@ -269,22 +816,38 @@ def update_reservation(reservation_id):
         
     Responses:
         200: Reservation updated successfully
+        400: Unknown reservation status or invalid time slot
         404: Reservation not found
         500: Server error
     """
     data = request.json
-    session = Session(db.engine)
+    if 'status' in data and data['status'] not in STATUSES:
+        return jsonify({'success': False, 'message': f"Invalid status: {data['status']}"}), 400
+    if 'time_slot' in data:
+        try:
+            time_slot = datetime.fromisoformat(data['time_slot'])
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+
+    session = db.session
     reservation = session.get(Reservation, reservation_id)
 
     if not reservation:
-        session.close()
         return jsonify({'success': False, 'message': 'Reservation not found'}), 404
 
+    # The day's kitchen pacing counter is rebuilt after any change
+    previous_day = reservation.time_slot.date()
+    # Moving, shrinking or closing an active booking may free tables for the waitlist
+    frees_tables = reservation.status in ACTIVE_STATUSES and any(
+        field in data for field in ('table_number', 'time_slot', 'guests', 'status')
+    )
+    previous_slot, previous_guests = reservation.time_slot, reservation.guests
+
     # Update reservation fields
     if 'table_number' in data:
         reservation.table_number = data['table_number']
     if 'time_slot' in data:
-        reservation.time_slot = data['time_slot']
+        reservation.time_slot = time_slot
     if 'guests' in data:
         reservation.guests = data['guests']
     if 'special_requests' in data:
@@ -303,12 +866,22 @@ def update_reservation(reservation_id):
             customer.phone = data['customer_phone']
 
     try:
+        publish_reservation(
+            session, 'reservation.canceled' if reservation.status == 'canceled' else 'reservation.updated', reservation
+        )
+        for changed_day in {previous_day, reservation.time_slot.date()}:
+            invalidate(session, 'reservations', changed_day, local=False)
         session.commit()
-        session.close()
+        pacing = get_pacing_cache()
+        after_commit(session, pacing.forget, previous_day)
+        after_commit(session, pacing.forget, reservation.time_slot.date())
+        if frees_tables:
+            promotions = promote_freed(session, get_schedule(), previous_slot, previous_guests)
+            session.commit()
+            after_commit(session, announce_promotions, promotions)
         return jsonify({'success': True, 'message': 'Reservation updated successfully'}), 200
     except Exception as e:
         session.rollback()
-        session.close()
         return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
 
 @reservations_bp.route('/cancel/<int:reservation_id>', methods=['POST'])
@@ -316,7 +889,8 @@ def cancel_reservation(reservation_id):
     """
     Cancel a reservation
     
-    Changes the status of a reservation to 'canceled'.
+    Changes the status of a reservation to 'canceled'. The freed tables are
+    offered to the waitlist straight away (see ``services/waitlist.py``).
     
     Parameters:
         reservation_id (int): The ID of the reservation to cancel
@@ -327,17 +901,33 @@ def cancel_reservation(reservation_id):
     Responses:
         200: Reservation canceled successfully
         404: Reservation not found
+        500: Server error
     """
-    session = Session(db.engine)
+    session = db.session
     reservation = session.get(Reservation, reservation_id)
 
     if not reservation:
-        session.close()
         return jsonify({'success': False, 'message': 'Reservation not found'}), 404
 
+    was_active = reservation.status in ACTIVE_STATUSES
+    time_slot, guests = reservation.time_slot, reservation.guests
+    promotions = []
     reservation.status = 'canceled'
-    session.commit()
-    session.close()
+    try:
+        if was_active:
+            # Hand the freed tables to the waitlist in the same transaction
+            promotions = promote_freed(session, get_schedule(), time_slot, guests)
+        publish_reservation(session, 'reservation.canceled', reservation)
+        invalidate(session, 'reservations', time_slot.date(), local=False)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+    # Give the covers back to the kitchen pacing counter
+    if was_active:
+        after_commit(session, get_pacing_cache().record, time_slot, -guests)
+    after_commit(session, announce_promotions, promotions)
 
     return jsonify({
         'success': True,
@@ -346,35 +936,36 @@ def cancel_reservation(reservation_id):
     })
 
 @reservations_bp.route('/all', methods=['GET'])
+@negotiated
+@conditional(lambda: [(Reservation,), (Customer,)])
 def get_reservations():
     """
     Get all reservations
     
-    Retrieves all reservations with associated customer details.
+    Retrieves all reservations with associated customer details. The
+    customer is joined in only when one of its fields is requested.
+    
+    Query Parameters:
+        fields (str, optional): Comma-separated fields to return (see ``fieldsets.py``)
+        include (str, optional): 'customer' to add the customer's name, email and phone
     
     Returns:
         JSON: Object containing a list of all reservations with customer information
         
     Responses:
         200: Reservations retrieved successfully
+        400: Unknown field or include
     """
-    session = Session(db.engine)
     try:
-        reservations = session.query(Reservation).all()
-        reservations_with_customer = []
-
-        for reservation in reservations:
-            customer = session.get(Customer, reservation.customer_id)
-            reservation_dict = reservation.to_dict()
-            reservation_dict['customer_name'] = customer.name if customer else None
-            reservation_dict['customer_email'] = customer.email if customer else None
-            reservation_dict['customer_phone'] = customer.phone if customer else None
-            reservation_dict['reservation_id'] = reservation.id
-            reservations_with_customer.append(reservation_dict)
+        names = reservation_fields.parse(request.args, default=RESERVATION_LIST)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
 
+    session = Session(get_read_engine())
+    try:
         return jsonify({
             'success': True,
-            'reservations': reservations_with_customer
+            'reservations': reservation_fields.as_dicts(names, session.execute(reservation_fields.select(names)))
         })
     finally:
         session.close()
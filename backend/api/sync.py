@@ -0,0 +1,67 @@
+"""
+Delta sync API Blueprint for Café Fausse
+
+This module provides the endpoint through which the admin pages and offline
+clients keep local copies of reservations, customers, subscribers and the
+menu up to date, fetching only what changed since their last sync (see
+``services/sync.py``).
+"""
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..serialization import negotiated
+from ..services.sync import SYNCED_MODELS, cursor_expired, decode_since, sync_changes
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('', methods=['GET'])
+@sync_bp.route('/', methods=['GET'])
+@negotiated
+def get_changes():
+    """
+    Get the rows changed and deleted since the last sync
+
+    Call without ``since`` for a full snapshot, then pass the returned
+    ``cursor`` as ``since``. While ``has_more`` is true the next page is
+    ready straight away. Apply ``deleted`` before ``changes``; rows may be
+    sent twice and are applied as upserts by ID.
+
+    Query Parameters:
+        since (str, optional): Cursor of the previous sync, or an ISO 8601 timestamp (UTC)
+        types (str, optional): Comma-separated entities among reservations,
+            customers, subscribers, categories and menu_items; all by default
+        limit (int, optional): Most rows per entity, at most ``SYNC_PAGE_SIZE``
+
+    Returns:
+        JSON: Object with success status, ``changes`` and ``deleted`` by
+            entity, the next ``cursor`` and ``has_more``
+
+    Responses:
+        200: Changes since the cursor
+        400: Unknown entity or invalid since
+        410: The cursor is older than the kept deletions; resync without since
+    """
+    config = current_app.config
+    names = request.args.get('types', ','.join(SYNCED_MODELS)).split(',')
+    unknown = [name for name in names if name not in SYNCED_MODELS]
+    if unknown:
+        return jsonify({'success': False, 'message': f'Unknown sync types: {", ".join(unknown)}'}), 400
+    limit = min(request.args.get('limit', config['SYNC_PAGE_SIZE'], type=int), config['SYNC_PAGE_SIZE'])
+    if limit < 1:
+        return jsonify({'success': False, 'message': 'limit must be positive'}), 400
+
+    try:
+        positions = decode_since(request.args.get('since'), names)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if cursor_expired(positions, datetime.utcnow(), config['SYNC_TOMBSTONE_RETENTION_DAYS']):
+        return jsonify({'success': False, 'message': 'Sync cursor expired, resync without since'}), 410
+
+    # The watermark needs the primary's view of running transactions
+    session = Session(db.engine)
+    try:
+        result = sync_changes(session, positions, names, limit, config['SYNC_CLOCK_SKEW_SECONDS'])
+    finally:
+        session.close()
+    return jsonify({'success': True, **result})
@@ -0,0 +1,180 @@
+"""
+Waitlist API Blueprint for Café Fausse
+
+This module provides API endpoints for joining, checking and leaving the
+waitlist of a fully booked time slot. Waiting parties are given a table
+automatically when a reservation is canceled or changed (see
+``services/waitlist.py``) and are notified once their reservation exists.
+"""
+from flask import Blueprint, jsonify, request, current_app
+from datetime import datetime
+from ..extensions import db
+from ..models.waitlist import WaitlistEntry
+from ..db_routing import get_read_engine
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..api.reservations import get_or_create_customer
+from ..services.occupancy import load_day, lock_service_day
+from ..services.pacing import pacing_allows
+from ..services.schedule import get_schedule
+from ..services.waitlist import waitlist_position
+
+waitlist_bp = Blueprint('waitlist', __name__)
+
+@waitlist_bp.route('', methods=['POST'])
+@waitlist_bp.route('/', methods=['POST'])
+def join_waitlist():
+    """
+    Join the waitlist of a fully booked time slot
+
+    Only full times can be waitlisted; when the party can be seated the
+    client is told to book directly instead.
+
+    Request Body:
+        name (str): Customer's name
+        email (str): Customer's email address
+        phone (str, optional): Customer's phone number
+        date (str): Requested date in YYYY-MM-DD format
+        time (str): Requested time in HH:MM format
+        guests (int): Number of guests
+        special_requests (str, optional): Any special requests
+
+    Returns:
+        JSON: Object containing the waitlist entry ID and queue position
+
+    Responses:
+        201: Added to the waitlist
+        400: Missing required fields, invalid date format, invalid number of guests,
+             a time in the past or outside the service schedule
+        409: The time can be booked directly, or the customer is already waiting for it
+        500: Server error
+    """
+    data = request.json
+
+    required_fields = ['name', 'email', 'date', 'time', 'guests']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'success': False, 'error': 'Validation Error', 'message': f'Missing required field: {field}'}), 400
+
+    try:
+        time_slot = datetime.strptime(f"{data['date']} {data['time']}", '%Y-%m-%d %H:%M')
+        guests = int(data['guests'])
+
+        if time_slot < datetime.now():
+            return jsonify({'success': False, 'message': 'Cannot join the waitlist for a past time'}), 400
+
+        if guests <= 0 or guests > 20:
+            return jsonify({'success': False, 'message': 'Invalid number of guests'}), 400
+
+        schedule = get_schedule()
+        if not schedule.is_valid_slot(time_slot, guests):
+            return jsonify({'success': False, 'message': 'We do not take reservations at this time'}), 400
+
+        # Under the day lock a concurrent cancellation either sees this entry or frees the table first
+        lock_service_day(db.session, time_slot)
+        day = load_day(db.session, time_slot, schedule)
+        if day.plan.best_fit(guests, time_slot, time_slot + schedule.duration_for(guests)) is not None \
+                and pacing_allows(day.covers, time_slot, guests):
+            db.session.rollback()  # Release the day lock
+            return jsonify({'success': False, 'message': 'A table is available at this time, please book directly'}), 409
+
+        customer = get_or_create_customer(data)
+        waiting = db.session.scalar(select(WaitlistEntry).where(
+            WaitlistEntry.customer_id == customer.id,
+            WaitlistEntry.time_slot == time_slot,
+            WaitlistEntry.status == 'waiting'
+        ))
+        if waiting:
+            db.session.rollback()
+            return jsonify({'success': False, 'message': 'You are already on the waitlist for this time'}), 409
+
+        entry = WaitlistEntry(
+            customer_id=customer.id,
+            time_slot=time_slot,
+            guests=guests,
+            special_requests=data.get('special_requests', None),
+            status='waiting'
+        )
+        db.session.add(entry)
+        db.session.flush()
+        position = waitlist_position(db.session, entry)
+        db.session.commit()
+
+        print("Waitlist entry created:", entry)
+
+        return jsonify({
+            'success': True,
+            'message': 'You are on the waitlist. We will let you know as soon as a table opens up.',
+            'waitlist_id': entry.id,
+            'position': position,
+            'time_slot': entry.time_slot.isoformat(),
+            'guests': entry.guests
+        }), 201
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Invalid data format: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Error joining the waitlist: {str(e)}')
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@waitlist_bp.route('/<int:entry_id>', methods=['GET'])
+def get_waitlist_entry(entry_id):
+    """
+    Get a waitlist entry and its position in the queue
+
+    Parameters:
+        entry_id (int): The ID of the waitlist entry
+
+    Returns:
+        JSON: Object containing the entry; waiting entries include their position
+
+    Responses:
+        200: Entry found and returned
+        404: Entry not found
+    """
+    session = Session(get_read_engine())
+    try:
+        entry = session.get(WaitlistEntry, entry_id)
+        if not entry:
+            return jsonify({'success': False, 'message': 'Waitlist entry not found'}), 404
+
+        entry_dict = entry.to_dict()
+        entry_dict['position'] = waitlist_position(session, entry) if entry.status == 'waiting' else None
+        return jsonify({'success': True, 'waitlist_entry': entry_dict})
+    finally:
+        session.close()
+
+@waitlist_bp.route('/cancel/<int:entry_id>', methods=['POST'])
+def leave_waitlist(entry_id):
+    """
+    Leave the waitlist
+
+    Parameters:
+        entry_id (int): The ID of the waitlist entry
+
+    Returns:
+        JSON: Object with success status and message
+
+    Responses:
+        200: Entry canceled
+        404: Entry not found
+        409: The entry was already promoted to a reservation
+    """
+    entry = db.session.get(WaitlistEntry, entry_id, with_for_update=True)
+    if not entry:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Waitlist entry not found'}), 404
+
+    if entry.status == 'promoted':
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'This entry already has a reservation; cancel the reservation instead',
+            'reservation_id': entry.reservation_id
+        }), 409
+
+    entry.status = 'canceled'
+    db.session.commit()
+    return jsonify({'success': True, 'message': 'You have left the waitlist', 'waitlist_id': entry_id})
@@ -32,6 +32,10 @@ def create_app(config_name='development'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Encode responses with orjson (see backend/serialization.py)
+    from .serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Enable CORS for the frontend - update to be more permissive for development
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
@@ -70,23 +74,51 @@ def create_app(config_name='development'):
     from .api.newsletter import newsletter_bp
     from .api.customers import customers_bp
     from .api.auth import auth_bp
+    from .api.waitlist import waitlist_bp
+    from .api.blocks import blocks_bp
+    from .api.cache import cache_bp
+    from .api.sync import sync_bp
+    from .api.batch import batch_bp
     
     app.register_blueprint(menu_bp, url_prefix='/api/menu')
     app.register_blueprint(reservations_bp, url_prefix='/api/reservations')
     app.register_blueprint(newsletter_bp, url_prefix='/api/newsletter')
     app.register_blueprint(customers_bp, url_prefix='/api/customers')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(waitlist_bp, url_prefix='/api/waitlist')
+    app.register_blueprint(blocks_bp, url_prefix='/api/blocks')
+    app.register_blueprint(cache_bp, url_prefix='/api/cache')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
     
     # Initialize extensions with the app
-    from .extensions import db, migrate
+    from .extensions import db, migrate, async_db, cache
     db.init_app(app)
     migrate.init_app(app, db)
+    async_db.init_app(app)
+    cache.init_app(app)
+    
+    # Route read-only queries to the replica bind when one is configured
+    from .db_routing import replica_router
+    replica_router.init_app(app)
+    
+    # Queue booking requests when the write path is saturated
+    from .admission import admission_control
+    admission_control.init_app(app)
+    
+    # Compress responses with brotli or gzip as the client accepts
+    from .compression import compression
+    compression.init_app(app)
     
     # Configure Flask-JWT-Extended
     from flask_jwt_extended import JWTManager
     app.config["JWT_SECRET_KEY"] = app.config.get("SECRET_KEY", "default-jwt-secret-key")
     jwt = JWTManager(app)
     
+    # Register batch job commands (flask partitions ...)
+    from .jobs import register_commands
+    register_commands(app)
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,233 @@
+"""
+Async read engine for the Café Fausse application
+
+This module provides the async read path used by the hot read-only endpoints
+(menu listings and reservation availability checks). Statements are executed on
+an async SQLAlchemy engine backed by asyncpg with its own connection pool.
+
+Flask runs every ``async def`` view in a short-lived event loop, and asyncpg
+connections are bound to the loop that created them, so the engine and its pool
+live on a single background event loop per worker process. Views submit their
+statements to that loop and await the result, which lets one worker overlap
+many in-flight reads on a shared pool. Writes stay on the synchronous engine.
+Reads follow the same primary/replica routing as the synchronous blueprints
+(see ``db_routing.py``), with one async engine per bind.
+
+When asyncpg is not installed or ``ASYNC_READS_ENABLED`` is off, the same API
+falls back to the synchronous engine so the views behave identically.
+"""
+import asyncio
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+try:
+    import asyncpg  # noqa: F401
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+except ImportError:  # pragma: no cover - depends on the installed drivers
+    AsyncSession = create_async_engine = None
+
+
+def to_async_url(database_uri):
+    """
+    Convert a synchronous PostgreSQL URI into its asyncpg equivalent
+
+    Args:
+        database_uri (str): A ``postgresql://`` or ``postgresql+psycopg2://`` URI
+
+    Returns:
+        str: The same URI using the ``postgresql+asyncpg`` driver
+    """
+    url = make_url(database_uri).set(drivername='postgresql+asyncpg')
+    return url.render_as_string(hide_password=False)
+
+
+class _AsyncState:
+    """
+    Per-application, per-process state of the async engine
+
+    Holds the background event loop, the thread running it and the async
+    engines created on that loop, keyed by bind (None is the primary).
+
+    Attributes:
+        pid (int): Process that owns the loop; a forked worker starts its own
+        loop (asyncio.AbstractEventLoop): Background loop owning the pools
+        engines (dict): asyncpg-backed engines keyed by bind key
+    """
+
+    def __init__(self, urls, pool_size, max_overflow, pool_timeout):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever,
+            name='async-read-engine',
+            daemon=True
+        )
+        self.thread.start()
+        self.engines = {
+            bind_key: self._call(self._create_engine(url, pool_size, max_overflow, pool_timeout))
+            for bind_key, url in urls.items()
+        }
+
+    async def _create_engine(self, url, pool_size, max_overflow, pool_timeout):
+        # The engine must be created on the loop that will use its connections
+        return create_async_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_pre_ping=True
+        )
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _execute(self, bind_key, statement, scalars):
+        async with self.engines[bind_key].connect() as connection:
+            result = await connection.execute(statement)
+            return result.scalars().all() if scalars else result.all()
+
+    async def _execute_orm(self, bind_key, statement):
+        async with AsyncSession(self.engines[bind_key], expire_on_commit=False) as session:
+            result = await session.scalars(statement)
+            return result.all()
+
+    async def submit(self, coro):
+        """
+        Run a coroutine on the background loop and await its result
+
+        Args:
+            coro (coroutine): Coroutine using the engine
+
+        Returns:
+            object: Whatever the coroutine returns
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return await asyncio.wrap_future(future)
+
+
+class AsyncReadEngine:
+    """
+    Flask extension exposing the async read path
+
+    Initialised in ``create_app`` like the other extensions. Per-application
+    state is stored in ``app.extensions['async_db']`` and created lazily on the
+    first query so gunicorn workers forked after ``create_app`` each get their
+    own loop and pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Register the extension with a Flask application
+
+        Args:
+            app (Flask): The Flask application instance
+        """
+        app.config.setdefault('ASYNC_READS_ENABLED', True)
+        app.config.setdefault('ASYNC_POOL_SIZE', 20)
+        app.config.setdefault('ASYNC_MAX_OVERFLOW', 30)
+        app.config.setdefault('ASYNC_POOL_TIMEOUT', 10)
+        app.extensions['async_db'] = {'state': None}
+
+    @property
+    def enabled(self):
+        """
+        bool: Whether reads run on the asyncpg engine for the current app
+        """
+        return bool(current_app.config.get('ASYNC_READS_ENABLED')) and create_async_engine is not None
+
+    def _get_state(self):
+        app = current_app._get_current_object()
+        holder = app.extensions['async_db']
+        state = holder['state']
+        if state is not None and state.pid == os.getpid():
+            return state
+
+        with self._lock:
+            state = holder['state']
+            if state is None or state.pid != os.getpid():
+                urls = {None: app.config.get('ASYNC_DATABASE_URI') or
+                        to_async_url(app.config['SQLALCHEMY_DATABASE_URI'])}
+                replica_uri = app.config.get('SQLALCHEMY_BINDS', {}).get('replica')
+                if replica_uri:
+                    urls['replica'] = to_async_url(replica_uri)
+                state = _AsyncState(
+                    urls,
+                    app.config['ASYNC_POOL_SIZE'],
+                    app.config['ASYNC_MAX_OVERFLOW'],
+                    app.config['ASYNC_POOL_TIMEOUT']
+                )
+                holder['state'] = state
+        return state
+
+    async def execute(self, statement):
+        """
+        Execute a Core statement and return all result rows
+
+        Args:
+            statement (Executable): A ``select()`` or other read statement
+
+        Returns:
+            list: List of Row objects
+        """
+        bind_key = self._read_bind_key()
+        if not self.enabled:
+            return self._execute_sync(bind_key, statement, scalars=False)
+        state = self._get_state()
+        return await state.submit(state._execute(bind_key, statement, scalars=False))
+
+    async def scalars(self, statement):
+        """
+        Execute a statement and return the first column of every row
+
+        Args:
+            statement (Executable): A ``select()`` of a single column
+
+        Returns:
+            list: List of scalar values
+        """
+        bind_key = self._read_bind_key()
+        if not self.enabled:
+            return self._execute_sync(bind_key, statement, scalars=True)
+        state = self._get_state()
+        return await state.submit(state._execute(bind_key, statement, scalars=True))
+
+    async def fetch_models(self, statement):
+        """
+        Execute an ORM ``select(Model)`` and return detached model instances
+
+        Args:
+            statement (Select): A ``select()`` of a mapped class
+
+        Returns:
+            list: List of model instances with their columns loaded
+        """
+        bind_key = self._read_bind_key()
+        if not self.enabled:
+            return self._execute_sync_orm(bind_key, statement)
+        state = self._get_state()
+        return await state.submit(state._execute_orm(bind_key, statement))
+
+    def _read_bind_key(self):
+        from .db_routing import replica_router
+
+        return replica_router.read_bind_key()
+
+    def _execute_sync(self, bind_key, statement, scalars):
+        from .extensions import db
+
+        with Session(db.engines[bind_key]) as session:
+            result = session.execute(statement)
+            return result.scalars().all() if scalars else result.all()
+
+    def _execute_sync_orm(self, bind_key, statement):
+        from .extensions import db
+
+        with Session(db.engines[bind_key], expire_on_commit=False) as session:
+            return session.scalars(statement).all()
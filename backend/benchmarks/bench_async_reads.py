@@ -0,0 +1,81 @@
+"""
+Concurrency benchmark for the async read path
+
+Fires availability checks and menu reads at a running Café Fausse backend from
+500 concurrent clients and reports throughput and latency percentiles. Run it
+once with ``ASYNC_READS_ENABLED=true`` and once with ``false`` on the server to
+compare the async engine against the synchronous fallback.
+
+Start the server with enough threads to keep requests in flight, e.g.:
+
+    gunicorn -w 2 -k gthread --threads 250 "backend.app:create_app('production')"
+
+Then, from the parent directory of ``backend``:
+
+    python -m backend.benchmarks.bench_async_reads --url http://localhost:8000 --clients 500
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+        status = response.status
+    return time.perf_counter() - started, status
+
+
+def _client(base_url, requests_per_client, client_index):
+    date = (datetime.now() + timedelta(days=7 + client_index % 14)).strftime('%Y-%m-%d')
+    timings = []
+    for i in range(requests_per_client):
+        if i % 2 == 0:
+            timings.append(_request(f'{base_url}/api/reservations/check-availability', {
+                'date': date,
+                'time': '19:00',
+                'guests': 2 + client_index % 6
+            }))
+        else:
+            timings.append(_request(f'{base_url}/api/menu/items'))
+    return timings
+
+
+def run(base_url, clients, requests_per_client):
+    """
+    Run the benchmark and print a summary
+
+    Args:
+        base_url (str): Server base URL without trailing slash
+        clients (int): Number of concurrent clients
+        requests_per_client (int): Requests issued sequentially by each client
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda i: _client(base_url, requests_per_client, i), range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for timings in results for t, _ in timings)
+    errors = sum(1 for timings in results for _, status in timings if status >= 400)
+    total = len(latencies)
+    print(f'clients={clients} requests={total} errors={errors} elapsed={elapsed:.2f}s')
+    print(f'throughput={total / elapsed:.1f} req/s')
+    print(f'p50={statistics.median(latencies) * 1000:.1f}ms '
+          f'p95={latencies[int(total * 0.95) - 1] * 1000:.1f}ms '
+          f'p99={latencies[int(total * 0.99) - 1] * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://localhost:5001')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    args = parser.parse_args()
+    run(args.url.rstrip('/'), args.clients, args.requests)
@@ -0,0 +1,101 @@
+"""
+Throughput and yield benchmark for the seating engine
+
+Generates synthetic service nights of 500 booking requests against the default
+30-table floor plan and seats them with the best-fit engine and with the old
+strategy (a random free table, ignoring party size beyond "it fits"). Reports
+accepted bookings, seated covers and assignment throughput for both.
+
+Runs in-process without a database. From the parent directory of ``backend``:
+
+    python -m backend.benchmarks.bench_seating --nights 20 --bookings 500
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from backend.models.table import DEFAULT_FLOOR_PLAN
+from backend.services.seating import SeatingPlan, TableSpec
+
+SITTING = timedelta(minutes=90)
+# Party sizes weighted roughly like a bistro's booking book
+PARTY_SIZES = [1, 2, 2, 2, 2, 3, 3, 4, 4, 4, 5, 6, 6, 8, 10, 12]
+
+
+def floor_plan():
+    return [
+        TableSpec(number, capacity, section, combinable)
+        for first, last, capacity, section, combinable in DEFAULT_FLOOR_PLAN
+        for number in range(first, last + 1)
+    ]
+
+
+def synthetic_night(rng, bookings):
+    opening = datetime(2025, 4, 10, 17, 0)
+    slots = [opening + timedelta(minutes=15 * i) for i in range(21)]  # 17:00 - 22:00
+    return [(rng.choice(PARTY_SIZES), rng.choice(slots)) for _ in range(bookings)]
+
+
+def seat_best_fit(requests):
+    plan = SeatingPlan(floor_plan())
+    return [plan.assign(guests, start, start + SITTING) for guests, start in requests]
+
+
+def seat_random(requests, rng):
+    plan = SeatingPlan(floor_plan())
+    results = []
+    for guests, start in requests:
+        end = start + SITTING
+        fitting = [table for table in plan.free_tables(start, end) if table.capacity >= guests]
+        if fitting:
+            table = rng.choice(fitting)
+            plan.book([table.number], start, end)
+            results.append((table.number,))
+        else:
+            results.append(None)
+    return results
+
+
+def summarise(name, nights, results, elapsed):
+    accepted = [sum(1 for tables in night if tables) for night in results]
+    covers = [
+        sum(guests for (guests, _), tables in zip(requests, night) if tables)
+        for requests, night in zip(nights, results)
+    ]
+    total = sum(len(requests) for requests in nights)
+    print(f'{name:>9}: accepted/night={statistics.mean(accepted):.1f} '
+          f'covers/night={statistics.mean(covers):.1f} '
+          f'throughput={total / elapsed:,.0f} assignments/s '
+          f'({elapsed / total * 1e6:.1f}us each)')
+
+
+def run(nights_count, bookings, seed):
+    """
+    Run the benchmark and print a summary
+
+    Args:
+        nights_count (int): Number of synthetic nights
+        bookings (int): Booking requests per night
+        seed (int): Random seed for reproducible nights
+    """
+    rng = random.Random(seed)
+    nights = [synthetic_night(rng, bookings) for _ in range(nights_count)]
+
+    started = time.perf_counter()
+    best_fit = [seat_best_fit(requests) for requests in nights]
+    summarise('best fit', nights, best_fit, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    baseline = [seat_random(requests, rng) for requests in nights]
+    summarise('random', nights, baseline, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--nights', type=int, default=20)
+    parser.add_argument('--bookings', type=int, default=500, help='booking requests per night')
+    parser.add_argument('--seed', type=int, default=31)
+    args = parser.parse_args()
+    run(args.nights, args.bookings, args.seed)
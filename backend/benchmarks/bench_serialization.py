@@ -0,0 +1,104 @@
+"""
+Serialization benchmark for large list responses
+
+Builds the ``/api/customers`` payload for 100,000 customers and times the
+encoding of the response with Flask's default JSON provider (rows converted
+with ``isoformat()`` as before), with ``FastJSONProvider`` (orjson, native
+datetimes) and as MessagePack. Reports the best time of several runs and
+the payload size for each.
+
+Runs in-process without a database. From the parent directory of ``backend``:
+
+    python -m backend.benchmarks.bench_serialization --rows 100000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from flask import g
+from flask.json.provider import DefaultJSONProvider
+
+from backend.app import create_app
+from backend.models.customer import Customer
+from backend.serialization import MSGPACK_MIMETYPE, FastJSONProvider, msgpack, orjson
+
+
+def customers(rows):
+    created = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    return [
+        Customer(
+            id=i,
+            name=f'Guest {i}',
+            email=f'guest{i}@cafefausse.com',
+            phone=f'555-{i % 1000:03d}-{i % 10000:04d}',
+            newsletter_signup=i % 3 == 0,
+            created_at=created + timedelta(minutes=i),
+            updated_at=created + timedelta(minutes=i, seconds=30)
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def legacy_dict(customer):
+    # Customer.to_dict before the fast provider, formatting timestamps itself
+    return {
+        'id': customer.id,
+        'name': customer.name,
+        'email': customer.email,
+        'phone': customer.phone,
+        'newsletter_signup': customer.newsletter_signup,
+        'created_at': customer.created_at.isoformat() if customer.created_at else None,
+        'updated_at': customer.updated_at.isoformat() if customer.updated_at else None
+    }
+
+
+def best_of(repeats, build):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = build()
+        timings.append(time.perf_counter() - started)
+    return min(timings), len(response.get_data())
+
+
+def run(rows, repeats):
+    """
+    Run the benchmark and print a summary
+
+    Args:
+        rows (int): Number of customers in the payload
+        repeats (int): Runs per encoder; the best one is reported
+    """
+    app = create_app('testing')
+    records = customers(rows)
+    default, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+
+    cases = [('flask json + isoformat', lambda: default.response(
+        {'success': True, 'count': rows, 'customers': [legacy_dict(c) for c in records]}
+    ))]
+    if orjson is not None:
+        cases.append(('orjson provider', lambda: fast.response(
+            {'success': True, 'count': rows, 'customers': [c.to_dict() for c in records]}
+        )))
+    if msgpack is not None:
+        def packed():
+            g.response_mimetype = MSGPACK_MIMETYPE
+            return fast.response({'success': True, 'count': rows, 'customers': [c.to_dict() for c in records]})
+        cases.append(('msgpack', packed))
+
+    print(f'rows={rows} repeats={repeats}')
+    baseline = None
+    with app.test_request_context():
+        for name, build in cases:
+            g.pop('response_mimetype', None)
+            elapsed, size = best_of(repeats, build)
+            baseline = baseline or elapsed
+            print(f'{name:<24} {elapsed * 1000:8.1f}ms  x{baseline / elapsed:4.1f}  {size / 1e6:6.2f}MB')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
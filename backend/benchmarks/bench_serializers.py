@@ -0,0 +1,150 @@
+"""
+ORM versus compiled serializer benchmark for large reads
+
+Inserts 100,000 customers and as many reservations, then builds their list
+payloads two ways: loading ORM instances and calling ``to_dict()`` (the
+reservations with their customer joined, where the model's own ``to_dict()``
+would query it once per row), and selecting the default fields of their
+fieldsets as plain rows turned into dicts by the compiled serializers (see
+``serializers.py``). Reports the best wall and CPU time of several runs and
+the peak Python memory of one run for each.
+
+Needs a database; everything runs in one transaction that is rolled back at
+the end, so no row is left behind. From the parent directory of ``backend``:
+
+    python -m backend.benchmarks.bench_serializers --rows 100000 --config testing
+"""
+import argparse
+import time
+import tracemalloc
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.customer import Customer
+from backend.models.reservation import Reservation
+from backend.serializers import customer_fields, reservation_fields
+
+INSERT_CUSTOMERS = text("""
+    INSERT INTO customers (name, email, phone, newsletter_signup, created_at, updated_at)
+    SELECT 'Guest ' || g, 'bench' || g || '@cafefausse.com', '555-0100', g % 3 = 0, now(), now()
+    FROM generate_series(1, :rows) AS g
+""")
+
+# One booking per benchmark customer, a minute apart, far enough ahead to stay clear of real bookings
+INSERT_RESERVATIONS = text("""
+    INSERT INTO reservations (customer_id, time_slot, guests, table_number, status, created_at, updated_at)
+    SELECT id, timestamp '2099-01-01 12:00' + id * interval '1 minute', 2, 1 + id % 10, 'confirmed', now(), now()
+    FROM customers WHERE email LIKE 'bench%@cafefausse.com'
+""")
+
+
+def orm_reservations(session):
+    # Reservation.to_dict with the customer's name from the join instead of its per-row lookup
+    rows = session.execute(
+        select(Reservation, Customer.name).outerjoin(Customer, Customer.id == Reservation.customer_id)
+    ).all()
+    return [
+        {
+            'id': reservation.id,
+            'customer_id': reservation.customer_id,
+            'customer_name': name,
+            'time_slot': reservation.time_slot,
+            'guests': reservation.guests,
+            'table_number': reservation.table_number,
+            'tables': reservation.tables,
+            'special_requests': reservation.special_requests,
+            'status': reservation.status,
+            'standing_id': reservation.standing_id,
+            'created_at': reservation.created_at,
+            'updated_at': reservation.updated_at
+        }
+        for reservation, name in rows
+    ]
+
+
+def measure(connection, repeats, build):
+    """
+    Time a payload build and trace its memory
+
+    Args:
+        connection (Connection): Connection holding the benchmark rows
+        repeats (int): Timed runs; the best one is reported
+        build (function): Takes a session and returns the payload rows
+
+    Returns:
+        tuple: Best wall seconds, best CPU seconds, peak traced bytes and row count
+    """
+    def run():
+        session = Session(bind=connection, join_transaction_mode='create_savepoint')
+        try:
+            return build(session)
+        finally:
+            session.close()
+
+    walls, cpus = [], []
+    for _ in range(repeats):
+        wall, cpu = time.perf_counter(), time.process_time()
+        payload = run()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+        del payload
+
+    tracemalloc.start()
+    try:
+        payload = run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(walls), min(cpus), peak, len(payload)
+
+
+def run(rows, repeats, config_name):
+    """
+    Run the benchmark and print a summary
+
+    Args:
+        rows (int): Number of customers and of reservations inserted
+        repeats (int): Runs per approach; the best one is reported
+        config_name (str): Configuration naming the database
+    """
+    app = create_app(config_name)
+    cases = [
+        ('customers', 'orm + to_dict', lambda session: [c.to_dict() for c in session.scalars(select(Customer))]),
+        ('customers', 'compiled rows', lambda session: customer_fields.as_dicts(
+            customer_fields.default, session.execute(customer_fields.select(customer_fields.default))
+        )),
+        ('reservations', 'orm + dict', orm_reservations),
+        ('reservations', 'compiled rows', lambda session: reservation_fields.as_dicts(
+            reservation_fields.default, session.execute(reservation_fields.select(reservation_fields.default))
+        )),
+    ]
+
+    print(f'rows={rows} repeats={repeats}')
+    with app.app_context(), db.engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            connection.execute(INSERT_CUSTOMERS, {'rows': rows})
+            connection.execute(INSERT_RESERVATIONS)
+            baseline = {}
+            for entity, name, build in cases:
+                wall, cpu, peak, count = measure(connection, repeats, build)
+                baseline.setdefault(entity, (cpu, peak))
+                print(
+                    f'{entity:<13} {name:<14} {count:>7} rows  wall {wall * 1000:7.1f}ms  '
+                    f'cpu {cpu * 1000:7.1f}ms  x{baseline[entity][0] / cpu:4.1f}  '
+                    f'peak {peak / 1e6:7.1f}MB  x{baseline[entity][1] / peak:4.1f}'
+                )
+        finally:
+            transaction.rollback()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--config', default='development', help='configuration naming the database')
+    args = parser.parse_args()
+    run(args.rows, args.repeats, args.config)
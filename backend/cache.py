@@ -0,0 +1,708 @@
+"""
+Caching layer for the Café Fausse application
+
+Cached data lives in named namespaces (``menu``, ``schedule``, ...) declared
+with ``cache.namespace`` next to the code that reads it. A namespace caches
+view results with ``cached_view``, function (query) results with ``cached``
+or anything else with ``get_or_set``. Entries are kept in the backend chosen
+by ``CACHE_BACKEND``:
+
+- ``memory``: an in-process LRU of at most ``CACHE_MAX_ENTRIES`` entries per
+  worker, each expiring after its namespace's TTL.
+- ``redis``: a Redis (or Redis-protocol) server at ``CACHE_REDIS_URL`` shared
+  by every worker and host. Values are pickled; namespaces holding objects
+  that cannot be pickled are declared ``local`` and stay in process memory.
+- ``none``: nothing is cached.
+
+Freshness comes from the invalidation bus (see ``services/invalidation.py``).
+A namespace names the entities it is built from; when the token of any of
+them changes the namespace is flushed before its next use, and while the bus
+cannot vouch for freshness the namespace reads through to the database. An
+entry computed while one of its entities changed is not stored.
+
+On a miss only one caller computes the entry. Other threads of the worker
+wait for its result, and with a shared backend other workers wait on a lock
+key (``SET NX``) for at most ``CACHE_LOCK_SECONDS`` and then read the stored
+entry, so a hot key expiring does not send every worker to the database at
+once. Each worker counts hits, misses, evictions and the rest per namespace;
+``GET /api/cache`` shows them and ``DELETE /api/cache/<namespace>`` flushes a
+namespace in every worker.
+"""
+import functools
+import inspect
+import os
+import pickle
+import threading
+import time as clock
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+
+from .compression import precompress
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depends on the installed packages
+    redis = None
+
+# Returned by backends for a key they do not hold
+MISSING = object()
+
+# Seconds between checks of a key another worker is computing
+LOCK_POLL_SECONDS = 0.02
+
+# Entity invalidated to flush a namespace by hand; keyed by namespace name
+FLUSH_ENTITY = 'cache'
+
+# Response headers stored with cached views: the validators of conditional GET
+KEPT_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache with per-entry expiry
+
+    Attributes:
+        max_entries (int): Number of entries kept; the least recently used is evicted first
+        shared (bool): False, every worker has its own entries
+    """
+    shared = False
+
+    def __init__(self, max_entries, on_evict=None):
+        self.max_entries = max_entries
+        self._on_evict = on_evict or (lambda key, reason: None)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[1] > clock.monotonic():
+                self._entries.move_to_end(key)
+                return entry[0]
+            del self._entries[key]
+        self._on_evict(key, 'expirations')
+        return MISSING
+
+    def set(self, key, value, ttl):
+        evicted = []
+        with self._lock:
+            self._entries[key] = (value, clock.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for old_key in evicted:
+            self._on_evict(old_key, 'evictions')
+
+    def add(self, key, value, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > clock.monotonic():
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix=''):
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def count(self, prefix=''):
+        with self._lock:
+            return sum(1 for key in self._entries if key.startswith(prefix))
+
+    def info(self):
+        return {'type': 'memory', 'entries': self.count(), 'max_entries': self.max_entries}
+
+
+class RedisBackend:
+    """
+    Cache shared by every worker on a Redis-protocol server
+
+    Attributes:
+        prefix (str): Prepended to every key, so several applications can share a server
+        shared (bool): True, entries are seen by every worker
+    """
+    shared = True
+
+    def __init__(self, url, prefix):
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return MISSING if data is None else pickle.loads(data)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    def add(self, key, value, ttl):
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000), nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def _keys(self, prefix):
+        return list(self.client.scan_iter(match=f'{self.prefix}{prefix}*', count=500))
+
+    def clear(self, prefix=''):
+        keys = self._keys(prefix)
+        for start in range(0, len(keys), 500):
+            self.client.delete(*keys[start:start + 500])
+        return len(keys)
+
+    def count(self, prefix=''):
+        return len(self._keys(prefix))
+
+    def info(self):
+        stats = self.client.info()
+        return {
+            'type': 'redis',
+            'entries': self.count(),
+            'evicted_keys': stats.get('evicted_keys'),
+            'used_memory': stats.get('used_memory')
+        }
+
+
+class NullBackend:
+    """
+    Backend of ``CACHE_BACKEND=none``: holds nothing
+    """
+    shared = False
+
+    def get(self, key):
+        return MISSING
+
+    def set(self, key, value, ttl):
+        pass
+
+    def add(self, key, value, ttl):
+        return True
+
+    def delete(self, key):
+        pass
+
+    def clear(self, prefix=''):
+        return 0
+
+    def count(self, prefix=''):
+        return 0
+
+    def info(self):
+        return {'type': 'none'}
+
+
+class _Flight:
+    """
+    A computation other threads of the worker are waiting for
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+
+    def land(self, value):
+        self.value = value
+        self.done.set()
+
+
+class _CacheState:
+    """
+    Per-application, per-process state of the cache
+
+    Attributes:
+        pid (int): Process owning the state; a forked worker starts its own
+        backend: Backend selected by ``CACHE_BACKEND``
+        local_backend: Process-memory backend of ``local`` namespaces
+        metrics (dict): Counters per namespace name
+    """
+
+    def __init__(self, app):
+        self.pid = os.getpid()
+        self.app = app
+        config = app.config
+        self.default_ttl = config['CACHE_DEFAULT_TTL']
+        self.lock_seconds = config['CACHE_LOCK_SECONDS']
+        self.local_backend = MemoryBackend(config['CACHE_MAX_ENTRIES'], self._count_eviction)
+        kind = config['CACHE_BACKEND']
+        if kind == 'redis':
+            self.backend = RedisBackend(config['CACHE_REDIS_URL'], config['CACHE_KEY_PREFIX'])
+        elif kind == 'none':
+            self.backend = self.local_backend = NullBackend()
+        elif kind == 'memory':
+            self.backend = self.local_backend
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND: {kind}')
+        self.metrics = {}
+        self.tokens = {}
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def count(self, namespace, counter, amount=1):
+        with self.lock:
+            self.metrics.setdefault(namespace, Counter())[counter] += amount
+
+    def _count_eviction(self, key, reason):
+        self.count(key.partition(':')[0], reason)
+
+    def call(self, namespace, operation, *args, default=None):
+        # A cache outage must never fail the request: treat it as a miss
+        try:
+            return operation(*args)
+        except Exception as e:
+            self.count(namespace, 'errors')
+            self.app.logger.warning(f'Cache {namespace} unavailable: {str(e)}')
+            return default
+
+
+class _Fill:
+    """
+    A miss the caller must compute, then complete or abandon
+    """
+
+    def __init__(self, namespace, state, backend, key, tokens, flight, locked):
+        self.namespace = namespace
+        self.state = state
+        self.backend = backend
+        self.key = key
+        self.tokens = tokens
+        self.flight = flight
+        self.locked = locked
+
+    def complete(self, value, store=True):
+        """
+        Store a computed value and hand it to the callers waiting for it
+
+        Args:
+            value (object): The computed value
+            store (bool): False for a value only meant for this caller (e.g.
+                a ``304`` answering its own validators); it is neither cached
+                nor handed over, and waiting callers compute their own
+        """
+        namespace, state = self.namespace, self.state
+        if not store:
+            self._finish(MISSING)
+            return
+        # Data loaded while an entity changed may already be stale
+        if namespace.tokens() == self.tokens:
+            state.call(namespace.name, self.backend.set, self.key, value, namespace.ttl(state))
+            state.count(namespace.name, 'sets')
+        self._finish(value)
+
+    def abandon(self):
+        """
+        Give up after the computation failed; waiting callers compute themselves
+        """
+        self._finish(MISSING)
+
+    def _finish(self, value):
+        if self.locked:
+            self.state.call(self.namespace.name, self.backend.delete, _lock_key(self.key))
+        if self.flight is not None:
+            with self.state.lock:
+                self.state.flights.pop(self.key, None)
+            self.flight.land(value)
+
+
+class _Bypass:
+    """
+    A computation whose result must not be cached
+    """
+
+    def complete(self, value, store=True):
+        pass
+
+    def abandon(self):
+        pass
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+class Namespace:
+    """
+    A named group of cached entries sharing a TTL and invalidation rules
+
+    Attributes:
+        name (str): Namespace name, the first part of its keys
+        entities (tuple): Invalidation bus entities the entries are built from
+        local (bool): Keep the entries in process memory whatever the backend
+    """
+
+    def __init__(self, cache, name, ttl=None, entities=(), local=False):
+        self.cache = cache
+        self.name = name
+        self._ttl = ttl
+        self.entities = tuple(entities)
+        self.local = local
+
+    def ttl(self, state=None):
+        """
+        Lifetime of the namespace's entries in seconds
+
+        Args:
+            state (_CacheState, optional): State of the current application
+
+        Returns:
+            float: The namespace's TTL, read from the config when given as a setting name
+        """
+        if self._ttl is None:
+            return (state or self.cache.state()).default_ttl
+        if isinstance(self._ttl, str):
+            return current_app.config[self._ttl]
+        return self._ttl
+
+    def tokens(self):
+        """
+        Current invalidation tokens of the namespace's entities
+
+        Returns:
+            tuple: The tokens, or None when the entries cannot be trusted
+        """
+        from .services.invalidation import cache_token
+        tokens = tuple(cache_token(entity) for entity in self.entities) + (cache_token(FLUSH_ENTITY, self.name),)
+        return None if None in tokens else tokens
+
+    def _backend(self, state):
+        return state.local_backend if self.local else state.backend
+
+    def _prefix(self):
+        return f'{self.name}:'
+
+    def _check_tokens(self, state, backend, tokens):
+        # Flush everything cached before the latest change of an entity
+        with state.lock:
+            previous = state.tokens.get(self.name)
+            state.tokens[self.name] = tokens
+        if previous is not None and previous != tokens:
+            state.call(self.name, backend.clear, self._prefix())
+            state.count(self.name, 'flushes')
+
+    def _begin(self, key):
+        # Returns (value, None) when the value is known, else (MISSING, fill)
+        state = self.cache.state()
+        tokens = self.tokens()
+        if tokens is None:
+            state.count(self.name, 'bypassed')
+            return MISSING, _Bypass()
+        backend = self._backend(state)
+        self._check_tokens(state, backend, tokens)
+        key = f'{self.name}:{key}'
+
+        value = state.call(self.name, backend.get, key, default=MISSING)
+        if value is not MISSING:
+            state.count(self.name, 'hits')
+            return value, None
+        state.count(self.name, 'misses')
+
+        with state.lock:
+            flight = state.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = state.flights[key] = _Flight()
+        if not leader:
+            # Another thread of this worker is computing the key
+            state.count(self.name, 'coalesced')
+            flight.done.wait(state.lock_seconds)
+            if flight.value is not MISSING:
+                return flight.value, None
+            return MISSING, _Fill(self, state, backend, key, tokens, None, False)
+
+        locked = False
+        if backend.shared:
+            deadline = clock.monotonic() + state.lock_seconds
+            while clock.monotonic() < deadline:
+                if state.call(self.name, backend.add, _lock_key(key), 1, state.lock_seconds, default=True):
+                    locked = True
+                    break
+                # Another worker is computing the key
+                clock.sleep(LOCK_POLL_SECONDS)
+                value = state.call(self.name, backend.get, key, default=MISSING)
+                if value is not MISSING:
+                    state.count(self.name, 'coalesced')
+                    with state.lock:
+                        state.flights.pop(key, None)
+                    flight.land(value)
+                    return value, None
+        return MISSING, _Fill(self, state, backend, key, tokens, flight, locked)
+
+    def get_or_set(self, key, compute):
+        """
+        Get an entry, computing and storing it on a miss
+
+        Args:
+            key (str): Key of the entry within the namespace
+            compute (callable): Called without arguments to build a missing entry
+
+        Returns:
+            object: The cached or freshly computed value
+        """
+        value, fill = self._begin(key)
+        if fill is None:
+            return value
+        try:
+            value = compute()
+        except BaseException:
+            fill.abandon()
+            raise
+        fill.complete(value)
+        return value
+
+    async def get_or_set_async(self, key, compute):
+        """
+        Get an entry, awaiting ``compute()`` to build it on a miss
+
+        Args:
+            key (str): Key of the entry within the namespace
+            compute (callable): Coroutine function called without arguments
+
+        Returns:
+            object: The cached or freshly computed value
+        """
+        value, fill = self._begin(key)
+        if fill is None:
+            return value
+        try:
+            value = await compute()
+        except BaseException:
+            fill.abandon()
+            raise
+        fill.complete(value)
+        return value
+
+    def cached(self, key=None):
+        """
+        Decorate a function whose result (typically a query's) is cached
+
+        Args:
+            key (callable, optional): Builds the entry key from the function's
+                arguments; defaults to the function name and the arguments' repr
+
+        Returns:
+            callable: The decorator
+        """
+        def decorator(function):
+            def make_key(args, kwargs):
+                if key is not None:
+                    return key(*args, **kwargs)
+                arguments = [repr(arg) for arg in args] + [f'{name}={value!r}' for name, value in sorted(kwargs.items())]
+                return f"{function.__qualname__}({','.join(arguments)})"
+
+            if inspect.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def async_wrapper(*args, **kwargs):
+                    return await self.get_or_set_async(make_key(args, kwargs), lambda: function(*args, **kwargs))
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                return self.get_or_set(make_key(args, kwargs), lambda: function(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    def cached_view(self, key=None):
+        """
+        Decorate a view whose successful responses are cached
+
+        Only ``200`` responses are stored, together with their status,
+        content type, validators (see ``conditional.py``) and compressed
+        bodies (see ``compression.py``); they are served with
+        ``X-Cache: HIT``, or as ``304`` when the client's copy matches.
+
+        Args:
+            key (callable, optional): Builds the entry key from the view
+                arguments; defaults to the request path and sorted query string
+
+        Returns:
+            callable: The decorator
+        """
+        def make_key(kwargs):
+            if key is not None:
+                return key(**kwargs)
+            return f'{request.path}?{urlencode(sorted(request.args.items(multi=True)))}'
+
+        def snapshot(response):
+            body = response.get_data()
+            return {
+                'body': body,
+                'status': response.status_code,
+                'mimetype': response.mimetype,
+                'headers': [(name, response.headers[name]) for name in KEPT_HEADERS if name in response.headers],
+                # Compressed once here rather than on every hit
+                'encoded': precompress(body, response.mimetype) if response.status_code == 200 else {}
+            }
+
+        def restore(entry, hit):
+            response = Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+            response.headers.extend(entry.get('headers', ()))
+            response.precompressed = entry.get('encoded')
+            response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+            if hit:
+                response.make_conditional(request)
+            return response
+
+        def decorator(view):
+            if inspect.iscoroutinefunction(view):
+                @functools.wraps(view)
+                async def async_wrapper(*args, **kwargs):
+                    entry, fill = self._begin(make_key(kwargs))
+                    if fill is None:
+                        return restore(entry, True)
+                    try:
+                        entry = snapshot(current_app.make_response(await view(*args, **kwargs)))
+                    except BaseException:
+                        fill.abandon()
+                        raise
+                    fill.complete(entry, store=entry['status'] == 200)
+                    return restore(entry, False)
+                return async_wrapper
+
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                entry, fill = self._begin(make_key(kwargs))
+                if fill is None:
+                    return restore(entry, True)
+                try:
+                    entry = snapshot(current_app.make_response(view(*args, **kwargs)))
+                except BaseException:
+                    fill.abandon()
+                    raise
+                fill.complete(entry, store=entry['status'] == 200)
+                return restore(entry, False)
+            return wrapper
+        return decorator
+
+    def delete(self, key):
+        """
+        Drop one entry from this worker's view of the cache
+
+        Args:
+            key (str): Key of the entry within the namespace
+        """
+        state = self.cache.state()
+        state.call(self.name, self._backend(state).delete, f'{self.name}:{key}')
+
+    def flush(self):
+        """
+        Drop every entry of the namespace (in this worker only for local namespaces)
+
+        Returns:
+            int: Number of entries dropped
+        """
+        state = self.cache.state()
+        state.count(self.name, 'flushes')
+        return state.call(self.name, self._backend(state).clear, self._prefix(), default=0)
+
+    def stats(self):
+        """
+        Counters and size of the namespace in this worker
+
+        Returns:
+            dict: Settings, entry count and counters of the namespace
+        """
+        state = self.cache.state()
+        with state.lock:
+            counters = dict(state.metrics.get(self.name, {}))
+        lookups = counters.get('hits', 0) + counters.get('misses', 0)
+        return {
+            'ttl': self.ttl(state),
+            'entities': list(self.entities),
+            'local': self.local,
+            'entries': state.call(self.name, self._backend(state).count, self._prefix(), default=None),
+            'hit_ratio': round(counters.get('hits', 0) / lookups, 3) if lookups else None,
+            **{name: counters.get(name, 0) for name in (
+                'hits', 'misses', 'sets', 'coalesced', 'evictions', 'expirations', 'flushes', 'bypassed', 'errors'
+            )}
+        }
+
+
+class Cache:
+    """
+    Flask extension holding the application's cache namespaces
+
+    Namespaces are declared once at import time; the backend and counters are
+    created per application and per worker process on first use.
+
+    Attributes:
+        namespaces (dict): Declared namespaces by name
+    """
+
+    def __init__(self):
+        self.namespaces = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Register the cache with a Flask application
+
+        Args:
+            app (Flask): The Flask application instance
+        """
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('CACHE_KEY_PREFIX', 'cafe_fausse:')
+        app.config.setdefault('CACHE_MAX_ENTRIES', 10000)
+        app.config.setdefault('CACHE_DEFAULT_TTL', 300)
+        app.config.setdefault('CACHE_LOCK_SECONDS', 5)
+        app.extensions['cache'] = None
+
+    def namespace(self, name, ttl=None, entities=(), local=False):
+        """
+        Declare a cache namespace
+
+        Args:
+            name (str): Namespace name; must not contain ``:``
+            ttl (int | str, optional): Lifetime of entries in seconds, or the
+                name of the setting holding it; defaults to ``CACHE_DEFAULT_TTL``
+            entities (tuple): Invalidation bus entities the entries are built from
+            local (bool): Keep entries in process memory even with a shared backend
+
+        Returns:
+            Namespace: The new namespace
+        """
+        if ':' in name or name in self.namespaces:
+            raise ValueError(f'Invalid or duplicate cache namespace: {name}')
+        namespace = self.namespaces[name] = Namespace(self, name, ttl, entities, local)
+        return namespace
+
+    def state(self):
+        """
+        Get the cache state of the current application, creating it if needed
+
+        Returns:
+            _CacheState: The application's cache state in this process
+        """
+        app = current_app._get_current_object()
+        state = app.extensions.get('cache')
+        if state is None or state.pid != os.getpid():
+            with self._lock:
+                state = app.extensions.get('cache')
+                if state is None or state.pid != os.getpid():
+                    state = _CacheState(app)
+                    app.extensions['cache'] = state
+        return state
+
+    def info(self):
+        """
+        Describe the backend of the current application
+
+        Returns:
+            dict: Backend type and size, or an ``error`` when it cannot be reached
+        """
+        state = self.state()
+        try:
+            return state.backend.info()
+        except Exception as e:
+            return {'type': current_app.config['CACHE_BACKEND'], 'error': str(e)}
@@ -0,0 +1,177 @@
+"""
+Response compression for the Café Fausse application
+
+Responses in a compressible format (JSON, MessagePack, text) are compressed
+with brotli or gzip, whichever the client's ``Accept-Encoding`` ranks first
+among ``COMPRESS_ENCODINGS``. Bodies smaller than ``COMPRESS_MIN_BYTES`` are
+sent as they are, since the framing would outweigh the savings.
+
+Streamed responses, such as the reservation change feed, are compressed
+chunk by chunk and flushed after each one, so every event still reaches the
+client as soon as it is written.
+
+Compressing a large list on every request would cost more CPU than building
+it when it comes from the cache, so ``cached_view`` entries (see
+``cache.py``) store the compressed bodies alongside the original, made once
+when the entry is filled; ``compression`` sends them as they are.
+"""
+import gzip
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the installed packages
+    brotli = None
+
+# Formats worth compressing; everything else (images, archives) already is
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'application/json', 'application/msgpack', 'application/javascript', 'image/svg+xml'
+])
+
+
+def compressible(mimetype):
+    """
+    Whether responses of a format are worth compressing
+
+    Args:
+        mimetype (str): Response mimetype, without parameters
+
+    Returns:
+        bool: True for text and the formats in ``COMPRESSIBLE_MIMETYPES``
+    """
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES)
+
+
+def available_encodings(config):
+    """
+    Content codings the application offers, in order of preference
+
+    Args:
+        config (Config): Application configuration
+
+    Returns:
+        list: Codings among 'br' and 'gzip'; brotli only when installed
+    """
+    encodings = [coding.strip() for coding in config['COMPRESS_ENCODINGS'].split(',') if coding.strip()]
+    return [coding for coding in encodings if coding == 'gzip' or (coding == 'br' and brotli is not None)]
+
+
+def compress(data, coding, config):
+    """
+    Compress a whole body
+
+    Args:
+        data (bytes): Body to compress
+        coding (str): 'br' or 'gzip'
+        config (Config): Application configuration, for the compression levels
+
+    Returns:
+        bytes: The compressed body
+    """
+    if coding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def precompress(data, mimetype):
+    """
+    Compress a body with every offered coding, for storing in a cache entry
+
+    Args:
+        data (bytes): Body of a cacheable response
+        mimetype (str): Its mimetype
+
+    Returns:
+        dict: Compressed body keyed by coding; empty when the body is not
+            worth compressing
+    """
+    config = current_app.config
+    if 'COMPRESS_ENCODINGS' not in config or not compressible(mimetype) or len(data) < config['COMPRESS_MIN_BYTES']:
+        return {}
+    return {coding: compress(data, coding, config) for coding in available_encodings(config)}
+
+
+def _stream(source, coding, config):
+    # Compress a streamed body, flushing after each chunk so nothing waits for the next one
+    if coding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BROTLI_QUALITY'])
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    try:
+        for chunk in source:
+            if chunk:
+                yield process(chunk.encode() if isinstance(chunk, str) else chunk) + flush()
+        yield finish()
+    finally:
+        # Closing the response closes this generator; pass it on, e.g. to end a feed subscription
+        close = getattr(source, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compression:
+    """
+    Flask extension compressing responses
+
+    Registers an ``after_request`` hook negotiating the coding with the
+    client and compressing the body, or reusing a cached compressed body.
+    """
+
+    def init_app(self, app):
+        """
+        Register response compression with a Flask application
+
+        Args:
+            app (Flask): The Flask application instance
+        """
+        app.config.setdefault('COMPRESS_ENCODINGS', 'br,gzip')
+        app.config.setdefault('COMPRESS_MIN_BYTES', 1024)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+        app.after_request(self._compress)
+
+    def _compress(self, response):
+        config = current_app.config
+        if (
+            response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')
+            or not compressible(response.mimetype)
+        ):
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and response.calculate_content_length() < config['COMPRESS_MIN_BYTES']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        coding = request.accept_encodings.best_match(available_encodings(config))
+        if coding is None:
+            return response
+
+        if streamed:
+            response.response = _stream(response.response, coding, config)
+            response.headers.pop('Content-Length', None)
+        else:
+            cached = getattr(response, 'precompressed', None) or {}
+            data = cached.get(coding)
+            if data is None:
+                data = compress(response.get_data(), coding, config)
+            response.set_data(data)
+
+        response.headers['Content-Encoding'] = coding
+        # The compressed body differs byte for byte, so a strong validator becomes weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compression = Compression()
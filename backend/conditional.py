@@ -0,0 +1,165 @@
+"""
+Conditional GET for the Café Fausse application
+
+Read endpoints decorated with ``conditional`` answer with a weak ``ETag`` and
+a ``Last-Modified`` date, and with ``304 Not Modified`` when the client's
+``If-None-Match`` or ``If-Modified-Since`` still matches, so browsers and
+proxies do not download the same payload again.
+
+The validators come from a stamp of the rows a response is built from, taken
+by one aggregate query before the view runs: for each source the number of
+matching rows and their latest ``updated_at`` (every write bumps it), plus
+the time of the latest deletion from the table's sync tombstones (see
+``models/sync_tombstone.py``), which ``updated_at`` alone cannot reveal. The
+ETag hashes the stamp with the request path and query string;
+``Last-Modified`` is the latest of the dates. A ``304`` is therefore sent
+without loading or serialising the result set.
+
+Responses carry ``Cache-Control: no-cache``: clients may keep them but
+revalidate on every use, so a change shows up on the next request.
+"""
+import functools
+import hashlib
+import inspect
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .db_routing import get_read_engine
+from .extensions import async_db
+from .models.sync_tombstone import SYNCED_TABLES, SyncTombstone
+
+
+def stamp_query(sources):
+    """
+    Build the aggregate query stamping the rows a response is built from
+
+    Args:
+        sources (list): ``(model, *criteria)`` tuples, one per set of rows
+
+    Returns:
+        Select: Statement returning one row with the count and latest
+            ``updated_at`` of each source, then the latest deletion of each
+            synced table
+    """
+    columns = []
+    for model, *criteria in sources:
+        columns.append(select(func.count(model.id)).where(*criteria).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+    tables = dict.fromkeys(model.__tablename__ for model, *_ in sources)
+    for table in tables:
+        if table in SYNCED_TABLES:
+            columns.append(
+                select(func.max(SyncTombstone.deleted_at))
+                .where(SyncTombstone.entity == table)
+                .scalar_subquery()
+            )
+    return select(*columns)
+
+
+def validators(stamp):
+    """
+    Derive the validators of the current request's response from a stamp
+
+    Args:
+        stamp (tuple): Row returned by ``stamp_query``
+
+    Returns:
+        tuple: (etag, last_modified); last_modified is None when no row has a date
+    """
+    params = urlencode(sorted(request.args.items(multi=True)))
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in stamp]
+    etag = hashlib.sha1(repr((request.path, params, values)).encode()).hexdigest()
+    dates = [value for value in stamp if hasattr(value, 'isoformat')]
+    return etag, max(dates, default=None)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _not_modified(etag, last_modified):
+    # Weak comparison for If-None-Match, which takes precedence over If-Modified-Since
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and \
+        last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+
+def conditional(sources):
+    """
+    Decorate a read view with ETag/Last-Modified validators and 304 responses
+
+    Only ``200`` responses get validators. The stamp is read like the view's
+    data (replica or primary, see ``db_routing.py``); if it cannot be read,
+    the view runs as if the request were unconditional.
+
+    Args:
+        sources (callable): Called with the view arguments; returns the
+            ``(model, *criteria)`` tuples the response is built from, or None
+            to serve the request unconditionally (e.g. invalid arguments)
+
+    Returns:
+        callable: The decorator
+    """
+    def evaluate(stamp):
+        etag, last_modified = validators(stamp)
+        if _not_modified(etag, last_modified):
+            return etag, last_modified, _set_validators(current_app.response_class(status=304), etag, last_modified)
+        return etag, last_modified, None
+
+    def finish(result, etag, last_modified):
+        response = current_app.make_response(result)
+        if response.status_code == 200:
+            _set_validators(response, etag, last_modified)
+        return response
+
+    def read_stamp(statement):
+        session = Session(get_read_engine())
+        try:
+            return tuple(session.execute(statement).one())
+        finally:
+            session.close()
+
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                parts = sources(**kwargs)
+                if parts is None:
+                    return await view(*args, **kwargs)
+                try:
+                    stamp = tuple((await async_db.execute(stamp_query(parts)))[0])
+                except SQLAlchemyError as e:
+                    current_app.logger.warning(f'Validators unavailable for {request.path}: {str(e)}')
+                    return await view(*args, **kwargs)
+                etag, last_modified, response = evaluate(stamp)
+                if response is not None:
+                    return response
+                return finish(await view(*args, **kwargs), etag, last_modified)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = sources(**kwargs)
+            if parts is None:
+                return view(*args, **kwargs)
+            try:
+                stamp = read_stamp(stamp_query(parts))
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f'Validators unavailable for {request.path}: {str(e)}')
+                return view(*args, **kwargs)
+            etag, last_modified, response = evaluate(stamp)
+            if response is not None:
+                return response
+            return finish(view(*args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,186 @@
+"""
+Read-replica routing for the Café Fausse application
+
+This module decides which database bind serves a read-only query. GET
+endpoints read from the ``replica`` bind configured in ``SQLALCHEMY_BINDS``
+while every write keeps using the primary. Three rules keep this safe:
+
+- Read-your-writes: after a client performs a successful write, a short-lived
+  cookie pins that client's reads to the primary for ``REPLICA_STICKY_SECONDS``.
+- Lag fallback: replica lag is sampled at most every
+  ``REPLICA_HEALTH_INTERVAL`` seconds and reads go to the primary while it
+  exceeds ``REPLICA_MAX_LAG_SECONDS``.
+- Outage fallback: a failed health check or connection error takes the
+  replica out of rotation for ``REPLICA_RETRY_SECONDS``.
+
+Without a replica bind every helper simply returns the primary, so local
+development needs no extra setup. Any second PostgreSQL database can act as a
+replica stand-in: on a non-replica server the lag query reports zero.
+"""
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, text
+
+from .extensions import db
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'cf_primary_until'
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Non-GET endpoints that only read and may therefore use the replica
+READ_ONLY_ENDPOINTS = frozenset(['reservations.check_availability', 'reservations.get_alternatives'])
+
+# Seconds of replay lag on a streaming replica; zero when caught up or when the
+# server is not a replica at all (both functions return NULL on a primary)
+LAG_QUERY = text("""
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+""")
+
+
+class _ReplicaHealth:
+    """
+    Cached health of the replica for one application
+
+    Attributes:
+        down_until (float): Monotonic time until which the replica is skipped
+        checked_at (float): Monotonic time of the last lag sample
+        lag (float): Last measured replication lag in seconds
+        hooked_engine (Engine): Replica engine the error hook is attached to
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag = 0.0
+        self.hooked_engine = None
+
+
+class ReplicaRouter:
+    """
+    Flask extension routing read-only queries to the replica bind
+
+    Registers an ``after_request`` hook that sets the read-your-writes cookie
+    and an error hook on the replica engine that marks it down.
+    """
+
+    def init_app(self, app):
+        """
+        Register the router with a Flask application
+
+        Args:
+            app (Flask): The Flask application instance
+        """
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+        app.config.setdefault('REPLICA_MAX_LAG_SECONDS', 5)
+        app.config.setdefault('REPLICA_HEALTH_INTERVAL', 2)
+        app.config.setdefault('REPLICA_RETRY_SECONDS', 30)
+        app.extensions['replica_router'] = _ReplicaHealth()
+        app.after_request(self._mark_sticky)
+
+    def _mark_sticky(self, response):
+        if REPLICA_BIND not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+            return response
+        if request.method not in SAFE_METHODS and request.endpoint not in READ_ONLY_ENDPOINTS \
+                and response.status_code < 400:
+            sticky_seconds = current_app.config['REPLICA_STICKY_SECONDS']
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def _is_sticky(self):
+        if not has_request_context():
+            return False
+        if request.method not in SAFE_METHODS and request.endpoint not in READ_ONLY_ENDPOINTS:
+            return True
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _mark_down(self, app):
+        health = app.extensions['replica_router']
+        health.down_until = time.monotonic() + app.config['REPLICA_RETRY_SECONDS']
+        app.logger.warning('Read replica unavailable, routing reads to the primary')
+
+    def _is_healthy(self, app, engine):
+        health = app.extensions['replica_router']
+        now = time.monotonic()
+        if now < health.down_until:
+            return False
+        if now - health.checked_at < app.config['REPLICA_HEALTH_INTERVAL']:
+            return health.lag <= app.config['REPLICA_MAX_LAG_SECONDS']
+
+        # Only one request per interval pays for the lag sample
+        if not health.lock.acquire(blocking=False):
+            return health.lag <= app.config['REPLICA_MAX_LAG_SECONDS']
+        try:
+            with engine.connect() as connection:
+                health.lag = float(connection.execute(LAG_QUERY).scalar() or 0)
+            health.checked_at = time.monotonic()
+        except Exception as e:
+            app.logger.error(f'Read replica health check failed: {str(e)}')
+            self._mark_down(app)
+            return False
+        finally:
+            health.lock.release()
+        return health.lag <= app.config['REPLICA_MAX_LAG_SECONDS']
+
+    def read_bind_key(self):
+        """
+        Choose the bind that should serve a read in the current context
+
+        Returns:
+            str: ``'replica'`` when the replica may serve the read, otherwise None
+        """
+        app = current_app._get_current_object()
+        engines = db.engines
+        if REPLICA_BIND not in engines or self._is_sticky():
+            return None
+        engine = engines[REPLICA_BIND]
+        health = app.extensions['replica_router']
+        if health.hooked_engine is not engine:
+            # Connection errors during a query take the replica out of rotation
+            event.listen(engine, 'handle_error', lambda context: self._on_error(app, context))
+            health.hooked_engine = engine
+        if not self._is_healthy(app, engine):
+            return None
+        return REPLICA_BIND
+
+    def _on_error(self, app, context):
+        if context.is_disconnect or context.connection is None:
+            self._mark_down(app)
+
+    def get_read_engine(self):
+        """
+        Get the engine that should serve a read in the current context
+
+        Returns:
+            Engine: The replica engine or the primary engine
+        """
+        return db.engines[self.read_bind_key()]
+
+
+replica_router = ReplicaRouter()
+
+
+def get_read_engine():
+    """
+    Get the engine for a read-only query in the current context
+
+    Shorthand used by the blueprints: ``Session(get_read_engine())``.
+
+    Returns:
+        Engine: The replica engine or the primary engine
+    """
+    return replica_router.get_read_engine()
@@ -9,10 +9,18 @@ initialized with the app instance when create_app() is called.
 Extensions defined:
 - SQLAlchemy: For ORM database operations
 - Migrate: For handling database migrations
+- AsyncReadEngine: asyncpg-backed engine for the async read path
+- Cache: namespaced result cache with memory or Redis backends
 """
+import os
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from .async_db import AsyncReadEngine
+from .cache import Cache
 
 # Initialize SQLAlchemy without binding to app
 db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+# Migrations live in backend/migrations regardless of the working directory
+migrate = Migrate(directory=os.path.join(os.path.dirname(__file__), 'migrations'))
+async_db = AsyncReadEngine()
+cache = Cache()
@@ -0,0 +1,256 @@
+"""
+Standalone server for the reservation change feed
+
+``GET /api/reservations/changes`` is a long-lived Server-Sent Events stream.
+Served by the Flask application, every open stream keeps the thread handling
+its request busy, so a worker holds one thread per open screen. This server
+serves the same stream from a single asyncio event loop: each subscriber is a
+coroutine and its socket, so hundreds of idle subscribers cost no thread and
+no database connection.
+
+The server holds one ``LISTEN`` connection (asyncpg) to the primary and keeps
+the recent events in the same ``EventLog`` as the in-process feed (see
+``services/change_feed.py``), with the same event IDs, resumption through
+``Last-Event-ID`` and ``reset`` events after missed changes. Run it next to
+the application servers and route ``/api/reservations/changes`` to it::
+
+    python -m backend.feed_server
+
+It listens on ``CHANGE_FEED_HOST``:``CHANGE_FEED_PORT``.
+"""
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+from sqlalchemy.engine import make_url
+
+from .services.change_feed import CHANNEL, EventLog
+from .services.listener import RECONNECT_SECONDS
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - depends on the installed drivers
+    asyncpg = None
+
+FEED_PATH = '/api/reservations/changes'
+
+# Seconds a client may take to send its request headers
+REQUEST_TIMEOUT_SECONDS = 10
+
+MAX_HEADERS = 100
+
+STREAM_HEADERS = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/event-stream; charset=utf-8\r\n'
+    b'Cache-Control: no-cache\r\n'
+    b'X-Accel-Buffering: no\r\n'
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'Connection: close\r\n'
+    b'\r\n'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def listen_dsn(database_uri):
+    """
+    Convert a SQLAlchemy PostgreSQL URI into a DSN asyncpg accepts
+
+    Args:
+        database_uri (str): A ``postgresql://`` or ``postgresql+<driver>://`` URI
+
+    Returns:
+        str: The same URI with the plain ``postgresql`` scheme
+    """
+    return make_url(database_uri).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+def _plain_response(status):
+    return f'HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'.encode()
+
+
+class FeedServer:
+    """
+    Server-Sent Events server for the change feed, on one event loop
+
+    Attributes:
+        log (EventLog): Recent change events
+        heartbeat (float): Seconds of silence after which subscribers get a
+            keep-alive and the LISTEN connection is checked
+        subscribers (int): Number of open streams
+        port (int): Port the server listens on, once started
+    """
+
+    def __init__(self, dsn, buffer_size, heartbeat):
+        if asyncpg is None:
+            raise RuntimeError('The change feed server requires the asyncpg package')
+        self.dsn = dsn
+        self.log = EventLog(buffer_size)
+        self.heartbeat = heartbeat
+        self.subscribers = 0
+        self.port = None
+        self._changed = asyncio.Event()
+        self._listening = asyncio.Event()
+        self._closed = False
+        self._server = None
+        self._listener = None
+        self._connections = set()
+
+    def _append(self, event, data):
+        self.log.append(event, data)
+        self._wake()
+
+    def _receive(self, connection, pid, channel, payload):
+        self.log.receive(payload)
+        self._wake()
+
+    def _wake(self):
+        # Subscribers wait on the current event; the next change gets a new one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _listen(self):
+        connected_before = False
+        while not self._closed:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(CHANNEL, self._receive)
+                if connected_before:
+                    # Changes made while the connection was down were missed
+                    self._append('reset', {})
+                connected_before = True
+                self._listening.set()
+                while not self._closed:
+                    await asyncio.sleep(self.heartbeat)
+                    await connection.execute('SELECT 1')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Change feed LISTEN connection lost: {str(e)}')
+                await asyncio.sleep(RECONNECT_SECONDS)
+            finally:
+                self._listening.clear()
+                if connection is not None:
+                    connection.terminate()
+
+    async def wait_until_listening(self, timeout=5.0):
+        """
+        Wait until the LISTEN connection is up
+
+        Args:
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: True once the server is listening
+        """
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        for _ in range(MAX_HEADERS):
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return request_line, headers
+
+    async def _handle(self, reader, writer):
+        self._connections.add(asyncio.current_task())
+        try:
+            request_line, headers = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT_SECONDS)
+            if len(request_line) != 3 or urlsplit(request_line[1]).path != FEED_PATH:
+                writer.write(_plain_response('404 Not Found'))
+            elif request_line[0] != 'GET':
+                writer.write(_plain_response('405 Method Not Allowed'))
+            else:
+                await self._stream(writer, headers.get('last-event-id'))
+            await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    async def _stream(self, writer, last_event_id):
+        self.subscribers += 1
+        try:
+            position, missed = self.log.position(last_event_id)
+            writer.write(STREAM_HEADERS + ''.join(self.log.opening(position, missed)).encode())
+            await writer.drain()
+            while not self._closed:
+                changed = self._changed
+                if self.log.sequence == position:
+                    try:
+                        await asyncio.wait_for(changed.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        pass
+                position, chunks = self.log.read(position)
+                writer.write(''.join(chunks or [': keep-alive\n\n']).encode())
+                await writer.drain()
+        finally:
+            self.subscribers -= 1
+
+    async def start(self, host, port):
+        """
+        Start listening for changes and accepting subscribers
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind, 0 for any free port
+        """
+        self._listener = asyncio.create_task(self._listen())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host, port):
+        """
+        Run the server until it is cancelled
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind
+        """
+        await self.start(host, port)
+        logger.info(f'Change feed serving on {host}:{self.port}')
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stop accepting subscribers and end every open stream
+        """
+        self._closed = True
+        if self._server is not None:
+            self._server.close()
+        tasks = [*self._connections, *([self._listener] if self._listener else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    """
+    Run the change feed server with the production configuration
+    """
+    from .app import create_app
+    config = create_app('production').config
+    logging.basicConfig(level=logging.INFO)
+    server = FeedServer(
+        listen_dsn(config['SQLALCHEMY_DATABASE_URI']),
+        config['CHANGE_FEED_BUFFER_SIZE'],
+        config['CHANGE_FEED_HEARTBEAT_SECONDS']
+    )
+    asyncio.run(server.serve_forever(config['CHANGE_FEED_HOST'], config['CHANGE_FEED_PORT']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Sparse fieldsets for the Café Fausse read endpoints
+
+List and detail endpoints accept two query parameters shaping both their
+payload and their SQL:
+
+- ``fields``: comma-separated fields to return, replacing the endpoint's
+  default set, e.g. ``/api/customers?fields=id,name,email``.
+- ``include``: comma-separated relations whose fields are added, e.g.
+  ``/api/reservations/all?fields=id,time_slot&include=customer``.
+
+A ``Fieldset`` maps each field of a resource to a column or SQL expression
+and each relation to a join. Only the requested columns are selected, as
+plain rows rather than ORM instances, and a relation is joined only when one
+of its fields is requested, so a narrower request costs less to query as
+well as to send. Relation fields are flat and prefixed with the relation
+name (``customer_name``), like the payloads the endpoints already returned.
+
+Rows become response objects through serializer functions compiled once per
+list of fields: the generated code builds each dict as a literal indexing
+the row, with no per-row loop over the field names. The fieldsets of the
+models themselves are declared in ``serializers.py``.
+"""
+import functools
+from collections import namedtuple
+
+from sqlalchemy import select
+
+# A joined model and the fields it contributes, keyed by field name
+Relation = namedtuple('Relation', ['model', 'onclause', 'fields'])
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+@functools.lru_cache(maxsize=256)
+def compile_serializer(names):
+    """
+    Compile the function turning selected rows into response objects
+
+    Args:
+        names (tuple): Field names the rows are selected with, in order
+
+    Returns:
+        function: Taking an iterable of rows and returning one dict per row,
+            keyed by field name
+    """
+    items = ', '.join(f'{name!r}: row[{index}]' for index, name in enumerate(names))
+    namespace = {}
+    exec(f'def serialize(rows):\n    return [{{{items}}} for row in rows]', namespace)
+    return namespace['serialize']
+
+
+class Fieldset:
+    """
+    Selectable fields and relations of one resource
+
+    Attributes:
+        model (Base): Model the resource is read from
+        columns (dict): Column or SQL expression of every field, relation fields included
+        default (tuple): Fields returned when the request names none
+        relations (dict): ``Relation`` by name
+    """
+
+    def __init__(self, model, fields, default=None, relations=None):
+        self.model = model
+        self.relations = relations or {}
+        self.columns = dict(fields)
+        self._owners = {}
+        for name, relation in self.relations.items():
+            for field, column in relation.fields.items():
+                self.columns[field] = column
+                self._owners[field] = name
+        self.default = tuple(default or fields)
+        compile_serializer(self.default)
+
+    def parse(self, args, default=None):
+        """
+        Resolve the fields requested by a query string
+
+        Args:
+            args (MultiDict): Request arguments, read for ``fields`` and ``include``
+            default (tuple, optional): Fields returned without ``fields``;
+                defaults to the fieldset's own default
+
+        Returns:
+            list: Field names, in output order
+
+        Raises:
+            ValueError: If a field or relation is unknown, or no field is left
+        """
+        names = _split(args['fields']) if 'fields' in args else list(default or self.default)
+        unknown = [name for name in names if name not in self.columns]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+
+        for relation in _split(args.get('include', '')):
+            if relation not in self.relations:
+                raise ValueError(f'Unknown include: {relation}')
+            names += [field for field in self.relations[relation].fields if field not in names]
+
+        if not names:
+            raise ValueError('fields must name at least one field')
+        return list(dict.fromkeys(names))
+
+    def select(self, names):
+        """
+        Build the query selecting some fields
+
+        Args:
+            names (list): Field names from ``parse``
+
+        Returns:
+            Select: Statement returning one labelled column per field, with
+                the relations those fields need outer-joined; callers add
+                filters and ordering
+        """
+        statement = select(*[self.columns[name].label(name) for name in names]).select_from(self.model)
+        for relation in dict.fromkeys(self._owners[name] for name in names if name in self._owners):
+            statement = statement.outerjoin(self.relations[relation].model, self.relations[relation].onclause)
+        return statement
+
+    def as_dicts(self, names, rows):
+        """
+        Turn selected rows into response objects
+
+        Args:
+            names (list): Field names the rows were selected with
+            rows (list): Rows returned by the statement from ``select``
+
+        Returns:
+            list: One dict per row, keyed by field name
+        """
+        return compile_serializer(tuple(names))(rows)
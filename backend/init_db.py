@@ -15,8 +15,17 @@ from .extensions import db
 from .models.category import Category
 from .models.customer import Customer
 from .models.reservation import Reservation
+from .models.reservation_hold import ReservationHold
+from .models.capacity_block import CapacityBlock
+from .models.standing_reservation import StandingReservation
+from .models.sync_tombstone import SyncTombstone
+from .models.admission import AdmissionSlot, AdmissionWaiter
 from .models.newsletter import Newsletter
 from .models.employee import Employee  # Import Employee model directly
+from .models.table import Table
+from .models.schedule import ServicePeriod, PartyDuration
+from .models.waitlist import WaitlistEntry
+from .jobs.partitions import ensure_partitions
 from datetime import datetime, timedelta
 
 def init_db(app, populate_sample_data=True):
@@ -37,20 +46,33 @@ def init_db(app, populate_sample_data=True):
         # Log the database URI for debugging
         print(f"Database URI: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
-        # Drop all tables if they exist
+        # Drop all tables if they exist (primary only; a read replica is never written)
         print("Dropping all existing tables...")
-        db.drop_all()
+        db.drop_all(bind_key=None)
 
         # Debug log to confirm schema creation
         print("Executing db.create_all() to create tables...")
 
         # Create all tables explicitly
-        db.create_all()
+        db.create_all(bind_key=None)
 
         # Ensure the schema is created for testing
         if app.config.get('TESTING'):
             print("Ensuring test database schema is created...")
-            db.create_all()
+            db.create_all(bind_key=None)
+
+        # Prepare the monthly reservation partitions
+        if db.engine.dialect.name == 'postgresql':
+            print("Creating reservation partitions...")
+            with db.engine.begin() as connection:
+                ensure_partitions(connection, app.config['RESERVATION_PARTITION_MONTHS_AHEAD'])
+
+        # The floor plan and opening hours are needed to take any reservation, sample data or not
+        print("Creating dining room tables and service schedule...")
+        db.session.add_all(Table.default_floor_plan())
+        db.session.add_all(ServicePeriod.default_schedule())
+        db.session.add_all(PartyDuration.default_durations())
+        db.session.commit()
 
         if not populate_sample_data:
             print("Skipping sample data population.")
@@ -265,7 +287,7 @@ def drop_db():
     deletes all data.
     """
     print("Dropping all tables...")
-    db.drop_all()
+    db.drop_all(bind_key=None)
     db.session.commit()
 
 if __name__ == '__main__':
@@ -0,0 +1,24 @@
+"""
+Batch jobs for the Café Fausse application
+
+Maintenance jobs are exposed as Flask CLI command groups so they can be run
+from cron or any other scheduler, e.g.:
+
+    FLASK_APP="backend.app:create_app('production')" flask partitions ensure
+"""
+
+
+def register_commands(app):
+    """
+    Register the batch job command groups with the application CLI
+
+    Args:
+        app (Flask): The Flask application instance
+    """
+    from .partitions import partitions_cli
+    from .reservations import reservations_cli
+    from .sync import sync_cli
+
+    app.cli.add_command(partitions_cli)
+    app.cli.add_command(reservations_cli)
+    app.cli.add_command(sync_cli)
@@ -0,0 +1,318 @@
+"""
+Reservation partition maintenance
+
+``reservations`` is range-partitioned by ``time_slot`` month, with a DEFAULT
+partition catching anything outside the monthly ranges. This module creates
+future monthly partitions ahead of time, archives old months to compressed
+CSV files and restores archived months for reporting.
+
+Commands (run from cron with FLASK_APP set to the app factory):
+
+    flask partitions ensure                  # create partitions for the coming months
+    flask partitions archive                 # detach + archive months past retention
+    flask partitions restore 2025-04         # reattach an archived month
+    flask partitions list
+"""
+import csv
+import gzip
+import os
+import re
+from datetime import date, datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from ..extensions import db
+
+PARENT_TABLE = 'reservations'
+DEFAULT_PARTITION = 'reservations_default'
+PARTITION_NAME = re.compile(r'^reservations_p(\d{4})_(\d{2})$')
+
+
+def month_start(value):
+    """
+    Truncate a date or datetime to the first day of its month
+
+    Args:
+        value (date): Any date or datetime
+
+    Returns:
+        date: First day of the month
+    """
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """
+    Shift a first-of-month date by a number of months
+
+    Args:
+        value (date): First day of a month
+        months (int): Months to add, may be negative
+
+    Returns:
+        date: First day of the resulting month
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """
+    Name of the partition holding a given month
+
+    Args:
+        month (date): First day of the month
+
+    Returns:
+        str: Partition table name, e.g. ``reservations_p2025_04``
+    """
+    return f'{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}'
+
+
+def list_partitions(connection):
+    """
+    List the monthly partitions currently attached to ``reservations``
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection
+
+    Returns:
+        list: Sorted list of first-of-month dates with an attached partition
+    """
+    names = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+    """), {'parent': PARENT_TABLE}).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_partition(connection, month):
+    """
+    Create and attach the partition for one month
+
+    Rows for that month that already landed in the DEFAULT partition are moved
+    into the new partition in the same transaction, so attaching never fails
+    on a default-partition constraint violation.
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection inside a transaction
+        month (date): First day of the month
+    """
+    name = partition_name(month)
+    bounds = {'start': month, 'end': add_months(month, 1)}
+    connection.execute(text(
+        f'CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    connection.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE time_slot >= :start AND time_slot < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds)
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+
+
+def ensure_partitions(connection, months_ahead, today=None):
+    """
+    Make sure partitions exist from the current month through ``months_ahead``
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection inside a transaction
+        months_ahead (int): Number of future months to prepare
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        list: Months for which a partition was created
+    """
+    current = month_start(today or date.today())
+    existing = set(list_partitions(connection))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_partition(connection, month)
+            created.append(month)
+    return created
+
+
+def archive_path(archive_dir, month):
+    """
+    Location of the compressed archive for a month
+
+    Args:
+        archive_dir (str): Directory holding the archives
+        month (date): First day of the month
+
+    Returns:
+        str: Path to the ``.csv.gz`` archive
+    """
+    return os.path.join(archive_dir, f'{partition_name(month)}.csv.gz')
+
+
+def archive_partition(connection, month, archive_dir):
+    """
+    Detach one monthly partition, write it to a gzip CSV and drop it
+
+    The table is only dropped after the archive has been written and its row
+    count verified, so a failure leaves the data in place.
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection inside a transaction
+        month (date): First day of the month to archive
+        archive_dir (str): Directory receiving the archive
+
+    Returns:
+        int: Number of archived rows
+    """
+    name = partition_name(month)
+    path = archive_path(archive_dir, month)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    connection.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}'))
+    expected = connection.execute(text(f'SELECT count(*) FROM {name}')).scalar()
+
+    cursor = connection.connection.cursor()
+    try:
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as archive:
+            cursor.copy_expert(f'COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+    finally:
+        cursor.close()
+
+    # Count CSV records, not lines: quoted values such as special requests may span lines
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as archive:
+        written = sum(1 for _ in csv.reader(archive)) - 1
+    if written != expected:
+        raise RuntimeError(f'Archive {path} has {written} rows, expected {expected}')
+
+    connection.execute(text(f'DROP TABLE {name}'))
+    return expected
+
+
+def archive_partitions(connection, retention_months, archive_dir, today=None):
+    """
+    Archive every monthly partition older than the retention window
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection inside a transaction
+        retention_months (int): Months of history to keep attached
+        archive_dir (str): Directory receiving the archives
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        dict: Archived row counts keyed by month
+    """
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    return {
+        month: archive_partition(connection, month, archive_dir)
+        for month in list_partitions(connection)
+        if month < cutoff
+    }
+
+
+def restore_partition(connection, month, archive_dir):
+    """
+    Reattach an archived month so it can be queried for reporting
+
+    Args:
+        connection (Connection): An open SQLAlchemy connection inside a transaction
+        month (date): First day of the month to restore
+        archive_dir (str): Directory holding the archives
+
+    Returns:
+        int: Number of restored rows
+    """
+    name = partition_name(month)
+    path = archive_path(archive_dir, month)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'No archive for {month:%Y-%m} at {path}')
+
+    connection.execute(text(
+        f'CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    cursor = connection.connection.cursor()
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as archive:
+            # Load by the archived column names so columns added since the
+            # archive was written fall back to their defaults
+            columns = archive.readline().strip()
+            cursor.copy_expert(f'COPY {name} ({columns}) FROM STDIN WITH (FORMAT csv)', archive)
+    finally:
+        cursor.close()
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    ))
+    return connection.execute(text(f'SELECT count(*) FROM {name}')).scalar()
+
+
+@click.group('partitions')
+def partitions_cli():
+    """Manage the monthly partitions of the reservations table."""
+
+
+@partitions_cli.command('ensure')
+@click.option('--months-ahead', type=int, default=None, help='Future months to prepare.')
+@with_appcontext
+def ensure_command(months_ahead):
+    """Create partitions for the current and upcoming months."""
+    if months_ahead is None:
+        months_ahead = current_app.config['RESERVATION_PARTITION_MONTHS_AHEAD']
+    with db.engine.begin() as connection:
+        created = ensure_partitions(connection, months_ahead)
+    for month in created:
+        click.echo(f'Created {partition_name(month)}')
+    click.echo(f'{len(created)} partition(s) created')
+
+
+@partitions_cli.command('archive')
+@click.option('--retention-months', type=int, default=None, help='Months of history to keep attached.')
+@click.option('--archive-dir', default=None, help='Directory receiving the .csv.gz archives.')
+@with_appcontext
+def archive_command(retention_months, archive_dir):
+    """Detach partitions past retention and archive them to gzip files."""
+    if retention_months is None:
+        retention_months = current_app.config['RESERVATION_RETENTION_MONTHS']
+    archive_dir = archive_dir or current_app.config['RESERVATION_ARCHIVE_DIR']
+    with db.engine.begin() as connection:
+        archived = archive_partitions(connection, retention_months, archive_dir)
+    for month, rows in archived.items():
+        click.echo(f'Archived {partition_name(month)} ({rows} rows) to {archive_path(archive_dir, month)}')
+    click.echo(f'{len(archived)} partition(s) archived')
+
+
+@partitions_cli.command('restore')
+@click.argument('month')
+@click.option('--archive-dir', default=None, help='Directory holding the .csv.gz archives.')
+@with_appcontext
+def restore_command(month, archive_dir):
+    """Reattach an archived MONTH (YYYY-MM) for reporting."""
+    archive_dir = archive_dir or current_app.config['RESERVATION_ARCHIVE_DIR']
+    month = month_start(datetime.strptime(month, '%Y-%m'))
+    with db.engine.begin() as connection:
+        rows = restore_partition(connection, month, archive_dir)
+    click.echo(f'Restored {partition_name(month)} ({rows} rows)')
+
+
+@partitions_cli.command('list')
+@with_appcontext
+def list_command():
+    """List the attached monthly partitions."""
+    with db.engine.connect() as connection:
+        for month in list_partitions(connection):
+            click.echo(partition_name(month))
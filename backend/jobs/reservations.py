@@ -0,0 +1,228 @@
+"""
+Reservation status sweeper
+
+Reservations are created ``confirmed`` and only change status when a guest
+cancels or the host stand marks them ``seated``. This job moves bookings whose
+sitting has ended out of the active statuses so availability checks and admin
+listings only wade through live rows, and analytics see final statuses:
+
+- ``seated`` bookings become ``completed``
+- ``confirmed`` bookings that were never seated become
+  ``RESERVATION_UNSEATED_STATUS`` (``completed`` by default; set it to
+  ``no_show`` once the host stand records arrivals)
+
+Each status is swept with set-based ``UPDATE`` statements of at most
+``RESERVATION_SWEEP_BATCH_SIZE`` rows, one short transaction per chunk. Rows
+locked by a concurrent edit are skipped and picked up on the next run.
+
+Expired reservation holds (see ``services/holds.py``) are reclaimed the same
+way, oldest first along the ``expires_at`` index, and standing reservations
+(see ``services/standing.py``) are expanded into bookings as the booking
+horizon rolls forward, one rule per transaction.
+
+Commands (run from cron with FLASK_APP set to the app factory):
+
+    flask reservations sweep                 # e.g. every 15 minutes
+    flask reservations expire-holds          # e.g. every minute
+    flask reservations expand-standing       # e.g. nightly
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..services.holds import expire_statement
+from ..services.notifications import get_notifier
+from ..services.schedule import get_schedule
+from ..services.standing import due_standing_query, expand_standing, horizon_end, notify_skipped
+
+
+def sweep_cutoff(after_minutes, now=None):
+    """
+    Latest start time of a booking whose sitting counts as over
+
+    Args:
+        after_minutes (int): Minutes after the start time a booking is swept
+        now (datetime, optional): Reference time, defaults to now
+
+    Returns:
+        datetime: Bookings starting before this time are swept
+    """
+    return (now or datetime.now()) - timedelta(minutes=after_minutes)
+
+
+def sweep_statement(from_status, to_status, cutoff, batch_size):
+    """
+    Build the ``UPDATE`` moving one chunk of past bookings to a final status
+
+    The chunk is chosen by a ``FOR UPDATE SKIP LOCKED`` subquery so concurrent
+    sweeps or guest edits never wait on each other. Repeating ``time_slot <
+    cutoff`` on the outer statement lets PostgreSQL prune future partitions.
+
+    Args:
+        from_status (str): Status of the bookings to sweep
+        to_status (str): Status they are moved to
+        cutoff (datetime): Only bookings starting before this time are swept
+        batch_size (int): Maximum number of rows updated by the statement
+
+    Returns:
+        Update: The chunked update statement
+    """
+    table = Reservation.__table__
+    chunk = (
+        select(table.c.id, table.c.time_slot)
+        .where(table.c.status == from_status, table.c.time_slot < cutoff)
+        .order_by(table.c.time_slot)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(table)
+        .where(tuple_(table.c.id, table.c.time_slot).in_(chunk), table.c.time_slot < cutoff)
+        .values(status=to_status, updated_at=datetime.utcnow())
+    )
+
+
+def sweep_status(engine, from_status, to_status, cutoff, batch_size):
+    """
+    Move every past booking with one status to another, chunk by chunk
+
+    Args:
+        engine (Engine): Engine of the primary database
+        from_status (str): Status of the bookings to sweep
+        to_status (str): Status they are moved to
+        cutoff (datetime): Only bookings starting before this time are swept
+        batch_size (int): Rows updated per transaction
+
+    Returns:
+        int: Total number of updated bookings
+    """
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            updated = connection.execute(sweep_statement(from_status, to_status, cutoff, batch_size)).rowcount
+        total += updated
+        if updated < batch_size:
+            return total
+
+
+def sweep_reservations(engine, after_minutes, unseated_status, batch_size, now=None):
+    """
+    Move every booking whose sitting has ended to its final status
+
+    Args:
+        engine (Engine): Engine of the primary database
+        after_minutes (int): Minutes after the start time a booking is swept
+        unseated_status (str): Final status of confirmed bookings never seated
+        batch_size (int): Rows updated per transaction
+        now (datetime, optional): Reference time, defaults to now
+
+    Returns:
+        dict: Number of swept bookings keyed by ``(from_status, to_status)``
+    """
+    if unseated_status not in ('completed', 'no_show'):
+        raise ValueError(f'Unseated bookings must become completed or no_show, not {unseated_status}')
+    cutoff = sweep_cutoff(after_minutes, now)
+    return {
+        (from_status, to_status): sweep_status(engine, from_status, to_status, cutoff, batch_size)
+        for from_status, to_status in (('seated', 'completed'), ('confirmed', unseated_status))
+    }
+
+
+def expire_holds(engine, batch_size, now=None):
+    """
+    Delete every expired reservation hold, chunk by chunk
+
+    Args:
+        engine (Engine): Engine of the primary database
+        batch_size (int): Holds deleted per transaction
+        now (datetime, optional): Reference UTC time, defaults to now
+
+    Returns:
+        int: Total number of deleted holds
+    """
+    now = now or datetime.utcnow()
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            deleted = connection.execute(expire_statement(now, batch_size)).rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def expand_all_standing(engine, schedule, horizon, now=None):
+    """
+    Expand every standing reservation lagging behind the booking horizon
+
+    Each rule is claimed with ``FOR UPDATE SKIP LOCKED`` and expanded in its
+    own transaction, so concurrent runs share the work.
+
+    Args:
+        engine (Engine): Engine of the primary database
+        schedule (ServiceSchedule): The service schedule
+        horizon (datetime): Expand occurrences up to this time
+        now (datetime, optional): Occurrences at or before this time are skipped
+
+    Returns:
+        tuple: (number of rules expanded, occurrences booked, occurrences skipped)
+    """
+    rules = booked = skipped = 0
+    while True:
+        with Session(engine) as session:
+            standing = session.scalar(due_standing_query(horizon))
+            if standing is None:
+                return rules, booked, skipped
+            expansion = expand_standing(session, schedule, standing, horizon, now)
+            session.commit()
+            notify_skipped(session.get(Customer, standing.customer_id), expansion.skipped)
+        rules += 1
+        booked += len(expansion.booked)
+        skipped += len(expansion.skipped)
+
+
+@click.group('reservations')
+def reservations_cli():
+    """Maintain reservation statuses."""
+
+
+@reservations_cli.command('sweep')
+@click.option('--batch-size', type=int, default=None, help='Rows updated per transaction.')
+@with_appcontext
+def sweep_command(batch_size):
+    """Move past reservations to completed or no_show."""
+    config = current_app.config
+    swept = sweep_reservations(
+        db.engine,
+        config['RESERVATION_SWEEP_AFTER_MINUTES'],
+        config['RESERVATION_UNSEATED_STATUS'],
+        batch_size or config['RESERVATION_SWEEP_BATCH_SIZE']
+    )
+    for (from_status, to_status), count in swept.items():
+        click.echo(f'{from_status} -> {to_status}: {count}')
+
+
+@reservations_cli.command('expire-holds')
+@click.option('--batch-size', type=int, default=None, help='Holds deleted per transaction.')
+@with_appcontext
+def expire_holds_command(batch_size):
+    """Delete expired reservation holds."""
+    expired = expire_holds(db.engine, batch_size or current_app.config['RESERVATION_SWEEP_BATCH_SIZE'])
+    click.echo(f'expired holds: {expired}')
+
+
+@reservations_cli.command('expand-standing')
+@with_appcontext
+def expand_standing_command():
+    """Book standing reservation occurrences entering the booking horizon."""
+    horizon = horizon_end(current_app.config['STANDING_RESERVATION_HORIZON_DAYS'])
+    rules, booked, skipped = expand_all_standing(db.engine, get_schedule(), horizon)
+    # Deliver the skipped-date notices before the process exits
+    get_notifier().join()
+    click.echo(f'standing reservations expanded: {rules}, booked: {booked}, skipped: {skipped}')
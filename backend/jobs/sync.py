@@ -0,0 +1,64 @@
+"""
+Sync tombstone purge
+
+Every deleted row of a synced table leaves a tombstone (see
+``models/sync_tombstone.py``) so delta sync clients learn about the deletion.
+Clients that have not synced for ``SYNC_TOMBSTONE_RETENTION_DAYS`` are told
+to resync in full, so older tombstones are no longer needed; this job removes
+them oldest first along the ``deleted_at`` index, one short transaction per
+chunk of ``RESERVATION_SWEEP_BATCH_SIZE`` rows.
+
+Commands (run from cron with FLASK_APP set to the app factory):
+
+    flask sync purge-tombstones              # e.g. nightly
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from ..extensions import db
+from ..services.sync import purge_statement
+
+
+def purge_tombstones(engine, retention_days, batch_size, now=None):
+    """
+    Delete every tombstone older than the retention period, chunk by chunk
+
+    Args:
+        engine (Engine): Engine of the primary database
+        retention_days (int): Days tombstones are kept
+        batch_size (int): Tombstones deleted per transaction
+        now (datetime, optional): Current UTC time, defaults to now
+
+    Returns:
+        int: Total number of deleted tombstones
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            deleted = connection.execute(purge_statement(cutoff, batch_size)).rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+@click.group('sync')
+def sync_cli():
+    """Maintain delta sync data."""
+
+
+@sync_cli.command('purge-tombstones')
+@click.option('--batch-size', type=int, default=None, help='Tombstones deleted per transaction.')
+@with_appcontext
+def purge_tombstones_command(batch_size):
+    """Delete tombstones older than the retention period."""
+    config = current_app.config
+    purged = purge_tombstones(
+        db.engine,
+        config['SYNC_TOMBSTONE_RETENTION_DAYS'],
+        batch_size or config['RESERVATION_SWEEP_BATCH_SIZE']
+    )
+    click.echo(f'purged tombstones: {purged}')
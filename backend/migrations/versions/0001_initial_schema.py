@@ -0,0 +1,117 @@
+"""Initial schema
+
+Creates the tables as they existed before migrations were introduced. A
+database that was built with ``init_db`` already has them and only needs to
+be stamped: ``flask db stamp 0001_initial_schema``.
+
+Revision ID: 0001_initial_schema
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=200), nullable=True),
+        sa.Column('display_order', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table(
+        'menu_categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'customers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('newsletter_signup', sa.Boolean(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    op.create_table(
+        'employees',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.String(length=50), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username')
+    )
+    op.create_table(
+        'newsletter_subscribers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    op.create_table(
+        'menu_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=True),
+        sa.Column('is_vegetarian', sa.Boolean(), nullable=True),
+        sa.Column('is_vegan', sa.Boolean(), nullable=True),
+        sa.Column('is_gluten_free', sa.Boolean(), nullable=True),
+        sa.Column('is_featured', sa.Boolean(), nullable=True),
+        sa.Column('available', sa.Boolean(), nullable=True),
+        sa.Column('display_order', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('time_slot', sa.DateTime(), nullable=False),
+        sa.Column('guests', sa.Integer(), nullable=False),
+        sa.Column('table_number', sa.Integer(), nullable=False),
+        sa.Column('special_requests', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('reservations')
+    op.drop_table('menu_items')
+    op.drop_table('newsletter_subscribers')
+    op.drop_table('employees')
+    op.drop_table('customers')
+    op.drop_table('menu_categories')
+    op.drop_table('categories')
@@ -0,0 +1,48 @@
+"""Performance indexes for hot filters
+
+Adds the indexes used by availability checks, customer lookups, category
+listings, subscriber filters and ``updated_at`` change scans. Every index is
+built with ``CREATE INDEX CONCURRENTLY`` so a live database keeps serving
+reads and writes while it is created. ``CONCURRENTLY`` cannot run inside a
+transaction, hence the autocommit block; ``IF NOT EXISTS`` lets the migration
+be re-run after an interrupted build (drop any index left INVALID first).
+
+Revision ID: 0002_performance_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-19 09:05:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_performance_indexes'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_reservations_time_slot_status', 'reservations', 'time_slot, status'),
+    ('ix_reservations_customer_id', 'reservations', 'customer_id'),
+    ('ix_menu_items_category_id_display_order', 'menu_items', 'category_id, display_order'),
+    ('ix_newsletter_subscribers_is_active', 'newsletter_subscribers', 'is_active'),
+    ('ix_categories_updated_at', 'categories', 'updated_at'),
+    ('ix_customers_updated_at', 'customers', 'updated_at'),
+    ('ix_employees_updated_at', 'employees', 'updated_at'),
+    ('ix_menu_items_updated_at', 'menu_items', 'updated_at'),
+    ('ix_newsletter_subscribers_updated_at', 'newsletter_subscribers', 'updated_at'),
+    ('ix_reservations_updated_at', 'reservations', 'updated_at'),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
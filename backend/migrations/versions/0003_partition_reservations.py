@@ -0,0 +1,120 @@
+"""Partition reservations by time_slot month
+
+Rebuilds ``reservations`` as a table range-partitioned by ``time_slot``
+month with a DEFAULT partition, creating one partition per month from the
+oldest booking through three months ahead. The partition key has to be part
+of the primary key, which becomes ``(id, time_slot)``; the id sequence is
+kept so existing ids stay valid.
+
+The data is copied under an exclusive lock, so run this revision in a
+maintenance window. After it, ``flask partitions ensure`` keeps future
+months ready and ``flask partitions archive`` detaches old ones.
+
+Revision ID: 0003_partition_reservations
+Revises: 0002_performance_indexes
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_partition_reservations'
+down_revision = '0002_performance_indexes'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, customer_id, time_slot, guests, table_number, special_requests, status, created_at, updated_at'
+
+INDEXES = [
+    ('ix_reservations_time_slot_status', 'time_slot, status'),
+    ('ix_reservations_customer_id', 'customer_id'),
+    ('ix_reservations_updated_at', 'updated_at'),
+]
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months(connection):
+    oldest = connection.execute(sa.text('SELECT min(time_slot) FROM reservations')).scalar()
+    today = date.today()
+    month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+    last = _add_months(date(today.year, today.month, 1), 3)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade():
+    connection = op.get_bind()
+    op.execute(f"""
+        CREATE TABLE reservations_partitioned (
+            id INTEGER NOT NULL DEFAULT nextval('reservations_id_seq'),
+            customer_id INTEGER NOT NULL,
+            time_slot TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            guests INTEGER NOT NULL,
+            table_number INTEGER NOT NULL,
+            special_requests TEXT,
+            status VARCHAR(20),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT reservations_partitioned_pkey PRIMARY KEY (id, time_slot),
+            CONSTRAINT reservations_partitioned_customer_id_fkey
+                FOREIGN KEY (customer_id) REFERENCES customers (id)
+        ) PARTITION BY RANGE (time_slot)
+    """)
+    op.execute('CREATE TABLE reservations_default PARTITION OF reservations_partitioned DEFAULT')
+    for month in _months(connection):
+        op.execute(
+            f"CREATE TABLE reservations_p{month.year:04d}_{month.month:02d} "
+            f"PARTITION OF reservations_partitioned "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+
+    op.execute('LOCK TABLE reservations IN EXCLUSIVE MODE')
+    op.execute(f'INSERT INTO reservations_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM reservations')
+    op.execute('ALTER SEQUENCE reservations_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE reservations')
+
+    op.execute('ALTER TABLE reservations_partitioned RENAME TO reservations')
+    op.execute('ALTER TABLE reservations RENAME CONSTRAINT reservations_partitioned_pkey TO reservations_pkey')
+    op.execute(
+        'ALTER TABLE reservations RENAME CONSTRAINT '
+        'reservations_partitioned_customer_id_fkey TO reservations_customer_id_fkey'
+    )
+    op.execute('ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id')
+    # Indexes on a partitioned table cannot be built concurrently; the table is new here
+    for name, columns in INDEXES:
+        op.execute(f'CREATE INDEX {name} ON reservations ({columns})')
+
+
+def downgrade():
+    op.execute("""
+        CREATE TABLE reservations_plain (
+            id INTEGER NOT NULL DEFAULT nextval('reservations_id_seq'),
+            customer_id INTEGER NOT NULL REFERENCES customers (id),
+            time_slot TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            guests INTEGER NOT NULL,
+            table_number INTEGER NOT NULL,
+            special_requests TEXT,
+            status VARCHAR(20),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT reservations_plain_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute('LOCK TABLE reservations IN EXCLUSIVE MODE')
+    op.execute(f'INSERT INTO reservations_plain ({COLUMNS}) SELECT {COLUMNS} FROM reservations')
+    op.execute('ALTER SEQUENCE reservations_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE reservations')
+    op.execute('ALTER TABLE reservations_plain RENAME TO reservations')
+    op.execute('ALTER TABLE reservations RENAME CONSTRAINT reservations_plain_pkey TO reservations_pkey')
+    op.execute('ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id')
+    for name, columns in INDEXES:
+        op.execute(f'CREATE INDEX {name} ON reservations ({columns})')
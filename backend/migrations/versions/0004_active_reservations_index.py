@@ -0,0 +1,55 @@
+"""Partial index on active reservations
+
+Adds ``ix_reservations_active_time_slot``, an index on ``time_slot`` limited
+to ``confirmed`` and ``seated`` bookings. Once the status sweeper moves past
+bookings to ``completed``/``no_show`` this index only holds the live working
+set, which keeps availability checks and the sweeper itself cheap however much
+history the table accumulates.
+
+An index on a partitioned table cannot be built ``CONCURRENTLY``, so the
+parent index is created ``ON ONLY`` the parent (invalid, no build), each
+partition's index is built concurrently and attached, after which PostgreSQL
+marks the parent index valid. Partitions created later inherit the index.
+
+Revision ID: 0004_active_reservations_index
+Revises: 0003_partition_reservations
+Create Date: 2026-10-19 13:20:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_active_reservations_index'
+down_revision = '0003_partition_reservations'
+branch_labels = None
+depends_on = None
+
+
+INDEX = 'ix_reservations_active_time_slot'
+DEFINITION = "(time_slot) WHERE status IN ('confirmed', 'seated')"
+
+
+def upgrade():
+    op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY reservations {DEFINITION}')
+    partitions = op.get_bind().execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'reservations'
+        ORDER BY child.relname
+    """)).scalars().all()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_active_time_slot_idx '
+                f'ON {partition} {DEFINITION}'
+            )
+            op.execute(f'ALTER INDEX {INDEX} ATTACH PARTITION {partition}_active_time_slot_idx')
+
+
+def downgrade():
+    # Dropping the parent index drops the attached partition indexes with it
+    op.execute(f'DROP INDEX IF EXISTS {INDEX}')
@@ -0,0 +1,68 @@
+"""Dining tables and combined table assignments
+
+Creates ``dining_tables`` seeded with the default 30-table floor plan used by
+the seating engine, and adds ``reservations.extra_tables`` for parties seated
+on several tables pushed together. Adding a column with a constant default is
+a catalog-only change in PostgreSQL 11+, so no partition is rewritten.
+
+Revision ID: 0005_dining_tables
+Revises: 0004_active_reservations_index
+Create Date: 2026-10-19 15:40:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_dining_tables'
+down_revision = '0004_active_reservations_index'
+branch_labels = None
+depends_on = None
+
+
+# Same layout as models.table.DEFAULT_FLOOR_PLAN at the time of this migration
+FLOOR_PLAN = [
+    (1, 8, 2, 'window', True),
+    (9, 20, 4, 'main', True),
+    (21, 26, 4, 'terrace', True),
+    (27, 28, 6, 'main', False),
+    (29, 30, 8, 'private', False),
+]
+
+
+def upgrade():
+    dining_tables = op.create_table(
+        'dining_tables',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('section', sa.String(length=50), nullable=False),
+        sa.Column('combinable', sa.Boolean(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('number')
+    )
+    op.create_index('ix_dining_tables_updated_at', 'dining_tables', ['updated_at'])
+    now = datetime.utcnow()
+    op.bulk_insert(dining_tables, [
+        {'number': number, 'capacity': capacity, 'section': section, 'combinable': combinable,
+         'is_active': True, 'created_at': now, 'updated_at': now}
+        for first, last, capacity, section, combinable in FLOOR_PLAN
+        for number in range(first, last + 1)
+    ])
+
+    op.add_column('reservations', sa.Column(
+        'extra_tables', postgresql.ARRAY(sa.Integer()), nullable=False, server_default='{}'
+    ))
+
+
+def downgrade():
+    op.drop_column('reservations', 'extra_tables')
+    op.drop_index('ix_dining_tables_updated_at', table_name='dining_tables')
+    op.drop_table('dining_tables')
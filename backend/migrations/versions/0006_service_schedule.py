@@ -0,0 +1,95 @@
+"""Service schedule tables
+
+Creates ``service_periods``, ``blackout_dates`` and ``party_durations`` and
+seeds them with the published opening hours (Monday-Saturday 5-11 PM, Sunday
+5-9 PM) and the default sitting length by party size.
+
+Revision ID: 0006_service_schedule
+Revises: 0005_dining_tables
+Create Date: 2026-10-19 17:10:00.000000
+
+"""
+from datetime import datetime, time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_service_schedule'
+down_revision = '0005_dining_tables'
+branch_labels = None
+depends_on = None
+
+
+# Same values as models.schedule at the time of this migration
+SERVICE_PERIODS = [
+    (weekday, 'dinner', time(17, 0), time(21, 30), time(23, 0)) for weekday in range(6)
+] + [
+    (6, 'dinner', time(17, 0), time(19, 30), time(21, 0)),
+]
+PARTY_DURATIONS = [(1, 2, 90), (3, 4, 105), (5, 6, 120), (7, 20, 150)]
+
+
+def timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade():
+    service_periods = op.create_table(
+        'service_periods',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('opens_at', sa.Time(), nullable=False),
+        sa.Column('last_seating', sa.Time(), nullable=False),
+        sa.Column('closes_at', sa.Time(), nullable=False),
+        sa.Column('slot_minutes', sa.Integer(), nullable=False),
+        *timestamps(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_service_periods_weekday', 'service_periods', ['weekday'])
+    op.create_index('ix_service_periods_updated_at', 'service_periods', ['updated_at'])
+
+    op.create_table(
+        'blackout_dates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('reason', sa.String(length=200), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('date')
+    )
+    op.create_index('ix_blackout_dates_updated_at', 'blackout_dates', ['updated_at'])
+
+    party_durations = op.create_table(
+        'party_durations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('min_guests', sa.Integer(), nullable=False),
+        sa.Column('max_guests', sa.Integer(), nullable=False),
+        sa.Column('minutes', sa.Integer(), nullable=False),
+        *timestamps(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_party_durations_updated_at', 'party_durations', ['updated_at'])
+
+    now = datetime.utcnow()
+    op.bulk_insert(service_periods, [
+        {'weekday': weekday, 'name': name, 'opens_at': opens_at, 'last_seating': last_seating,
+         'closes_at': closes_at, 'slot_minutes': 15, 'created_at': now, 'updated_at': now}
+        for weekday, name, opens_at, last_seating, closes_at in SERVICE_PERIODS
+    ])
+    op.bulk_insert(party_durations, [
+        {'min_guests': min_guests, 'max_guests': max_guests, 'minutes': minutes,
+         'created_at': now, 'updated_at': now}
+        for min_guests, max_guests, minutes in PARTY_DURATIONS
+    ])
+
+
+def downgrade():
+    op.drop_table('party_durations')
+    op.drop_table('blackout_dates')
+    op.drop_table('service_periods')
@@ -0,0 +1,52 @@
+"""Waitlist entries
+
+Creates ``waitlist_entries`` with the partial index that serves as the
+per-slot waitlist queue: waiting entries ordered by time slot, largest party
+first, then oldest entry. Promotions read the head of the queue with an index
+range scan, and promoted or canceled entries drop out of the index.
+
+Revision ID: 0007_waitlist
+Revises: 0006_service_schedule
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_waitlist'
+down_revision = '0006_service_schedule'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waitlist_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('time_slot', sa.DateTime(), nullable=False),
+        sa.Column('guests', sa.Integer(), nullable=False),
+        sa.Column('special_requests', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('reservation_id', sa.Integer(), nullable=True),
+        sa.Column('promoted_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_waitlist_entries_customer_id', 'waitlist_entries', ['customer_id'])
+    op.create_index('ix_waitlist_entries_updated_at', 'waitlist_entries', ['updated_at'])
+    op.create_index(
+        'ix_waitlist_entries_queue', 'waitlist_entries', ['time_slot', sa.text('guests DESC'), 'created_at'],
+        postgresql_where=sa.text("status = 'waiting'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_waitlist_entries_queue', table_name='waitlist_entries')
+    op.drop_index('ix_waitlist_entries_updated_at', table_name='waitlist_entries')
+    op.drop_index('ix_waitlist_entries_customer_id', table_name='waitlist_entries')
+    op.drop_table('waitlist_entries')
@@ -0,0 +1,49 @@
+"""Reservation holds
+
+Creates ``reservation_holds`` for tables held while a guest completes the
+booking form. ``expires_at`` is indexed so expired holds are reclaimed by an
+index range scan from the oldest, and ``time_slot`` so occupancy loads only
+read the holds of one service day.
+
+Revision ID: 0008_reservation_holds
+Revises: 0007_waitlist
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_reservation_holds'
+down_revision = '0007_waitlist'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reservation_holds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(length=64), nullable=False),
+        sa.Column('time_slot', sa.DateTime(), nullable=False),
+        sa.Column('guests', sa.Integer(), nullable=False),
+        sa.Column('table_number', sa.Integer(), nullable=False),
+        sa.Column('extra_tables', postgresql.ARRAY(sa.Integer()), nullable=False, server_default='{}'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token')
+    )
+    op.create_index('ix_reservation_holds_time_slot', 'reservation_holds', ['time_slot'])
+    op.create_index('ix_reservation_holds_expires_at', 'reservation_holds', ['expires_at'])
+    op.create_index('ix_reservation_holds_updated_at', 'reservation_holds', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_reservation_holds_updated_at', table_name='reservation_holds')
+    op.drop_index('ix_reservation_holds_expires_at', table_name='reservation_holds')
+    op.drop_index('ix_reservation_holds_time_slot', table_name='reservation_holds')
+    op.drop_table('reservation_holds')
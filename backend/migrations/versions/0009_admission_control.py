@@ -0,0 +1,44 @@
+"""Admission control state
+
+Creates the shared state of the booking waiting room: the queue ticket
+sequence, the single-row ``admission_state`` and ``admission_leases`` for the
+booking requests currently in the write path.
+
+Revision ID: 0009_admission_control
+Revises: 0008_reservation_holds
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_admission_control'
+down_revision = '0008_reservation_holds'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('admission_ticket_seq')))
+    admission_state = op.create_table(
+        'admission_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('now_serving', sa.BigInteger(), nullable=False),
+        sa.Column('advanced_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(admission_state, [{'id': 1, 'now_serving': 0}])
+    op.create_table(
+        'admission_leases',
+        sa.Column('ticket', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('lease_until', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('ticket')
+    )
+
+
+def downgrade():
+    op.drop_table('admission_leases')
+    op.drop_table('admission_state')
+    op.execute(sa.schema.DropSequence(sa.Sequence('admission_ticket_seq')))
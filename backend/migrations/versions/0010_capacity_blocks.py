@@ -0,0 +1,49 @@
+"""Capacity blocks for private events and buyouts
+
+Creates ``capacity_blocks``, one row per private event or buyout, with a
+generated ``tsrange`` period and a GiST index on it so availability finds the
+blocks overlapping a service day by index search.
+
+Revision ID: 0010_capacity_blocks
+Revises: 0009_admission_control
+Create Date: 2026-10-19 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_capacity_blocks'
+down_revision = '0009_admission_control'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'capacity_blocks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('starts_at', sa.DateTime(), nullable=False),
+        sa.Column('ends_at', sa.DateTime(), nullable=False),
+        sa.Column('table_numbers', postgresql.ARRAY(sa.Integer()), nullable=True),
+        sa.Column('guests', sa.Integer(), nullable=True),
+        sa.Column('customer_id', sa.Integer(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('period', postgresql.TSRANGE(), sa.Computed('tsrange(starts_at, ends_at)', persisted=True)),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint('ends_at > starts_at', name='ck_capacity_blocks_period'),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_capacity_blocks_period', 'capacity_blocks', ['period'], postgresql_using='gist')
+    op.create_index('ix_capacity_blocks_updated_at', 'capacity_blocks', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_capacity_blocks_updated_at', table_name='capacity_blocks')
+    op.drop_index('ix_capacity_blocks_period', table_name='capacity_blocks')
+    op.drop_table('capacity_blocks')
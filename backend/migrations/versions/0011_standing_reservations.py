@@ -0,0 +1,67 @@
+"""Standing (recurring) reservations
+
+Creates ``standing_reservations``, one row per recurring booking rule, and
+links the occurrences already expanded into ``reservations`` through a new
+nullable ``standing_id`` column. The unique partial index on
+``(standing_id, time_slot)`` keeps the expansion job idempotent; since every
+existing row has a NULL ``standing_id`` it is empty when created, so it is
+built directly on the partitioned table rather than partition by partition.
+
+Revision ID: 0011_standing_reservations
+Revises: 0010_capacity_blocks
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_standing_reservations'
+down_revision = '0010_capacity_blocks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'standing_reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(), nullable=False),
+        sa.Column('recurrence', sa.String(length=255), nullable=False),
+        sa.Column('ends_on', sa.Date(), nullable=True),
+        sa.Column('guests', sa.Integer(), nullable=False),
+        sa.Column('special_requests', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('expanded_until', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_standing_reservations_customer_id', 'standing_reservations', ['customer_id'])
+    op.create_index('ix_standing_reservations_updated_at', 'standing_reservations', ['updated_at'])
+    op.create_index(
+        'ix_standing_reservations_expansion', 'standing_reservations', ['expanded_until'],
+        postgresql_where=sa.text('is_active')
+    )
+
+    op.add_column('reservations', sa.Column('standing_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'reservations_standing_id_fkey', 'reservations', 'standing_reservations', ['standing_id'], ['id']
+    )
+    op.create_index(
+        'ix_reservations_standing_occurrence', 'reservations', ['standing_id', 'time_slot'],
+        unique=True, postgresql_where=sa.text('standing_id IS NOT NULL')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_reservations_standing_occurrence', table_name='reservations')
+    op.drop_constraint('reservations_standing_id_fkey', 'reservations', type_='foreignkey')
+    op.drop_column('reservations', 'standing_id')
+    op.drop_index('ix_standing_reservations_expansion', table_name='standing_reservations')
+    op.drop_index('ix_standing_reservations_updated_at', table_name='standing_reservations')
+    op.drop_index('ix_standing_reservations_customer_id', table_name='standing_reservations')
+    op.drop_table('standing_reservations')
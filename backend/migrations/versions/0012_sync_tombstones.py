@@ -0,0 +1,59 @@
+"""Sync tombstones for deleted rows
+
+Creates ``sync_tombstones`` and an ``AFTER DELETE`` trigger on every table
+served by the delta sync endpoint, so deletions can be synced like updates.
+The trigger on the partitioned ``reservations`` table applies to every
+partition, present and future; as ``TG_TABLE_NAME`` would name the
+partition, each trigger passes its table name to the function. The ``updated_at`` indexes the endpoint reads
+along already exist (``0002_performance_indexes``).
+
+Revision ID: 0012_sync_tombstones
+Revises: 0011_standing_reservations
+Create Date: 2026-10-19 23:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_sync_tombstones'
+down_revision = '0011_standing_reservations'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ('reservations', 'customers', 'newsletter_subscribers', 'categories', 'menu_items')
+
+
+def upgrade():
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(length=40), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_deleted_at', 'sync_tombstones', ['deleted_at'])
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+            VALUES (TG_ARGV[0], OLD.id, timezone('utc', now()));
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in SYNCED_TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} '
+            f"FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('{table}')"
+        )
+
+
+def downgrade():
+    for table in SYNCED_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS record_sync_tombstone()')
+    op.drop_index('ix_sync_tombstones_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
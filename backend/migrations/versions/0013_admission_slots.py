@@ -0,0 +1,64 @@
+"""Admission slots and waiters
+
+Replaces the single-row ``admission_state`` whose row lock serialised every
+admission decision. Admitted booking requests now claim one of
+``ADMISSION_MAX_CONCURRENT`` rows of ``admission_slots`` with ``SKIP
+LOCKED``, and queued tickets are kept in ``admission_waiters`` until they are
+admitted or stop retrying. The slot rows are created by the application as
+the configured limit requires.
+
+Revision ID: 0013_admission_slots
+Revises: 0012_sync_tombstones
+Create Date: 2026-10-20 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013_admission_slots'
+down_revision = '0012_sync_tombstones'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_table('admission_leases')
+    op.drop_table('admission_state')
+    op.create_table(
+        'admission_slots',
+        sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('ticket', sa.BigInteger(), nullable=True),
+        sa.Column('lease_until', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('slot')
+    )
+    op.create_index('ix_admission_slots_ticket', 'admission_slots', ['ticket'])
+    op.create_table(
+        'admission_waiters',
+        sa.Column('ticket', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('seen_until', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('ticket')
+    )
+    op.create_index('ix_admission_waiters_seen_until', 'admission_waiters', ['seen_until'])
+
+
+def downgrade():
+    op.drop_index('ix_admission_waiters_seen_until', table_name='admission_waiters')
+    op.drop_table('admission_waiters')
+    op.drop_index('ix_admission_slots_ticket', table_name='admission_slots')
+    op.drop_table('admission_slots')
+    admission_state = op.create_table(
+        'admission_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('now_serving', sa.BigInteger(), nullable=False),
+        sa.Column('advanced_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(admission_state, [{'id': 1, 'now_serving': 0}])
+    op.create_table(
+        'admission_leases',
+        sa.Column('ticket', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('lease_until', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('ticket')
+    )
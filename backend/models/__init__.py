@@ -1,17 +1,36 @@
+from .admission import AdmissionSlot, AdmissionWaiter
 from .base import Base
+from .capacity_block import CapacityBlock
 from .category import Category
 from .customer import Customer
 from .menu_item import MenuItem
 from .newsletter import Newsletter
 from .reservation import Reservation
+from .reservation_hold import ReservationHold
+from .schedule import BlackoutDate, PartyDuration, ServicePeriod
+from .standing_reservation import StandingReservation
+from .sync_tombstone import SyncTombstone
+from .table import Table
+from .waitlist import WaitlistEntry
 # Import of Employee temporarily removed to avoid circular imports
 
 __all__ = [
+    "AdmissionSlot",
+    "AdmissionWaiter",
     "Base",
+    "CapacityBlock",
     "Category",
     "Customer",
     "MenuItem",
     "Newsletter",
     "Reservation",
+    "ReservationHold",
+    "ServicePeriod",
+    "BlackoutDate",
+    "PartyDuration",
+    "StandingReservation",
+    "SyncTombstone",
+    "Table",
+    "WaitlistEntry",
     # "Employee" temporarily removed
 ]
\ No newline at end of file
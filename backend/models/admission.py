@@ -0,0 +1,57 @@
+"""
+Admission control models for the Café Fausse application
+
+This module defines the shared state of the booking waiting room (see
+``admission.py``) when it is kept in PostgreSQL: the queue ticket sequence,
+one slot per booking request allowed in the write path at once, and the
+queued tickets still waiting for a turn. Keeping them in PostgreSQL makes the
+waiting room shared by every gunicorn worker and server without another
+service.
+
+These tables hold short-lived coordination state rather than business
+records, so they do not extend Base and carry no timestamps.
+"""
+from ..extensions import db
+
+# Queue tickets are handed out in order from this sequence
+ticket_sequence = db.Sequence('admission_ticket_seq', metadata=db.metadata)
+
+
+class AdmissionSlot(db.Model):
+    """
+    AdmissionSlot model representing one place in the booking write path
+
+    There are ``ADMISSION_MAX_CONCURRENT`` slots. Admitted requests claim a
+    free slot with ``FOR UPDATE SKIP LOCKED``, so concurrent admissions lock
+    different rows instead of queueing on one. A slot is free again when its
+    request releases it or its lease lapses, in case the worker died.
+
+    Attributes:
+        slot (int): Slot number, from 0
+        ticket (int): Queue ticket of the request holding the slot, if any
+        lease_until (datetime): Database time after which the slot is free again
+    """
+    __tablename__ = 'admission_slots'
+    __table_args__ = {'extend_existing': True}
+
+    slot = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    ticket = db.Column(db.BigInteger, nullable=True, index=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
+
+
+class AdmissionWaiter(db.Model):
+    """
+    AdmissionWaiter model representing a queued ticket
+
+    Free slots go to the waiters with the lowest tickets first. A waiter that
+    does not retry by ``seen_until`` has left and no longer holds anyone back.
+
+    Attributes:
+        ticket (int): Queue ticket of the waiting client
+        seen_until (datetime): Database time after which the waiter is skipped
+    """
+    __tablename__ = 'admission_waiters'
+    __table_args__ = {'extend_existing': True}
+
+    ticket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    seen_until = db.Column(db.DateTime, nullable=False, index=True)
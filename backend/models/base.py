@@ -17,6 +17,10 @@ class Base(db.Model):
     in the application, including automatic timestamp tracking and common
     database operations like save and delete.
     
+    The ``to_dict`` methods of models listed in bulk hand these timestamps
+    over as datetimes; the application's JSON provider writes them in ISO 8601
+    (see ``serialization.py``).
+    
     Attributes:
         created_at (datetime): Timestamp when the record was created
         updated_at (datetime): Timestamp when the record was last updated
@@ -24,7 +28,8 @@ class Base(db.Model):
     __abstract__ = True
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed on every table so changes can be found by timestamp
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def save(self):
         """
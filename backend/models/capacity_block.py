@@ -0,0 +1,89 @@
+"""
+Capacity block model for the Café Fausse application
+
+This module defines the CapacityBlock model which represents tables taken out
+of booking for a time window: a private event, a buyout of the whole room or
+a large party seated on a group of tables. One row covers the whole event,
+however many tables and hours it spans.
+"""
+from .base import Base
+from ..extensions import db
+from sqlalchemy.dialects.postgresql import ARRAY, TSRANGE
+
+
+class CapacityBlock(Base):
+    """
+    CapacityBlock model representing tables blocked over a time window
+
+    The window is also stored as a generated ``tsrange`` column with a GiST
+    index, so finding the blocks that overlap a service day is an index
+    search (logarithmic in the number of blocks) using the ``&&`` operator.
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the block
+        name (str): Name of the event shown to staff
+        starts_at (datetime): Start of the block
+        ends_at (datetime): End of the block, exclusive
+        table_numbers (list): Blocked tables; None blocks the whole room
+        guests (int): Expected covers, counted by kitchen pacing at the start time
+        customer_id (int): Optional foreign key to the customer hosting the event
+        notes (str): Any notes for the event
+        period (DateTimeRange): Generated ``[starts_at, ends_at)`` range
+    """
+    __tablename__ = 'capacity_blocks'
+    __table_args__ = (
+        db.CheckConstraint('ends_at > starts_at', name='ck_capacity_blocks_period'),
+        # The interval index answering "which blocks overlap this window"
+        db.Index('ix_capacity_blocks_period', 'period', postgresql_using='gist'),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    ends_at = db.Column(db.DateTime, nullable=False)
+    table_numbers = db.Column(ARRAY(db.Integer), nullable=True)
+    guests = db.Column(db.Integer, nullable=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=True)
+    notes = db.Column(db.Text, nullable=True)
+    period = db.Column(TSRANGE, db.Computed('tsrange(starts_at, ends_at)', persisted=True))
+
+    def __repr__(self):
+        """
+        Returns a string representation of the block
+
+        Returns:
+            str: String representation in the format <CapacityBlock name from starts_at>
+        """
+        return f'<CapacityBlock {self.name} from {self.starts_at}>'
+
+    @property
+    def whole_room(self):
+        """
+        Whether the block covers every table
+
+        Returns:
+            bool: True when no table numbers are given
+        """
+        return not self.table_numbers
+
+    def to_dict(self):
+        """
+        Convert block to dictionary
+
+        Returns:
+            dict: Dictionary containing all block properties
+        """
+        return {
+            'id': self.id,
+            'name': self.name,
+            'starts_at': self.starts_at.isoformat(),
+            'ends_at': self.ends_at.isoformat(),
+            'table_numbers': self.table_numbers,
+            'whole_room': self.whole_room,
+            'guests': self.guests,
+            'customer_id': self.customer_id,
+            'notes': self.notes
+        }
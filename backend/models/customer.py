@@ -52,8 +52,9 @@ class Customer(Base):
         """
         Find a customer by email address
         
-        Searches for a customer with the specified email address.
-        Uses a dedicated session to ensure transaction isolation.
+        Searches for a customer with the specified email address in the
+        request's session, so changes made to the customer are committed with
+        the caller's transaction.
         
         Args:
             email (str): The email address to search for
@@ -61,12 +62,7 @@ class Customer(Base):
         Returns:
             Customer: The customer object if found, otherwise None
         """
-        session = Session(db.engine)
-        try:
-            customer = session.query(cls).filter_by(email=email).first()
-            return customer
-        finally:
-            session.close()
+        return cls.query.filter_by(email=email).first()
     
     def save(self):
         """
@@ -102,6 +98,6 @@ class Customer(Base):
             'email': self.email,
             'phone': self.phone,
             'newsletter_signup': self.newsletter_signup,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
\ No newline at end of file
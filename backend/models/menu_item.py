@@ -34,7 +34,11 @@ class MenuItem(Base):
         category (Category): Relationship to the Category model
     """
     __tablename__ = 'menu_items'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Category listings filter by category and sort by display order
+        db.Index('ix_menu_items_category_id_display_order', 'category_id', 'display_order'),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
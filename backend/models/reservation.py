@@ -9,8 +9,15 @@ from .base import Base
 from ..extensions import db
 from datetime import datetime
 from .customer import Customer  # Import Customer model
+from ..db_routing import get_read_engine
+from sqlalchemy import DDL, event, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
+# Statuses that still hold a table; past bookings leave this set via the sweeper
+ACTIVE_STATUSES = ('confirmed', 'seated')
+STATUSES = ACTIVE_STATUSES + ('completed', 'no_show', 'canceled')
+
 
 class Reservation(Base):
     """
@@ -21,25 +28,49 @@ class Reservation(Base):
     any special requests. It extends the Base model which provides created_at
     and updated_at fields.
     
+    The table is range-partitioned by ``time_slot`` month (see
+    ``jobs/partitions.py``), so PostgreSQL requires the partition key in the
+    primary key. The ORM still identifies reservations by ``id`` alone.
+    
     Attributes:
         id (int): Primary key for the reservation
         customer_id (int): Foreign key to the customer making the reservation
         time_slot (datetime): Date and time of the reservation
         guests (int): Number of people in the party
         table_number (int): Assigned table number for the reservation
+        extra_tables (list): Further table numbers pushed together for a large party
         special_requests (str): Any special requests or notes for this reservation
-        status (str): Status of the reservation (confirmed, canceled, completed)
+        status (str): Status of the reservation (confirmed, seated, completed, no_show, canceled)
+        standing_id (int): Standing reservation this booking is an occurrence of, if any
     """
     __tablename__ = 'reservations'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Availability checks filter on the time window and status together
+        db.Index('ix_reservations_time_slot_status', 'time_slot', 'status'),
+        # Only live bookings: stays small however much history accumulates
+        db.Index(
+            'ix_reservations_active_time_slot', 'time_slot',
+            postgresql_where=db.text("status IN ('confirmed', 'seated')")
+        ),
+        # One occurrence per standing reservation and time, so expansion is idempotent
+        db.Index(
+            'ix_reservations_standing_occurrence', 'standing_id', 'time_slot', unique=True,
+            postgresql_where=db.text('standing_id IS NOT NULL')
+        ),
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (time_slot)'}
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
-    time_slot = db.Column(db.DateTime, nullable=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
+    time_slot = db.Column(db.DateTime, primary_key=True, nullable=False)
     guests = db.Column(db.Integer, nullable=False)
     table_number = db.Column(db.Integer, nullable=False)
+    extra_tables = db.Column(ARRAY(db.Integer), nullable=False, default=list, server_default='{}')
     special_requests = db.Column(db.Text, nullable=True)
-    status = db.Column(db.String(20), default='confirmed')  # confirmed, canceled, completed
+    status = db.Column(db.String(20), default='confirmed')  # see STATUSES
+    standing_id = db.Column(db.Integer, db.ForeignKey('standing_reservations.id'), nullable=True)
+
+    __mapper_args__ = {'primary_key': [id]}
 
     def __repr__(self):
         """
@@ -49,13 +80,21 @@ class Reservation(Base):
             str: String representation in the format <Reservation id for time_slot>
         """
         return f'<Reservation {self.id} for {self.time_slot}>'
+
+    @property
+    def tables(self):
+        """
+        list: Every table number occupied by the reservation
+        """
+        return [self.table_number, *(self.extra_tables or [])]
     
     @classmethod
     def find_by_time_slot(cls, time_slot_start, time_slot_end=None):
         """
         Find reservations for a given time slot
         
-        Retrieves all confirmed reservations that fall within the specified time range.
+        Retrieves all active (confirmed or seated) reservations that fall within
+        the specified time range.
         
         Args:
             time_slot_start (datetime): Start of the time slot to check
@@ -71,14 +110,37 @@ class Reservation(Base):
                 reservations = session.query(cls).filter(
                     cls.time_slot >= time_slot_start,
                     cls.time_slot <= time_slot_end,
-                    cls.status == 'confirmed'
+                    cls.status.in_(ACTIVE_STATUSES)
                 ).all()
             else:
-                reservations = session.query(cls).filter_by(time_slot=time_slot_start, status='confirmed').all()
+                reservations = session.query(cls).filter(
+                    cls.time_slot == time_slot_start,
+                    cls.status.in_(ACTIVE_STATUSES)
+                ).all()
             return reservations
         finally:
             session.close()
 
+    @classmethod
+    def booked_tables_query(cls, time_slot_start, time_slot_end=None):
+        """
+        Build the query selecting booked table numbers for a time slot
+        
+        Shared by the synchronous ``get_booked_tables`` and the async read path
+        so both check availability with exactly the same statement.
+        
+        Args:
+            time_slot_start (datetime): Start of the time slot to check
+            time_slot_end (datetime, optional): End of the time slot to check
+            
+        Returns:
+            Select: Statement returning one table number per active reservation
+        """
+        query = select(cls.table_number).where(cls.status.in_(ACTIVE_STATUSES))
+        if time_slot_end:
+            return query.where(cls.time_slot >= time_slot_start, cls.time_slot <= time_slot_end)
+        return query.where(cls.time_slot == time_slot_start)
+
     @classmethod
     def get_booked_tables(cls, time_slot_start, time_slot_end=None):
         """
@@ -94,8 +156,11 @@ class Reservation(Base):
         Returns:
             list: List of integer table numbers that are already booked
         """
-        reservations = cls.find_by_time_slot(time_slot_start, time_slot_end)
-        return [reservation.table_number for reservation in reservations]
+        session = Session(db.engine)
+        try:
+            return list(session.scalars(cls.booked_tables_query(time_slot_start, time_slot_end)))
+        finally:
+            session.close()
     
     def to_dict(self):
         """
@@ -107,18 +172,29 @@ class Reservation(Base):
         Returns:
             dict: Dictionary containing all reservation properties and basic customer info
         """
-        session = Session(db.engine)
+        session = Session(get_read_engine())
         customer = session.get(Customer, self.customer_id)
         session.close()
         return {
             'id': self.id,
             'customer_id': self.customer_id,
             'customer_name': customer.name if customer else None,
-            'time_slot': self.time_slot.isoformat(),
+            'time_slot': self.time_slot,
             'guests': self.guests,
             'table_number': self.table_number,
+            'tables': self.tables,
             'special_requests': self.special_requests,
             'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+            'standing_id': self.standing_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+# Rows outside every monthly partition land here until their month is created
+event.listen(
+    Reservation.__table__,
+    'after_create',
+    DDL('CREATE TABLE IF NOT EXISTS reservations_default PARTITION OF reservations DEFAULT')
+    .execute_if(dialect='postgresql')
+)
@@ -0,0 +1,91 @@
+"""
+Reservation hold model for the Café Fausse application
+
+This module defines the ReservationHold model which represents tables set
+aside for a guest who is still filling in the booking form. A hold lasts
+``RESERVATION_HOLD_MINUTES`` and is turned into a reservation by submitting
+the booking with its token.
+"""
+import secrets
+
+from .base import Base
+from ..extensions import db
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+def new_hold_token():
+    """
+    Generate an unguessable hold token
+
+    Returns:
+        str: URL-safe random token
+    """
+    return secrets.token_urlsafe(24)
+
+
+class ReservationHold(Base):
+    """
+    ReservationHold model representing tables held during the booking flow
+
+    Unexpired holds occupy their tables and kitchen covers exactly like a
+    confirmed booking (see ``services/occupancy.py``), so availability never
+    offers a held table to someone else. Expired holds are ignored by every
+    read and deleted in the background by ``flask reservations expire-holds``,
+    which walks the ``expires_at`` index instead of scanning the table.
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the hold
+        token (str): Secret the guest presents to confirm the booking
+        time_slot (datetime): Held date and time
+        guests (int): Party size the tables were chosen for
+        table_number (int): First held table
+        extra_tables (list): Further tables pushed together for a large party
+        expires_at (datetime): UTC time at which the tables are released
+    """
+    __tablename__ = 'reservation_holds'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(64), nullable=False, unique=True, default=new_hold_token)
+    time_slot = db.Column(db.DateTime, nullable=False, index=True)
+    guests = db.Column(db.Integer, nullable=False)
+    table_number = db.Column(db.Integer, nullable=False)
+    extra_tables = db.Column(ARRAY(db.Integer), nullable=False, default=list, server_default='{}')
+    # The expiry index: the sweeper reads expired holds oldest first
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the hold
+
+        Returns:
+            str: String representation in the format <ReservationHold id for time_slot>
+        """
+        return f'<ReservationHold {self.id} for {self.time_slot}>'
+
+    @property
+    def tables(self):
+        """
+        All held table numbers
+
+        Returns:
+            list: The first table followed by any extra tables
+        """
+        return [self.table_number, *(self.extra_tables or [])]
+
+    def to_dict(self):
+        """
+        Convert hold to dictionary
+
+        Returns:
+            dict: Dictionary containing the hold properties shown to the guest
+        """
+        return {
+            'hold_token': self.token,
+            'time_slot': self.time_slot.isoformat(),
+            'guests': self.guests,
+            'tables': self.tables,
+            'expires_at': self.expires_at.isoformat()
+        }
@@ -0,0 +1,148 @@
+"""
+Service schedule models for the Café Fausse application
+
+This module defines the models describing when the restaurant takes bookings:
+service periods per weekday, blackout dates when it is closed, and how long a
+table is held depending on the size of the party. The slot generator in
+``services/schedule.py`` turns them into the bookable times of each day.
+"""
+from datetime import time
+
+from .base import Base
+from ..extensions import db
+
+# Monday-Saturday 5:00 PM - 11:00 PM, Sunday 5:00 PM - 9:00 PM
+# (weekday, name, opens_at, last_seating, closes_at)
+DEFAULT_SERVICE_PERIODS = [
+    (weekday, 'dinner', time(17, 0), time(21, 30), time(23, 0)) for weekday in range(6)
+] + [
+    (6, 'dinner', time(17, 0), time(19, 30), time(21, 0)),
+]
+
+# (min_guests, max_guests, minutes)
+DEFAULT_PARTY_DURATIONS = [
+    (1, 2, 90),
+    (3, 4, 105),
+    (5, 6, 120),
+    (7, 20, 150),
+]
+
+
+class ServicePeriod(Base):
+    """
+    ServicePeriod model representing one service on a weekday
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the service period
+        weekday (int): Day of the week, 0 is Monday and 6 is Sunday
+        name (str): Name of the service, e.g. dinner
+        opens_at (time): First bookable arrival time
+        last_seating (time): Last bookable arrival time
+        closes_at (time): Time the dining room closes
+        slot_minutes (int): Minutes between two bookable arrival times
+    """
+    __tablename__ = 'service_periods'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    weekday = db.Column(db.Integer, nullable=False, index=True)
+    name = db.Column(db.String(50), nullable=False, default='dinner')
+    opens_at = db.Column(db.Time, nullable=False)
+    last_seating = db.Column(db.Time, nullable=False)
+    closes_at = db.Column(db.Time, nullable=False)
+    slot_minutes = db.Column(db.Integer, nullable=False, default=15)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the service period
+
+        Returns:
+            str: String representation in the format <ServicePeriod name on weekday>
+        """
+        return f'<ServicePeriod {self.name} on {self.weekday}>'
+
+    @classmethod
+    def default_schedule(cls):
+        """
+        Build the default opening hours
+
+        Returns:
+            list: Unsaved ServicePeriod objects for every weekday
+        """
+        return [
+            cls(weekday=weekday, name=name, opens_at=opens_at, last_seating=last_seating, closes_at=closes_at)
+            for weekday, name, opens_at, last_seating, closes_at in DEFAULT_SERVICE_PERIODS
+        ]
+
+
+class BlackoutDate(Base):
+    """
+    BlackoutDate model representing a day the restaurant takes no bookings
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the blackout date
+        date (date): The closed day, must be unique
+        reason (str): Optional note such as a holiday or private event
+    """
+    __tablename__ = 'blackout_dates'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, unique=True)
+    reason = db.Column(db.String(200), nullable=True)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the blackout date
+
+        Returns:
+            str: String representation in the format <BlackoutDate date>
+        """
+        return f'<BlackoutDate {self.date}>'
+
+
+class PartyDuration(Base):
+    """
+    PartyDuration model representing how long a party holds its table
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the duration band
+        min_guests (int): Smallest party size of the band
+        max_guests (int): Largest party size of the band
+        minutes (int): Length of the sitting in minutes
+    """
+    __tablename__ = 'party_durations'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    min_guests = db.Column(db.Integer, nullable=False)
+    max_guests = db.Column(db.Integer, nullable=False)
+    minutes = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the duration band
+
+        Returns:
+            str: String representation in the format <PartyDuration min-max: minutes>
+        """
+        return f'<PartyDuration {self.min_guests}-{self.max_guests}: {self.minutes}>'
+
+    @classmethod
+    def default_durations(cls):
+        """
+        Build the default sitting lengths by party size
+
+        Returns:
+            list: Unsaved PartyDuration objects
+        """
+        return [
+            cls(min_guests=min_guests, max_guests=max_guests, minutes=minutes)
+            for min_guests, max_guests, minutes in DEFAULT_PARTY_DURATIONS
+        ]
@@ -0,0 +1,78 @@
+"""
+Standing reservation model for the Café Fausse application
+
+This module defines the StandingReservation model which represents a
+recurring booking such as "every Friday at 19:00 for four". The rule is
+stored once; its occurrences become ordinary reservations only when they
+enter the booking horizon (see ``services/standing.py``).
+"""
+from .base import Base
+from ..extensions import db
+
+
+class StandingReservation(Base):
+    """
+    StandingReservation model representing a recurring booking rule
+
+    ``recurrence`` is an RFC 5545 RRULE (``FREQ=WEEKLY``,
+    ``FREQ=WEEKLY;INTERVAL=2``, ``FREQ=MONTHLY;BYDAY=1FR`` ...) anchored at
+    ``starts_at``. Occurrences up to ``expanded_until`` have already been
+    turned into reservations linked by ``Reservation.standing_id``.
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the standing reservation
+        customer_id (int): Foreign key to the customer
+        starts_at (datetime): First occurrence; also gives the time of day
+        recurrence (str): RRULE describing the repetition
+        ends_on (date): Last day an occurrence may fall on, None for no end
+        guests (int): Number of people in the party
+        special_requests (str): Any special requests or notes
+        is_active (bool): False once the guest stops the standing reservation
+        expanded_until (datetime): End of the window already expanded into reservations
+    """
+    __tablename__ = 'standing_reservations'
+    __table_args__ = (
+        # The expansion job reads the active rules lagging behind the horizon
+        db.Index('ix_standing_reservations_expansion', 'expanded_until', postgresql_where=db.text('is_active')),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    recurrence = db.Column(db.String(255), nullable=False, default='FREQ=WEEKLY')
+    ends_on = db.Column(db.Date, nullable=True)
+    guests = db.Column(db.Integer, nullable=False)
+    special_requests = db.Column(db.Text, nullable=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    expanded_until = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the standing reservation
+
+        Returns:
+            str: String representation in the format <StandingReservation id recurrence>
+        """
+        return f'<StandingReservation {self.id} {self.recurrence}>'
+
+    def to_dict(self):
+        """
+        Convert standing reservation to dictionary
+
+        Returns:
+            dict: Dictionary containing all standing reservation properties
+        """
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'starts_at': self.starts_at.isoformat(),
+            'recurrence': self.recurrence,
+            'ends_on': self.ends_on.isoformat() if self.ends_on else None,
+            'guests': self.guests,
+            'special_requests': self.special_requests,
+            'is_active': self.is_active,
+            'expanded_until': self.expanded_until.isoformat() if self.expanded_until else None
+        }
@@ -0,0 +1,79 @@
+"""
+Sync tombstone model for the Café Fausse application
+
+The delta sync endpoint (see ``services/sync.py``) finds changed rows by
+their ``updated_at``, which a deleted row no longer has. A trigger on each
+synced table therefore records every deleted row here, whichever code path
+(ORM, bulk statement or SQL console) deleted it. Tombstones are purged after
+``SYNC_TOMBSTONE_RETENTION_DAYS`` by ``flask sync purge-tombstones``.
+
+Like the admission tables, tombstones are bookkeeping rather than business
+records, so they do not extend Base.
+"""
+from sqlalchemy import DDL, event
+
+from ..extensions import db
+
+# Tables whose deletions are recorded
+SYNCED_TABLES = ('reservations', 'customers', 'newsletter_subscribers', 'categories', 'menu_items')
+
+# The table name is passed as an argument: on a partitioned table TG_TABLE_NAME
+# is the partition. Deletion time in UTC, like the ``updated_at`` of every model
+RECORD_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+    VALUES (TG_ARGV[0], OLD.id, timezone('utc', now()));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def tombstone_trigger(table):
+    """
+    Statement creating the tombstone trigger of a table
+
+    Args:
+        table (str): Name of a synced table
+
+    Returns:
+        str: The ``CREATE TRIGGER`` statement
+    """
+    return (
+        f'CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} '
+        f"FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone('{table}')"
+    )
+
+
+class SyncTombstone(db.Model):
+    """
+    SyncTombstone model recording a deleted row of a synced table
+
+    Attributes:
+        id (int): Primary key, breaking ties between tombstones of the same instant
+        entity (str): Table the row was deleted from
+        entity_id (int): ID of the deleted row
+        deleted_at (datetime): Start of the deleting transaction, in UTC
+    """
+    __tablename__ = 'sync_tombstones'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    entity = db.Column(db.String(40), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_tombstone_triggers(target, connection, tables=(), **kw):
+    # Tables created by ``db.create_all``; the migrations create the same triggers
+    if connection.dialect.name != 'postgresql':
+        return
+    created = {table.name for table in tables}
+    if SyncTombstone.__tablename__ not in created:
+        return
+    connection.execute(DDL(RECORD_TOMBSTONE_FUNCTION))
+    for table in SYNCED_TABLES:
+        if table in created:
+            connection.execute(DDL(tombstone_trigger(table)))
@@ -0,0 +1,82 @@
+"""
+Table model for the Café Fausse application
+
+This module defines the Table model which represents the physical tables of
+the dining room. Reservations are seated on one table or, for larger parties,
+on several combinable tables of the same section pushed together.
+"""
+from .base import Base
+from ..extensions import db
+
+# Default floor plan: (first number, last number, capacity, section, combinable)
+DEFAULT_FLOOR_PLAN = [
+    (1, 8, 2, 'window', True),
+    (9, 20, 4, 'main', True),
+    (21, 26, 4, 'terrace', True),
+    (27, 28, 6, 'main', False),
+    (29, 30, 8, 'private', False),
+]
+
+
+class Table(Base):
+    """
+    Table model representing a dining table
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the table
+        number (int): Table number shown on the floor plan, must be unique
+        capacity (int): Maximum number of guests the table seats on its own
+        section (str): Area of the dining room; only tables of one section are combined
+        combinable (bool): Whether the table can be pushed together with its neighbours
+        is_active (bool): Whether the table is currently in service
+    """
+    __tablename__ = 'dining_tables'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    number = db.Column(db.Integer, nullable=False, unique=True)
+    capacity = db.Column(db.Integer, nullable=False)
+    section = db.Column(db.String(50), nullable=False, default='main')
+    combinable = db.Column(db.Boolean, nullable=False, default=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the table
+
+        Returns:
+            str: String representation in the format <Table number (capacity)>
+        """
+        return f'<Table {self.number} ({self.capacity})>'
+
+    @classmethod
+    def default_floor_plan(cls):
+        """
+        Build the default floor plan of 30 tables
+
+        Returns:
+            list: Unsaved Table objects for the default dining room layout
+        """
+        return [
+            cls(number=number, capacity=capacity, section=section, combinable=combinable)
+            for first, last, capacity, section, combinable in DEFAULT_FLOOR_PLAN
+            for number in range(first, last + 1)
+        ]
+
+    def to_dict(self):
+        """
+        Convert table to dictionary
+
+        Returns:
+            dict: Dictionary containing all table properties
+        """
+        return {
+            'id': self.id,
+            'number': self.number,
+            'capacity': self.capacity,
+            'section': self.section,
+            'combinable': self.combinable,
+            'is_active': self.is_active
+        }
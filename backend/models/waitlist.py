@@ -0,0 +1,81 @@
+"""
+Waitlist model for the Café Fausse application
+
+This module defines the WaitlistEntry model which represents a party waiting
+for a table at a fully booked time. Entries are promoted to reservations
+automatically when a cancellation or change frees capacity (see
+``services/waitlist.py``).
+"""
+from .base import Base
+from ..extensions import db
+
+WAITLIST_STATUSES = ('waiting', 'promoted', 'canceled')
+
+
+class WaitlistEntry(Base):
+    """
+    WaitlistEntry model representing a party waiting for a time slot
+
+    Each time slot has its own queue, served largest party first and then
+    first come, first served, so a freed table goes to the party that uses
+    it best. A partial index over waiting entries in exactly that order lets
+    a promotion read the head of the queue without scanning it.
+
+    It extends the Base model which provides created_at and updated_at fields.
+
+    Attributes:
+        id (int): Primary key for the entry
+        customer_id (int): Foreign key to the waiting customer
+        time_slot (datetime): Requested date and time
+        guests (int): Number of people in the party
+        special_requests (str): Any special requests or notes
+        status (str): waiting, promoted or canceled
+        reservation_id (int): Reservation created when the entry was promoted
+        promoted_at (datetime): When the entry was promoted
+    """
+    __tablename__ = 'waitlist_entries'
+    __table_args__ = (
+        # The per-slot priority queue: largest party first, then oldest entry
+        db.Index(
+            'ix_waitlist_entries_queue', 'time_slot', db.text('guests DESC'), 'created_at',
+            postgresql_where=db.text("status = 'waiting'")
+        ),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
+    time_slot = db.Column(db.DateTime, nullable=False)
+    guests = db.Column(db.Integer, nullable=False)
+    special_requests = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='waiting')
+    reservation_id = db.Column(db.Integer, nullable=True)
+    promoted_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the waitlist entry
+
+        Returns:
+            str: String representation in the format <WaitlistEntry id for time_slot>
+        """
+        return f'<WaitlistEntry {self.id} for {self.time_slot}>'
+
+    def to_dict(self):
+        """
+        Convert waitlist entry to dictionary
+
+        Returns:
+            dict: Dictionary containing all waitlist entry properties
+        """
+        return {
+            'id': self.id,
+            'customer_id': self.customer_id,
+            'time_slot': self.time_slot.isoformat(),
+            'guests': self.guests,
+            'special_requests': self.special_requests,
+            'status': self.status,
+            'reservation_id': self.reservation_id,
+            'promoted_at': self.promoted_at.isoformat() if self.promoted_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,143 @@
+"""
+Response serialization for the Café Fausse application
+
+``FastJSONProvider`` replaces Flask's default JSON provider (see
+``create_app``). It encodes with orjson straight to the response bytes,
+without sorting keys or building an intermediate string, and writes
+``datetime`` and ``date`` values natively in ISO 8601, so models hand their
+timestamps over as they are instead of calling ``isoformat()`` per row.
+Without orjson installed the standard library encoder is used, with the same
+output.
+
+Admin endpoints returning large lists are also decorated with
+``negotiated``: a client sending ``Accept: application/msgpack`` gets the
+same payload encoded as MessagePack, more compact and cheaper to decode
+(timestamps stay ISO 8601 strings). MessagePack is optional; without the
+``msgpack`` package every client gets JSON.
+"""
+import decimal
+import functools
+import inspect
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed packages
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the installed packages
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def _default(value):
+    # Values neither encoder handles natively, converted like Flask's default provider
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    JSON provider encoding with orjson, and MessagePack when negotiated
+
+    Attributes:
+        compact (bool): Whether responses are minified; None minifies them
+            except in debug mode, like Flask's default provider
+    """
+    compact = None
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def encode(self, obj):
+        """
+        Encode a value as JSON
+
+        Args:
+            obj: Value to encode
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if self._indent() else 0)
+            return orjson.dumps(obj, default=_default, option=option)
+        indent = 2 if self._indent() else None
+        separators = None if indent else (',', ':')
+        return json.dumps(obj, default=_default, indent=indent, separators=separators).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if has_request_context() and g.get('response_mimetype') == MSGPACK_MIMETYPE:
+            return self._app.response_class(msgpack.packb(obj, default=_default), mimetype=MSGPACK_MIMETYPE)
+        return self._app.response_class(self.encode(obj), mimetype=JSON_MIMETYPE)
+
+
+def preferred_mimetype():
+    """
+    Response format the client prefers among those available
+
+    Returns:
+        str: ``application/msgpack`` when the client ranks it above JSON and
+            msgpack is installed, otherwise ``application/json``
+    """
+    offered = [JSON_MIMETYPE, MSGPACK_MIMETYPE] if msgpack is not None else [JSON_MIMETYPE]
+    return request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+
+
+def negotiated(view):
+    """
+    Decorate a view whose JSON responses may be sent as MessagePack instead
+
+    The format follows the request's ``Accept`` header; responses carry
+    ``Vary: Accept`` so caches keep the formats apart. Do not combine with
+    ``cached_view``, whose entries do not vary by format.
+
+    Args:
+        view (callable): The view, sync or async
+
+    Returns:
+        callable: The decorated view
+    """
+    def finish(result):
+        response = current_app.make_response(result)
+        response.vary.add('Accept')
+        return response
+
+    if inspect.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            g.response_mimetype = preferred_mimetype()
+            return finish(await view(*args, **kwargs))
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.response_mimetype = preferred_mimetype()
+        return finish(view(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,89 @@
+"""
+ORM-free serializers of the Café Fausse models
+
+Read-only endpoints and the delta sync do not load model instances: the
+identity map, change tracking and attribute instrumentation they come with
+are thrown away as soon as ``to_dict()`` has run. Instead they select the
+columns of one of the fieldsets below with a Core ``select()`` and turn the
+row tuples into dicts with the serializer compiled for those fields (see
+``fieldsets.py``).
+
+The default fields of each fieldset are the payload of the model's
+``to_dict()``, so a row serialized here and an instance serialized by its
+model look the same to clients. The reservation default includes the
+customer's name, read with an outer join rather than one query per row.
+"""
+from sqlalchemy import func
+
+from .fieldsets import Fieldset, Relation
+from .models.category import Category
+from .models.customer import Customer
+from .models.menu_item import MenuItem
+from .models.newsletter import Newsletter
+from .models.reservation import Reservation
+
+customer_fields = Fieldset(Customer, {
+    'id': Customer.id,
+    'name': Customer.name,
+    'email': Customer.email,
+    'phone': Customer.phone,
+    'newsletter_signup': Customer.newsletter_signup,
+    'created_at': Customer.created_at,
+    'updated_at': Customer.updated_at
+})
+
+subscriber_fields = Fieldset(Newsletter, {
+    'id': Newsletter.id,
+    'email': Newsletter.email,
+    'is_active': Newsletter.is_active,
+    'created_at': Newsletter.created_at,
+    'updated_at': Newsletter.updated_at
+})
+
+reservation_fields = Fieldset(Reservation, {
+    'id': Reservation.id,
+    'reservation_id': Reservation.id,
+    'customer_id': Reservation.customer_id,
+    'time_slot': Reservation.time_slot,
+    'guests': Reservation.guests,
+    'table_number': Reservation.table_number,
+    'tables': func.array_prepend(Reservation.table_number, Reservation.extra_tables),
+    'special_requests': Reservation.special_requests,
+    'status': Reservation.status,
+    'standing_id': Reservation.standing_id,
+    'created_at': Reservation.created_at,
+    'updated_at': Reservation.updated_at
+}, default=(
+    'id', 'customer_id', 'customer_name', 'time_slot', 'guests', 'table_number', 'tables',
+    'special_requests', 'status', 'standing_id', 'created_at', 'updated_at'
+), relations={
+    'customer': Relation(Customer, Customer.id == Reservation.customer_id, {
+        'customer_name': Customer.name,
+        'customer_email': Customer.email,
+        'customer_phone': Customer.phone
+    })
+})
+
+category_fields = Fieldset(Category, {
+    'id': Category.id,
+    'name': Category.name,
+    'description': Category.description,
+    'display_order': Category.display_order
+})
+
+item_fields = Fieldset(MenuItem, {
+    'id': MenuItem.id,
+    'name': MenuItem.name,
+    'description': MenuItem.description,
+    'price': MenuItem.price,
+    'image_url': MenuItem.image_url,
+    'is_vegetarian': MenuItem.is_vegetarian,
+    'is_vegan': MenuItem.is_vegan,
+    'is_gluten_free': MenuItem.is_gluten_free,
+    'is_featured': MenuItem.is_featured,
+    'available': MenuItem.available,
+    'category_id': MenuItem.category_id,
+    'display_order': MenuItem.display_order
+}, relations={
+    'category': Relation(Category, Category.id == MenuItem.category_id, {'category_name': Category.name})
+})
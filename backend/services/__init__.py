@@ -0,0 +1,6 @@
+"""
+Domain services for the Café Fausse application
+
+Business logic that does not belong to a single model or endpoint, such as
+table assignment, lives here so the blueprints stay thin.
+"""
@@ -0,0 +1,131 @@
+"""
+Nearest available slots for the Café Fausse application
+
+When a requested time is full, the API suggests the closest times at which
+the party can still be seated, instead of clients polling
+``check-availability`` for neighbouring times. Each candidate day is loaded
+once (the same occupancy rows the booking path uses) and all of its slots are
+tested against that in-memory plan: the requested day first, then days
+further away, up to ``RESERVATION_ALTERNATIVES_DAYS`` in each direction.
+On other days the slots closest to the requested time of day come first.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from .occupancy import load_day, load_day_async
+from .pacing import pacing_allows
+
+
+def candidate_days(requested_day, max_days):
+    """
+    Days to search, nearest first
+
+    Args:
+        requested_day (date): Day of the requested time
+        max_days (int): How many days to search on either side
+
+    Returns:
+        list: The requested day, then the next and previous days alternately
+    """
+    days = [requested_day]
+    for offset in range(1, max_days + 1):
+        days += [requested_day + timedelta(days=offset), requested_day - timedelta(days=offset)]
+    return days
+
+
+def free_slots(day, slots, guests, duration, requested, now):
+    """
+    Slots of one day at which a party can be seated, nearest first
+
+    Args:
+        day (DayOccupancy): Loaded occupancy of the day
+        slots (tuple): The day's bookable slots
+        guests (int): Party size
+        duration (timedelta): Length of the party's sitting
+        requested (datetime): Requested time, itself excluded from the result
+        now (datetime): Slots at or before this time are skipped
+
+    Returns:
+        list: Available slot datetimes sorted by distance to the requested time of day
+    """
+    anchor = datetime.combine(slots[0].date(), requested.time())
+    candidates = sorted(
+        (slot for slot in slots if slot > now and slot != requested),
+        key=lambda slot: (abs(slot - anchor), slot)
+    )
+    return [
+        slot for slot in candidates
+        if day.plan.best_fit(guests, slot, slot + duration) is not None
+        and pacing_allows(day.covers, slot, guests)
+    ]
+
+
+def _searched_days(schedule, guests, requested):
+    max_days = current_app.config['RESERVATION_ALTERNATIVES_DAYS']
+    for candidate in candidate_days(requested.date(), max_days):
+        slots = schedule.seatings_for(candidate, guests)
+        if slots:
+            yield slots
+
+
+def nearest_slots(session, schedule, guests, requested, limit, requested_day=None):
+    """
+    Find the nearest available slots through a synchronous session
+
+    Args:
+        session (Session): Session to query with
+        schedule (ServiceSchedule): The service schedule
+        guests (int): Party size
+        requested (datetime): Requested time
+        limit (int): Maximum number of suggestions
+        requested_day (DayOccupancy, optional): Already loaded occupancy of the requested day
+
+    Returns:
+        list: Up to ``limit`` available slot datetimes, nearest first
+    """
+    duration, now, found = schedule.duration_for(guests), datetime.now(), []
+    for slots in _searched_days(schedule, guests, requested):
+        if requested_day is not None and slots[0].date() == requested.date():
+            day = requested_day
+        else:
+            day = load_day(session, slots[0], schedule)
+        found += free_slots(day, slots, guests, duration, requested, now)[:limit - len(found)]
+        if len(found) >= limit:
+            break
+    return found
+
+
+async def nearest_slots_async(schedule, guests, requested, limit):
+    """
+    Find the nearest available slots on the async read engine
+
+    Args:
+        schedule (ServiceSchedule): The service schedule
+        guests (int): Party size
+        requested (datetime): Requested time
+        limit (int): Maximum number of suggestions
+
+    Returns:
+        list: Up to ``limit`` available slot datetimes, nearest first
+    """
+    duration, now, found = schedule.duration_for(guests), datetime.now(), []
+    for slots in _searched_days(schedule, guests, requested):
+        day = await load_day_async(slots[0], schedule)
+        found += free_slots(day, slots, guests, duration, requested, now)[:limit - len(found)]
+        if len(found) >= limit:
+            break
+    return found
+
+
+def slot_to_dict(slot):
+    """
+    Convert a slot to the date/time pair used by the reservation API
+
+    Args:
+        slot (datetime): Slot start
+
+    Returns:
+        dict: ``{'date': 'YYYY-MM-DD', 'time': 'HH:MM'}``
+    """
+    return {'date': slot.strftime('%Y-%m-%d'), 'time': slot.strftime('%H:%M')}
@@ -0,0 +1,60 @@
+"""
+Capacity blocks for the Café Fausse application
+
+Private events and buyouts are stored as one ``CapacityBlock`` each instead
+of a reservation per table. Availability consumes blocks through
+``services/occupancy.py``; this module checks a new block against the
+bookings it would displace.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from ..models.reservation import ACTIVE_STATUSES, Reservation
+
+
+def conflicting_reservations(session, schedule, starts_at, ends_at, table_numbers=None):
+    """
+    Find the active reservations a block would overlap
+
+    Args:
+        session (Session): Session to query with
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+        starts_at (datetime): Start of the block
+        ends_at (datetime): End of the block
+        table_numbers (list, optional): Blocked tables; None for the whole room
+
+    Returns:
+        list: Reservations whose tables and sitting overlap the block
+    """
+    candidates = session.scalars(select(Reservation).where(
+        Reservation.status.in_(ACTIVE_STATUSES),
+        Reservation.time_slot > starts_at - schedule.longest_duration,
+        Reservation.time_slot < ends_at
+    ).order_by(Reservation.time_slot)).all()
+    blocked = set(table_numbers) if table_numbers else None
+    return [
+        reservation for reservation in candidates
+        if reservation.time_slot + schedule.held_for(reservation.guests) > starts_at
+        and (blocked is None or blocked.intersection(reservation.tables))
+    ]
+
+
+def block_days(schedule, starts_at, ends_at):
+    """
+    List the service days whose bookings a block can overlap
+
+    Every day the block spans counts, and so does the day before it when a
+    sitting started that day can run into the block.
+
+    Args:
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+        starts_at (datetime): Start of the block
+        ends_at (datetime): End of the block
+
+    Returns:
+        list: Dates in ascending order, the order their day locks are taken in
+    """
+    first = (starts_at - schedule.longest_duration).date()
+    last = (ends_at - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
@@ -0,0 +1,297 @@
+"""
+Reservation change feed for the Café Fausse application
+
+Writes that change the floor (reservations created, updated or canceled,
+capacity blocks added or removed) publish an event with ``pg_notify`` inside
+their own transaction, so an event is delivered exactly when its change
+commits and never for a rolled-back one, whichever worker made it.
+
+Notifications are appended to a bounded ``EventLog``; each subscriber keeps
+its position in the log and is woken when events arrive. A subscriber that
+falls further behind than the log holds, or reconnects to a process with
+another log, receives a ``reset`` event and reloads instead.
+
+The log is served two ways. Each worker process runs one ``ChangeFeed`` per
+application, fed by the worker's single ``LISTEN`` connection (see
+``services/listener.py``); its streams are generators iterated by the
+threads serving their requests, so every open stream holds a worker thread.
+In production the stream is served by ``feed_server.py`` instead, where a
+subscriber is a coroutine on one event loop and costs no thread.
+"""
+import json
+import os
+import threading
+import uuid
+from collections import deque
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from .listener import RECONNECT_SECONDS, get_listener
+
+CHANNEL = 'reservation_changes'
+
+# PostgreSQL's limit on the size of a notification payload
+MAX_PAYLOAD_BYTES = 8000
+
+
+def publish(session, event, data):
+    """
+    Publish an event, delivered when the session's transaction commits
+
+    PostgreSQL refuses notification payloads of ``MAX_PAYLOAD_BYTES`` or more,
+    which would fail the transaction making the change. An event too large to
+    send is published as a ``reset`` instead, so subscribers reload.
+
+    Args:
+        session (Session): Session whose transaction makes the change
+        event (str): Event name, e.g. ``reservation.created``
+        data (dict): JSON-serialisable event data
+    """
+    payload = json.dumps({'event': event, 'data': data}, default=str)
+    if len(payload.encode()) >= MAX_PAYLOAD_BYTES:
+        payload = json.dumps({'event': 'reset', 'data': {}})
+    session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+def reservation_payload(reservation):
+    """
+    Build the event data of a reservation
+
+    Only the fields that place the reservation on the floor are sent, so the
+    payload stays small whatever the guest wrote in ``special_requests``.
+    Clients fetch the full row from ``GET /api/reservations/<id>``.
+
+    Args:
+        reservation (Reservation): The changed reservation, flushed
+
+    Returns:
+        dict: The reservation's ID, status and time slot
+    """
+    return {
+        'id': reservation.id,
+        'status': reservation.status,
+        'time_slot': reservation.time_slot.isoformat()
+    }
+
+
+def publish_reservation(session, event, reservation):
+    """
+    Publish a reservation event in the session's transaction
+
+    Args:
+        session (Session): Session whose transaction makes the change
+        event (str): ``reservation.created``, ``reservation.updated`` or ``reservation.canceled``
+        reservation (Reservation): The changed reservation
+    """
+    session.flush()
+    publish(session, event, reservation_payload(reservation))
+
+
+def format_event(event_id, event, data):
+    """
+    Encode one Server-Sent Event
+
+    Args:
+        event_id (str): Event ID, sent back by the browser as ``Last-Event-ID``
+        event (str): Event name
+        data (dict): Event data
+
+    Returns:
+        str: The event in ``text/event-stream`` format
+    """
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+class EventLog:
+    """
+    Bounded log of recent change events and the positions of its readers
+
+    Holds no lock; the feeds serving the log synchronise around it.
+
+    Attributes:
+        token (str): Identifies this log in event IDs; resuming from another
+            log's ID yields a ``reset``
+        sequence (int): Number of the latest event
+    """
+
+    def __init__(self, buffer_size):
+        self.token = uuid.uuid4().hex[:12]
+        self.sequence = 0
+        self._entries = deque(maxlen=buffer_size)
+
+    def append(self, event, data):
+        """
+        Add an event to the log
+
+        Args:
+            event (str): Event name
+            data (dict): Event data
+        """
+        self.sequence += 1
+        self._entries.append((self.sequence, event, data))
+
+    def receive(self, payload):
+        """
+        Add the event carried by a notification payload from ``publish``
+
+        Args:
+            payload (str): JSON notification payload
+        """
+        message = json.loads(payload)
+        self.append(message['event'], message['data'])
+
+    def position(self, last_event_id):
+        """
+        Starting position of a new subscriber
+
+        Args:
+            last_event_id (str): ``Last-Event-ID`` of a reconnecting client, if any
+
+        Returns:
+            tuple: (position, missed); events after ``last_event_id`` can be
+                replayed only if it came from this log
+        """
+        token, _, sequence = (last_event_id or '').partition('-')
+        if token == self.token and sequence.isdigit():
+            return int(sequence), False
+        return self.sequence, bool(last_event_id)
+
+    def read(self, position):
+        """
+        Encode what a subscriber has not seen yet
+
+        Args:
+            position (int): Sequence of the last event the subscriber received
+
+        Returns:
+            tuple: (new position, encoded events); a ``reset`` when events
+                after ``position`` have already left the log
+        """
+        oldest = self._entries[0][0] if self._entries else self.sequence + 1
+        if position + 1 < oldest:
+            return self.sequence, [format_event(f'{self.token}-{self.sequence}', 'reset', {})]
+        return self.sequence, [
+            format_event(f'{self.token}-{sequence}', event, data)
+            for sequence, event, data in self._entries if sequence > position
+        ]
+
+    def opening(self, position, missed):
+        """
+        Encode the start of a subscriber's stream
+
+        Args:
+            position (int): The subscriber's position
+            missed (bool): Whether the client's ``Last-Event-ID`` cannot be resumed
+
+        Returns:
+            list: The reconnection delay, then a ``reset`` if events were missed
+        """
+        chunks = [f'retry: {int(RECONNECT_SECONDS * 1000)}\n\n']
+        if missed:
+            chunks.append(format_event(f'{self.token}-{position}', 'reset', {}))
+        return chunks
+
+
+class ChangeFeed:
+    """
+    Fan-out of change notifications to the subscribers of one worker
+
+    Each open stream is iterated by the thread serving its request. The
+    standalone server in ``feed_server.py`` serves the same log from one
+    event loop instead.
+
+    Attributes:
+        pid (int): Process owning the listener
+        token (str): Identifies this feed in event IDs; resuming from another
+            feed's ID yields a ``reset``
+    """
+
+    def __init__(self, listener, buffer_size):
+        self.listener = listener
+        self.pid = listener.pid
+        self._log = EventLog(buffer_size)
+        self.token = self._log.token
+        self._condition = threading.Condition()
+        self._closed = False
+        listener.add_channel(CHANNEL, self._receive, on_reconnect=self._reconnected)
+
+    def _receive(self, payload):
+        with self._condition:
+            self._log.receive(payload)
+            self._condition.notify_all()
+
+    def _reconnected(self, epoch):
+        # Changes made while the listener was disconnected were missed
+        with self._condition:
+            self._log.append('reset', {})
+            self._condition.notify_all()
+
+    def wait_until_listening(self, timeout=5.0):
+        """
+        Block until the listener has subscribed to the channel
+
+        Args:
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: True once the feed is listening
+        """
+        return self.listener.wait_until_listening(CHANNEL, timeout)
+
+    def events(self, last_event_id=None, heartbeat=15.0):
+        """
+        Subscribe to the feed
+
+        The subscriber's position is taken immediately, so no change
+        committed after this call is missed even if the stream is only
+        iterated later.
+
+        Args:
+            last_event_id (str, optional): ``Last-Event-ID`` of a reconnecting client
+            heartbeat (float): Seconds of silence after which a comment keeps the connection open
+
+        Returns:
+            generator: Encoded events and keep-alive comments, until the feed closes
+        """
+        with self._condition:
+            position, missed = self._log.position(last_event_id)
+        return self._stream(position, missed, heartbeat)
+
+    def _stream(self, position, missed, heartbeat):
+        yield from self._log.opening(position, missed)
+        while not self._closed:
+            with self._condition:
+                if self._log.sequence == position:
+                    self._condition.wait(heartbeat)
+                position, chunks = self._log.read(position)
+            yield from chunks or [': keep-alive\n\n']
+
+    def close(self):
+        """
+        End every subscriber's stream
+        """
+        self._closed = True
+        with self._condition:
+            self._condition.notify_all()
+
+
+_lock = threading.Lock()
+
+
+def get_change_feed():
+    """
+    Get the change feed of the current application, starting it if needed
+
+    Returns:
+        ChangeFeed: The application's change feed in this process
+    """
+    app = current_app._get_current_object()
+    feed = app.extensions.get('change_feed')
+    if feed is None or feed.pid != os.getpid():
+        with _lock:
+            feed = app.extensions.get('change_feed')
+            if feed is None or feed.pid != os.getpid():
+                feed = ChangeFeed(get_listener(), app.config['CHANGE_FEED_BUFFER_SIZE'])
+                app.extensions['change_feed'] = feed
+    return feed
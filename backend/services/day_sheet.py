@@ -0,0 +1,164 @@
+"""
+Host-stand day sheet for the Café Fausse application
+
+The day sheet lists one service day's reservations in arrival order with the
+guest context the host needs at the door: name, phone, how many times the
+guest has dined with us and their special requests. It is built by a single
+query over the day's ``time_slot`` range (index-backed and pruned to one
+partition), with the customer joined in and the visit count computed by a
+correlated subquery on the ``customer_id`` index. Visits are counted over the
+``RESERVATION_RETENTION_MONTHS`` kept attached before the day's month, so the
+subquery is pruned to those partitions and archiving older ones does not
+change the counts.
+
+Sheets are kept in the ``day_sheet`` cache namespace (see ``cache.py``) for
+``DAY_SHEET_CACHE_SECONDS``, keyed by the day and a stamp of what the sheet
+shows: the count and latest ``updated_at`` of the day's reservations and the
+latest ``updated_at`` of their customers. Every write to a reservation or a
+customer bumps ``updated_at``, so a sheet is reused until a reservation of
+that day is created, changed or canceled, or one of its guests is edited, in
+any worker.
+"""
+from datetime import datetime, time, timedelta
+
+from dateutil.relativedelta import relativedelta
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from ..extensions import cache
+from ..models.customer import Customer
+from ..models.reservation import ACTIVE_STATUSES, Reservation
+
+day_sheet_cache = cache.namespace('day_sheet', ttl='DAY_SHEET_CACHE_SECONDS')
+
+
+def day_range(day):
+    """
+    Start and end of a service day
+
+    Args:
+        day (date): Service day
+
+    Returns:
+        tuple: (start, end) datetimes, end exclusive
+    """
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def day_customers(day):
+    """
+    Build the subquery selecting the customers of a day's reservations
+
+    Args:
+        day (date): Service day
+
+    Returns:
+        Select: Statement returning the ``customer_id`` of each reservation of the day
+    """
+    start, end = day_range(day)
+    return select(Reservation.customer_id).where(Reservation.time_slot >= start, Reservation.time_slot < end)
+
+
+def day_stamp_query(day):
+    """
+    Build the query stamping the current state of a day sheet's rows
+
+    Args:
+        day (date): Service day
+
+    Returns:
+        Select: Statement returning one (count, latest reservation updated_at,
+            latest customer updated_at) row
+    """
+    start, end = day_range(day)
+    customers_changed = select(func.max(Customer.updated_at)).where(Customer.id.in_(day_customers(day)))
+    return select(
+        func.count(Reservation.id), func.max(Reservation.updated_at), customers_changed.scalar_subquery()
+    ).where(Reservation.time_slot >= start, Reservation.time_slot < end)
+
+
+def day_sheet_query(day, visit_months):
+    """
+    Build the query selecting a day's reservations with their guest context
+
+    Args:
+        day (date): Service day
+        visit_months (int): Whole months before the day's month in which
+            completed reservations count as visits
+
+    Returns:
+        Select: Statement returning (Reservation, name, phone, email, visits) rows in arrival order
+    """
+    start, end = day_range(day)
+    since = datetime.combine(day.replace(day=1) - relativedelta(months=visit_months), time.min)
+    past = aliased(Reservation)
+    visits = (
+        select(func.count(past.id))
+        .where(
+            past.customer_id == Reservation.customer_id,
+            past.status == 'completed',
+            past.time_slot >= since,
+            past.time_slot < end
+        )
+        .correlate(Reservation)
+        .scalar_subquery()
+    )
+    return (
+        select(Reservation, Customer.name, Customer.phone, Customer.email, visits.label('visits'))
+        .join(Customer, Customer.id == Reservation.customer_id)
+        .where(Reservation.time_slot >= start, Reservation.time_slot < end)
+        .order_by(Reservation.time_slot, Reservation.id)
+    )
+
+
+def build_day_sheet(session, day):
+    """
+    Build the day sheet of a service day
+
+    Args:
+        session (Session): Session to query with
+        day (date): Service day
+
+    Returns:
+        dict: The day's date, expected covers and reservations in arrival order
+    """
+    entries = []
+    covers = 0
+    visit_months = current_app.config['RESERVATION_RETENTION_MONTHS']
+    for reservation, name, phone, email, visits in session.execute(day_sheet_query(day, visit_months)):
+        if reservation.status in ACTIVE_STATUSES:
+            covers += reservation.guests
+        entries.append({
+            'reservation_id': reservation.id,
+            'time': reservation.time_slot.strftime('%H:%M'),
+            'time_slot': reservation.time_slot.isoformat(),
+            'guests': reservation.guests,
+            'tables': reservation.tables,
+            'status': reservation.status,
+            'special_requests': reservation.special_requests,
+            'standing_id': reservation.standing_id,
+            'customer_id': reservation.customer_id,
+            'customer_name': name,
+            'customer_phone': phone,
+            'customer_email': email,
+            'visits': visits
+        })
+    return {'date': day.isoformat(), 'covers': covers, 'reservations': entries}
+
+
+def get_day_sheet(session, day):
+    """
+    Get the day sheet of a service day, rebuilding it only after a change
+
+    Args:
+        session (Session): Session to query with
+        day (date): Service day
+
+    Returns:
+        dict: The day sheet
+    """
+    stamp = session.execute(day_stamp_query(day)).one()
+    key = ':'.join([day.isoformat(), *(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in stamp)])
+    return day_sheet_cache.get_or_set(key, lambda: build_day_sheet(session, day))
@@ -0,0 +1,98 @@
+"""
+Temporary reservation holds for the Café Fausse application
+
+A guest who has seen a time available can hold its tables for
+``RESERVATION_HOLD_MINUTES`` while filling in the booking form, then book
+against the hold token instead of competing for the tables again. Holds are
+placed and confirmed under the same per-day lock as bookings, and an
+unexpired hold counts toward the day's occupancy (tables and kitchen covers)
+wherever availability is computed.
+
+Expiry needs no timer: every read filters on ``expires_at``, so a hold stops
+counting the moment it lapses. Expired rows are then deleted in the
+background by ``flask reservations expire-holds`` (see
+``jobs/reservations.py``), which walks the ``expires_at`` index from the
+oldest entry and stops at the first live hold, so its cost depends on the
+number of expired holds rather than the size of the table.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from ..models.reservation_hold import ReservationHold
+from .pacing import minute_of_day, pacing_allows
+
+
+def hold_tables(session, day, schedule, time_slot, guests, minutes):
+    """
+    Hold the best tables for a party if it can be seated
+
+    The caller must hold the day lock (``lock_service_day``) and commit.
+
+    Args:
+        session (Session): Session whose transaction stores the hold
+        day (DayOccupancy): Occupancy of the service day, updated in place
+        schedule (ServiceSchedule): The service schedule
+        time_slot (datetime): Requested arrival time
+        guests (int): Party size
+        minutes (int): How long the hold lasts
+
+    Returns:
+        ReservationHold: The new hold, or None when the party cannot be seated
+    """
+    end = time_slot + schedule.duration_for(guests)
+    tables = day.plan.best_fit(guests, time_slot, end)
+    if not tables or not pacing_allows(day.covers, time_slot, guests):
+        return None
+
+    hold = ReservationHold(
+        time_slot=time_slot,
+        guests=guests,
+        table_number=tables[0],
+        extra_tables=list(tables[1:]),
+        expires_at=datetime.utcnow() + timedelta(minutes=minutes)
+    )
+    session.add(hold)
+    session.flush()
+    day.plan.book(tables, time_slot, end)
+    day.covers.add(minute_of_day(time_slot), guests)
+    return hold
+
+
+def claim_hold(session, token):
+    """
+    Lock an unexpired hold so it can be confirmed or released
+
+    Args:
+        session (Session): Session whose transaction uses the hold
+        token (str): Hold token given to the guest
+
+    Returns:
+        ReservationHold: The locked hold, or None when unknown or expired
+    """
+    return session.scalar(
+        select(ReservationHold)
+        .where(ReservationHold.token == token, ReservationHold.expires_at > datetime.utcnow())
+        .with_for_update()
+    )
+
+
+def expire_statement(now, batch_size):
+    """
+    Build the ``DELETE`` reclaiming one chunk of expired holds
+
+    Args:
+        now (datetime): Current UTC time
+        batch_size (int): Maximum number of holds deleted by the statement
+
+    Returns:
+        Delete: Statement deleting the oldest expired holds, skipping locked rows
+    """
+    chunk = (
+        select(ReservationHold.id)
+        .where(ReservationHold.expires_at <= now)
+        .order_by(ReservationHold.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return delete(ReservationHold).where(ReservationHold.id.in_(chunk))
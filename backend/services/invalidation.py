@@ -0,0 +1,259 @@
+"""
+Cross-worker cache invalidation for the Café Fausse application
+
+In-process caches (the service schedule, kitchen pacing counters, ...) live
+in each gunicorn worker, so a change committed by one worker must reach the
+caches of every other worker and host. Mutation paths call ``invalidate``
+with an entity and an optional key (``'reservations'`` and a service day,
+``'schedule'``); it sends a ``NOTIFY`` in the same transaction, so the
+message goes out exactly when the change commits, and the worker's own
+caches are invalidated right after its commit. Every worker's ``LISTEN``
+connection (see ``services/listener.py``) receives the message and bumps the
+entity's (or key's) version.
+
+Caches do not keep lists of entries to evict. They store the ``token`` of
+the entity and key next to each entry and only use an entry while the token
+is unchanged. A token is taken before the data is loaded, so a change that
+commits while a worker is still loading invalidates the entry it is about to
+store. The token also includes the listener's epoch and is None while the
+listener is down or has not been heard from within two
+``INVALIDATION_HEARTBEAT_SECONDS``, during which caches read through to the
+database. Notifications lost to a dropped connection therefore never leave a
+stale entry in use: an entry can outlive its data by at most the
+notification delay while connected, and by two heartbeats otherwise.
+
+With ``INVALIDATION_BUS_ENABLED`` off, tokens only change on the worker's
+own commits, and changes made by other workers are left to the caches' own
+expiry times.
+"""
+import json
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .listener import get_listener
+
+CHANNEL = 'cache_invalidation'
+
+# Start of the tokens handed out when the bus is disabled
+STATIC_TOKEN = ('static',)
+
+
+class EntityVersions:
+    """
+    Versions of the cached entities of one worker
+
+    Each entity has a version for the whole entity, one per key and a count
+    of every change to it. The token of a key changes when the key or the
+    whole entity is invalidated; the token of the entity itself changes on
+    any invalidation, so a cache built from all of an entity's entries can
+    depend on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def evict(self, entity, key=None):
+        """
+        Invalidate this worker's cached copies of an entity
+
+        Args:
+            entity (str): Cached entity, e.g. ``'reservations'``
+            key (str, optional): Entry of the entity; None invalidates all of them
+        """
+        with self._lock:
+            versions = self._versions.setdefault(entity, [0, {}, 0])
+            if key is None:
+                versions[0] += 1
+            else:
+                versions[1][key] = versions[1].get(key, 0) + 1
+            versions[2] += 1
+
+    def _version(self, entity, key):
+        with self._lock:
+            whole, keys, changes = self._versions.get(entity, (0, {}, 0))
+            return whole, changes if key is None else keys.get(key, 0)
+
+
+class InvalidationBus(EntityVersions):
+    """
+    Versions of the cached entities of one worker, bumped by notifications
+
+    Attributes:
+        listener (PgListener): The worker's LISTEN connection
+    """
+
+    def __init__(self, listener):
+        super().__init__()
+        self.listener = listener
+        listener.add_channel(CHANNEL, self._receive)
+
+    def _receive(self, payload):
+        message = json.loads(payload)
+        # This worker already invalidated its caches when it committed
+        if message['origin'] != self.listener.origin:
+            self.evict(message['entity'], message['key'])
+
+    def token(self, entity, key=None):
+        """
+        Current version of an entity entry, to store with a cached copy
+
+        Args:
+            entity (str): Cached entity
+            key (str, optional): Entry of the entity; None for the entity as a whole
+
+        Returns:
+            tuple: Token equal to later tokens until the entry changes, or None
+                when the listener cannot vouch for freshness
+        """
+        if not self.listener.healthy:
+            return None
+        return (self.listener.epoch,) + self._version(entity, key)
+
+    def publish(self, session, entity, key=None):
+        """
+        Send an invalidation, delivered when the session's transaction commits
+
+        Args:
+            session (Session): Session whose transaction makes the change
+            entity (str): Changed entity
+            key (str, optional): Changed entry; None for the whole entity
+        """
+        payload = json.dumps({'origin': self.listener.origin, 'entity': entity, 'key': key})
+        session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+class DisabledBus(EntityVersions):
+    """
+    Stand-in used when ``INVALIDATION_BUS_ENABLED`` is off: only the worker's
+    own commits invalidate its caches
+
+    Attributes:
+        pid (int): Process owning the versions
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pid = os.getpid()
+
+    def token(self, entity, key=None):
+        return STATIC_TOKEN + self._version(entity, key)
+
+    def publish(self, session, entity, key=None):
+        pass
+
+
+_lock = threading.Lock()
+
+
+def get_invalidation_bus():
+    """
+    Get the invalidation bus of the current application, starting it if needed
+
+    Returns:
+        InvalidationBus: The application's bus in this process, or a
+            ``DisabledBus`` when the bus is switched off
+    """
+    app = current_app._get_current_object()
+    bus = app.extensions.get('invalidation_bus')
+    if not app.config['INVALIDATION_BUS_ENABLED']:
+        if not isinstance(bus, DisabledBus) or bus.pid != os.getpid():
+            with _lock:
+                bus = app.extensions.get('invalidation_bus')
+                if not isinstance(bus, DisabledBus) or bus.pid != os.getpid():
+                    bus = DisabledBus()
+                    app.extensions['invalidation_bus'] = bus
+        return bus
+    if not isinstance(bus, InvalidationBus) or bus.listener.pid != os.getpid():
+        listener = get_listener()
+        with _lock:
+            bus = app.extensions.get('invalidation_bus')
+            if not isinstance(bus, InvalidationBus) or bus.listener is not listener:
+                bus = InvalidationBus(listener)
+                app.extensions['invalidation_bus'] = bus
+    return bus
+
+
+def cache_token(entity, key=None):
+    """
+    Token of an entity entry on the current application's bus
+
+    Args:
+        entity (str): Cached entity
+        key (object, optional): Entry of the entity (dates are keyed by their ISO form)
+
+    Returns:
+        tuple: The entry's current token, or None when caching is not safe
+    """
+    return get_invalidation_bus().token(entity, normalize_key(key))
+
+
+def normalize_key(key):
+    """
+    Turn a cache key into the string form sent in notifications
+
+    Args:
+        key (object): Key such as a date or an integer ID, or None
+
+    Returns:
+        str: The key as text, or None
+    """
+    if key is None:
+        return None
+    return key.isoformat() if hasattr(key, 'isoformat') else str(key)
+
+
+def invalidate(session, entity, key=None, local=True):
+    """
+    Invalidate an entity entry in every worker once the transaction commits
+
+    Args:
+        session (Session): Session whose transaction makes the change
+        entity (str): Changed entity
+        key (object, optional): Changed entry; None for the whole entity
+        local (bool): Also invalidate this worker's caches after the commit;
+            pass False when the caller updates its own cache in place
+    """
+    bus = get_invalidation_bus()
+    key = normalize_key(key)
+    bus.publish(session, entity, key)
+    if 'batch_invalidations' in session.info:
+        # The session only commits a savepoint of a batch's transaction; the
+        # batch evicts these, in-place updates included, once it ends (see api/batch.py)
+        session.info['batch_invalidations'].append((bus, entity, key))
+    elif local:
+        session.info.setdefault('pending_invalidations', []).append((bus, entity, key))
+
+
+def after_commit(session, action, *args):
+    """
+    Run a side effect of a change once the change is committed for good
+
+    Called after the session commits. In an atomic batch that commit only
+    releases a savepoint, so the action is queued and run when the batch's
+    transaction commits, or dropped with the batch (see ``api/batch.py``).
+
+    Args:
+        session (Session): Session that committed the change
+        action (callable): Side effect, e.g. ``announce_promotions``
+        *args: Arguments of the action
+    """
+    if 'batch_actions' in session.info:
+        session.info['batch_actions'].append((action, args))
+    else:
+        action(*args)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_invalidations(session):
+    for bus, entity, key in session.info.pop('pending_invalidations', ()):
+        bus.evict(entity, key)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _drop_pending_invalidations(session, previous_transaction):
+    session.info.pop('pending_invalidations', None)
@@ -0,0 +1,194 @@
+"""
+Shared PostgreSQL LISTEN connection for the Café Fausse application
+
+Each worker process holds a single ``LISTEN`` connection to the primary per
+application, on a background thread, and dispatches every notification to
+the handlers registered for its channel: the reservation change feed (see
+``services/change_feed.py``) and the cache invalidation bus (see
+``services/invalidation.py``).
+
+The thread checks that the connection is alive every
+``INVALIDATION_HEARTBEAT_SECONDS`` while it is idle, and reconnects after any
+error. Notifications sent while it was disconnected are lost, so every
+(re)connection starts a new ``epoch`` and the registered reconnect handlers
+are told, letting consumers discard whatever the lost messages would have
+changed.
+"""
+import os
+import threading
+import time as clock
+import uuid
+from select import select as wait_readable
+
+from flask import current_app
+
+from ..extensions import db
+
+# Seconds between reconnection attempts of a dropped LISTEN connection
+RECONNECT_SECONDS = 1.0
+
+
+class PgListener:
+    """
+    Single LISTEN connection of one worker, dispatching by channel
+
+    Attributes:
+        pid (int): Process owning the listener thread
+        origin (str): Identifies this process in the notifications it sends
+        heartbeat (float): Seconds of silence after which the connection is checked
+        epoch (int): Number of connections made so far; changes on every reconnect
+        connected (bool): Whether the LISTEN connection is currently up
+    """
+
+    def __init__(self, app, engine, heartbeat):
+        self.app = app
+        self.engine = engine
+        self.pid = os.getpid()
+        self.origin = uuid.uuid4().hex[:12]
+        self.heartbeat = heartbeat
+        self.epoch = 0
+        self.connected = False
+        self._last_contact = 0.0
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._reconnect_handlers = []
+        self._listening = {}
+        self._pending = set()
+        self._closed = False
+        self._wake_read, self._wake_write = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='pg-listener', daemon=True)
+        self._thread.start()
+
+    def add_channel(self, channel, handler, on_reconnect=None):
+        """
+        Register a handler for the notifications of a channel
+
+        Args:
+            channel (str): Notification channel
+            handler (callable): Called with each notification's payload string
+            on_reconnect (callable, optional): Called with the new epoch after a
+                reconnection, when notifications may have been lost
+        """
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+            if on_reconnect:
+                self._reconnect_handlers.append(on_reconnect)
+            self._listening.setdefault(channel, threading.Event())
+            self._pending.add(channel)
+        os.write(self._wake_write, b'.')
+
+    def wait_until_listening(self, channel, timeout=5.0):
+        """
+        Block until the connection listens on a registered channel
+
+        Args:
+            channel (str): Notification channel
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: True once the channel is listened on
+        """
+        return self._listening[channel].wait(timeout)
+
+    @property
+    def healthy(self):
+        """
+        bool: Whether the connection is up and was heard from within two heartbeats
+        """
+        return self.connected and clock.monotonic() - self._last_contact <= 2 * self.heartbeat
+
+    def _connect(self):
+        connection = self.engine.raw_connection()
+        driver = connection.driver_connection
+        driver.autocommit = True
+        with self._lock:
+            self._pending = set(self._handlers)
+        return connection, driver
+
+    def _listen_pending(self, driver):
+        with self._lock:
+            channels, self._pending = self._pending, set()
+        with driver.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f'LISTEN {channel}')
+        for channel in channels:
+            self._listening[channel].set()
+
+    def _dispatch(self, driver):
+        while driver.notifies:
+            notification = driver.notifies.pop(0)
+            for handler in list(self._handlers.get(notification.channel, ())):
+                try:
+                    handler(notification.payload)
+                except Exception as e:
+                    self.app.logger.error(f'Notification handler failed on {notification.channel}: {str(e)}')
+
+    def _run(self):
+        while not self._closed:
+            try:
+                connection, driver = self._connect()
+                self._listen_pending(driver)
+            except Exception as e:
+                self.app.logger.error(f'Cannot listen for notifications: {str(e)}')
+                clock.sleep(RECONNECT_SECONDS)
+                continue
+
+            self.epoch += 1
+            self._last_contact = clock.monotonic()
+            self.connected = True
+            if self.epoch > 1:
+                for handler in list(self._reconnect_handlers):
+                    handler(self.epoch)
+            try:
+                while not self._closed:
+                    readable, _, _ = wait_readable([driver, self._wake_read], [], [], self.heartbeat)
+                    if self._wake_read in readable:
+                        os.read(self._wake_read, 1024)
+                        self._listen_pending(driver)
+                    if driver in readable:
+                        driver.poll()
+                    elif not readable:
+                        # Idle: make sure the connection is still there
+                        with driver.cursor() as cursor:
+                            cursor.execute('SELECT 1')
+                    self._last_contact = clock.monotonic()
+                    self._dispatch(driver)
+            except Exception as e:
+                if not self._closed:
+                    self.app.logger.error(f'Notification connection lost: {str(e)}')
+            finally:
+                self.connected = False
+                connection.invalidate()
+
+    def close(self):
+        """
+        Stop listening and release the connection
+        """
+        if self._closed:
+            return
+        self._closed = True
+        os.write(self._wake_write, b'.')
+        self._thread.join(timeout=self.heartbeat + RECONNECT_SECONDS)
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+
+_lock = threading.Lock()
+
+
+def get_listener():
+    """
+    Get the LISTEN connection of the current application, starting it if needed
+
+    Returns:
+        PgListener: The application's listener in this process
+    """
+    app = current_app._get_current_object()
+    listener = app.extensions.get('pg_listener')
+    if listener is None or listener.pid != os.getpid():
+        with _lock:
+            listener = app.extensions.get('pg_listener')
+            if listener is None or listener.pid != os.getpid():
+                listener = PgListener(app, db.engine, app.config['INVALIDATION_HEARTBEAT_SECONDS'])
+                app.extensions['pg_listener'] = listener
+    return listener
@@ -0,0 +1,116 @@
+"""
+Guest notifications for the Café Fausse application
+
+Notifications (such as a waitlisted party being given a table) are sent from
+a background thread so request handlers never wait on a mail server. Each
+worker process owns one queue and one sender thread per application.
+
+The sender is a plain callable ``sender(recipient, subject, body)``. Without
+``NOTIFICATION_SENDER`` configured, messages are written to the application
+log; set it to a dotted path (``package.module:function``) to deliver them
+through a real mail or SMS gateway.
+"""
+import os
+import queue
+import threading
+from importlib import import_module
+
+from flask import current_app
+
+
+def log_sender(app):
+    """
+    Build the default sender that writes notifications to the application log
+
+    Args:
+        app (Flask): The Flask application instance
+
+    Returns:
+        callable: Sender logging each message
+    """
+    def send(recipient, subject, body):
+        app.logger.info(f'Notification to {recipient}: {subject} - {body}')
+    return send
+
+
+def load_sender(app):
+    """
+    Resolve the configured sender of an application
+
+    Args:
+        app (Flask): The Flask application instance
+
+    Returns:
+        callable: The configured sender, or the log sender
+    """
+    path = app.config.get('NOTIFICATION_SENDER')
+    if not path:
+        return log_sender(app)
+    module, _, name = path.partition(':')
+    return getattr(import_module(module), name)
+
+
+class Notifier:
+    """
+    Background queue delivering notifications for one application
+
+    Attributes:
+        sender (callable): Function delivering one message
+        pid (int): Process owning the sender thread
+    """
+
+    def __init__(self, app, sender):
+        self.app = app
+        self.sender = sender
+        self.pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            recipient, subject, body = self._queue.get()
+            try:
+                self.sender(recipient, subject, body)
+            except Exception as e:
+                self.app.logger.error(f'Failed to notify {recipient}: {str(e)}')
+            finally:
+                self._queue.task_done()
+
+    def send(self, recipient, subject, body):
+        """
+        Queue a notification without waiting for its delivery
+
+        Args:
+            recipient (str): Email address or phone number
+            subject (str): Short subject line
+            body (str): Message text
+        """
+        self._queue.put((recipient, subject, body))
+
+    def join(self):
+        """
+        Block until every queued notification has been handled
+        """
+        self._queue.join()
+
+
+_lock = threading.Lock()
+
+
+def get_notifier():
+    """
+    Get the notifier of the current application, starting it if needed
+
+    Returns:
+        Notifier: The application's notification queue in this process
+    """
+    app = current_app._get_current_object()
+    notifier = app.extensions.get('notifier')
+    if notifier is None or notifier.pid != os.getpid():
+        with _lock:
+            notifier = app.extensions.get('notifier')
+            if notifier is None or notifier.pid != os.getpid():
+                notifier = Notifier(app, load_sender(app))
+                app.extensions['notifier'] = notifier
+    return notifier
@@ -0,0 +1,216 @@
+"""
+Table occupancy loader for the Café Fausse application
+
+Builds the ``SeatingPlan`` and kitchen arrival counter (see
+``services/pacing.py``) of one service day from the tables and the active
+reservations in the database, in a single pass over the day's bookings. Each
+booking holds its tables for the sitting length of its party size (see
+``services/schedule.py``). Unexpired holds taken during the booking flow (see
+``services/holds.py``) count exactly like bookings, and capacity blocks
+(private events, buyouts) occupy their tables for their whole window. Both
+the synchronous booking path and the async availability check use the same
+statements, so they always agree on which tables are free.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func, select
+
+from ..extensions import async_db
+from ..models.capacity_block import CapacityBlock
+from ..models.reservation import ACTIVE_STATUSES, Reservation
+from ..models.reservation_hold import ReservationHold
+from ..models.table import Table
+from .pacing import DayCovers, build_covers, minute_of_day
+from .seating import SeatingPlan, TableSpec
+
+# First key of the advisory locks serialising bookings per service day
+BOOKING_LOCK_NAMESPACE = 31031
+
+DayOccupancy = namedtuple('DayOccupancy', ['plan', 'covers'])
+
+
+def day_window(time_slot, duration):
+    """
+    Time window whose bookings can occupy a table on a service day
+
+    Args:
+        time_slot (datetime): Any time on the service day
+        duration (timedelta): Length of the longest sitting
+
+    Returns:
+        tuple: (start, end) datetimes bounding the bookings to load
+    """
+    day_start = datetime.combine(time_slot.date(), time.min)
+    return day_start - duration, day_start + timedelta(days=1)
+
+
+def tables_query():
+    """
+    Build the query selecting the tables in service
+
+    Returns:
+        Select: Statement returning (number, capacity, section, combinable) rows
+    """
+    return select(Table.number, Table.capacity, Table.section, Table.combinable).where(Table.is_active.is_(True))
+
+
+def occupancy_query(window_start, window_end):
+    """
+    Build the query selecting the active bookings starting inside a window
+
+    Args:
+        window_start (datetime): Earliest start time to load (exclusive)
+        window_end (datetime): Latest start time to load (exclusive)
+
+    Returns:
+        Select: Statement returning (table_number, extra_tables, time_slot, guests) rows
+    """
+    return select(
+        Reservation.table_number, Reservation.extra_tables, Reservation.time_slot, Reservation.guests
+    ).where(
+        Reservation.status.in_(ACTIVE_STATUSES),
+        Reservation.time_slot > window_start,
+        Reservation.time_slot < window_end
+    )
+
+
+def holds_query(window_start, window_end, now):
+    """
+    Build the query selecting the unexpired holds starting inside a window
+
+    Args:
+        window_start (datetime): Earliest start time to load (exclusive)
+        window_end (datetime): Latest start time to load (exclusive)
+        now (datetime): Current UTC time; holds expiring by then are ignored
+
+    Returns:
+        Select: Statement returning rows shaped like ``occupancy_query``
+    """
+    return select(
+        ReservationHold.table_number, ReservationHold.extra_tables, ReservationHold.time_slot, ReservationHold.guests
+    ).where(
+        ReservationHold.expires_at > now,
+        ReservationHold.time_slot > window_start,
+        ReservationHold.time_slot < window_end
+    )
+
+
+def blocks_query(window_start, window_end):
+    """
+    Build the query selecting the capacity blocks overlapping a window
+
+    The ``&&`` overlap test on the generated ``period`` range is answered by
+    the GiST index ``ix_capacity_blocks_period``.
+
+    Args:
+        window_start (datetime): Start of the window
+        window_end (datetime): End of the window
+
+    Returns:
+        Select: Statement returning (table_numbers, starts_at, ends_at, guests) rows
+    """
+    return select(
+        CapacityBlock.table_numbers, CapacityBlock.starts_at, CapacityBlock.ends_at, CapacityBlock.guests
+    ).where(CapacityBlock.period.op('&&')(func.tsrange(window_start, window_end)))
+
+
+def build_plan(table_rows, booking_rows, schedule):
+    """
+    Build a seating plan from loaded table and booking rows
+
+    Args:
+        table_rows (iterable): Rows from ``tables_query``
+        booking_rows (iterable): Rows from ``occupancy_query``
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+
+    Returns:
+        SeatingPlan: Plan with every loaded booking marked as occupied
+    """
+    plan = SeatingPlan([TableSpec(*row) for row in table_rows])
+    for table_number, extra_tables, time_slot, guests in booking_rows:
+        plan.book([table_number, *(extra_tables or [])], time_slot, time_slot + schedule.held_for(guests))
+    return plan
+
+
+def build_day(time_slot, table_rows, booking_rows, schedule, block_rows=()):
+    """
+    Build the occupancy of a service day from loaded rows
+
+    Args:
+        time_slot (datetime): Any time on the service day
+        table_rows (iterable): Rows from ``tables_query``
+        booking_rows (list): Rows from ``occupancy_query`` and ``holds_query``
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+        block_rows (iterable): Rows from ``blocks_query``
+
+    Returns:
+        DayOccupancy: The day's seating plan and kitchen arrival counter
+    """
+    plan = build_plan(table_rows, booking_rows, schedule)
+    covers = build_covers(booking_rows).get(time_slot.date()) or DayCovers()
+    for table_numbers, starts_at, ends_at, guests in block_rows:
+        plan.book(table_numbers or list(plan.tables), starts_at, ends_at)
+        if guests and starts_at.date() == time_slot.date():
+            covers.add(minute_of_day(starts_at), guests)
+    return DayOccupancy(plan, covers)
+
+
+def load_day(session, time_slot, schedule):
+    """
+    Load the occupancy of a service day through a synchronous session
+
+    Args:
+        session (Session): Session to query with
+        time_slot (datetime): Any time on the service day
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+
+    Returns:
+        DayOccupancy: The day's seating plan and kitchen arrival counter
+    """
+    window_start, window_end = day_window(time_slot, schedule.longest_duration)
+    return build_day(
+        time_slot,
+        session.execute(tables_query()).all(),
+        session.execute(occupancy_query(window_start, window_end)).all()
+        + session.execute(holds_query(window_start, window_end, datetime.utcnow())).all(),
+        schedule,
+        session.execute(blocks_query(window_start, window_end + schedule.longest_duration)).all()
+    )
+
+
+async def load_day_async(time_slot, schedule):
+    """
+    Load the occupancy of a service day on the async read engine
+
+    Args:
+        time_slot (datetime): Any time on the service day
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+
+    Returns:
+        DayOccupancy: The day's seating plan and kitchen arrival counter
+    """
+    window_start, window_end = day_window(time_slot, schedule.longest_duration)
+    return build_day(
+        time_slot,
+        await async_db.execute(tables_query()),
+        await async_db.execute(occupancy_query(window_start, window_end))
+        + await async_db.execute(holds_query(window_start, window_end, datetime.utcnow())),
+        schedule,
+        await async_db.execute(blocks_query(window_start, window_end + schedule.longest_duration))
+    )
+
+
+def lock_service_day(session, time_slot):
+    """
+    Serialise table assignment for one service day
+
+    Takes a transaction-scoped advisory lock so two concurrent bookings for
+    the same day cannot be given the same table. Bookings for other days do
+    not wait.
+
+    Args:
+        session (Session): Session whose transaction holds the lock
+        time_slot (datetime): Any time on the service day
+    """
+    session.execute(select(func.pg_advisory_xact_lock(BOOKING_LOCK_NAMESPACE, time_slot.date().toordinal())))
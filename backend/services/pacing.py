@@ -0,0 +1,262 @@
+"""
+Kitchen pacing for the Café Fausse application
+
+The kitchen can only start so many covers at once, so on top of free tables a
+booking needs room in every ``KITCHEN_PACING_INTERVAL_MINUTES`` window around
+its arrival: no window may see more than ``KITCHEN_MAX_COVERS_PER_INTERVAL``
+guests arriving.
+
+Arrivals of a service day are kept in a ``DayCovers`` Fenwick tree over the
+minutes of the day, so adding or removing a booking and summing any window
+are O(log n). Each application keeps the counters of recently used days and
+updates them incrementally when a reservation is created or canceled in this
+worker. Reservation and capacity block changes committed by other workers
+invalidate the day's counter through the invalidation bus (see
+``services/invalidation.py``); counters also expire after
+``KITCHEN_PACING_CACHE_SECONDS``, which bounds the effect of changes that are
+not announced, such as holds. Availability checks use a fresh counter to turn
+away parties the kitchen has no room for without loading the day's occupancy,
+and store the counter of every day they do load. The booking path always
+rebuilds the day from the rows it has just loaded under the day lock, so the
+cap itself is never exceeded.
+"""
+import threading
+import time as clock
+
+from flask import current_app
+
+from .invalidation import cache_token
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class DayCovers:
+    """
+    Guests arriving per minute of one service day, as a Fenwick tree
+
+    Attributes:
+        total (int): Guests arriving over the whole day
+    """
+
+    def __init__(self):
+        self._tree = [0] * (MINUTES_PER_DAY + 1)
+        self.total = 0
+
+    def add(self, minute, guests):
+        """
+        Record guests arriving at a minute of the day (negative to remove)
+
+        Args:
+            minute (int): Minutes since midnight
+            guests (int): Number of guests
+        """
+        self.total += guests
+        index = minute + 1
+        while index <= MINUTES_PER_DAY:
+            self._tree[index] += guests
+            index += index & -index
+
+    def _prefix(self, minute):
+        # Guests arriving from midnight up to and including ``minute``
+        total = 0
+        index = min(minute, MINUTES_PER_DAY - 1) + 1
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def window(self, start, width):
+        """
+        Guests arriving in the window of ``width`` minutes starting at ``start``
+
+        Args:
+            start (int): First minute of the window
+            width (int): Window length in minutes
+
+        Returns:
+            int: Number of arriving guests
+        """
+        end = start + width - 1
+        if end < 0:
+            return 0
+        return self._prefix(end) - (self._prefix(start - 1) if start > 0 else 0)
+
+    def busiest_window(self, minute, width):
+        """
+        Largest arrival count of any window containing a given minute
+
+        Args:
+            minute (int): Minutes since midnight
+            width (int): Window length in minutes
+
+        Returns:
+            int: Guests arriving in the busiest window around the minute
+        """
+        return max(self.window(start, width) for start in range(minute - width + 1, minute + 1))
+
+    def fits(self, minute, guests, width, cap):
+        """
+        Check whether a party can arrive without breaking the pacing cap
+
+        Args:
+            minute (int): Arrival in minutes since midnight
+            guests (int): Party size
+            width (int): Window length in minutes
+            cap (int): Maximum guests arriving per window; falsy disables pacing
+
+        Returns:
+            bool: True when every window containing the arrival stays within the cap
+        """
+        return not cap or self.busiest_window(minute, width) + guests <= cap
+
+
+def minute_of_day(time_slot):
+    """
+    Minutes since midnight of a datetime
+
+    Args:
+        time_slot (datetime): Arrival time
+
+    Returns:
+        int: Minute of the day
+    """
+    return time_slot.hour * 60 + time_slot.minute
+
+
+def build_covers(booking_rows):
+    """
+    Build the arrival counter of a day from occupancy rows
+
+    Args:
+        booking_rows (iterable): Rows from ``occupancy_query``; only the
+            ``time_slot`` and ``guests`` columns are used
+
+    Returns:
+        dict: DayCovers keyed by the date of the arrivals
+    """
+    days = {}
+    for row in booking_rows:
+        days.setdefault(row.time_slot.date(), DayCovers()).add(minute_of_day(row.time_slot), row.guests)
+    return days
+
+
+class PacingCache:
+    """
+    Recently used DayCovers of one application, updated incrementally
+
+    Attributes:
+        ttl (float): Seconds a day's counter is trusted before it is rebuilt
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._days = {}
+
+    def get(self, day):
+        """
+        Get a fresh counter for a day
+
+        Args:
+            day (date): Service day
+
+        Returns:
+            DayCovers: The cached counter, or None when missing, expired or
+                changed by another worker
+        """
+        entry = self._days.get(day)
+        if entry and entry[1] > clock.monotonic() and entry[2] is not None and entry[2] == day_tokens(day):
+            return entry[0]
+        return None
+
+    def put(self, day, covers, tokens=None):
+        """
+        Store the counter of a day
+
+        Args:
+            day (date): Service day
+            covers (DayCovers): Counter built from the database
+            tokens (tuple, optional): ``day_tokens`` taken before the rows were
+                loaded; defaults to the current ones
+        """
+        tokens = tokens or day_tokens(day)
+        with self._lock:
+            self._days[day] = (covers, clock.monotonic() + self.ttl, tokens)
+            # Drop expired days so the cache only holds days in active use
+            now = clock.monotonic()
+            for stale in [key for key, (_, expires, _) in self._days.items() if expires <= now]:
+                del self._days[stale]
+
+    def record(self, time_slot, guests):
+        """
+        Apply a booking change to the cached counter of its day, if any
+
+        Args:
+            time_slot (datetime): Arrival time of the booking
+            guests (int): Guests added, negative when a booking is released
+        """
+        with self._lock:
+            entry = self._days.get(time_slot.date())
+            if entry:
+                entry[0].add(minute_of_day(time_slot), guests)
+
+    def forget(self, day):
+        """
+        Drop the counter of a day so it is rebuilt on next use
+
+        Args:
+            day (date): Service day
+        """
+        with self._lock:
+            self._days.pop(day, None)
+
+
+def day_tokens(day):
+    """
+    Invalidation tokens of everything a day's counter is built from
+
+    Args:
+        day (date): Service day
+
+    Returns:
+        tuple: Tokens of the day's reservations and capacity blocks, or None
+            when the invalidation bus cannot vouch for them
+    """
+    tokens = (cache_token('reservations', day), cache_token('capacity_blocks', day))
+    return None if None in tokens else tokens
+
+
+def get_pacing_cache():
+    """
+    Get the pacing cache of the current application
+
+    Returns:
+        PacingCache: The application's cache of day counters
+    """
+    cache = current_app.extensions.get('kitchen_pacing')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'kitchen_pacing', PacingCache(current_app.config['KITCHEN_PACING_CACHE_SECONDS'])
+        )
+    return cache
+
+
+def pacing_allows(covers, time_slot, guests):
+    """
+    Check a party against the configured pacing cap
+
+    Args:
+        covers (DayCovers): Arrivals of the booking's day
+        time_slot (datetime): Requested arrival time
+        guests (int): Party size
+
+    Returns:
+        bool: True when the kitchen can take the party at that time
+    """
+    config = current_app.config
+    return covers.fits(
+        minute_of_day(time_slot),
+        guests,
+        config['KITCHEN_PACING_INTERVAL_MINUTES'],
+        config['KITCHEN_MAX_COVERS_PER_INTERVAL']
+    )
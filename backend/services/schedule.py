@@ -0,0 +1,228 @@
+"""
+Service schedule and slot generator for the Café Fausse application
+
+Turns the schedule tables (service periods, blackout dates and sitting length
+by party size) into a ``ServiceSchedule`` answering the questions every
+availability path asks: is this a bookable time, which times can be booked on
+a day, and how long does a party of N hold its table. A time is only bookable
+for a party whose sitting ends by the closing time of its service period, so
+late seatings are trimmed for larger parties.
+
+Bookable times are precomputed per weekday when the schedule is loaded and
+the slots of each requested day are memoised, so validating a request is a
+set lookup. The loaded schedule is kept in the ``schedule`` cache namespace
+(in process memory, as it memoises with ``lru_cache``) for
+``SCHEDULE_CACHE_SECONDS``. Code editing the schedule tables calls
+``invalidate(session, 'schedule')`` in its transaction so every worker
+reloads after the commit (see ``services/invalidation.py``);
+``invalidate_schedule`` drops this worker's copy only.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db_routing import get_read_engine
+from ..extensions import cache
+from ..models.schedule import BlackoutDate, PartyDuration, ServicePeriod
+
+schedule_cache = cache.namespace('schedule', ttl='SCHEDULE_CACHE_SECONDS', entities=('schedule',), local=True)
+
+
+class ServiceSchedule:
+    """
+    Bookable times and sitting lengths derived from the schedule tables
+
+    Attributes:
+        blackouts (frozenset): Dates on which nothing can be booked
+        longest_duration (timedelta): Longest sitting of any party size
+    """
+
+    def __init__(self, periods, blackouts, durations, cached_days=512):
+        """
+        Args:
+            periods (iterable): (weekday, opens_at, last_seating, closes_at, slot_minutes) tuples
+            blackouts (iterable): Closed dates
+            durations (iterable): (min_guests, max_guests, minutes) tuples
+            cached_days (int): Number of days whose slots are memoised
+        """
+        times, closing = {}, {}
+        for weekday, opens_at, last_seating, closes_at, slot_minutes in periods:
+            current = datetime.combine(datetime.min.date(), opens_at)
+            last = datetime.combine(datetime.min.date(), last_seating)
+            # Closing at or before opening means the service runs past midnight
+            closes = datetime.combine(datetime.min.date(), closes_at) - datetime.min
+            if closes_at <= opens_at:
+                closes += timedelta(days=1)
+            while current <= last:
+                times.setdefault(weekday, set()).add(current.time())
+                closing.setdefault(weekday, {})[current.time()] = closes
+                current += timedelta(minutes=slot_minutes)
+        self._closing = closing
+        self._times = {weekday: tuple(sorted(values)) for weekday, values in times.items()}
+        self._time_sets = {weekday: frozenset(values) for weekday, values in times.items()}
+        self.blackouts = frozenset(blackouts)
+
+        bands = sorted((max_guests, min_guests, minutes) for min_guests, max_guests, minutes in durations)
+        self._band_limits = [max_guests for max_guests, _, _ in bands]
+        self._bands = bands
+        self.longest_duration = timedelta(minutes=max((minutes for _, _, minutes in bands), default=0))
+
+        self.slots_for = lru_cache(maxsize=cached_days)(self._slots_for)
+
+    def is_open(self, day):
+        """
+        Check whether any booking can be taken on a day
+
+        Args:
+            day (date): The day to check
+
+        Returns:
+            bool: False on blackout dates and weekdays without a service
+        """
+        return day not in self.blackouts and day.weekday() in self._times
+
+    def _slots_for(self, day):
+        if not self.is_open(day):
+            return ()
+        return tuple(datetime.combine(day, slot) for slot in self._times[day.weekday()])
+
+    def is_valid_slot(self, time_slot, guests=None):
+        """
+        Check whether a date and time is a bookable arrival time
+
+        Args:
+            time_slot (datetime): Requested arrival time
+            guests (int, optional): Party size; when given the party's sitting
+                must also end by the closing time of the service
+
+        Returns:
+            bool: True when the time is one of the day's slots
+        """
+        day = time_slot.date()
+        if day in self.blackouts or time_slot.time() not in self._time_sets.get(day.weekday(), ()):
+            return False
+        return guests is None or self.ends_before_close(time_slot, guests)
+
+    def closes_at(self, time_slot):
+        """
+        Closing time of the service a slot belongs to
+
+        Args:
+            time_slot (datetime): One of the day's slots
+
+        Returns:
+            datetime: When the service closes, None for times outside the schedule
+        """
+        closes = self._closing.get(time_slot.weekday(), {}).get(time_slot.time())
+        return None if closes is None else datetime.combine(time_slot.date(), datetime.min.time()) + closes
+
+    def ends_before_close(self, time_slot, guests):
+        """
+        Check whether a party arriving at a slot is finished by closing time
+
+        Args:
+            time_slot (datetime): One of the day's slots
+            guests (int): Party size
+
+        Returns:
+            bool: False when the sitting would run past the closing time
+        """
+        closes = self.closes_at(time_slot)
+        return closes is not None and time_slot + self.held_for(guests) <= closes
+
+    def seatings_for(self, day, guests):
+        """
+        Slots of a day at which a party can still be seated
+
+        Args:
+            day (date): The day to list
+            guests (int): Party size
+
+        Returns:
+            tuple: The day's slot datetimes whose sitting ends by closing time
+        """
+        return tuple(slot for slot in self.slots_for(day) if self.ends_before_close(slot, guests))
+
+    def duration_for(self, guests):
+        """
+        Length of the sitting for a party size
+
+        Args:
+            guests (int): Party size
+
+        Returns:
+            timedelta: How long the party holds its table
+
+        Raises:
+            ValueError: If no duration band covers the party size
+        """
+        index = bisect_left(self._band_limits, guests)
+        if index < len(self._bands):
+            _, min_guests, minutes = self._bands[index]
+            if guests >= min_guests:
+                return timedelta(minutes=minutes)
+        raise ValueError(f'No sitting length configured for {guests} guests')
+
+    def held_for(self, guests):
+        """
+        How long an existing booking holds its tables
+
+        Unlike ``duration_for`` this never fails: bookings made before the
+        current duration bands hold their tables for the longest sitting.
+
+        Args:
+            guests (int): Party size of the booking
+
+        Returns:
+            timedelta: Length of the booking's sitting
+        """
+        try:
+            return self.duration_for(guests)
+        except ValueError:
+            return self.longest_duration
+
+
+def load_schedule(session):
+    """
+    Load the service schedule from the database
+
+    Args:
+        session (Session): Session to query with
+
+    Returns:
+        ServiceSchedule: The schedule built from the schedule tables
+    """
+    return ServiceSchedule(
+        session.execute(select(
+            ServicePeriod.weekday, ServicePeriod.opens_at, ServicePeriod.last_seating, ServicePeriod.closes_at,
+            ServicePeriod.slot_minutes
+        )).all(),
+        session.scalars(select(BlackoutDate.date)).all(),
+        session.execute(select(PartyDuration.min_guests, PartyDuration.max_guests, PartyDuration.minutes)).all()
+    )
+
+
+@schedule_cache.cached(key=lambda: 'current')
+def get_schedule():
+    """
+    Get the cached service schedule of the current application
+
+    Returns:
+        ServiceSchedule: The schedule, reloaded every ``SCHEDULE_CACHE_SECONDS``
+        and after any announced change to the schedule tables
+    """
+    session = Session(get_read_engine())
+    try:
+        return load_schedule(session)
+    finally:
+        session.close()
+
+
+def invalidate_schedule():
+    """
+    Drop the cached schedule so the next request reloads it
+    """
+    schedule_cache.flush()
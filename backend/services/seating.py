@@ -0,0 +1,164 @@
+"""
+Seating engine for the Café Fausse application
+
+Assigns tables to a party for a time window by best fit. Each table keeps its
+bookings as a sorted list of non-overlapping intervals, so checking whether a
+table is free for a window is a binary search. A party is seated on:
+
+1. the single free table with the least spare seats, ties broken by the
+   table whose neighbouring bookings leave the least idle time around the new
+   one (interval scheduling: sittings are packed back to back), or
+2. when no single table is large enough, the combination of up to
+   ``max_combined`` free combinable tables of one section with the least spare
+   seats (bin packing), then the fewest tables.
+
+The engine is pure Python and knows nothing about the database; see
+``services/occupancy.py`` for loading a plan from the reservations table.
+"""
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import timedelta
+from itertools import combinations
+
+TableSpec = namedtuple('TableSpec', ['number', 'capacity', 'section', 'combinable'])
+
+# Idle time counted for a side of a booking with no neighbouring booking
+OPEN_SLACK = timedelta(hours=12)
+
+
+class SeatingPlan:
+    """
+    Table occupancy for one service and the best-fit assignment on top of it
+
+    Attributes:
+        tables (dict): TableSpec objects keyed by table number
+        max_combined (int): Largest number of tables pushed together for one party
+    """
+
+    def __init__(self, tables, max_combined=3):
+        self.tables = {table.number: table for table in tables}
+        self.max_combined = max_combined
+        self._starts = {number: [] for number in self.tables}
+        self._ends = {number: [] for number in self.tables}
+
+    def book(self, table_numbers, start, end):
+        """
+        Mark tables as occupied for a time window
+
+        Unknown table numbers (e.g. a table taken out of service) are ignored.
+
+        Args:
+            table_numbers (iterable): Numbers of the tables to occupy
+            start (datetime): Start of the booking
+            end (datetime): End of the booking
+        """
+        for number in table_numbers:
+            if number not in self.tables:
+                continue
+            # Bookings on one table never overlap, so the n-th start and the
+            # n-th end belong to the same booking
+            insort(self._starts[number], start)
+            insort(self._ends[number], end)
+
+    def _neighbours(self, number, start, end):
+        # Index of the first booking starting at or after the window end
+        starts = self._starts[number]
+        index = bisect_left(starts, end)
+        previous_end = self._ends[number][index - 1] if index else None
+        next_start = starts[index] if index < len(starts) else None
+        return previous_end, next_start
+
+    def is_free(self, number, start, end):
+        """
+        Check whether a table is free for a whole time window
+
+        Args:
+            number (int): Table number
+            start (datetime): Start of the window
+            end (datetime): End of the window
+
+        Returns:
+            bool: True when no booking on the table overlaps the window
+        """
+        previous_end, _ = self._neighbours(number, start, end)
+        return previous_end is None or previous_end <= start
+
+    def _slack(self, number, start, end):
+        previous_end, next_start = self._neighbours(number, start, end)
+        before = start - previous_end if previous_end else OPEN_SLACK
+        after = next_start - end if next_start else OPEN_SLACK
+        return min(before, OPEN_SLACK) + min(after, OPEN_SLACK)
+
+    def free_tables(self, start, end):
+        """
+        List the tables free for a whole time window
+
+        Args:
+            start (datetime): Start of the window
+            end (datetime): End of the window
+
+        Returns:
+            list: TableSpec objects of the free tables
+        """
+        return [table for table in self.tables.values() if self.is_free(table.number, start, end)]
+
+    def best_fit(self, guests, start, end):
+        """
+        Find the best tables for a party without booking them
+
+        Args:
+            guests (int): Party size
+            start (datetime): Start of the booking
+            end (datetime): End of the booking
+
+        Returns:
+            tuple: Table numbers, largest first, or None when the party cannot be seated
+        """
+        free = self.free_tables(start, end)
+
+        singles = [table for table in free if table.capacity >= guests]
+        if singles:
+            best = min(singles, key=lambda table: (
+                table.capacity - guests, self._slack(table.number, start, end), table.number
+            ))
+            return (best.number,)
+
+        sections = {}
+        for table in free:
+            if table.combinable:
+                sections.setdefault(table.section, []).append(table)
+
+        best, best_key = None, None
+        for tables in sections.values():
+            # Largest tables first so the seat count bound prunes early
+            tables.sort(key=lambda table: (-table.capacity, table.number))
+            for size in range(2, min(self.max_combined, len(tables)) + 1):
+                if sum(table.capacity for table in tables[:size]) < guests:
+                    continue
+                for combo in combinations(tables, size):
+                    seats = sum(table.capacity for table in combo)
+                    if seats < guests:
+                        continue
+                    key = (seats - guests, size, tuple(table.number for table in combo))
+                    if best_key is None or key < best_key:
+                        best, best_key = combo, key
+        if best is None:
+            return None
+        return tuple(table.number for table in best)
+
+    def assign(self, guests, start, end):
+        """
+        Find the best tables for a party and book them
+
+        Args:
+            guests (int): Party size
+            start (datetime): Start of the booking
+            end (datetime): End of the booking
+
+        Returns:
+            tuple: Assigned table numbers, or None when the party cannot be seated
+        """
+        tables = self.best_fit(guests, start, end)
+        if tables:
+            self.book(tables, start, end)
+        return tables
@@ -0,0 +1,221 @@
+"""
+Standing (recurring) reservations for the Café Fausse application
+
+A standing reservation stores its recurrence rule once instead of a row per
+occurrence. Occurrences are expanded lazily: only those inside the booking
+horizon (``STANDING_RESERVATION_HORIZON_DAYS`` ahead) become ordinary
+reservations linked by ``standing_id``, and the horizon is rolled forward
+by ``flask reservations expand-standing`` (see ``jobs/reservations.py``).
+Storage therefore grows with the number of rules, not with how long they
+run, and every availability check, listing and status sweep sees the
+occurrences through the same reservations queries as any other booking.
+
+Each occurrence is seated under the day lock exactly like a new booking. An
+occurrence that cannot be seated (the room is full, a private event, a
+closed day) is skipped and the guest is told.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import or_, select
+
+from ..models.reservation import Reservation
+from ..models.standing_reservation import StandingReservation
+from .change_feed import publish_reservation
+from .invalidation import invalidate
+from .notifications import get_notifier
+from .occupancy import load_day, lock_service_day
+from .pacing import pacing_allows
+from .waitlist import promote_freed
+
+Expansion = namedtuple('Expansion', ['booked', 'skipped'])
+
+
+def parse_recurrence(recurrence, starts_at):
+    """
+    Parse and validate a recurrence rule
+
+    Args:
+        recurrence (str): RFC 5545 RRULE, e.g. ``FREQ=WEEKLY``
+        starts_at (datetime): First occurrence
+
+    Returns:
+        rrule: The rule anchored at ``starts_at``
+
+    Raises:
+        ValueError: If the rule is malformed or repeats more than once a day
+    """
+    rule = rrulestr(recurrence, dtstart=starts_at)
+    following = rule.after(starts_at)
+    if following is not None and following - starts_at < timedelta(days=1):
+        raise ValueError('A standing reservation repeats at most daily')
+    return rule
+
+
+def horizon_end(days, now=None):
+    """
+    End of the booking horizon in which occurrences are materialised
+
+    Args:
+        days (int): Days ahead covered by the horizon
+        now (datetime, optional): Reference time, defaults to now
+
+    Returns:
+        datetime: Midnight after the last day of the horizon
+    """
+    return datetime.combine((now or datetime.now()).date() + timedelta(days=days + 1), time.min)
+
+
+def occurrences(standing, after, until):
+    """
+    Occurrences of a standing reservation inside a window
+
+    Args:
+        standing (StandingReservation): The standing reservation
+        after (datetime): Start of the window (exclusive)
+        until (datetime): End of the window (inclusive)
+
+    Returns:
+        list: Occurrence datetimes in order
+    """
+    if standing.ends_on:
+        until = min(until, datetime.combine(standing.ends_on, time.max))
+    rule = parse_recurrence(standing.recurrence, standing.starts_at)
+    return [occurrence for occurrence in rule.between(after, until, inc=True) if occurrence > after]
+
+
+def expand_standing(session, schedule, standing, horizon, now=None):
+    """
+    Book the occurrences of a standing reservation up to the horizon
+
+    The caller commits. Occurrences already expanded are never booked
+    again, so a guest who cancels one occurrence keeps it canceled.
+
+    Args:
+        session (Session): Session whose transaction books the occurrences
+        schedule (ServiceSchedule): The service schedule
+        standing (StandingReservation): The standing reservation to expand
+        horizon (datetime): Expand occurrences up to this time
+        now (datetime, optional): Occurrences at or before this time are skipped
+
+    Returns:
+        Expansion: Reservations booked and occurrence times that could not be seated
+    """
+    now = now or datetime.now()
+    after = standing.expanded_until or standing.starts_at - timedelta(microseconds=1)
+    booked, skipped = [], []
+    if horizon <= after:
+        return Expansion(booked, skipped)
+
+    for occurrence in occurrences(standing, after, horizon):
+        if occurrence <= now:
+            continue
+        if not schedule.is_valid_slot(occurrence, standing.guests):
+            skipped.append(occurrence)
+            continue
+        end = occurrence + schedule.duration_for(standing.guests)
+        lock_service_day(session, occurrence)
+        day = load_day(session, occurrence, schedule)
+        tables = day.plan.best_fit(standing.guests, occurrence, end)
+        if not tables or not pacing_allows(day.covers, occurrence, standing.guests):
+            skipped.append(occurrence)
+            continue
+        reservation = Reservation(
+            customer_id=standing.customer_id,
+            time_slot=occurrence,
+            guests=standing.guests,
+            table_number=tables[0],
+            extra_tables=list(tables[1:]),
+            special_requests=standing.special_requests,
+            status='confirmed',
+            standing_id=standing.id
+        )
+        session.add(reservation)
+        publish_reservation(session, 'reservation.created', reservation)
+        invalidate(session, 'reservations', occurrence.date(), local=False)
+        booked.append(reservation)
+    standing.expanded_until = horizon
+    session.flush()
+    return Expansion(booked, skipped)
+
+
+def due_standing_query(horizon):
+    """
+    Build the query claiming the next standing reservation to expand
+
+    Args:
+        horizon (datetime): End of the booking horizon
+
+    Returns:
+        Select: Statement locking one lagging active rule, skipping rules being expanded elsewhere
+    """
+    return (
+        select(StandingReservation)
+        .where(
+            StandingReservation.is_active,
+            or_(StandingReservation.expanded_until.is_(None), StandingReservation.expanded_until < horizon)
+        )
+        .order_by(StandingReservation.expanded_until.nulls_first())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def cancel_standing(session, schedule, standing, now=None):
+    """
+    Stop a standing reservation and cancel its upcoming occurrences
+
+    The freed tables are offered to the waitlist in the same transaction; the
+    caller commits and passes the result to ``announce_promotions``.
+
+    Args:
+        session (Session): Session whose transaction performs the cancellation
+        schedule (ServiceSchedule): The service schedule
+        standing (StandingReservation): The standing reservation to stop
+        now (datetime, optional): Occurrences after this time are canceled
+
+    Returns:
+        tuple: (canceled (time_slot, guests) rows, Promotion tuples of
+            waitlisted parties given the freed tables)
+    """
+    standing.is_active = False
+    upcoming = session.scalars(
+        select(Reservation)
+        .where(
+            Reservation.standing_id == standing.id,
+            Reservation.time_slot > (now or datetime.now()),
+            Reservation.status == 'confirmed'
+        )
+        .order_by(Reservation.time_slot)
+        .with_for_update()
+    ).all()
+    canceled = []
+    for reservation in upcoming:
+        reservation.status = 'canceled'
+        publish_reservation(session, 'reservation.canceled', reservation)
+        invalidate(session, 'reservations', reservation.time_slot.date(), local=False)
+        canceled.append((reservation.time_slot, reservation.guests))
+    promotions = []
+    for time_slot, guests in canceled:
+        promotions += promote_freed(session, schedule, time_slot, guests)
+    return canceled, promotions
+
+
+def notify_skipped(customer, skipped):
+    """
+    Tell the guest which occurrences could not be seated
+
+    Args:
+        customer (Customer): Guest of the standing reservation
+        skipped (list): Occurrence datetimes that were not booked
+    """
+    if not skipped:
+        return
+    dates = ', '.join(f'{occurrence:%A %d %B}' for occurrence in skipped)
+    get_notifier().send(
+        customer.email,
+        'About your standing reservation at Café Fausse',
+        f'Dear {customer.name}, we are sorry but we could not hold your usual table on {dates}. '
+        f'Your other dates are unchanged.'
+    )
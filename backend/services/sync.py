@@ -0,0 +1,267 @@
+"""
+Delta sync for the Café Fausse application
+
+``GET /api/sync`` returns the reservations, customers, newsletter
+subscribers, menu categories and menu items changed since a client's last
+sync, plus the IDs of those deleted since (see ``models/sync_tombstone.py``),
+so the admin pages and offline clients refresh with payloads proportional to
+what changed. Rows are read along the ``updated_at`` index of each table in
+``(updated_at, id)`` order, at most ``SYNC_PAGE_SIZE`` per entity and request.
+
+The response carries an opaque cursor holding one position per entity, to
+send back as ``since``. ``updated_at`` is stamped before a transaction
+commits, so a row may become visible after rows stamped later. Positions
+therefore never pass the watermark: the start of the oldest transaction
+still writing on the primary, less ``SYNC_CLOCK_SKEW_SECONDS`` for the clock
+differences between hosts. Every row stamped before it is already visible;
+rows stamped after it may be sent again on the next sync, and clients apply
+changes as idempotent upserts.
+
+Changed rows are selected as plain rows with the default fields of each
+entity's fieldset (see ``serializers.py``), which match the models'
+``to_dict()`` payloads.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, text, tuple_
+
+from ..models.category import Category
+from ..models.customer import Customer
+from ..models.menu_item import MenuItem
+from ..models.newsletter import Newsletter
+from ..models.reservation import Reservation
+from ..models.sync_tombstone import SyncTombstone
+from ..serializers import category_fields, customer_fields, item_fields, reservation_fields, subscriber_fields
+
+# Synced entities by their name in requests and responses
+SYNCED_MODELS = {
+    'reservations': Reservation,
+    'customers': Customer,
+    'subscribers': Newsletter,
+    'categories': Category,
+    'menu_items': MenuItem
+}
+
+# Fieldset each entity's changes are selected and serialized with
+SYNCED_FIELDS = {
+    'reservations': reservation_fields,
+    'customers': customer_fields,
+    'subscribers': subscriber_fields,
+    'categories': category_fields,
+    'menu_items': item_fields
+}
+
+# Cursor position of the tombstones
+DELETED = 'deleted'
+
+# Start of the oldest transaction other than ours that has written anything, in UTC
+WATERMARK_QUERY = text("""
+    SELECT LEAST(timezone('utc', statement_timestamp()), min(timezone('utc', xact_start)))
+    FROM pg_stat_activity
+    WHERE backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+""")
+
+
+def watermark(session, skew_seconds):
+    """
+    Latest time before which every stamped change is visible
+
+    Args:
+        session (Session): Session on the primary
+        skew_seconds (float): Allowance for clock differences between hosts
+
+    Returns:
+        datetime: The watermark, in UTC
+    """
+    return session.execute(WATERMARK_QUERY).scalar_one() - timedelta(seconds=skew_seconds)
+
+
+def encode_cursor(positions):
+    """
+    Encode sync positions as an opaque cursor
+
+    Args:
+        positions (dict): ``(timestamp, id)`` position keyed by entity name
+
+    Returns:
+        str: URL-safe cursor
+    """
+    data = {name: [stamp.isoformat(), row_id] for name, (stamp, row_id) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_since(since, names):
+    """
+    Parse the ``since`` parameter of a sync request
+
+    Args:
+        since (str): A cursor from an earlier sync, an ISO 8601 timestamp
+            (naive values are UTC) or None for a full snapshot
+        names (list): Entity names requested
+
+    Returns:
+        dict: ``(timestamp, id)`` position keyed by entity name and ``DELETED``;
+            entities without a position are sent in full
+
+    Raises:
+        ValueError: If ``since`` is neither a cursor nor a timestamp
+    """
+    if not since:
+        return {}
+    try:
+        stamp = datetime.fromisoformat(since.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    else:
+        if stamp.tzinfo is not None:
+            stamp = stamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return {name: (stamp, 0) for name in [*names, DELETED]}
+
+    try:
+        data = json.loads(base64.urlsafe_b64decode(since + '=' * (-len(since) % 4)))
+        return {
+            name: (datetime.fromisoformat(data[name][0]), int(data[name][1]))
+            for name in [*names, DELETED] if name in data
+        }
+    except (binascii.Error, ValueError, TypeError, KeyError, IndexError, AttributeError):
+        raise ValueError('since must be a sync cursor or an ISO 8601 timestamp')
+
+
+def changes_query(fields, position, limit):
+    """
+    Build the query selecting the next rows of an entity changed after a position
+
+    Args:
+        fields (Fieldset): Fieldset of the synced entity; its default fields are selected
+        position (tuple): ``(updated_at, id)`` of the last row already synced, or None
+        limit (int): Maximum number of rows
+
+    Returns:
+        Select: Statement walking the ``updated_at`` index in ``(updated_at, id)`` order,
+            returning the default fields followed by ``updated_at`` as ``sync_stamp``
+    """
+    model = fields.model
+    # Not every payload has updated_at; the stamp trails the fields, so serializers ignore it
+    statement = fields.select(fields.default).add_columns(model.updated_at.label('sync_stamp'))
+    if position is not None:
+        # The plain range lets PostgreSQL use the index; the row comparison breaks ties
+        statement = statement.where(
+            model.updated_at >= position[0],
+            tuple_(model.updated_at, model.id) > tuple_(*position)
+        )
+    return statement.order_by(model.updated_at, model.id).limit(limit)
+
+
+def tombstones_query(position, tables, limit):
+    """
+    Build the query selecting the next tombstones after a position
+
+    Args:
+        position (tuple): ``(deleted_at, id)`` of the last tombstone already synced, or None
+        tables (list): Table names of the requested entities
+        limit (int): Maximum number of tombstones
+
+    Returns:
+        Select: Statement walking the ``deleted_at`` index
+    """
+    statement = select(SyncTombstone).where(SyncTombstone.entity.in_(tables))
+    if position is not None:
+        statement = statement.where(
+            SyncTombstone.deleted_at >= position[0],
+            tuple_(SyncTombstone.deleted_at, SyncTombstone.id) > tuple_(*position)
+        )
+    return statement.order_by(SyncTombstone.deleted_at, SyncTombstone.id).limit(limit)
+
+
+def _advance(position, rows, limit, mark, stamp):
+    # Next position after a page: past the rows sent, but never past the watermark
+    floor = (mark, 0) if position is None else max(position, (mark, 0))
+    if len(rows) > limit:
+        last = (stamp(rows[limit - 1]), rows[limit - 1].id)
+        if last < floor:
+            return last, True
+    # Whatever is left was stamped after the watermark and is sent on the next sync
+    return floor, False
+
+
+def sync_changes(session, positions, names, limit, skew_seconds):
+    """
+    Collect the changes and deletions after a set of positions
+
+    Args:
+        session (Session): Session on the primary
+        positions (dict): Positions from ``decode_since``
+        names (list): Entity names to sync
+        limit (int): Maximum rows per entity, and tombstones, in the response
+        skew_seconds (float): Allowance for clock differences between hosts
+
+    Returns:
+        dict: ``changes`` (serialised rows by entity), ``deleted`` (IDs by
+            entity), the next ``cursor`` and whether ``has_more`` pages are ready
+    """
+    mark = watermark(session, skew_seconds)
+    changes, deleted, following = {}, {}, {}
+    has_more = False
+
+    for name in names:
+        fields = SYNCED_FIELDS[name]
+        position = positions.get(name)
+        rows = session.execute(changes_query(fields, position, limit + 1)).all()
+        following[name], more = _advance(position, rows, limit, mark, lambda row: row.sync_stamp)
+        has_more = has_more or more
+        changes[name] = fields.as_dicts(fields.default, rows[:limit])
+
+    tables = {SYNCED_MODELS[name].__tablename__: name for name in names}
+    position = positions.get(DELETED)
+    tombstones = session.scalars(tombstones_query(position, list(tables), limit + 1)).all()
+    following[DELETED], more = _advance(position, tombstones, limit, mark, lambda row: row.deleted_at)
+    has_more = has_more or more
+
+    for table, name in tables.items():
+        ids = {tombstone.entity_id for tombstone in tombstones[:limit] if tombstone.entity == table}
+        if ids:
+            # A row can outlive its tombstone, e.g. a reservation moved to another month's partition
+            model = SYNCED_MODELS[name]
+            ids -= set(session.scalars(select(model.id).where(model.id.in_(ids))))
+        deleted[name] = sorted(ids)
+
+    return {'changes': changes, 'deleted': deleted, 'cursor': encode_cursor(following), 'has_more': has_more}
+
+
+def cursor_expired(positions, now, retention_days):
+    """
+    Whether a client's positions are older than the kept tombstones
+
+    Args:
+        positions (dict): Positions from ``decode_since``
+        now (datetime): Current UTC time
+        retention_days (int): Days tombstones are kept
+
+    Returns:
+        bool: True when deletions may have been purged and the client must resync in full
+    """
+    position = positions.get(DELETED)
+    return position is not None and position[0] < now - timedelta(days=retention_days)
+
+
+def purge_statement(cutoff, batch_size):
+    """
+    Build the ``DELETE`` removing one chunk of tombstones older than a cutoff
+
+    Args:
+        cutoff (datetime): Tombstones deleted before this UTC time are removed
+        batch_size (int): Maximum number of rows removed by the statement
+
+    Returns:
+        Delete: The chunked delete statement
+    """
+    chunk = (
+        select(SyncTombstone.id)
+        .where(SyncTombstone.deleted_at < cutoff)
+        .order_by(SyncTombstone.deleted_at)
+        .limit(batch_size)
+    )
+    return delete(SyncTombstone).where(SyncTombstone.id.in_(chunk))
@@ -0,0 +1,184 @@
+"""
+Waitlist engine for the Café Fausse application
+
+Guests who find a time full can join the waitlist of that slot. Whenever a
+cancellation or change frees capacity, the waiting parties whose sitting
+would overlap the freed window are offered the tables, in queue order:
+earliest slot first, then largest party, then oldest entry.
+
+The queue lives in the partial index ``ix_waitlist_entries_queue``, so a
+promotion reads the head of the affected slots with an index range scan
+(O(log n) in the size of the waitlist) instead of rescanning every entry.
+Promotions run in the same transaction as the change that freed the
+capacity, under the per-day booking lock, and claim entries with
+``FOR UPDATE SKIP LOCKED``, so concurrent cancellations never promote the
+same party twice or hand out the same table. Guests are notified from the
+background notification queue once the transaction has committed.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import and_, func, or_, select
+
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..models.waitlist import WaitlistEntry
+from .change_feed import publish_reservation
+from .invalidation import invalidate
+from .notifications import get_notifier
+from .occupancy import load_day, lock_service_day
+from .pacing import get_pacing_cache, minute_of_day, pacing_allows
+
+# Waiting entries examined per freed window
+PROMOTION_BATCH = 50
+
+Promotion = namedtuple('Promotion', ['entry_id', 'reservation_id', 'email', 'name', 'time_slot', 'guests', 'tables'])
+
+
+def queue_query(window_start, window_end, limit=PROMOTION_BATCH):
+    """
+    Build the query claiming the head of the waitlist for a time window
+
+    Args:
+        window_start (datetime): Earliest slot to consider (inclusive)
+        window_end (datetime): Latest slot to consider (exclusive)
+        limit (int): Maximum number of entries to claim
+
+    Returns:
+        Select: Statement locking waiting entries in queue order
+    """
+    return (
+        select(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == 'waiting',
+            WaitlistEntry.time_slot >= window_start,
+            WaitlistEntry.time_slot < window_end
+        )
+        .order_by(WaitlistEntry.time_slot, WaitlistEntry.guests.desc(), WaitlistEntry.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def waitlist_position(session, entry):
+    """
+    Position of a waiting entry in its slot's queue
+
+    Args:
+        session (Session): Session to query with
+        entry (WaitlistEntry): A waiting entry
+
+    Returns:
+        int: 1 for the head of the queue
+    """
+    ahead = session.scalar(select(func.count()).select_from(WaitlistEntry).where(
+        WaitlistEntry.status == 'waiting',
+        WaitlistEntry.time_slot == entry.time_slot,
+        or_(
+            WaitlistEntry.guests > entry.guests,
+            and_(WaitlistEntry.guests == entry.guests, WaitlistEntry.created_at < entry.created_at)
+        )
+    ))
+    return ahead + 1
+
+
+def promote_waitlist(session, day, schedule, freed_start, freed_end):
+    """
+    Turn the best-fitting waiting parties into reservations
+
+    The caller must hold the day lock (``lock_service_day``) and pass the
+    day's occupancy loaded after the change that freed capacity.
+
+    Args:
+        session (Session): Session whose transaction performs the promotion
+        day (DayOccupancy): Occupancy of the service day, updated in place
+        schedule (ServiceSchedule): Schedule giving each party's sitting length
+        freed_start (datetime): Start of the window whose tables were freed
+        freed_end (datetime): End of the window whose tables were freed
+
+    Returns:
+        list: Promotion tuples, to be passed to ``announce_promotions`` after commit
+    """
+    # Parties whose sitting would overlap the freed window, on this service day only
+    midnight = datetime.combine(freed_start.date(), time.min)
+    window_start = max(freed_start - schedule.longest_duration, midnight)
+    window_end = min(freed_end, midnight + timedelta(days=1))
+    now = datetime.now()
+
+    promotions = []
+    for entry in session.scalars(queue_query(window_start, window_end)).all():
+        if entry.time_slot <= now:
+            continue
+        end = entry.time_slot + schedule.held_for(entry.guests)
+        tables = day.plan.best_fit(entry.guests, entry.time_slot, end)
+        if not tables or not pacing_allows(day.covers, entry.time_slot, entry.guests):
+            continue
+
+        reservation = Reservation(
+            customer_id=entry.customer_id,
+            time_slot=entry.time_slot,
+            guests=entry.guests,
+            table_number=tables[0],
+            extra_tables=list(tables[1:]),
+            special_requests=entry.special_requests,
+            status='confirmed'
+        )
+        session.add(reservation)
+        publish_reservation(session, 'reservation.created', reservation)
+        invalidate(session, 'reservations', entry.time_slot.date(), local=False)
+        entry.status = 'promoted'
+        entry.reservation_id = reservation.id
+        entry.promoted_at = datetime.utcnow()
+
+        day.plan.book(tables, entry.time_slot, end)
+        day.covers.add(minute_of_day(entry.time_slot), entry.guests)
+        customer = session.get(Customer, entry.customer_id)
+        promotions.append(Promotion(
+            entry.id, reservation.id, customer.email, customer.name, entry.time_slot, entry.guests, tables
+        ))
+    return promotions
+
+
+def promote_freed(session, schedule, time_slot, guests):
+    """
+    Offer the tables freed by a booking to the waitlist
+
+    Flushes the pending change, takes the day lock and promotes within the
+    caller's transaction; commit it, then pass the result to
+    ``announce_promotions``.
+
+    Args:
+        session (Session): Session holding the change that freed the tables
+        schedule (ServiceSchedule): The service schedule
+        time_slot (datetime): Start of the freed booking
+        guests (int): Party size of the freed booking
+
+    Returns:
+        list: Promotion tuples
+    """
+    session.flush()
+    lock_service_day(session, time_slot)
+    day = load_day(session, time_slot, schedule)
+    return promote_waitlist(session, day, schedule, time_slot, time_slot + schedule.held_for(guests))
+
+
+def announce_promotions(promotions):
+    """
+    Record committed promotions in the pacing cache and notify the guests
+
+    Args:
+        promotions (list): Promotion tuples returned by ``promote_waitlist``
+    """
+    if not promotions:
+        return
+    pacing = get_pacing_cache()
+    notifier = get_notifier()
+    for promotion in promotions:
+        pacing.record(promotion.time_slot, promotion.guests)
+        notifier.send(
+            promotion.email,
+            'A table is ready for you at Café Fausse',
+            f'Good news, {promotion.name}! A table for {promotion.guests} opened up on '
+            f'{promotion.time_slot:%A %d %B at %H:%M}. Your reservation number is '
+            f'{promotion.reservation_id}.'
+        )
@@ -0,0 +1,162 @@
+import threading
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, select, update
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..admission import TICKET_HEADER, PostgresWaitingRoom, retry_after
+from ..models.admission import AdmissionSlot, AdmissionWaiter
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['ADMISSION_MAX_CONCURRENT'] = 2
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+room = PostgresWaitingRoom()
+
+def decide(ticket=None, limit=2, skip_seconds=10):
+    return room.admit(ticket, limit, 30, 2, skip_seconds)
+
+def booking():
+    return {
+        'name': 'Queue Test', 'email': 'queue@cafefausse.com',
+        'date': '2099-04-10', 'time': '19:00', 'guests': 2
+    }
+
+def test_admits_up_to_the_limit_then_queues_in_order(app):
+    with app.app_context():
+        first, second = decide(), decide()
+        assert first.admitted and second.admitted
+        third, fourth = decide(), decide()
+        assert not third.admitted and third.position == 1
+        assert not fourth.admitted and fourth.position == 2
+
+        room.release(first.ticket)
+        # The freed capacity goes to the head of the queue, not to a newcomer
+        assert not decide().admitted
+        assert not decide(fourth.ticket).admitted
+        assert decide(third.ticket).admitted
+
+def test_expired_leases_free_capacity(app):
+    with app.app_context():
+        decide(), decide()
+        with db.engine.begin() as connection:
+            connection.execute(update(AdmissionSlot).values(lease_until=datetime.now() - timedelta(seconds=1)))
+        assert decide().admitted
+
+def test_unclaimed_turns_are_skipped(app):
+    with app.app_context():
+        first, _ = decide(), decide()
+        waiting = [decide() for _ in range(3)]
+        room.release(first.ticket)
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(AdmissionWaiter).where(AdmissionWaiter.ticket == waiting[0].ticket)
+                .values(seen_until=datetime.now() - timedelta(seconds=1))
+            )
+        # The head of the queue never came back, so the next ticket takes its turn
+        assert decide(waiting[1].ticket).admitted
+        assert not decide(waiting[2].ticket).admitted
+
+def test_queued_requests_cost_one_statement(app):
+    with app.app_context():
+        decide(), decide()
+        statements = []
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            queued = decide(skip_seconds=10)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert not queued.admitted and queued.position == 1 and len(statements) == 1
+
+        # Remembered until its Retry-After plus the skip allowance
+        remaining = db.session.scalar(
+            select(AdmissionWaiter.seen_until - func.localtimestamp()).where(AdmissionWaiter.ticket == queued.ticket)
+        )
+        assert timedelta(seconds=queued.retry_after + 9) < remaining <= timedelta(seconds=queued.retry_after + 10)
+
+def test_retry_after_grows_with_position():
+    assert retry_after(1, 20, 2) == 2
+    assert retry_after(45, 20, 2) == 6
+    assert retry_after(10000, 20, 2) == 20
+
+def test_busy_booking_endpoint_returns_queue_ticket(app):
+    client = app.test_client()
+    with app.app_context():
+        decide(), decide()
+
+    response = client.post('/api/reservations', json=booking())
+    assert response.status_code == 429
+    assert response.json['position'] == 1
+    assert response.headers['Retry-After'] == str(response.json['retry_after'])
+    ticket = response.json['queue_ticket']
+
+    # Forged tickets are ignored and queued behind
+    forged = client.post('/api/reservations', json=booking(), headers={TICKET_HEADER: '1'})
+    assert forged.json['position'] == 2
+
+    with app.app_context():
+        db.session.execute(db.update(AdmissionSlot).values(ticket=None))
+        db.session.commit()
+    response = client.post('/api/reservations', json=booking(), headers={TICKET_HEADER: ticket})
+    assert response.status_code == 201
+
+    # The admission is released when the request finishes
+    with app.app_context():
+        assert db.session.query(AdmissionSlot).filter(AdmissionSlot.ticket.isnot(None)).count() == 0
+
+def test_reads_bypass_the_waiting_room(app):
+    client = app.test_client()
+    with app.app_context():
+        decide(), decide()
+    response = client.post('/api/reservations/check-availability', json={
+        'date': '2099-04-10', 'time': '19:00', 'guests': 2
+    })
+    assert response.status_code == 200
+
+def test_slots_follow_the_configured_limit(app):
+    with app.app_context():
+        assert [decide(limit=3).admitted for _ in range(4)] == [True, True, True, False]
+        assert db.session.query(AdmissionSlot).count() == 3
+
+def test_unavailable_waiting_room_queues_instead_of_admitting(app, monkeypatch):
+    def down(*args):
+        raise RuntimeError('connection refused')
+    monkeypatch.setattr(PostgresWaitingRoom, 'admit', down)
+    response = app.test_client().post('/api/reservations', json=booking())
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(app.config['ADMISSION_RETRY_SECONDS'])
+    with app.app_context():
+        assert db.session.query(AdmissionSlot).count() == 0
+
+def test_unreachable_redis_fails_closed(app):
+    pytest.importorskip('redis')
+    app.config['CACHE_BACKEND'] = 'redis'
+    app.config['CACHE_REDIS_URL'] = 'redis://127.0.0.1:1/0'
+    response = app.test_client().post('/api/reservations', json=booking())
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+def test_decisions_do_not_wait_on_each_other(app):
+    def claim(decisions):
+        with app.app_context():
+            decisions.append(decide(limit=3))
+
+    with app.app_context():
+        decide(limit=3)
+        room.release(decide(limit=3).ticket)
+        with db.engine.connect() as connection, connection.begin():
+            # Another decision is in the middle of claiming the free slot 1
+            connection.execute(select(AdmissionSlot).where(AdmissionSlot.slot == 1).with_for_update())
+            decisions = []
+            thread = threading.Thread(target=claim, args=(decisions,))
+            thread.start()
+            thread.join(timeout=5)
+            assert decisions and decisions[0].admitted
+        assert db.session.get(AdmissionSlot, 2).ticket == decisions[0].ticket
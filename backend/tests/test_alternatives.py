@@ -0,0 +1,66 @@
+import pytest
+from datetime import date
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.schedule import BlackoutDate
+from ..services.alternatives import candidate_days
+from ..services.schedule import invalidate_schedule
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 10
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def book(client, guests, time='19:00'):
+    return client.post('/api/reservations', json={
+        'name': 'Alternatives Test', 'email': 'alternatives@cafefausse.com',
+        'date': '2099-04-10', 'time': time, 'guests': guests
+    })
+
+def test_candidate_days_nearest_first():
+    assert candidate_days(date(2099, 4, 10), 2) == [
+        date(2099, 4, 10), date(2099, 4, 11), date(2099, 4, 9), date(2099, 4, 12), date(2099, 4, 8)
+    ]
+
+def test_full_slot_returns_nearest_alternatives(app):
+    client = app.test_client()
+    assert book(client, 10).status_code == 201
+    response = book(client, 8)
+    assert response.status_code == 409
+    alternatives = response.json['alternatives']
+    assert len(alternatives) == app.config['RESERVATION_ALTERNATIVES_LIMIT']
+    assert alternatives[:3] == [
+        {'date': '2099-04-10', 'time': '18:45'},
+        {'date': '2099-04-10', 'time': '19:15'},
+        {'date': '2099-04-10', 'time': '18:30'},
+    ]
+    # Every suggestion can actually be booked
+    assert book(client, 8, time=alternatives[0]['time']).status_code == 201
+
+def test_alternatives_endpoint_moves_to_adjacent_days(app):
+    client = app.test_client()
+    with app.app_context():
+        db.session.add(BlackoutDate(date=date(2099, 4, 10), reason='Private event'))
+        db.session.commit()
+        invalidate_schedule()
+    response = client.post('/api/reservations/alternatives', json={
+        'date': '2099-04-10', 'time': '19:00', 'guests': 2, 'limit': 3
+    })
+    assert response.status_code == 200
+    assert response.json['alternatives'] == [
+        {'date': '2099-04-11', 'time': '19:00'},
+        {'date': '2099-04-11', 'time': '18:45'},
+        {'date': '2099-04-11', 'time': '19:15'},
+    ]
+
+def test_alternatives_endpoint_validates_input(app):
+    client = app.test_client()
+    assert client.post('/api/reservations/alternatives', json={'date': '2099-04-10'}).status_code == 400
+    assert client.post('/api/reservations/alternatives', json={
+        'date': '2099-04-10', 'time': '19:00', 'guests': 0
+    }).status_code == 400
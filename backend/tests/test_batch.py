@@ -0,0 +1,153 @@
+import pytest
+from sqlalchemy import event
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.menu_item import MenuItem
+from ..models.newsletter import Newsletter
+from ..models.reservation import Reservation
+from ..models.waitlist import WaitlistEntry
+from ..services.notifications import Notifier
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)
+    return app
+
+def subscriber_states(app):
+    with app.app_context():
+        return {subscriber.id: subscriber.is_active for subscriber in Newsletter.query.order_by(Newsletter.id)}
+
+def toggle(subscriber_id, is_active):
+    return {'method': 'PUT', 'path': f'/api/newsletter/subscribers/{subscriber_id}', 'body': {'is_active': is_active}}
+
+def test_atomic_batch_runs_on_one_connection(app):
+    client = app.test_client()
+    ids = list(subscriber_states(app))
+    client.get('/api/menu/items')  # Fill the menu cache the batch must invalidate
+    with app.app_context():
+        item_id = MenuItem.query.first().id
+
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)
+    with app.app_context():
+        event.listen(db.engine, 'checkout', listener)
+        try:
+            response = client.post('/api/batch', json={'operations': [
+                *[toggle(subscriber_id, False) for subscriber_id in ids],
+                {'method': 'PUT', 'path': f'/api/menu/items/{item_id}', 'body': {'name': 'Batch Special'}}
+            ]})
+        finally:
+            event.remove(db.engine, 'checkout', listener)
+
+    assert response.status_code == 200, response.json
+    assert response.json['committed'] and len(checkouts) == 1
+    assert [result['status'] for result in response.json['results']] == [200] * (len(ids) + 1)
+    assert response.json['results'][0]['body']['subscriber']['is_active'] is False
+    assert not any(subscriber_states(app).values())
+    with app.app_context():
+        # The subscribed customer follows in the same transaction
+        assert Customer.find_by_email('john.smith@example.com').newsletter_signup is False
+    names = [item['name'] for item in client.get('/api/menu/items').json['items']]
+    assert 'Batch Special' in names
+
+def test_atomic_batch_rolls_back_on_failure(app):
+    client = app.test_client()
+    before = subscriber_states(app)
+    first = next(iter(before))
+    response = client.post('/api/batch', json={'operations': [
+        toggle(first, not before[first]), toggle(999999, False), toggle(first, before[first])
+    ]})
+    assert response.status_code == 422
+    assert response.json['failed'] == 1 and not response.json['committed']
+    assert [result['status'] for result in response.json['results']] == [200, 404]
+    assert subscriber_states(app) == before
+
+def test_reservation_changes_roll_back_with_the_batch(app):
+    client = app.test_client()
+    with app.app_context():
+        reservation = Reservation.query.first()
+        reservation_id, before = reservation.id, reservation.special_requests
+    response = client.post('/api/batch', json={'operations': [
+        {'method': 'PUT', 'path': f'/api/reservations/{reservation_id}', 'body': {'special_requests': 'Window seat'}},
+        toggle(999999, False)
+    ]})
+    assert response.status_code == 422
+    assert [result['status'] for result in response.json['results']] == [200, 404]
+    with app.app_context():
+        assert db.session.get(Reservation, reservation_id).special_requests == before
+
+def test_reservation_and_customer_edits_share_the_batch_locks(app):
+    client = app.test_client()
+    with app.app_context():
+        reservation = Reservation.query.first()
+        reservation_id, customer_id = reservation.id, reservation.customer_id
+
+    # A second connection would wait on the batch's own row lock; fail instead of hanging
+    def lock_timeout(dbapi_connection, record, proxy):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET lock_timeout = '2s'")
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'checkout', lock_timeout)
+        try:
+            response = client.post('/api/batch', json={'operations': [
+                {'method': 'PUT', 'path': f'/api/customers/{customer_id}', 'body': {'name': 'Batch Guest'}},
+                {'method': 'PUT', 'path': f'/api/reservations/{reservation_id}', 'body': {'customer_name': 'Batch Host'}}
+            ]})
+        finally:
+            event.remove(db.engine, 'checkout', lock_timeout)
+
+    assert response.status_code == 200, response.json
+    with app.app_context():
+        assert db.session.get(Customer, customer_id).name == 'Batch Host'
+
+def test_rolled_back_batches_send_no_promotions(app):
+    client = app.test_client()
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 10
+    sent = []
+    app.extensions['notifier'] = Notifier(app, lambda *message: sent.append(message))
+    booking = {'date': '2099-04-10', 'time': '19:00'}
+    booked = client.post('/api/reservations', json={
+        **booking, 'name': 'Host', 'email': 'host@cafefausse.com', 'guests': 10
+    }).json['reservation_id']
+    waiting = client.post('/api/waitlist', json={**booking, 'name': 'Next', 'email': 'next@cafefausse.com', 'guests': 6})
+    assert waiting.status_code == 201
+    cancel = {'method': 'POST', 'path': f'/api/reservations/cancel/{booked}'}
+
+    response = client.post('/api/batch', json={'operations': [cancel, toggle(999999, False)]})
+    assert response.status_code == 422
+    app.extensions['notifier'].join()
+    assert sent == []
+    with app.app_context():
+        assert db.session.get(WaitlistEntry, waiting.json['waitlist_id']).status == 'waiting'
+
+    # Committed, the same cancellation announces the promotion
+    assert client.post('/api/batch', json={'operations': [cancel]}).status_code == 200
+    app.extensions['notifier'].join()
+    assert [recipient for recipient, _, _ in sent] == ['next@cafefausse.com']
+
+def test_independent_batch_commits_each_operation(app):
+    client = app.test_client()
+    before = subscriber_states(app)
+    first = next(iter(before))
+    response = client.post('/api/batch', json={'atomic': False, 'operations': [
+        toggle(first, not before[first]), toggle(999999, False)
+    ]})
+    assert response.status_code == 200 and not response.json['success']
+    assert [result['status'] for result in response.json['results']] == [200, 404]
+    assert subscriber_states(app)[first] is (not before[first])
+
+def test_invalid_batches_are_refused(app):
+    client = app.test_client()
+    app.config['BATCH_MAX_OPERATIONS'] = 2
+    assert client.post('/api/batch', json={}).status_code == 400
+    assert client.post('/api/batch', json={'operations': [toggle(1, True)] * 3}).status_code == 400
+    assert client.post('/api/batch', json={'operations': [{'method': 'GET', 'path': '/api/customers'}]}).status_code == 400
+    nested = {'method': 'POST', 'path': '/api/batch', 'body': {'operations': [toggle(1, True)]}}
+    assert client.post('/api/batch', json={'operations': [nested]}).status_code == 400
@@ -0,0 +1,119 @@
+import pytest
+from datetime import date, datetime
+from flask_jwt_extended import create_access_token
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..api import blocks
+from ..services.occupancy import load_day
+from ..services.schedule import get_schedule
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+@pytest.fixture
+def staff(app):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity="staff")}'}
+
+def block(**fields):
+    return {'name': 'Wine dinner', 'starts_at': '2099-04-10T19:00', 'ends_at': '2099-04-10T23:00', **fields}
+
+def available(client, time, guests=2, date='2099-04-10'):
+    return client.post('/api/reservations/check-availability', json={
+        'date': date, 'time': time, 'guests': guests
+    }).json['available']
+
+def test_buyout_blocks_the_whole_room(app, staff):
+    client = app.test_client()
+    response = client.post('/api/blocks', json=block(guests=60), headers=staff)
+    assert response.status_code == 201
+    assert response.json['block']['whole_room']
+
+    assert not available(client, '19:00')
+    assert not available(client, '18:00')  # The sitting would run into the event
+    assert available(client, '17:00')
+    assert available(client, '19:00', date='2099-04-11')
+
+def test_table_block_takes_only_its_tables(app, staff):
+    client = app.test_client()
+    assert client.post('/api/blocks', json=block(table_numbers=[29, 30]), headers=staff).status_code == 201
+    with app.app_context():
+        day = load_day(db.session, datetime(2099, 4, 10, 19), get_schedule())
+        start, end = datetime(2099, 4, 10, 19), datetime(2099, 4, 10, 21)
+        assert not day.plan.is_free(29, start, end)
+        assert day.plan.is_free(28, start, end)
+    assert available(client, '19:00', guests=8)
+
+def test_block_conflicts_with_existing_reservations(app, staff):
+    client = app.test_client()
+    booked = client.post('/api/reservations', json={
+        'name': 'Block Test', 'email': 'blocks@cafefausse.com',
+        'date': '2099-04-10', 'time': '18:30', 'guests': 2
+    }).json
+
+    response = client.post('/api/blocks', json=block(table_numbers=booked['tables']), headers=staff)
+    assert response.status_code == 409
+    assert response.json['conflicting_reservations'] == [booked['reservation_id']]
+
+    # Other tables are fine, and staff may override
+    assert client.post('/api/blocks', json=block(table_numbers=[29]), headers=staff).status_code == 201
+    assert client.post('/api/blocks', json=block(table_numbers=booked['tables'], force=True), headers=staff).status_code == 201
+
+def test_blocks_require_staff_and_valid_window(app, staff):
+    client = app.test_client()
+    assert client.post('/api/blocks', json=block()).status_code == 401
+    assert client.post('/api/blocks', json=block(ends_at='2099-04-10T18:00'), headers=staff).status_code == 400
+    assert client.post('/api/blocks', json={'name': 'Missing'}, headers=staff).status_code == 400
+
+def test_list_and_remove_blocks(app, staff):
+    client = app.test_client()
+    block_id = client.post('/api/blocks', json=block(), headers=staff).json['block']['id']
+    client.post('/api/blocks', json=block(starts_at='2099-05-01T19:00', ends_at='2099-05-01T23:00'), headers=staff)
+
+    listed = client.get('/api/blocks?from=2099-04-10&to=2099-04-11').json['blocks']
+    assert [entry['id'] for entry in listed] == [block_id]
+    assert len(client.get('/api/blocks').json['blocks']) == 2
+
+    assert client.delete(f'/api/blocks/{block_id}').status_code == 401
+    assert client.delete(f'/api/blocks/{block_id}', headers=staff).status_code == 200
+    assert available(client, '19:00')
+    assert client.delete(f'/api/blocks/{block_id}', headers=staff).status_code == 404
+
+def test_multi_day_blocks_cover_every_day(app, staff, monkeypatch):
+    client = app.test_client()
+    locked, invalidated = [], []
+    lock_service_day, invalidate = blocks.lock_service_day, blocks.invalidate
+    monkeypatch.setattr(blocks, 'lock_service_day', lambda session, time_slot: (
+        locked.append(time_slot.date()), lock_service_day(session, time_slot)
+    ))
+    monkeypatch.setattr(blocks, 'invalidate', lambda session, entity, key=None, local=True: (
+        invalidated.append(key), invalidate(session, entity, key, local)
+    ))
+    booked = client.post('/api/reservations', json={
+        'name': 'Block Test', 'email': 'blocks@cafefausse.com',
+        'date': '2099-04-11', 'time': '19:00', 'guests': 2
+    }).json
+    event = block(starts_at='2099-04-10T19:00', ends_at='2099-04-12T23:00', guests=60)
+    response = client.post('/api/blocks', json=event, headers=staff)
+    assert response.status_code == 409
+    assert response.json['conflicting_reservations'] == [booked['reservation_id']]
+    client.post(f"/api/reservations/cancel/{booked['reservation_id']}")
+
+    locked.clear()
+    block_id = client.post('/api/blocks', json=event, headers=staff).json['block']['id']
+    days = [date(2099, 4, 10), date(2099, 4, 11), date(2099, 4, 12)]
+    assert locked == days and invalidated == days
+    assert not available(client, '20:00', date='2099-04-11')
+    assert not available(client, '19:00', date='2099-04-12')
+
+    locked.clear(), invalidated.clear()
+    assert client.delete(f'/api/blocks/{block_id}', headers=staff).status_code == 200
+    assert locked == days and invalidated == days
+    assert available(client, '20:00', date='2099-04-11')
+    assert available(client, '19:00', date='2099-04-12')
@@ -0,0 +1,252 @@
+import fnmatch
+import socketserver
+import threading
+import time
+import pytest
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import cache
+from ..cache import MISSING, MemoryBackend
+from flask import Response, request
+from flask_jwt_extended import create_access_token
+
+slow = cache.namespace('test_slow', ttl=60)
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for the cache backend"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        arguments = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            arguments.append(self.rfile.read(length + 2)[:-2])
+        return arguments
+
+    def bulk(self, value):
+        return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def handle(self):
+        server = self.server
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            name, arguments = command[0].upper(), command[1:]
+            with server.lock:
+                if name == b'GET':
+                    entry = server.live(arguments[0])
+                    reply = self.bulk(entry[0] if entry else None)
+                elif name == b'SET':
+                    options = [argument.upper() for argument in arguments[2:]]
+                    expires = None
+                    if b'PX' in options:
+                        expires = time.monotonic() + int(arguments[2 + options.index(b'PX') + 1]) / 1000
+                    if b'NX' in options and server.live(arguments[0]):
+                        reply = b'$-1\r\n'
+                    else:
+                        server.data[arguments[0]] = (arguments[1], expires)
+                        reply = b'+OK\r\n'
+                elif name == b'DEL':
+                    reply = b':%d\r\n' % sum(server.data.pop(key, None) is not None for key in arguments)
+                elif name == b'SCAN':
+                    pattern = arguments[arguments.index(b'MATCH') + 1].decode()
+                    keys = [key for key in list(server.data) if server.live(key) and fnmatch.fnmatchcase(key.decode(), pattern)]
+                    reply = b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(keys) + b''.join(self.bulk(key) for key in keys)
+                elif name == b'INFO':
+                    reply = self.bulk(b'# Stats\r\nevicted_keys:0\r\nused_memory:1024\r\n')
+                elif name == b'PING':
+                    reply = b'+PONG\r\n'
+                else:
+                    reply = b'+OK\r\n'
+            self.wfile.write(reply)
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=True)
+    return app
+
+@pytest.fixture
+def auth_headers(app):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity="staff")}'}
+
+@pytest.fixture
+def redis_workers():
+    """Two applications sharing a Redis-protocol stand-in, as two workers would"""
+    pytest.importorskip('redis')
+    server = RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    apps = []
+    for _ in range(2):
+        app = create_app('testing')
+        app.config['CACHE_BACKEND'] = 'redis'
+        app.config['CACHE_REDIS_URL'] = f'redis://127.0.0.1:{server.server_address[1]}/0'
+        apps.append(app)
+    yield apps
+    server.shutdown()
+    server.server_close()
+
+def test_menu_listings_are_cached_until_the_menu_changes(app, auth_headers):
+    client = app.test_client()
+    first = client.get('/api/menu/items')
+    assert first.headers['X-Cache'] == 'MISS'
+    second = client.get('/api/menu/items')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.json == first.json
+
+    category_id = first.json['items'][0]['category_id']
+    client.post('/api/menu/items', json={'name': 'Cache Test Tart', 'price': 12.5, 'category_id': category_id}, headers=auth_headers)
+    third = client.get('/api/menu/items')
+    assert third.headers['X-Cache'] == 'MISS'
+    assert len(third.json['items']) == len(first.json['items']) + 1
+
+def test_not_found_responses_are_not_cached(app):
+    client = app.test_client()
+    assert client.get('/api/menu/items/999999').status_code == 404
+    assert client.get('/api/menu/items/999999').headers['X-Cache'] == 'MISS'
+
+def test_concurrent_misses_compute_once(app):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def read():
+        with app.app_context():
+            results.append(slow.get_or_set('hot', compute))
+
+    results = []
+    threads = [threading.Thread(target=read) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
+    with app.app_context():
+        stats = slow.stats()
+    assert stats['misses'] == 5 and stats['coalesced'] == 4 and stats['sets'] == 1
+
+def test_uncached_responses_are_not_handed_to_waiting_requests(app):
+    leader_inside = threading.Event()
+    release = threading.Event()
+
+    @slow.cached_view(key=lambda: 'conditional')
+    def view():
+        if request.headers.get('If-None-Match'):
+            leader_inside.set()
+            release.wait(5)
+            return Response(status=304)
+        return 'fresh'
+    app.add_url_rule('/api/test-conditional', 'test_conditional', view)
+
+    responses = {}
+    def fetch(name, **headers):
+        responses[name] = app.test_client().get('/api/test-conditional', headers=headers)
+
+    revalidation = threading.Thread(target=fetch, args=('revalidation',), kwargs={'If-None-Match': 'W/"old"'})
+    revalidation.start()
+    assert leader_inside.wait(5)
+    plain = threading.Thread(target=fetch, args=('plain',))
+    plain.start()
+    with app.app_context():
+        deadline = time.monotonic() + 5
+        while slow.stats()['coalesced'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    release.set()
+    revalidation.join()
+    plain.join()
+
+    assert responses['revalidation'].status_code == 304
+    # The plain request waited for the revalidation but computed its own response
+    assert responses['plain'].status_code == 200
+    assert responses['plain'].get_data(as_text=True) == 'fresh'
+    assert responses['plain'].headers['X-Cache'] == 'MISS'
+
+def test_memory_backend_evicts_least_recently_used_and_expired_entries():
+    evicted = []
+    backend = MemoryBackend(2, lambda key, reason: evicted.append((key, reason)))
+    backend.set('a', 1, 60)
+    backend.set('b', 2, 60)
+    backend.get('a')
+    backend.set('c', 3, 60)
+    assert evicted == [('b', 'evictions')]
+    backend.set('d', 4, -1)
+    assert backend.get('d') is MISSING
+    assert ('d', 'expirations') in evicted
+    assert backend.get('c') == 3
+
+def test_admin_endpoint_reports_and_flushes_namespaces(app, auth_headers):
+    client = app.test_client()
+    assert client.get('/api/cache').status_code == 401
+    client.get('/api/menu/categories')
+    client.get('/api/menu/categories')
+
+    stats = client.get('/api/cache', headers=auth_headers).json
+    assert stats['backend']['type'] == 'memory'
+    assert stats['namespaces']['menu']['hits'] == 1
+    assert stats['namespaces']['menu']['entries'] == 1
+
+    response = client.delete('/api/cache/menu', headers=auth_headers)
+    assert response.json['flushed'] == 1
+    assert client.get('/api/menu/categories').headers['X-Cache'] == 'MISS'
+    assert client.delete('/api/cache/unknown', headers=auth_headers).status_code == 404
+
+def test_redis_backend_is_shared_by_workers(redis_workers):
+    first, second = redis_workers
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'covers': 42}
+
+    def read(app):
+        with app.app_context():
+            results.append(slow.get_or_set('shared', compute))
+
+    results = []
+    threads = [threading.Thread(target=read, args=(app,)) for app in (first, second, first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{'covers': 42}] * 4
+    assert len(calls) == 1
+
+    with second.app_context():
+        assert slow.stats()['entries'] == 1
+        assert slow.flush() == 1
+    with first.app_context():
+        assert slow.get_or_set('shared', lambda: 'rebuilt') == 'rebuilt'
+
+def test_unreachable_redis_reads_through(app):
+    app.config['CACHE_BACKEND'] = 'redis'
+    app.config['CACHE_REDIS_URL'] = 'redis://127.0.0.1:1/0'
+    pytest.importorskip('redis')
+    with app.app_context():
+        assert slow.get_or_set('down', lambda: 'fresh') == 'fresh'
+        assert slow.stats()['errors'] >= 1
@@ -0,0 +1,115 @@
+import json
+import pytest
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..services.change_feed import get_change_feed, publish
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['CHANGE_FEED_HEARTBEAT_SECONDS'] = 0.2
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    yield app
+    app.extensions['change_feed'].close()
+    app.extensions['pg_listener'].close()
+
+def book(client, time='19:00'):
+    return client.post('/api/reservations', json={
+        'name': 'Feed Test', 'email': 'feed@cafefausse.com', 'phone': '555-0102',
+        'date': '2099-04-10', 'time': time, 'guests': 2
+    }).json['reservation_id']
+
+def next_event(stream, attempts=25):
+    """Read the next event from an SSE stream, skipping keep-alives"""
+    for _ in range(attempts):
+        chunk = next(stream)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(':') or chunk.startswith('retry:'):
+            continue
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+        return fields['id'], fields['event'], json.loads(fields['data'])
+    raise AssertionError('No event received')
+
+def open_stream(client, **headers):
+    response = client.get('/api/reservations/changes', headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    return iter(response.response)
+
+def test_stream_pushes_reservation_changes(app):
+    client = app.test_client()
+    stream = open_stream(client)
+    reservation_id = book(client)
+
+    _, event, data = next_event(stream)
+    assert event == 'reservation.created'
+    assert data == {'id': reservation_id, 'status': 'confirmed', 'time_slot': '2099-04-10T19:00:00'}
+
+    client.put(f'/api/reservations/{reservation_id}', json={'status': 'seated'})
+    _, event, data = next_event(stream)
+    assert (event, data['status']) == ('reservation.updated', 'seated')
+
+    client.post(f'/api/reservations/cancel/{reservation_id}')
+    _, event, data = next_event(stream)
+    assert (event, data['status']) == ('reservation.canceled', 'canceled')
+
+def test_moving_a_reservation_publishes_the_new_time(app):
+    client = app.test_client()
+    stream = open_stream(client)
+    reservation_id = book(client)
+    next_event(stream)
+
+    response = client.put(f'/api/reservations/{reservation_id}', json={'time_slot': '2099-04-10T20:30:00'})
+    assert response.status_code == 200, response.json
+    _, event, data = next_event(stream)
+    assert (event, data['time_slot']) == ('reservation.updated', '2099-04-10T20:30:00')
+    assert client.put(f'/api/reservations/{reservation_id}', json={'time_slot': 'tomorrow'}).status_code == 400
+
+def test_long_special_requests_do_not_break_booking(app):
+    client = app.test_client()
+    stream = open_stream(client)
+    response = client.post('/api/reservations', json={
+        'name': 'Feed Test', 'email': 'feed@cafefausse.com', 'phone': '555-0102',
+        'date': '2099-04-10', 'time': '19:00', 'guests': 2, 'special_requests': 'x' * 9000
+    })
+    assert response.status_code == 201, response.json
+    _, event, data = next_event(stream)
+    assert (event, data['id']) == ('reservation.created', response.json['reservation_id'])
+
+def test_oversized_events_are_sent_as_reset(app):
+    with app.app_context():
+        feed = get_change_feed()
+        feed.wait_until_listening()
+        events = feed.events(heartbeat=0.2)
+        publish(db.session, 'block.created', {'id': 1, 'reason': 'x' * 9000})
+        db.session.commit()
+        assert next_event(events)[1:] == ('reset', {})
+
+def test_only_committed_changes_are_published(app):
+    with app.app_context():
+        feed = get_change_feed()
+        feed.wait_until_listening()
+        events = feed.events(heartbeat=0.2)
+        publish(db.session, 'block.created', {'id': 1})
+        db.session.rollback()
+        publish(db.session, 'block.created', {'id': 2})
+        db.session.commit()
+        assert next_event(events)[1:] == ('block.created', {'id': 2})
+
+def test_reconnecting_clients_resume_or_reset(app):
+    client = app.test_client()
+    stream = open_stream(client)
+    book(client, '18:00')
+    last_id, _, _ = next_event(stream)
+    book(client, '20:00')
+
+    # The same worker replays what was missed since Last-Event-ID
+    resumed = open_stream(client, **{'Last-Event-ID': last_id})
+    _, event, data = next_event(resumed)
+    assert (event, data['time_slot']) == ('reservation.created', '2099-04-10T20:00:00')
+
+    # An ID from another worker cannot be resumed
+    assert next_event(open_stream(client, **{'Last-Event-ID': 'elsewhere-7'}))[1] == 'reset'
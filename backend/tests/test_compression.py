@@ -0,0 +1,70 @@
+import gzip
+import json
+import zlib
+import pytest
+from ..app import create_app
+from ..init_db import init_db
+from .. import compression
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['CHANGE_FEED_HEARTBEAT_SECONDS'] = 0.2
+    with app.app_context():
+        init_db(app)
+    yield app
+    for name in ('change_feed', 'pg_listener'):
+        if app.extensions.get(name) is not None:
+            app.extensions[name].close()
+
+def test_codings_follow_accept_encoding(app):
+    client = app.test_client()
+    plain = client.get('/api/menu/items')
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+
+    zipped = client.get('/api/menu/items', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.data) == plain.data
+    assert int(zipped.headers['Content-Length']) == len(zipped.data) < len(plain.data)
+
+    brotli = pytest.importorskip('brotli')
+    preferred = client.get('/api/menu/items', headers={'Accept-Encoding': 'gzip, deflate, br'})
+    assert preferred.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(preferred.data) == plain.data
+
+def test_small_bodies_are_sent_as_they_are(app):
+    response = app.test_client().get('/api/customers/1', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < app.config['COMPRESS_MIN_BYTES']
+    assert 'Content-Encoding' not in response.headers
+
+def test_cached_responses_are_compressed_once(app, monkeypatch):
+    client = app.test_client()
+    first = client.get('/api/menu/items', headers={'Accept-Encoding': 'gzip'})
+    assert first.headers['X-Cache'] == 'MISS'
+
+    def fail(*args):
+        raise AssertionError('compressed again')
+    monkeypatch.setattr(compression, 'compress', fail)
+    hit = client.get('/api/menu/items', headers={'Accept-Encoding': 'gzip'})
+    assert hit.headers['X-Cache'] == 'HIT' and hit.headers['Content-Encoding'] == 'gzip'
+    assert hit.data == first.data
+
+def test_streams_are_flushed_event_by_event(app):
+    client = app.test_client()
+    response = client.get('/api/reservations/changes', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    stream, decoder = iter(response.response), zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    reservation_id = client.post('/api/reservations', json={
+        'name': 'Stream Test', 'email': 'stream@cafefausse.com', 'phone': '555-0103',
+        'date': '2099-04-10', 'time': '19:00', 'guests': 2
+    }).json['reservation_id']
+    for _ in range(25):
+        text = decoder.decompress(next(stream)).decode()
+        if text.startswith('id:'):
+            break
+    fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+    assert fields['event'] == 'reservation.created'
+    assert json.loads(fields['data'])['id'] == reservation_id
+    response.close()
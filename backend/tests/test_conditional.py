@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import event, text
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)
+        # Date the sample data a day back, so changes fall in a later second
+        for table in ('customers', 'menu_items', 'categories'):
+            db.session.execute(text(f"UPDATE {table} SET updated_at = updated_at - interval '1 day'"))
+        db.session.commit()
+    return app
+
+def test_matching_etag_gets_304_from_one_query(app):
+    client = app.test_client()
+    response = client.get('/api/customers')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/') and response.headers['Last-Modified']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    statements = []
+    with app.app_context():
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            revalidated = client.get('/api/customers', headers={'If-None-Match': etag})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    assert revalidated.status_code == 304 and revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert len(statements) == 1
+
+def test_changes_replace_the_validators(app):
+    client = app.test_client()
+    first = client.get('/api/customers')
+    with app.app_context():
+        db.session.get(Customer, 1).phone = '555-000-0000'
+        db.session.commit()
+    second = client.get('/api/customers', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.headers['Last-Modified'] != first.headers['Last-Modified']
+
+def test_deletions_move_last_modified(app):
+    client = app.test_client()
+    first = client.get('/api/menu/categories/1/items')
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/menu/categories/1/items', headers=since).status_code == 304
+
+    item_id = first.json['items'][0]['id']
+    assert client.delete(f'/api/menu/items/{item_id}').status_code == 200
+    second = client.get('/api/menu/categories/1/items', headers=since)
+    assert second.status_code == 200
+    assert item_id not in [item['id'] for item in second.json['items']]
+
+def test_etag_depends_on_the_filters(app):
+    client = app.test_client()
+    every = client.get('/api/menu/items').headers['ETag']
+    starters = client.get('/api/menu/items?category_id=1').headers['ETag']
+    assert every != starters
+    assert client.get('/api/menu/items', headers={'If-None-Match': starters}).status_code == 200
+
+def test_cached_responses_keep_their_validators(app):
+    client = app.test_client()
+    miss = client.get('/api/menu/categories')
+    hit = client.get('/api/menu/categories', headers={'If-None-Match': miss.headers['ETag']})
+    assert hit.status_code == 304 and hit.headers['X-Cache'] == 'HIT'
+    assert hit.headers['ETag'] == miss.headers['ETag']
+
+def test_errors_have_no_validators(app):
+    client = app.test_client()
+    missing = client.get('/api/customers/999')
+    assert missing.status_code == 404 and 'ETag' not in missing.headers
+    assert client.get('/api/reservations/day/tomorrow').status_code == 400
@@ -0,0 +1,109 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy.dialects import postgresql
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..jobs.partitions import add_months, create_partition, month_start, partition_name
+from ..services import day_sheet
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def book(client, time, guests=2, email='sheet@cafefausse.com', **fields):
+    return client.post('/api/reservations', json={
+        'name': 'Sheet Test', 'email': email, 'phone': '555-0101',
+        'date': '2099-04-10', 'time': time, 'guests': guests, **fields
+    }).json['reservation_id']
+
+def test_day_sheet_lists_the_day_in_arrival_order(app):
+    client = app.test_client()
+    late = book(client, '20:00', guests=4, special_requests='Window seat')
+    early = book(client, '17:30', email='regular@cafefausse.com')
+    book(client, '19:00', date='2099-04-11')
+    with app.app_context():
+        regular = db.session.scalar(db.select(Customer).where(Customer.email == 'regular@cafefausse.com'))
+        db.session.add(Reservation(
+            customer_id=regular.id, time_slot=datetime(2099, 3, 6, 19, 0), guests=2, table_number=1, status='completed'
+        ))
+        # Older than the retention window, so no longer counted
+        db.session.add(Reservation(
+            customer_id=regular.id, time_slot=datetime(2097, 3, 6, 19, 0), guests=2, table_number=1, status='completed'
+        ))
+        db.session.commit()
+
+    response = client.get('/api/reservations/day/2099-04-10')
+    assert response.status_code == 200
+    sheet = response.json
+    assert sheet['covers'] == 6
+    assert [entry['reservation_id'] for entry in sheet['reservations']] == [early, late]
+    first, second = sheet['reservations']
+    assert (first['time'], first['customer_phone'], first['visits']) == ('17:30', '555-0101', 1)
+    assert (second['special_requests'], second['visits']) == ('Window seat', 0)
+
+def test_visit_counts_skip_partitions_past_retention(app):
+    today = date.today()
+    old_month = add_months(month_start(today), -24)
+    statement = day_sheet.day_sheet_query(today, app.config['RESERVATION_RETENTION_MONTHS'])
+    compiled = statement.compile(
+        dialect=postgresql.psycopg2.dialect(), compile_kwargs={'render_postcompile': True}
+    )
+    with app.app_context():
+        with db.engine.begin() as connection:
+            create_partition(connection, old_month)
+        try:
+            with db.engine.connect() as connection:
+                plan = '\n'.join(row[0] for row in connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params))
+        finally:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(f'DROP TABLE {partition_name(old_month)}')
+    assert partition_name(month_start(today)) in plan
+    assert partition_name(old_month) not in plan
+
+def test_day_sheet_is_cached_until_the_day_changes(app, monkeypatch):
+    client = app.test_client()
+    reservation_id = book(client, '19:00')
+    builds = []
+    build = day_sheet.build_day_sheet
+    monkeypatch.setattr(day_sheet, 'build_day_sheet', lambda session, day: builds.append(day) or build(session, day))
+
+    client.get('/api/reservations/day/2099-04-10')
+    client.get('/api/reservations/day/2099-04-10')
+    assert builds == [date(2099, 4, 10)]
+
+    # Another day's booking leaves the sheet alone; a change to this day rebuilds it
+    book(client, '19:00', date='2099-04-11')
+    client.get('/api/reservations/day/2099-04-10')
+    assert len(builds) == 1
+    client.post(f'/api/reservations/cancel/{reservation_id}')
+    sheet = client.get('/api/reservations/day/2099-04-10').json
+    assert len(builds) == 2
+    assert sheet['covers'] == 0
+    assert sheet['reservations'][0]['status'] == 'canceled'
+
+def test_day_sheet_follows_customer_edits(app):
+    client = app.test_client()
+    reservation_id = book(client, '19:00')
+    first = client.get('/api/reservations/day/2099-04-10')
+    with app.app_context():
+        customer_id = db.session.get(Reservation, reservation_id).customer_id
+
+    response = client.put(f'/api/customers/{customer_id}', json={'name': 'Renamed Guest', 'phone': '555-0199'})
+    assert response.status_code == 200
+    # Neither the cached sheet nor the client's copy may show the old guest details
+    response = client.get('/api/reservations/day/2099-04-10', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    entry = response.json['reservations'][0]
+    assert (entry['customer_name'], entry['customer_phone']) == ('Renamed Guest', '555-0199')
+
+def test_day_sheet_rejects_invalid_dates(app):
+    client = app.test_client()
+    assert client.get('/api/reservations/day/10-04-2099').status_code == 400
+    assert client.get('/api/reservations/day/2099-04-12').json['reservations'] == []
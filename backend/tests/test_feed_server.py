@@ -0,0 +1,88 @@
+import asyncio
+import json
+import socket
+import threading
+import pytest
+from ..app import create_app
+from ..init_db import init_db
+from ..feed_server import FeedServer, listen_dsn
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+@pytest.fixture
+def server(app):
+    """The feed server on its own event loop, as in its own process"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    run = lambda coroutine: asyncio.run_coroutine_threadsafe(coroutine, loop).result(10)
+    server = FeedServer(listen_dsn(app.config['SQLALCHEMY_DATABASE_URI']), 100, 0.2)
+    run(server.start('127.0.0.1', 0))
+    assert run(server.wait_until_listening())
+    yield server
+    run(server.close())
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+def book(client, time='19:00'):
+    return client.post('/api/reservations', json={
+        'name': 'Feed Server Test', 'email': 'feedserver@cafefausse.com',
+        'date': '2099-04-10', 'time': time, 'guests': 2
+    }).json['reservation_id']
+
+def subscribe(server, path='/api/reservations/changes', **headers):
+    connection = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+    lines = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+    connection.sendall(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n{lines}\r\n'.encode())
+    stream = connection.makefile('rb')
+    status = stream.readline().decode()
+    while stream.readline() not in (b'\r\n', b''):
+        pass
+    return connection, stream, status
+
+def next_event(stream, attempts=50):
+    """Read the next event from the stream, skipping keep-alives"""
+    for _ in range(attempts):
+        lines = []
+        while (line := stream.readline().decode()) not in ('\n', ''):
+            lines.append(line.rstrip('\n'))
+        if not lines or lines[0].startswith(':') or lines[0].startswith('retry:'):
+            continue
+        fields = dict(line.split(': ', 1) for line in lines)
+        return fields['id'], fields['event'], json.loads(fields['data'])
+    raise AssertionError('No event received')
+
+def test_server_streams_committed_changes(app, server):
+    connection, stream, status = subscribe(server)
+    assert status.startswith('HTTP/1.1 200')
+    reservation_id = book(app.test_client())
+    last_id, event, data = next_event(stream)
+    assert (event, data['id']) == ('reservation.created', reservation_id)
+    connection.close()
+
+    book(app.test_client(), '20:00')
+    connection, stream, _ = subscribe(server, **{'Last-Event-ID': last_id})
+    _, event, data = next_event(stream)
+    assert (event, data['time_slot']) == ('reservation.created', '2099-04-10T20:00:00')
+    connection.close()
+
+def test_idle_subscribers_need_no_thread(app, server):
+    threads = threading.active_count()
+    subscribers = [subscribe(server) for _ in range(200)]
+    assert threading.active_count() == threads
+    book(app.test_client())
+    assert next_event(subscribers[0][1])[1] == 'reservation.created'
+    assert next_event(subscribers[-1][1])[1] == 'reservation.created'
+    for connection, _, _ in subscribers:
+        connection.close()
+
+def test_other_paths_are_not_found(server):
+    connection, _, status = subscribe(server, path='/api/reservations')
+    assert status.startswith('HTTP/1.1 404')
+    connection.close()
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import event
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)
+    return app
+
+def fetch(app, url):
+    """GET a URL and return its JSON with the SQL statements it ran"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = app.test_client().get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 200, response.json
+    return response.json, [statement for statement in statements if 'FROM reservations' in statement]
+
+def test_fields_narrow_the_payload_and_the_select(app):
+    payload, statements = fetch(app, '/api/reservations/all?fields=id,time_slot')
+    assert all(list(row) == ['id', 'time_slot'] for row in payload['reservations'])
+    listing = statements[-1]
+    assert 'JOIN customers' not in listing and 'special_requests' not in listing
+
+def test_relations_are_joined_only_when_included(app):
+    payload, statements = fetch(app, '/api/reservations/all?fields=id&include=customer')
+    row = payload['reservations'][0]
+    assert list(row) == ['id', 'customer_name', 'customer_email', 'customer_phone']
+    assert row['customer_name'] and len(statements) == 2  # the ETag stamp and one joined select
+    assert 'JOIN customers' in statements[-1]
+
+def test_defaults_keep_the_existing_payload(app):
+    payload, statements = fetch(app, '/api/reservations/all')
+    row = payload['reservations'][0]
+    assert row['reservation_id'] == row['id'] and row['tables'] == [row['table_number']]
+    assert {'customer_name', 'customer_email', 'customer_phone'} <= set(row)
+    assert len(statements) == 2
+
+    customers, _ = fetch(app, '/api/customers?fields=id,name')
+    assert customers['customers'][0] == {'id': 1, 'name': 'John Smith'}
+
+def test_menu_items_include_their_category(app):
+    payload, _ = fetch(app, '/api/menu/items?fields=name&include=category&category_id=2')
+    assert {row['category_name'] for row in payload['items']} == {'Main Courses'}
+
+def test_unknown_fields_are_refused(app):
+    client = app.test_client()
+    assert client.get('/api/customers?fields=id,password').status_code == 400
+    assert client.get('/api/reservations/all?include=tables').status_code == 400
+    assert client.get('/api/newsletter/subscribers?fields=').status_code == 400
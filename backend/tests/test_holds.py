@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.reservation_hold import ReservationHold
+from ..jobs.reservations import expire_holds
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 10
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def slot(guests, time='19:00'):
+    return {'date': '2099-04-10', 'time': time, 'guests': guests}
+
+def booking(guests, token, time='19:00'):
+    return {'name': 'Hold Test', 'email': 'holds@cafefausse.com', 'hold_token': token, **slot(guests, time)}
+
+def available(client, guests):
+    return client.post('/api/reservations/check-availability', json=slot(guests)).json['available']
+
+def test_hold_counts_toward_availability(app):
+    client = app.test_client()
+    response = client.post('/api/reservations/holds', json=slot(10))
+    assert response.status_code == 201
+    assert response.json['hold_token']
+    assert not available(client, 2)
+
+    # A second guest cannot hold or book around the held covers
+    assert client.post('/api/reservations/holds', json=slot(2)).status_code == 409
+
+def test_confirm_books_the_held_tables(app):
+    client = app.test_client()
+    hold = client.post('/api/reservations/holds', json=slot(6)).json
+    response = client.post('/api/reservations', json=booking(6, hold['hold_token']))
+    assert response.status_code == 201
+    assert response.json['tables'] == hold['tables']
+
+    # The hold is used up, and its covers are not counted twice
+    assert client.post('/api/reservations', json=booking(6, hold['hold_token'])).status_code == 410
+    assert available(client, 4)
+    assert not available(client, 5)
+
+def test_confirm_must_match_the_hold(app):
+    client = app.test_client()
+    token = client.post('/api/reservations/holds', json=slot(2)).json['hold_token']
+    assert client.post('/api/reservations', json=booking(2, token, time='19:15')).status_code == 400
+    assert client.post('/api/reservations', json=booking(4, token)).status_code == 400
+    assert client.post('/api/reservations', json=booking(2, token)).status_code == 201
+
+def test_release_frees_the_tables(app):
+    client = app.test_client()
+    token = client.post('/api/reservations/holds', json=slot(10)).json['hold_token']
+    assert client.delete(f'/api/reservations/holds/{token}').status_code == 200
+    assert available(client, 10)
+    assert client.delete(f'/api/reservations/holds/{token}').status_code == 404
+
+def test_expired_holds_are_ignored_and_reclaimed(app):
+    client = app.test_client()
+    expired = client.post('/api/reservations/holds', json=slot(10)).json['hold_token']
+    live = client.post('/api/reservations/holds', json=slot(2, time='21:00')).json['hold_token']
+    with app.app_context():
+        hold = db.session.query(ReservationHold).filter_by(token=expired).one()
+        hold.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+    app.extensions.pop('kitchen_pacing', None)
+
+    assert available(client, 10)
+    assert client.post('/api/reservations', json=booking(10, expired)).status_code == 410
+
+    with app.app_context():
+        assert expire_holds(db.engine, batch_size=1) == 1
+        assert [hold.token for hold in db.session.query(ReservationHold)] == [live]
@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from flask_migrate import upgrade
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.reservation import Reservation
+from ..models.menu_item import MenuItem
+from ..models.newsletter import Newsletter
+from ..models.customer import Customer
+from ..jobs.reservations import sweep_statement
+from ..services.waitlist import queue_query
+from ..services.holds import expire_statement
+from ..services.occupancy import blocks_query, holds_query
+from ..services.standing import due_standing_query
+from ..services.day_sheet import day_sheet_query, day_stamp_query
+from ..serializers import item_fields, reservation_fields
+from ..services.sync import changes_query, tombstones_query
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)  # Initialize the database with sample data
+    return app
+
+def explain(statement):
+    """Return the EXPLAIN output of a statement with seq scans discouraged"""
+    compiled = statement.compile(
+        dialect=postgresql.psycopg2.dialect(), compile_kwargs={'render_postcompile': True}
+    )
+    with db.engine.connect() as connection:
+        # The sample data is tiny, so make the planner prefer any usable index
+        connection.exec_driver_sql('SET enable_seqscan = off')
+        rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params).all()
+    return '\n'.join(row[0] for row in rows)
+
+def hot_queries():
+    start = datetime.now() + timedelta(days=1)
+    return {
+        'availability': Reservation.booked_tables_query(start, start + timedelta(minutes=90)),
+        'reservations_by_customer': select(Reservation).where(Reservation.customer_id == 1),
+        'menu_by_category': select(MenuItem).where(MenuItem.category_id == 1).order_by(MenuItem.display_order),
+        'active_subscribers': select(Newsletter).where(Newsletter.is_active.is_(True)),
+        'changed_customers': select(Customer).where(Customer.updated_at > start - timedelta(days=2)),
+        'changed_reservations': select(Reservation).where(Reservation.updated_at > start - timedelta(days=2)),
+        'status_sweep': sweep_statement('confirmed', 'completed', start - timedelta(days=1), 1000),
+        'waitlist_queue': queue_query(start - timedelta(hours=3), start + timedelta(hours=2)),
+        'day_holds': holds_query(start - timedelta(hours=3), start + timedelta(days=1), start),
+        'hold_expiry': expire_statement(start, 1000),
+        'day_blocks': blocks_query(start - timedelta(hours=3), start + timedelta(days=1)),
+        'standing_expansion': due_standing_query(start + timedelta(days=28)),
+        'day_sheet': day_sheet_query(start.date(), 13),
+        'day_sheet_stamp': day_stamp_query(start.date()),
+        'standing_occurrences': select(Reservation).where(Reservation.standing_id == 1, Reservation.time_slot >= start),
+        'sync_changes': changes_query(item_fields, (start - timedelta(days=2), 0), 500),
+        'sync_reservation_changes': changes_query(reservation_fields, (start - timedelta(days=2), 0), 500),
+        'sync_tombstones': tombstones_query((start - timedelta(days=2), 0), ['menu_items'], 500),
+    }
+
+@pytest.mark.parametrize('name', list(hot_queries()))
+def test_hot_query_uses_index(app, name):
+    with app.app_context():
+        plan = explain(hot_queries()[name])
+    assert 'Index' in plan, f'{name} does not use an index:\n{plan}'
+    assert 'Seq Scan' not in plan, f'{name} falls back to a sequential scan:\n{plan}'
+
+def test_migration_chain_creates_indexes(app):
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP TABLE IF EXISTS alembic_version'))
+        upgrade()
+        with db.engine.connect() as connection:
+            index_names = set(connection.execute(text(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"
+            )).scalars())
+            connection.execute(text('DROP TABLE alembic_version'))
+            connection.commit()
+    assert {
+        'ix_reservations_time_slot_status',
+        'ix_reservations_customer_id',
+        'ix_menu_items_category_id_display_order',
+        'ix_newsletter_subscribers_is_active',
+        'ix_reservations_updated_at',
+        'ix_reservations_active_time_slot',
+        'ix_waitlist_entries_queue',
+        'ix_reservation_holds_expires_at',
+        'ix_capacity_blocks_period',
+        'ix_standing_reservations_expansion',
+        'ix_reservations_standing_occurrence',
+        'ix_sync_tombstones_deleted_at',
+    } <= index_names
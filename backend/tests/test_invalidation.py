@@ -0,0 +1,106 @@
+import time
+import pytest
+from datetime import date, datetime
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.schedule import BlackoutDate
+from ..services.invalidation import CHANNEL, STATIC_TOKEN, cache_token, get_invalidation_bus, invalidate
+from ..services.pacing import get_pacing_cache
+from ..services.schedule import get_schedule
+
+FRIDAY = date(2099, 4, 10)
+
+def worker():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['INVALIDATION_BUS_ENABLED'] = True
+    app.config['INVALIDATION_HEARTBEAT_SECONDS'] = 1
+    with app.app_context():
+        get_invalidation_bus().listener.wait_until_listening(CHANNEL)
+    return app
+
+@pytest.fixture
+def workers():
+    """Two applications standing in for two gunicorn workers"""
+    with create_app('testing').app_context() as context:
+        init_db(context.app, populate_sample_data=False)
+    apps = worker(), worker()
+    yield apps
+    for app in apps:
+        app.extensions['pg_listener'].close()
+
+def eventually(check, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+def check_availability(app, time='19:00'):
+    return app.test_client().post('/api/reservations/check-availability', json={
+        'date': '2099-04-10', 'time': time, 'guests': 2
+    })
+
+def test_booking_on_one_worker_invalidates_pacing_on_the_other(workers):
+    first, second = workers
+    check_availability(first)
+    with first.app_context():
+        assert get_pacing_cache().get(FRIDAY) is not None
+
+    second.test_client().post('/api/reservations', json={
+        'name': 'Bus Test', 'email': 'bus@cafefausse.com', 'date': '2099-04-10', 'time': '19:00', 'guests': 2
+    })
+    with first.app_context():
+        assert eventually(lambda: get_pacing_cache().get(FRIDAY) is None)
+    # The booking worker keeps its own counter, updated in place
+    with second.app_context():
+        assert get_pacing_cache().get(FRIDAY).total == 2
+
+def test_schedule_changes_reach_every_worker(workers):
+    first, second = workers
+    with first.app_context():
+        assert get_schedule().is_open(FRIDAY)
+
+    with second.app_context():
+        db.session.add(BlackoutDate(date=FRIDAY, reason='Private event'))
+        invalidate(db.session, 'schedule')
+        db.session.commit()
+        # The committing worker is invalidated straight away
+        assert not get_schedule().is_open(FRIDAY)
+
+    with first.app_context():
+        assert eventually(lambda: not get_schedule().is_open(FRIDAY))
+
+def test_rolled_back_changes_invalidate_nothing(workers):
+    first, second = workers
+    with first.app_context():
+        before = cache_token('reservations', FRIDAY)
+    with second.app_context():
+        invalidate(db.session, 'reservations', FRIDAY)
+        db.session.rollback()
+        invalidate(db.session, 'reservations', date(2099, 4, 11))
+        db.session.commit()
+    with first.app_context():
+        assert eventually(lambda: cache_token('reservations', date(2099, 4, 11)) != before)
+        assert cache_token('reservations', FRIDAY) == before
+
+def test_caches_read_through_while_the_listener_is_down(workers):
+    first, _ = workers
+    check_availability(first)
+    with first.app_context():
+        first.extensions['pg_listener'].close()
+        assert cache_token('reservations', FRIDAY) is None
+        assert get_pacing_cache().get(FRIDAY) is None
+
+def test_disabled_bus_only_sees_local_commits():
+    app = create_app('testing')
+    with app.app_context():
+        before = cache_token('schedule')
+        assert before[:1] == STATIC_TOKEN
+        invalidate(db.session, 'schedule')
+        assert cache_token('schedule') == before
+        db.session.commit()
+        assert cache_token('schedule') != before
+        assert 'pg_listener' not in app.extensions
@@ -0,0 +1,87 @@
+import pytest
+from datetime import date
+from ..api import reservations
+from ..app import create_app
+from ..init_db import init_db
+from ..services.pacing import DayCovers, get_pacing_cache
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 10
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def test_window_sums():
+    covers = DayCovers()
+    covers.add(19 * 60, 6)
+    covers.add(19 * 60 + 10, 4)
+    covers.add(19 * 60 + 30, 8)
+    assert covers.window(19 * 60, 15) == 10
+    assert covers.window(19 * 60 + 11, 15) == 0
+    assert covers.busiest_window(19 * 60 + 20, 15) == 8
+    assert covers.busiest_window(19 * 60 + 10, 15) == 10
+    covers.add(19 * 60 + 10, -4)
+    assert covers.window(19 * 60, 15) == 6
+    assert covers.total == 14
+
+def test_fits_checks_every_window_around_the_arrival():
+    covers = DayCovers()
+    covers.add(19 * 60, 8)
+    assert not covers.fits(19 * 60 + 29, 4, width=30, cap=10)
+    assert covers.fits(19 * 60 + 30, 4, width=30, cap=10)
+    assert covers.fits(19 * 60, 2, width=30, cap=10)
+    assert covers.fits(19 * 60, 50, width=30, cap=0)
+
+def book(client, guests, time='19:00'):
+    return client.post('/api/reservations', json={
+        'name': 'Pacing Test', 'email': 'pacing@cafefausse.com', 'date': '2099-04-10', 'time': time, 'guests': guests
+    })
+
+def check(client, guests, time='19:00'):
+    return client.post('/api/reservations/check-availability', json={
+        'date': '2099-04-10', 'time': time, 'guests': guests
+    }).json['available']
+
+def test_pacing_cap_limits_bookings(app):
+    client = app.test_client()
+    assert book(client, 8).status_code == 201
+    assert not check(client, 4)
+    assert check(client, 2)
+    assert check(client, 4, time='19:15')
+
+    response = book(client, 4)
+    assert response.status_code == 409
+    assert 'kitchen' in response.json['message']
+
+def test_cancel_releases_covers_incrementally(app):
+    client = app.test_client()
+    reservation_id = book(client, 8).json['reservation_id']
+    with app.app_context():
+        counter = get_pacing_cache().get(date(2099, 4, 10))
+        assert counter.total == 8
+
+    client.post(f'/api/reservations/cancel/{reservation_id}')
+    with app.app_context():
+        assert get_pacing_cache().get(date(2099, 4, 10)) is counter
+        assert counter.total == 0
+    assert check(client, 10)
+    assert book(client, 10).status_code == 201
+
+def test_full_kitchen_is_answered_from_the_counter(app, monkeypatch):
+    client = app.test_client()
+    book(client, 8)
+    loaded = []
+    load_day_async = reservations.load_day_async
+    async def counting_load(*args):
+        loaded.append(args)
+        return await load_day_async(*args)
+    monkeypatch.setattr(reservations, 'load_day_async', counting_load)
+
+    assert not check(client, 4)
+    assert not loaded
+    # Parties the counter has room for still need the tables checked
+    assert check(client, 2)
+    assert len(loaded) == 1
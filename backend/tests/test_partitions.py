@@ -0,0 +1,121 @@
+import os
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..jobs.partitions import (
+    add_months, month_start, partition_name, list_partitions, create_partition,
+    ensure_partitions, archive_partitions, restore_partition, archive_path
+)
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def add_reservation(time_slot, special_requests=None):
+    customer = Customer.query.filter_by(email='partition@example.com').first()
+    if not customer:
+        customer = Customer(name='Partition Test', email='partition@example.com')
+        db.session.add(customer)
+        db.session.flush()
+    reservation = Reservation(
+        customer_id=customer.id, time_slot=time_slot, guests=2, table_number=1, special_requests=special_requests
+    )
+    db.session.add(reservation)
+    db.session.flush()
+    reservation_id = reservation.id
+    db.session.commit()  # Release locks before partition DDL
+    return reservation_id
+
+def rows_in(table):
+    count = db.session.execute(text(f'SELECT count(*) FROM {table}')).scalar()
+    db.session.commit()  # Release locks before partition DDL
+    return count
+
+def reservation_exists(reservation_id):
+    exists = db.session.get(Reservation, reservation_id) is not None
+    db.session.rollback()  # Release locks before partition DDL
+    return exists
+
+def test_month_helpers():
+    assert month_start(datetime(2025, 4, 17, 19, 30)) == date(2025, 4, 1)
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2025, 4, 1)) == 'reservations_p2025_04'
+
+def test_init_db_creates_upcoming_partitions(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            months = list_partitions(connection)
+    current = month_start(date.today())
+    expected = [add_months(current, i) for i in range(app.config['RESERVATION_PARTITION_MONTHS_AHEAD'] + 1)]
+    assert months == expected
+
+def test_ensure_moves_rows_out_of_default_partition(app):
+    far_month = add_months(month_start(date.today()), 8)
+    with app.app_context():
+        add_reservation(datetime.combine(far_month, datetime.min.time()) + timedelta(days=3, hours=19))
+        assert rows_in('reservations_default') == 1
+
+        with db.engine.begin() as connection:
+            created = ensure_partitions(connection, months_ahead=8)
+        assert far_month in created
+        assert rows_in('reservations_default') == 0
+        assert rows_in(partition_name(far_month)) == 1
+        assert Reservation.query.count() == 1
+
+def test_availability_query_touches_one_partition(app):
+    start = datetime.combine(date.today() + timedelta(days=1), datetime.min.time()).replace(hour=19)
+    statement = Reservation.booked_tables_query(start, start + timedelta(minutes=90))
+    compiled = statement.compile(
+        dialect=postgresql.psycopg2.dialect(), compile_kwargs={'render_postcompile': True}
+    )
+    with app.app_context():
+        with db.engine.connect() as connection:
+            plan = '\n'.join(row[0] for row in connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params))
+            partitions = list_partitions(connection)
+    scanned = [month for month in partitions if partition_name(month) in plan]
+    assert scanned == [month_start(start)]
+    assert 'reservations_default' not in plan
+
+def test_archive_and_restore_round_trip(app, tmp_path):
+    old_month = add_months(month_start(date.today()), -24)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            create_partition(connection, old_month)
+        reservation_id = add_reservation(datetime.combine(old_month, datetime.min.time()) + timedelta(hours=20))
+
+        with db.engine.begin() as connection:
+            archived = archive_partitions(connection, retention_months=13, archive_dir=str(tmp_path))
+        assert archived == {old_month: 1}
+        assert os.path.exists(archive_path(str(tmp_path), old_month))
+        assert not reservation_exists(reservation_id)
+
+        with db.engine.begin() as connection:
+            assert restore_partition(connection, old_month, str(tmp_path)) == 1
+        assert reservation_exists(reservation_id)
+
+def test_archive_counts_records_spanning_lines(app, tmp_path):
+    old_month = add_months(month_start(date.today()), -24)
+    requests = 'Window seat\nBirthday cake,\r\n"surprise"'
+    with app.app_context():
+        with db.engine.begin() as connection:
+            create_partition(connection, old_month)
+        first = datetime.combine(old_month, datetime.min.time()) + timedelta(hours=19)
+        reservation_id = add_reservation(first, special_requests=requests)
+        add_reservation(first + timedelta(days=1))
+
+        with db.engine.begin() as connection:
+            assert archive_partitions(connection, retention_months=13, archive_dir=str(tmp_path)) == {old_month: 2}
+        with db.engine.begin() as connection:
+            assert restore_partition(connection, old_month, str(tmp_path)) == 2
+        assert db.session.get(Reservation, reservation_id).special_requests == requests
@@ -129,4 +129,24 @@ def test_get_reservations_multiple(client, init_database):
     # Verify the details of the reservations
     reservation_names = [res["customer_name"] for res in response.json["reservations"]]
     assert "John Doe" in reservation_names
-    assert "Jane Smith" in reservation_names
\ No newline at end of file
+    assert "Jane Smith" in reservation_names
+
+def test_newsletter_opt_in_runs_after_the_booking_commits(client, init_database, monkeypatch):
+    from backend.api import reservations
+    from backend.extensions import db
+    calls = []
+
+    def subscribe(email):
+        # The booking's transaction, and with it the day lock, must already be over
+        calls.append(db.session().in_transaction())
+        db.session.rollback()  # A failing subscription rolls back; the booking must survive it
+        return {'success': False, 'message': 'An error occurred'}, 500
+
+    monkeypatch.setattr(reservations, 'subscribe_to_newsletter', subscribe)
+    response = client.post('/api/reservations', json={
+        "name": "Opt In", "email": "optin@example.com", "phone": "555-0104",
+        "date": "2025-04-10", "time": "19:00", "guests": 2, "newsletter_opt_in": True
+    })
+    assert response.status_code == 201 and calls == [False]
+    assert client.get(f"/api/reservations/{response.json['reservation_id']}").status_code == 200
+
@@ -0,0 +1,108 @@
+import pytest
+from datetime import date, datetime, time, timedelta
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.schedule import BlackoutDate, DEFAULT_PARTY_DURATIONS
+from ..services.schedule import ServiceSchedule, get_schedule, invalidate_schedule
+
+FRIDAY = date(2099, 4, 10)
+SUNDAY = date(2099, 4, 12)
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def schedule(blackouts=()):
+    return ServiceSchedule(
+        [(4, time(17, 0), time(21, 30), time(23, 0), 15), (6, time(17, 0), time(19, 30), time(21, 0), 30)],
+        blackouts,
+        DEFAULT_PARTY_DURATIONS
+    )
+
+def test_slots_follow_service_periods():
+    slots = schedule().slots_for(FRIDAY)
+    assert slots[0] == datetime(2099, 4, 10, 17, 0)
+    assert slots[-1] == datetime(2099, 4, 10, 21, 30)
+    assert len(slots) == 19
+    assert len(schedule().slots_for(SUNDAY)) == 6
+    assert schedule().slots_for(FRIDAY - timedelta(days=1)) == ()
+
+def test_valid_slots():
+    service = schedule(blackouts=[SUNDAY])
+    assert service.is_valid_slot(datetime(2099, 4, 10, 19, 15))
+    assert not service.is_valid_slot(datetime(2099, 4, 10, 19, 10))
+    assert not service.is_valid_slot(datetime(2099, 4, 10, 22, 0))
+    assert not service.is_valid_slot(datetime(2099, 4, 12, 19, 0))
+    assert not service.is_open(SUNDAY)
+
+def test_duration_by_party_size():
+    service = schedule()
+    assert service.duration_for(2) == timedelta(minutes=90)
+    assert service.duration_for(3) == timedelta(minutes=105)
+    assert service.duration_for(12) == timedelta(minutes=150)
+    assert service.longest_duration == timedelta(minutes=150)
+    with pytest.raises(ValueError):
+        service.duration_for(21)
+
+def test_last_seatings_end_by_closing_time():
+    service = schedule()
+    last = datetime(2099, 4, 10, 21, 30)
+    assert service.closes_at(last) == datetime(2099, 4, 10, 23, 0)
+    assert service.is_valid_slot(last, 2)  # 90 minutes, done at 23:00
+    assert not service.is_valid_slot(last, 4)  # 105 minutes would run to 23:15
+    assert service.is_valid_slot(datetime(2099, 4, 10, 20, 30), 12)
+    assert not service.is_valid_slot(datetime(2099, 4, 10, 20, 45), 12)
+    assert service.seatings_for(FRIDAY, 12)[-1] == datetime(2099, 4, 10, 20, 30)
+    assert service.seatings_for(FRIDAY, 2) == service.slots_for(FRIDAY)
+
+def test_service_past_midnight_closes_the_next_day():
+    service = ServiceSchedule([(4, time(20, 0), time(23, 30), time(1, 0), 30)], (), DEFAULT_PARTY_DURATIONS)
+    assert service.closes_at(datetime(2099, 4, 10, 23, 30)) == datetime(2099, 4, 11, 1, 0)
+    assert service.is_valid_slot(datetime(2099, 4, 10, 23, 30), 2)
+
+def test_slots_endpoint(app):
+    client = app.test_client()
+    response = client.get('/api/reservations/slots?date=2099-04-12&guests=6')
+    assert response.status_code == 200
+    assert response.json['slots'][0] == '17:00'
+    assert response.json['slots'][-1] == '19:00'  # A 120 minute sitting ends by the 21:00 close
+    assert response.json['duration_minutes'] == 120
+    assert client.get('/api/reservations/slots?date=2099-04-12').json['slots'][-1] == '19:30'
+    assert client.get('/api/reservations/slots').status_code == 400
+
+def test_times_outside_service_are_rejected(app):
+    client = app.test_client()
+    for when in ('15:00', '22:00', '19:07'):
+        response = client.post('/api/reservations/check-availability', json={
+            'date': '2099-04-10', 'time': when, 'guests': 2
+        })
+        assert response.status_code == 400, when
+        response = client.post('/api/reservations', json={
+            'name': 'Schedule Test', 'email': 'schedule@cafefausse.com',
+            'date': '2099-04-10', 'time': when, 'guests': 2
+        })
+        assert response.status_code == 400, when
+
+def test_late_seatings_for_large_parties_are_rejected(app):
+    client = app.test_client()
+    booking = {'name': 'Late Party', 'email': 'late@cafefausse.com', 'date': '2099-04-10', 'time': '21:30'}
+    response = client.post('/api/reservations/check-availability', json={**booking, 'guests': 8})
+    assert response.status_code == 400
+    assert client.post('/api/reservations', json={**booking, 'guests': 8}).status_code == 400
+    assert client.post('/api/reservations', json={**booking, 'guests': 2}).status_code == 201
+
+def test_blackout_dates_close_the_day(app):
+    client = app.test_client()
+    with app.app_context():
+        assert get_schedule().is_open(FRIDAY)
+        db.session.add(BlackoutDate(date=FRIDAY, reason='Private event'))
+        db.session.commit()
+        invalidate_schedule()
+    response = client.get('/api/reservations/slots?date=2099-04-10')
+    assert response.json['open'] is False
+    assert response.json['slots'] == []
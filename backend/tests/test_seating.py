@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta
+from ..app import create_app
+from ..init_db import init_db
+from ..models.reservation import Reservation
+from ..models.table import DEFAULT_FLOOR_PLAN
+from ..services.seating import SeatingPlan, TableSpec
+
+SEVEN = datetime(2025, 4, 10, 19, 0)
+SITTING = timedelta(minutes=90)
+
+def floor_plan():
+    return [
+        TableSpec(number, capacity, section, combinable)
+        for first, last, capacity, section, combinable in DEFAULT_FLOOR_PLAN
+        for number in range(first, last + 1)
+    ]
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def test_party_gets_smallest_table_that_fits():
+    plan = SeatingPlan(floor_plan())
+    assert plan.tables[plan.best_fit(2, SEVEN, SEVEN + SITTING)[0]].capacity == 2
+    assert plan.tables[plan.best_fit(3, SEVEN, SEVEN + SITTING)[0]].capacity == 4
+    assert plan.tables[plan.best_fit(8, SEVEN, SEVEN + SITTING)[0]].capacity == 8
+
+def test_overlapping_bookings_block_a_table():
+    plan = SeatingPlan([TableSpec(1, 4, 'main', False)])
+    plan.book([1], SEVEN, SEVEN + SITTING)
+    assert not plan.is_free(1, SEVEN + timedelta(minutes=60), SEVEN + timedelta(minutes=150))
+    assert not plan.is_free(1, SEVEN - timedelta(minutes=60), SEVEN + timedelta(minutes=30))
+    assert plan.is_free(1, SEVEN + SITTING, SEVEN + 2 * SITTING)
+    assert plan.is_free(1, SEVEN - SITTING, SEVEN)
+
+def test_sittings_are_packed_back_to_back():
+    plan = SeatingPlan([TableSpec(1, 4, 'main', False), TableSpec(2, 4, 'main', False)])
+    plan.book([2], SEVEN - SITTING, SEVEN)
+    # Table 2 frees up exactly when the new party arrives, keeping table 1 open all evening
+    assert plan.assign(4, SEVEN, SEVEN + SITTING) == (2,)
+
+def test_large_party_combines_tables_of_one_section():
+    plan = SeatingPlan(floor_plan())
+    for number in (27, 28, 29, 30):
+        plan.book([number], SEVEN, SEVEN + SITTING)
+    tables = plan.assign(10, SEVEN, SEVEN + SITTING)
+    # Three four-tops (12 seats) waste fewer seats than anything else that fits
+    assert sum(plan.tables[number].capacity for number in tables) == 12
+    assert len({plan.tables[number].section for number in tables}) == 1
+    assert all(plan.tables[number].combinable for number in tables)
+
+def test_full_room_cannot_seat_party():
+    plan = SeatingPlan([TableSpec(1, 2, 'window', True), TableSpec(2, 2, 'main', True)])
+    assert plan.assign(4, SEVEN, SEVEN + SITTING) is None
+    plan = SeatingPlan([TableSpec(1, 4, 'main', False)])
+    assert plan.assign(4, SEVEN, SEVEN + SITTING) == (1,)
+    assert plan.assign(2, SEVEN + timedelta(minutes=30), SEVEN + timedelta(minutes=120)) is None
+
+def book(client, guests, date='2025-04-10', time='19:00'):
+    return client.post('/api/reservations', json={
+        'name': 'Seating Test', 'email': 'seating@cafefausse.com', 'date': date, 'time': time, 'guests': guests
+    })
+
+def check(client, guests, date='2099-04-10', time='19:00'):
+    return client.post('/api/reservations/check-availability', json={
+        'date': date, 'time': time, 'guests': guests
+    }).json['available']
+
+def test_reservations_are_seated_by_party_size(app):
+    client = app.test_client()
+    two = book(client, 2).json
+    eight = book(client, 8).json
+    assert two['table_number'] <= 8  # a two-top
+    assert eight['table_number'] in (29, 30)  # an eight-top
+
+def test_large_party_is_seated_on_combined_tables(app):
+    client = app.test_client()
+    response = book(client, 12)
+    assert response.status_code == 201
+    assert len(response.json['tables']) == 3
+    with app.app_context():
+        reservation = Reservation.query.get(response.json['reservation_id'])
+        assert reservation.tables == response.json['tables']
+
+def test_availability_depends_on_party_size(app):
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 0  # Only tables limit bookings here
+    client = app.test_client()
+    assert check(client, 12)
+    # Parties of 12 use up every section of combinable four-tops
+    while book(client, 12, date='2099-04-10').status_code == 201:
+        pass
+    assert not check(client, 12)
+    assert check(client, 2)
+    assert check(client, 12, date='2099-04-11')  # A 12-top booked at 19:00 leaves no later seating that day
+
+def test_invalid_party_size_is_rejected(app):
+    assert book(app.test_client(), 0).status_code == 400
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..serialization import FastJSONProvider
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)
+    return app
+
+def test_datetimes_are_written_in_iso_format(app):
+    assert isinstance(app.json, FastJSONProvider)
+    stamp = datetime(2099, 4, 10, 19, 30, 0, 250000)
+    assert app.json.loads(app.json.dumps({'at': stamp, 1: 'one'})) == {'at': stamp.isoformat(), '1': 'one'}
+
+    response = app.test_client().get('/api/customers')
+    assert response.mimetype == 'application/json'
+    with app.app_context():
+        customer = db.session.get(Customer, response.json['customers'][0]['id'])
+        assert response.json['customers'][0]['created_at'] == customer.created_at.isoformat()
+
+def test_bulk_endpoints_negotiate_msgpack(app):
+    msgpack = pytest.importorskip('msgpack')
+    client = app.test_client()
+    response = client.get('/api/customers', headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    assert 'Accept' in response.headers['Vary']
+    assert msgpack.unpackb(response.data) == client.get('/api/customers').json
+
+    preferred = client.get('/api/newsletter/subscribers', headers={
+        'Accept': 'application/json;q=0.5, application/msgpack'
+    })
+    assert preferred.mimetype == 'application/msgpack'
+
+def test_json_stays_the_default(app):
+    client = app.test_client()
+    assert client.get('/api/reservations/all', headers={'Accept': '*/*'}).mimetype == 'application/json'
+    # Endpoints outside the admin lists never negotiate
+    menu = client.get('/api/menu/items', headers={'Accept': 'application/msgpack'})
+    assert menu.mimetype == 'application/json'
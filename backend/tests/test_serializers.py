@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import event
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..fieldsets import compile_serializer
+from ..services.sync import SYNCED_FIELDS, SYNCED_MODELS
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app)
+    return app
+
+def test_compiled_serializers_build_one_dict_per_row():
+    serialize = compile_serializer(('id', 'name'))
+    assert serialize([(1, 'Ada'), (2, "O'Brien", 'ignored')]) == [
+        {'id': 1, 'name': 'Ada'}, {'id': 2, 'name': "O'Brien"}
+    ]
+    assert compile_serializer(('id', 'name')) is serialize
+    assert serialize([]) == []
+
+def test_default_fields_match_the_models_payloads(app):
+    client = app.test_client()
+    changes = client.get('/api/sync').json['changes']
+    with app.app_context():
+        for name, model in SYNCED_MODELS.items():
+            assert SYNCED_FIELDS[name].model is model
+            expected = {row['id']: app.json.loads(app.json.dumps(row))
+                        for row in (instance.to_dict() for instance in model.query)}
+            assert {row['id']: row for row in changes[name]} == expected, name
+
+def test_synced_reservations_join_their_customer_once(app):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = app.test_client().get('/api/sync?types=reservations')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    assert len(response.json['changes']['reservations']) > 1
+    assert all(row['customer_name'] for row in response.json['changes']['reservations'])
+    assert not [statement for statement in statements if 'FROM customers' in statement]
@@ -0,0 +1,125 @@
+import pytest
+from datetime import date, datetime
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..models.schedule import BlackoutDate
+from ..models.standing_reservation import StandingReservation
+from ..jobs.reservations import expand_all_standing
+from ..services.schedule import get_schedule, invalidate_schedule
+from ..services.standing import expand_standing, horizon_end
+
+NOW = datetime(2099, 4, 1, 12, 0)
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    # Reach the 2099 test dates from today
+    app.config['STANDING_RESERVATION_HORIZON_DAYS'] = 40000
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def standing_rule(**fields):
+    customer = Customer(name='Standing Test', email='standing@cafefausse.com')
+    db.session.add(customer)
+    db.session.flush()
+    standing = StandingReservation(
+        customer_id=customer.id, starts_at=datetime(2099, 4, 10, 19, 0), recurrence='FREQ=WEEKLY',
+        guests=4, **fields
+    )
+    db.session.add(standing)
+    db.session.flush()
+    return standing
+
+def booked_slots(standing_id):
+    return [reservation.time_slot for reservation in db.session.scalars(
+        db.select(Reservation).where(Reservation.standing_id == standing_id, Reservation.status == 'confirmed')
+        .order_by(Reservation.time_slot)
+    )]
+
+def standing_request(**fields):
+    return {
+        'name': 'Standing Test', 'email': 'standing@cafefausse.com',
+        'date': '2099-04-10', 'time': '19:00', 'guests': 4, 'ends_on': '2099-04-30', **fields
+    }
+
+def test_expands_only_within_the_horizon(app):
+    with app.app_context():
+        standing = standing_rule()
+        expansion = expand_standing(db.session, get_schedule(), standing, horizon_end(28, NOW), NOW)
+        db.session.commit()
+        assert [reservation.time_slot.day for reservation in expansion.booked] == [10, 17, 24]
+        assert standing.expanded_until == datetime(2099, 4, 30)
+
+        # Re-running books nothing new; rolling the horizon books the next week only
+        assert expand_standing(db.session, get_schedule(), standing, horizon_end(28, NOW), NOW).booked == []
+        later = datetime(2099, 4, 8, 12, 0)
+        expansion = expand_standing(db.session, get_schedule(), standing, horizon_end(28, later), later)
+        db.session.commit()
+        assert [reservation.time_slot for reservation in expansion.booked] == [datetime(2099, 5, 1, 19, 0)]
+        assert len(booked_slots(standing.id)) == 4
+
+def test_skips_occurrences_that_cannot_be_seated(app):
+    with app.app_context():
+        db.session.add(BlackoutDate(date=date(2099, 4, 17), reason='Private event'))
+        db.session.commit()
+        invalidate_schedule()
+        standing = standing_rule(ends_on=date(2099, 4, 24))
+        expansion = expand_standing(db.session, get_schedule(), standing, horizon_end(28, NOW), NOW)
+        db.session.commit()
+        assert expansion.skipped == [datetime(2099, 4, 17, 19, 0)]
+        assert booked_slots(standing.id) == [datetime(2099, 4, 10, 19, 0), datetime(2099, 4, 24, 19, 0)]
+
+def test_expansion_job_rolls_every_rule_forward(app):
+    with app.app_context():
+        first = standing_rule().id
+        db.session.add(StandingReservation(
+            customer_id=db.session.get(StandingReservation, first).customer_id,
+            starts_at=datetime(2099, 4, 11, 18, 0), recurrence='FREQ=WEEKLY;INTERVAL=2', guests=2
+        ))
+        db.session.commit()
+
+        rules, booked, skipped = expand_all_standing(db.engine, get_schedule(), horizon_end(28, NOW), NOW)
+        assert (rules, booked, skipped) == (2, 5, 0)
+        assert expand_all_standing(db.engine, get_schedule(), horizon_end(28, NOW), NOW) == (0, 0, 0)
+
+def test_create_and_list_standing_reservation(app):
+    client = app.test_client()
+    response = client.post('/api/reservations/standing', json=standing_request())
+    assert response.status_code == 201
+    standing = response.json['standing_reservation']
+    assert standing['recurrence'] == 'FREQ=WEEKLY'
+    assert [entry['time_slot'] for entry in response.json['reservations']] == [
+        '2099-04-10T19:00:00', '2099-04-17T19:00:00', '2099-04-24T19:00:00'
+    ]
+
+    # Occurrences are ordinary reservations
+    listed = client.get('/api/reservations/all').json['reservations']
+    assert [entry['standing_id'] for entry in listed] == [standing['id']] * 3
+
+    detail = client.get(f"/api/reservations/standing/{standing['id']}")
+    assert len(detail.json['reservations']) == 3
+    assert client.get('/api/reservations/standing/999').status_code == 404
+
+def test_cancel_standing_reservation(app):
+    client = app.test_client()
+    standing_id = client.post('/api/reservations/standing', json=standing_request()).json['standing_reservation']['id']
+    response = client.post(f'/api/reservations/standing/cancel/{standing_id}')
+    assert response.status_code == 200
+    assert response.json['canceled_reservations'] == 3
+
+    detail = client.get(f'/api/reservations/standing/{standing_id}').json
+    assert not detail['standing_reservation']['is_active']
+    assert {entry['status'] for entry in detail['reservations']} == {'canceled'}
+    assert client.post('/api/reservations/standing/cancel/999').status_code == 404
+
+def test_rejects_invalid_standing_requests(app):
+    client = app.test_client()
+    assert client.post('/api/reservations/standing', json=standing_request(recurrence='FREQ=HOURLY')).status_code == 400
+    assert client.post('/api/reservations/standing', json=standing_request(recurrence='NOT A RULE')).status_code == 400
+    assert client.post('/api/reservations/standing', json=standing_request(time='19:10')).status_code == 400
+    assert client.post('/api/reservations/standing', json={'name': 'Missing'}).status_code == 400
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.reservation import Reservation
+from ..jobs.reservations import sweep_reservations
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+def add_reservations(statuses, time_slot):
+    customer = Customer(name='Sweeper Test', email=f'sweeper{time_slot:%H%M%S%f}@cafefausse.com')
+    db.session.add(customer)
+    db.session.flush()
+    reservations = [
+        Reservation(customer_id=customer.id, time_slot=time_slot, guests=2, table_number=i + 1, status=status)
+        for i, status in enumerate(statuses)
+    ]
+    db.session.add_all(reservations)
+    db.session.commit()
+    return [reservation.id for reservation in reservations]
+
+def statuses(ids):
+    result = {r.id: r.status for r in Reservation.query.filter(Reservation.id.in_(ids))}
+    db.session.rollback()
+    return [result[i] for i in ids]
+
+def test_sweep_moves_past_bookings_to_final_statuses(app):
+    now = datetime.now()
+    with app.app_context():
+        past = add_reservations(['seated', 'confirmed', 'canceled'], now - timedelta(hours=5))
+        future = add_reservations(['confirmed', 'seated'], now + timedelta(days=1))
+        swept = sweep_reservations(db.engine, 120, 'completed', batch_size=1000, now=now)
+        assert swept == {('seated', 'completed'): 1, ('confirmed', 'completed'): 1}
+        assert statuses(past) == ['completed', 'completed', 'canceled']
+        assert statuses(future) == ['confirmed', 'seated']
+
+def test_sweep_marks_unseated_bookings_as_no_show(app):
+    now = datetime.now()
+    with app.app_context():
+        past = add_reservations(['seated', 'confirmed'], now - timedelta(hours=5))
+        sweep_reservations(db.engine, 120, 'no_show', batch_size=1000, now=now)
+        assert statuses(past) == ['completed', 'no_show']
+
+def test_sweep_leaves_sittings_in_progress_alone(app):
+    now = datetime.now()
+    with app.app_context():
+        current = add_reservations(['seated'], now - timedelta(minutes=60))
+        sweep_reservations(db.engine, 120, 'completed', batch_size=1000, now=now)
+        assert statuses(current) == ['seated']
+
+def test_sweep_runs_in_chunks(app):
+    now = datetime.now()
+    with app.app_context():
+        past = add_reservations(['confirmed'] * 7, now - timedelta(days=2))
+        before = Reservation.query.get(past[0]).updated_at
+        db.session.rollback()
+        swept = sweep_reservations(db.engine, 120, 'completed', batch_size=3, now=now)
+        assert swept[('confirmed', 'completed')] == 7
+        assert set(statuses(past)) == {'completed'}
+        assert Reservation.query.get(past[0]).updated_at > before
+
+def test_sweep_rejects_unknown_final_status(app):
+    with app.app_context():
+        with pytest.raises(ValueError):
+            sweep_reservations(db.engine, 120, 'canceled', batch_size=10)
+
+def test_sweep_command(app):
+    with app.app_context():
+        add_reservations(['confirmed'], datetime.now() - timedelta(days=1))
+    result = app.test_cli_runner().invoke(args=['reservations', 'sweep'])
+    assert result.exit_code == 0, result.output
+    assert 'confirmed -> completed: 1' in result.output
+
+def test_update_rejects_unknown_status(app):
+    with app.app_context():
+        [reservation_id] = add_reservations(['confirmed'], datetime.now() + timedelta(days=1))
+    client = app.test_client()
+    assert client.put(f'/api/reservations/{reservation_id}', json={'status': 'eaten'}).status_code == 400
+    assert client.put(f'/api/reservations/{reservation_id}', json={'status': 'seated'}).status_code == 200
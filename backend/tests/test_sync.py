@@ -0,0 +1,121 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.customer import Customer
+from ..models.menu_item import MenuItem
+from ..models.reservation import Reservation
+from ..jobs.sync import purge_tombstones
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    # Every host shares the test machine's clock
+    app.config['SYNC_CLOCK_SKEW_SECONDS'] = 0
+    with app.app_context():
+        init_db(app)
+    return app
+
+def sync(client, **params):
+    response = client.get('/api/sync', query_string=params)
+    assert response.status_code == 200, response.json
+    return response.json
+
+def ids(result, name):
+    return [row['id'] for row in result['changes'][name]]
+
+def test_only_changes_since_the_cursor_are_returned(app):
+    client = app.test_client()
+    snapshot = sync(client)
+    assert len(ids(snapshot, 'customers')) == 2
+    with app.app_context():
+        assert len(ids(snapshot, 'menu_items')) == MenuItem.query.count()
+
+    with app.app_context():
+        customer = db.session.get(Customer, 1)
+        customer.phone = '555-000-0000'
+        db.session.commit()
+
+    delta = sync(client, since=snapshot['cursor'])
+    assert ids(delta, 'customers') == [1]
+    assert delta['changes']['customers'][0]['phone'] == '555-000-0000'
+    assert ids(delta, 'menu_items') == [] and ids(delta, 'reservations') == []
+    assert ids(sync(client, since=delta['cursor']), 'customers') == []
+
+def test_pages_walk_every_row_once(app):
+    client = app.test_client()
+    seen, result = [], {'cursor': None, 'has_more': True}
+    while result['has_more']:
+        result = sync(client, types='menu_items', limit=3, since=result['cursor'] or '')
+        seen += ids(result, 'menu_items')
+    with app.app_context():
+        assert sorted(seen) == sorted(item.id for item in MenuItem.query.all())
+    assert list(result['changes']) == ['menu_items']
+
+def test_deletions_are_returned_as_tombstones(app):
+    client = app.test_client()
+    cursor = sync(client, types='menu_items,customers')['cursor']
+    with app.app_context():
+        db.session.execute(MenuItem.__table__.delete().where(MenuItem.id.in_([3, 4])))
+        db.session.commit()
+    delta = sync(client, types='menu_items,customers', since=cursor)
+    assert delta['deleted'] == {'menu_items': [3, 4], 'customers': []}
+
+def test_reservations_moved_between_partitions_are_not_deleted(app):
+    client = app.test_client()
+    start = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    with app.app_context():
+        reservation = Reservation(customer_id=1, time_slot=start, guests=2, table_number=1)
+        db.session.add(reservation)
+        db.session.commit()
+        reservation_id = reservation.id
+    cursor = sync(client, types='reservations')['cursor']
+
+    with app.app_context():
+        db.session.get(Reservation, reservation_id).time_slot = start + timedelta(days=40)
+        db.session.commit()
+    delta = sync(client, types='reservations', since=cursor)
+    assert delta['deleted']['reservations'] == []
+    assert ids(delta, 'reservations') == [reservation_id]
+
+    with app.app_context():
+        db.session.delete(db.session.get(Reservation, reservation_id))
+        db.session.commit()
+    delta = sync(client, types='reservations', since=delta['cursor'])
+    assert delta['deleted']['reservations'] == [reservation_id]
+
+def test_cursor_waits_for_transactions_still_writing(app):
+    client = app.test_client()
+    cursor = sync(client, types='customers')['cursor']
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        # Stamp the row after the transaction starts; SYNC_CLOCK_SKEW_SECONDS covers the gap otherwise
+        connection.execute(text('SELECT 1'))
+        connection.execute(Customer.__table__.insert().values(
+            name='Slow Writer', email='slow@cafefausse.com', updated_at=datetime.utcnow()
+        ))
+        # The row is invisible, and the cursor must not move past it
+        during = sync(client, types='customers', since=cursor)
+        assert ids(during, 'customers') == []
+        transaction.commit()
+        connection.close()
+    after = sync(client, types='customers', since=during['cursor'])
+    assert [row['email'] for row in after['changes']['customers']] == ['slow@cafefausse.com']
+
+def test_invalid_and_expired_cursors_are_refused(app):
+    client = app.test_client()
+    assert client.get('/api/sync?since=yesterday').status_code == 400
+    assert client.get('/api/sync?types=tables').status_code == 400
+    old = (datetime.utcnow() - timedelta(days=60)).isoformat()
+    assert client.get(f'/api/sync?since={old}').status_code == 410
+
+def test_purge_removes_old_tombstones(app):
+    with app.app_context():
+        db.session.execute(MenuItem.__table__.delete().where(MenuItem.id == 5))
+        db.session.commit()
+        assert purge_tombstones(db.engine, 30, 100) == 0
+        assert purge_tombstones(db.engine, 30, 100, now=datetime.utcnow() + timedelta(days=31)) == 1
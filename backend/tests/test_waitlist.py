@@ -0,0 +1,98 @@
+import pytest
+from ..app import create_app
+from ..init_db import init_db
+from ..extensions import db
+from ..models.reservation import Reservation
+from ..models.waitlist import WaitlistEntry
+from ..services.notifications import Notifier
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    app.config['KITCHEN_MAX_COVERS_PER_INTERVAL'] = 10
+    with app.app_context():
+        init_db(app, populate_sample_data=False)
+    return app
+
+@pytest.fixture
+def sent(app):
+    messages = []
+    app.extensions['notifier'] = Notifier(app, lambda *message: messages.append(message))
+    return messages
+
+def guest(name, guests, time='19:00'):
+    return {
+        'name': name, 'email': f'{name.lower()}@cafefausse.com',
+        'date': '2099-04-10', 'time': time, 'guests': guests
+    }
+
+def test_waitlist_only_for_full_times(app):
+    client = app.test_client()
+    response = client.post('/api/waitlist', json=guest('Early', 2))
+    assert response.status_code == 409
+    assert client.post('/api/waitlist', json=guest('Early', 2, time='14:00')).status_code == 400
+
+def test_queue_positions_favour_larger_parties(app):
+    client = app.test_client()
+    assert client.post('/api/reservations', json=guest('Host', 10)).status_code == 201
+
+    small = client.post('/api/waitlist', json=guest('Small', 2))
+    assert small.status_code == 201
+    assert small.json['position'] == 1
+    large = client.post('/api/waitlist', json=guest('Large', 6))
+    assert large.json['position'] == 1
+    assert client.get(f"/api/waitlist/{small.json['waitlist_id']}").json['waitlist_entry']['position'] == 2
+
+    # One entry per customer and time
+    assert client.post('/api/waitlist', json=guest('Small', 2)).status_code == 409
+
+def test_cancellation_promotes_waiting_parties(app, sent):
+    client = app.test_client()
+    booked = client.post('/api/reservations', json=guest('Host', 10))
+    ids = {}
+    for name, guests in [('Small', 2), ('Large', 6), ('Medium', 4)]:
+        ids[name] = client.post('/api/waitlist', json=guest(name, guests)).json['waitlist_id']
+
+    assert client.post(f"/api/reservations/cancel/{booked.json['reservation_id']}").status_code == 200
+    app.extensions['notifier'].join()
+
+    with app.app_context():
+        entries = {name: db.session.get(WaitlistEntry, entry_id) for name, entry_id in ids.items()}
+        # Largest parties first, until the kitchen cap of 10 covers is reached
+        assert entries['Large'].status == 'promoted'
+        assert entries['Medium'].status == 'promoted'
+        assert entries['Small'].status == 'waiting'
+        reservation = db.session.get(Reservation, entries['Large'].reservation_id)
+        assert reservation.status == 'confirmed'
+        assert reservation.guests == 6
+
+    assert sorted(recipient for recipient, _, _ in sent) == ['large@cafefausse.com', 'medium@cafefausse.com']
+    assert client.get(f"/api/waitlist/{ids['Small']}").json['waitlist_entry']['position'] == 1
+
+def test_update_frees_tables_for_waitlist(app, sent):
+    client = app.test_client()
+    booked = client.post('/api/reservations', json=guest('Host', 10))
+    waiting = client.post('/api/waitlist', json=guest('Small', 2)).json['waitlist_id']
+
+    response = client.put(f"/api/reservations/{booked.json['reservation_id']}", json={'guests': 8})
+    assert response.status_code == 200
+    app.extensions['notifier'].join()
+
+    entry = client.get(f'/api/waitlist/{waiting}').json['waitlist_entry']
+    assert entry['status'] == 'promoted'
+    assert entry['reservation_id'] is not None
+    assert [recipient for recipient, _, _ in sent] == ['small@cafefausse.com']
+
+def test_leave_waitlist(app, sent):
+    client = app.test_client()
+    booked = client.post('/api/reservations', json=guest('Host', 10))
+    waiting = client.post('/api/waitlist', json=guest('Small', 2)).json['waitlist_id']
+
+    assert client.post(f'/api/waitlist/cancel/{waiting}').status_code == 200
+    client.post(f"/api/reservations/cancel/{booked.json['reservation_id']}")
+    app.extensions['notifier'].join()
+
+    assert client.get(f'/api/waitlist/{waiting}').json['waitlist_entry']['status'] == 'canceled'
+    assert sent == []
+    assert client.post('/api/waitlist/cancel/999999').status_code == 404
@@ -59,9 +59,48 @@ const ManageReservations = () => {
         loadReservations();
     }, []);
 
+    useEffect(() => {
+        // Apply the changes pushed by the server instead of reloading the whole list
+        if (typeof EventSource === 'undefined') {
+            return;
+        }
+        const changes = new EventSource('/api/reservations/changes');
+        const mergeReservation = (change: Partial<Reservation> & { id: string }) => {
+            setReservations(prevReservations =>
+                prevReservations.some(reservation => reservation.id === change.id)
+                    ? prevReservations.map(reservation =>
+                        reservation.id === change.id ? { ...reservation, ...change } : reservation
+                    )
+                    : [...prevReservations, change as Reservation]
+            );
+        };
+        const applyChange = (event: MessageEvent) => {
+            // Events carry the ID, status and time; the rest of the row is fetched
+            const change: Partial<Reservation> & { id: string } = JSON.parse(event.data);
+            mergeReservation(change);
+            fetch(`/api/reservations/${change.id}?include=customer`)
+                .then(response => response.ok ? response.json() : null)
+                .then(data => {
+                    if (data && data.success) {
+                        mergeReservation(data.reservation);
+                    }
+                })
+                .catch(error => console.error('Error fetching changed reservation:', error));
+        };
+        ['reservation.created', 'reservation.updated', 'reservation.canceled'].forEach(name =>
+            changes.addEventListener(name, applyChange as EventListener)
+        );
+        // Changes were missed (e.g. after a long disconnect): reload once
+        changes.addEventListener('reset', loadReservations);
+        return () => changes.close();
+    }, []);
+
     // Function to handle successful reservation submission
     const handleReservationAdded = () => {
-        loadReservations();
+        // The change feed delivers the new reservation; reload only without it
+        if (typeof EventSource === 'undefined') {
+            loadReservations();
+        }
         setShowReservationForm(false); // Optionally hide the form after successful submission
     };
 
@@ -245,8 +284,10 @@ const ManageReservations = () => {
                                         >
                                             <option value="">All</option>
                                             <option value="confirmed">Confirmed</option>
-                                            <option value="canceled">Canceled</option>
+                                            <option value="seated">Seated</option>
                                             <option value="completed">Completed</option>
+                                            <option value="no_show">No-show</option>
+                                            <option value="canceled">Canceled</option>
                                         </select>
                                         {statusFilter && (
                                             <button 
@@ -393,8 +434,10 @@ const ManageReservations = () => {
                                             onChange={e => handleEdit(reservation.id, 'status', e.target.value)}
                                         >
                                             <option value="confirmed">Confirmed</option>
-                                            <option value="canceled">Canceled</option>
+                                            <option value="seated">Seated</option>
                                             <option value="completed">Completed</option>
+                                            <option value="no_show">No-show</option>
+                                            <option value="canceled">Canceled</option>
                                         </select>
                                     </td>
                                     <td>